@@ -10,18 +10,24 @@ Prerequisites
 * Application is authorized for the enterprise (Developer Portal - MyApp - Authorization)
 """
 
-from typing import IO, Any, Dict, Optional, Union
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 from abc import ABC, abstractmethod
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from io import BytesIO, StringIO
+import os
 from pathlib import PurePath
 import re
+import threading
 
 from boxsdk import Client, JWTAuth
+from boxsdk.exception import BoxAPIException
 from boxsdk.object.file import File
 from boxsdk.object.folder import Folder
+from boxsdk.object.upload_session import UploadSession
 
-from pyspark.sql.functions import expr, lit
-from pyspark.sql.types import StructType
+from pyspark.sql.functions import col, create_map, element_at, expr, length, lit, split
+from pyspark.sql.types import StringType, StructField, StructType
 
 from koheesio import Step, StepOutput
 from koheesio.models import (
@@ -35,11 +41,15 @@ from koheesio.models import (
     field_validator,
     model_validator,
 )
+from koheesio.spark import DataFrame
 from koheesio.spark.readers import Reader
-from koheesio.spark.readers.memory import InMemoryDataReader
+from koheesio.spark.utils.staging import create_staging_dir
 from koheesio.spark.writers.buffer import BufferWriter
 from koheesio.utils import utc_now
 
+_folder_index: Dict[str, Dict[str, File]] = {}
+_folder_index_lock = threading.Lock()
+
 
 class BoxFolderNotFoundError(Exception):
     """Error when a provided box path does not exist."""
@@ -363,7 +373,8 @@ class BoxReaderBase(Box, Reader, ABC):
     )
     params: Optional[Dict[str, Any]] = Field(
         default_factory=dict,
-        description="[Optional] Set of extra parameters that should be passed to the Spark reader.",
+        description="[Optional] Set of extra parameters that should be passed to the reader, e.g. `pandas.read_csv` "
+        "for `BoxCsvFileReader`.",
     )
 
     file_encoding: Optional[str] = Field(
@@ -376,6 +387,15 @@ class BoxCsvFileReader(BoxReaderBase):
     Class facilitates reading one or multiple CSV files with the same structure directly from Box and
     producing Spark Dataframe.
 
+    The files are downloaded concurrently, sharing the Box client. By default, the files are parsed on the driver with
+    `pandas.read_csv`, using `params` as its keyword arguments, and converted into a single Spark DataFrame.
+
+    When `spark_options` is provided, the files are downloaded to `staging_path` instead and read with a single
+    `spark.read.csv`, using `spark_options` as the Spark CSV options (`header` and `inferSchema` default to True). This
+    avoids collecting the content of large files on the driver. `staging_path` should be accessible by the driver and
+    by the executors, e.g. `dbfs:/tmp/box/` on Databricks. The files are downloaded to a unique directory in
+    `staging_path` that is removed when the Python process exits.
+
     Notes
     -----
     To manually identify the ID of the file in Box, open the file through Web UI, and copy ID from
@@ -399,14 +419,122 @@ class BoxCsvFileReader(BoxReaderBase):
         schema=schema,
     ).execute()
     b.df.show()
+
+    # read large files with Spark, staging them on dbfs
+    b = BoxCsvFileReader(
+        **auth_params,
+        file=["1", "2"],
+        spark_options={"sep": ";"},
+        staging_path="dbfs:/tmp/box/",
+    ).execute()
     ```
     """
 
     files: ListOfStrings = Field(default=..., alias="file", description="ID or list of IDs for the files to read.")
+    spark_options: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="[Optional] Spark CSV options. When provided, the files are staged in `staging_path` and read "
+        "with Spark instead of being parsed with pandas using `params`.",
+    )
+    staging_path: Optional[str] = Field(
+        default=None,
+        description="[Optional] Directory to download the files to before reading them with Spark, should be "
+        "accessible by the driver and by Spark. Required when `spark_options` is provided. If executing in "
+        "Databricks ensure to specify the scheme `dbfs:/`.",
+        examples=["/tmp/box/", "dbfs:/tmp/box/"],
+    )
+    max_workers: int = Field(default=8, gt=0, description="[Optional] Number of concurrent downloads.")
+
+    @model_validator(mode="after")
+    def validate_staging_path(self) -> "BoxCsvFileReader":
+        """
+        Validate that a 'staging_path' is provided when reading the files with Spark
+        """
+        if self.spark_options is not None and not self.staging_path:
+            raise AttributeError(
+                "The parameter 'staging_path' is mandatory when providing 'spark_options', use a location that is "
+                "accessible by the driver and by Spark, e.g. 'dbfs:/tmp/box/' on Databricks."
+            )
+        return self
+
+    def _download(self, file_id: str, stream: IO[bytes]) -> str:
+        """
+        Download a single file to the stream, returns the name of the file
+        """
+        file = self.client.file(file_id=file_id)
+        # noinspection PyUnresolvedReferences
+        file_name = file.get(fields=["name"]).name
+        self.log.debug(f"Downloading file with ID '{file_id}' and name '{file_name}'")
+        file.download_to(stream)
+        return file_name
+
+    def _download_to_dir(self, file_id: str, staging_dir: str) -> Tuple[str, str]:
+        """
+        Download a single file to the staging directory, returns the file identifier and name
+        """
+        with open(os.path.join(staging_dir, f"{file_id}.csv"), "wb") as f:
+            return file_id, self._download(file_id, f)
+
+    def _read_with_pandas(self, file_id: str) -> Any:
+        """
+        Download a single file and parse it with pandas, adding the file identifier and name
+        """
+        import pandas as pd
+
+        buffer = BytesIO()
+        file_name = self._download(file_id, buffer)
+        data = buffer.getvalue().decode(self.file_encoding)
+        return pd.read_csv(StringIO(data), **(self.params or {})).assign(meta_file_id=file_id, meta_file_name=file_name)
+
+    def _read_files_with_pandas(self) -> DataFrame:
+        """
+        Parse the files with pandas on the driver and convert them into a single Spark DataFrame
+        """
+        import pandas as pd
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.files))) as executor:
+            pandas_df = pd.concat(list(executor.map(self._read_with_pandas, self.files)), ignore_index=True)
+
+        schema = None
+        if self.schema_:
+            schema = StructType(
+                [
+                    *self.schema_.fields,
+                    StructField("meta_file_id", StringType()),
+                    StructField("meta_file_name", StringType()),
+                ]
+            )
+        return self.spark.createDataFrame(pandas_df, schema=schema)  # type: ignore[arg-type]
+
+    def _read_files_with_spark(self) -> DataFrame:
+        """
+        Stage the files in `staging_path` and read them with a single `spark.read.csv`
+        """
+        staging_dir = create_staging_dir(self.spark, self.staging_path, prefix="koheesio_box_")
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.files))) as executor:
+            file_names = dict(executor.map(lambda f: self._download_to_dir(f, staging_dir.local_path), self.files))
+
+        self.log.info(f"Downloaded {len(file_names)} file(s) from Box to '{staging_dir.spark_path}'")
+
+        options = {"header": True, "encoding": self.file_encoding, **({} if self.schema_ else {"inferSchema": True})}
+        options.update(self.spark_options or {})
+        reader = self.spark.read.options(**options)
+        if self.schema_:
+            reader = reader.schema(self.schema_)
+
+        df = reader.csv([f"{staging_dir.spark_path}/{file_id}.csv" for file_id in file_names])
+
+        # the identifier of the file is the name of the staged file, without the extension
+        file_id = element_at(split(col("_metadata.file_path"), r"/"), -1)
+        file_id = file_id.substr(lit(1), length(file_id) - 4)
+        name_mapping = create_map(*[lit(x) for item in file_names.items() for x in item])
+
+        return df.withColumn("meta_file_id", file_id).withColumn("meta_file_name", name_mapping[col("meta_file_id")])
 
     def execute(self) -> BoxReaderBase.Output:
         """
-        Loop through the list of provided file identifiers and load data into dataframe.
+        Download the provided files and load them into a single dataframe.
         For traceability purposes the following columns will be added to the dataframe:
             * meta_file_id: the identifier of the file on Box
             * meta_file_name: name of the file
@@ -415,29 +543,11 @@ class BoxCsvFileReader(BoxReaderBase):
         -------
         DataFrame
         """
-        df = None
-        for f in self.files:
-            self.log.debug(f"Currently processing file with ID '{f}'")
-            file = self.client.file(file_id=f)
+        df = self._read_files_with_pandas() if self.spark_options is None else self._read_files_with_spark()
 
-            self.log.debug(f"Reading file with ID '{file.object_id}' and name '{file.get().name}' into Spark DataFrame")
-            data = file.content().decode(self.file_encoding)
-            temp_df = InMemoryDataReader(data=data, schema=self.schema_, params=self.params, format="csv").read()
-
-            # type: ignore
-            # noinspection PyUnresolvedReferences
-            temp_df = (
-                temp_df
-                # fmt: off
-                .withColumn("meta_file_id", lit(file.object_id))
-                .withColumn("meta_file_name", lit(file.get().name))
-                .withColumn("meta_load_timestamp", expr("to_utc_timestamp(current_timestamp(), current_timezone())"))
-                # fmt: on
-            )
-
-            df = temp_df if not df else df.union(temp_df)
-
-        self.output.df = df
+        self.output.df = df.withColumn(
+            "meta_load_timestamp", expr("to_utc_timestamp(current_timestamp(), current_timezone())")
+        )
 
 
 class BoxCsvPathReader(BoxReaderBase):
@@ -624,10 +734,26 @@ class BoxToBoxFileMove(BoxFileBase):
 class BoxBaseFileWriter(BoxFolderBase, ABC):
     """
     Base class for writing files to Box
+
+    Files larger than `chunked_upload_threshold` are uploaded through a Box chunked upload session, uploading
+    `upload_workers` parts in parallel. Smaller files are uploaded as a single stream.
+
+    The content of the destination folder (name to file index) is cached per folder, so that checking whether a file
+    already exists does not require listing the folder for every file that is written. Writes through these classes
+    keep the cache up to date. When the cache is outdated because files were added (409 Conflict) or removed (404 Not
+    Found) by other processes, the listing of the folder is refreshed and the upload is retried once. Use
+    `clear_folder_cache` to invalidate the cache explicitly.
     """
 
     overwrite: bool = Field(default=False, description="Overwrite the file if it exists on box")
     description: Optional[str] = Field(None, description="Optional description to add to the file in Box")
+    chunked_upload_threshold: int = Field(
+        default=50 * 1024 * 1024,
+        ge=20 * 1024 * 1024,
+        description="Files larger than this size (in bytes) are uploaded in parts using a chunked upload session. "
+        "Box requires a minimum of 20MB for chunked uploads.",
+    )
+    upload_workers: int = Field(default=4, gt=0, description="Number of parts (or files) to upload in parallel")
 
     class Output(StepOutput):
         """Base Output class for Koheesio Box File Writers."""
@@ -644,6 +770,29 @@ class BoxBaseFileWriter(BoxFolderBase, ABC):
     def execute(self) -> Output:
         self.action()
 
+    @staticmethod
+    def clear_folder_cache(folder_id: Optional[str] = None) -> None:
+        """
+        Invalidate the cached folder listing of the given folder, or of all folders if no folder_id is provided
+        """
+        with _folder_index_lock:
+            if folder_id is None:
+                _folder_index.clear()
+            else:
+                _folder_index.pop(folder_id, None)
+
+    def _get_folder_index(self, folder: Folder) -> Dict[str, File]:
+        """
+        Get the (cached) name to file index of a folder
+        """
+        with _folder_index_lock:
+            if folder.object_id not in _folder_index:
+                # noinspection PyUnresolvedReferences
+                _folder_index[folder.object_id] = {
+                    item.name: item for item in folder.get_items() if item.type == "file"
+                }
+            return _folder_index[folder.object_id]
+
     def get_file(self, folder: Folder, file_name: str) -> Union[File, None]:
         """
         Get the file object, with ID, if the file exisst
@@ -651,48 +800,137 @@ class BoxBaseFileWriter(BoxFolderBase, ABC):
         """
         self.log.info(f"We are looking for {file_name}")
 
-        items = folder.get_items()
-        for item in items:
-            if item.type == "file" and item.name == file_name:
-                self.log.info("File with the same name is found")
-                return item
-        return None
+        file = self._get_folder_index(folder).get(file_name)
+        if file:
+            self.log.info("File with the same name is found")
+        return file
+
+    @staticmethod
+    def _stream_size(file_stream: IO[bytes]) -> int:
+        """
+        Size of the remaining content of a seekable stream
+        """
+        position = file_stream.tell()
+        size = file_stream.seek(0, os.SEEK_END) - position
+        file_stream.seek(position)
+        return size
+
+    def _chunked_upload(self, upload_session: UploadSession, file_stream: IO[bytes], file_size: int) -> File:
+        """
+        Upload a stream in parts through a chunked upload session and commit the session
+
+        Parts are read sequentially (to compute the SHA1 digest of the whole file) and uploaded in parallel, at most
+        `upload_workers` parts are kept in memory at any time.
+        """
+        part_size = upload_session.part_size
+        sha1 = hashlib.sha1()  # nosec B324: Box requires a SHA1 digest of the uploaded content
+        parts = []
+
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            futures = []
+            for offset in range(0, file_size, part_size):
+                part_bytes = file_stream.read(part_size)
+                sha1.update(part_bytes)
+                futures.append(executor.submit(upload_session.upload_part_bytes, part_bytes, offset, file_size))
+
+                # limit the number of parts held in memory
+                if len(futures) - len(parts) >= self.upload_workers:
+                    parts.append(futures[len(parts)].result())
+
+            parts.extend(future.result() for future in futures[len(parts) :])
+
+        file_attributes = {"description": self.description} if self.description else None
+        return upload_session.commit(content_sha1=sha1.digest(), parts=parts, file_attributes=file_attributes)
 
     def write_or_overwrite_file_with_stream(self, folder: Folder, file_stream: IO[bytes], file_name: str) -> File:
         """
         Overwrite the file if it exists, else write a new file
         Returns the new file object
+
+        When the upload fails because the cached listing of the folder is outdated, i.e. the file was created (409) or
+        deleted (404) by another process, the cache is invalidated and the upload is retried once.
+        """
+        position = file_stream.tell()
+        try:
+            return self._write_or_overwrite_file_with_stream(
+                folder=folder, file_stream=file_stream, file_name=file_name
+            )
+        except BoxAPIException as e:
+            if e.status not in (404, 409):
+                raise
+            self.log.warning(f"Folder listing of '{folder.object_id}' is outdated ({e.status}), retrying the upload")
+            self.clear_folder_cache(folder_id=folder.object_id)
+            file_stream.seek(position)
+            return self._write_or_overwrite_file_with_stream(
+                folder=folder, file_stream=file_stream, file_name=file_name
+            )
+
+    def _write_or_overwrite_file_with_stream(self, folder: Folder, file_stream: IO[bytes], file_name: str) -> File:
+        """
+        Upload the stream, using the cached folder listing to determine whether the file already exists
         """
         curr_file = self.get_file(folder=folder, file_name=file_name)
+        file_size = self._stream_size(file_stream)
+        chunked = file_size > self.chunked_upload_threshold
+
         if curr_file and self.overwrite:
             self.log.info("Overwriting to box ...")
-            new_file = curr_file.update_contents_with_stream(file_stream=file_stream)
+            if chunked:
+                upload_session = curr_file.create_upload_session(file_size=file_size)
+                new_file = self._chunked_upload(upload_session, file_stream, file_size)
+            else:
+                new_file = curr_file.update_contents_with_stream(file_stream=file_stream)
         else:
             self.log.info("Writing to box ...")
-            folder.preflight_check(size=0, name=file_name)
-            new_file = folder.upload_stream(
-                file_stream=file_stream, file_name=file_name, file_description=self.description
-            )
+            folder.preflight_check(size=file_size, name=file_name)
+            if chunked:
+                upload_session = folder.create_upload_session(file_size=file_size, file_name=file_name)
+                new_file = self._chunked_upload(upload_session, file_stream, file_size)
+            else:
+                new_file = folder.upload_stream(
+                    file_stream=file_stream, file_name=file_name, file_description=self.description
+                )
+
+        with _folder_index_lock:
+            if folder.object_id in _folder_index:
+                _folder_index[folder.object_id][file_name] = new_file
 
         return new_file
 
-    def write_file(self, file_stream: IO[bytes], file_name: str) -> File:
-        folder: Folder = BoxFolderGet.from_step(self, create_sub_folders=True).execute().folder
+    @property
+    def _folder(self) -> Folder:
+        """
+        Get (or create) the destination folder
+        """
+        return BoxFolderGet.from_step(self, create_sub_folders=True).execute().folder
 
-        # noinspection PyUnresolvedReferences
-        self.log.info(f"Uploading file '{file_name}' to Box folder '{folder.get().name}'...")
+    def _upload_file(self, file_stream: IO[bytes], file_name: str, folder: Folder) -> Tuple[File, str]:
+        """
+        Upload the stream to the folder, returns the Box file and its shared link
+        """
+        self.log.info(f"Uploading file '{file_name}' to Box folder '{folder.object_id}'...")
         _box_file: File = self.write_or_overwrite_file_with_stream(
             folder=folder, file_stream=file_stream, file_name=file_name
         )
+        return _box_file, _box_file.get_shared_link()
+
+    def write_file(self, file_stream: IO[bytes], file_name: str, folder: Optional[Folder] = None) -> File:
+        _box_file, shared_link = self._upload_file(
+            file_stream=file_stream, file_name=file_name, folder=folder or self._folder
+        )
 
         self.output.file = _box_file
-        self.output.shared_link = _box_file.get_shared_link()
+        self.output.shared_link = shared_link
+        return _box_file
 
 
 class BoxFileWriter(BoxBaseFileWriter):
     """
     Write file or a file-like object to Box.
 
+    Multiple files can be written at once by providing a list of paths. The destination folder is resolved once and
+    the files are uploaded in parallel (`upload_workers`) over the same Box client.
+
     Examples
     --------
     ```python
@@ -709,35 +947,66 @@ class BoxFileWriter(BoxBaseFileWriter):
     f2 = BoxFileWriter(
         **auth_params, path="/foo/bar", file=b, name="file.ext"
     ).execute()
+    # or
+    f3 = BoxFileWriter(
+        **auth_params,
+        path="/foo/bar",
+        file=["path/to/my/file1.ext", "path/to/my/file2.ext"],
+    ).execute()
+    f3.files  # list of Box file objects
     ```
     """
 
-    file: Union[str, BytesIO] = Field(default=..., description="Path to file or a file-like object")
+    file: Union[str, BytesIO, ListOfStrings] = Field(
+        default=..., description="Path to file, list of paths or a file-like object"
+    )
     file_name: Optional[str] = Field(
         default=None,
         description="When file path or name is provided to 'file' parameter, this will override the original name."
         "When binary stream is provided, the 'name' should be used to set the desired name for the Box file.",
     )
 
+    class Output(BoxBaseFileWriter.Output):
+        """Output class for BoxFileWriter, `file` and `shared_link` refer to the last file written"""
+
+        files: List[File] = Field(default_factory=list, description="File objects in Box")
+        shared_links: List[str] = Field(default_factory=list, description="Shared links for the Box files")
+
     @model_validator(mode="before")
     def validate_name_for_binary_data(cls, values: Dict[str, Any]) -> Dict[str, Any]:
         """Validate 'file_name' parameter when providing a binary input for 'file'."""
         file, file_name = values.get("file"), values.get("file_name")
-        if not isinstance(file, str) and not file_name:
+        if isinstance(file, list):
+            if file_name:
+                raise AttributeError("The parameter 'file_name' can not be used when providing a list of files.")
+        elif not isinstance(file, str) and not file_name:
             raise AttributeError("The parameter 'file_name' is mandatory when providing a binary input for 'file'.")
 
         return values
 
+    def _write_path(self, file_path: str, folder: Folder, file_name: Optional[str] = None) -> Tuple[File, str]:
+        """
+        Write a single local file to the given folder, returns the Box file and its shared link
+        """
+        with open(file_path, "rb") as f:
+            return self._upload_file(file_stream=f, file_name=file_name or PurePath(file_path).name, folder=folder)
+
     def action(self) -> None:
         _file = self.file
-        _name = self.file_name
+        folder = self._folder
 
-        if isinstance(_file, str):
-            _name = _name if _name else PurePath(_file).name
-            with open(_file, "rb") as f:
-                _file = BytesIO(f.read())
+        if isinstance(_file, list):
+            with ThreadPoolExecutor(max_workers=min(self.upload_workers, len(_file))) as executor:
+                uploads = list(executor.map(lambda f: self._write_path(f, folder), _file))
+        elif isinstance(_file, str):
+            uploads = [self._write_path(_file, folder, self.file_name)]
+        else:
+            uploads = [self._upload_file(file_stream=_file, file_name=self.file_name, folder=folder)]
 
-        self.write_file(file_stream=_file, file_name=_name)
+        self.output.files = [box_file for box_file, _ in uploads]
+        self.output.shared_links = [shared_link for _, shared_link in uploads]
+        self.output.file = self.output.files[-1]
+        self.output.shared_link = self.output.shared_links[-1]
 
 
 class BoxBufferFileWriter(BoxBaseFileWriter):
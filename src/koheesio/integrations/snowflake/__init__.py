@@ -44,12 +44,17 @@ format : str, optional, default="snowflake"
 
 from __future__ import annotations
 
-from typing import Any, Dict, Generator, List, Optional, Set, Union
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple, Union
 from abc import ABC
+import atexit
 from contextlib import contextmanager
 from functools import partial
+import hashlib
 import os
+import re
 import tempfile
+import threading
+import time
 from types import ModuleType
 from urllib.parse import urlparse
 
@@ -72,10 +77,12 @@ __all__ = [
     "GrantPrivilegesOnObject",
     "GrantPrivilegesOnTable",
     "GrantPrivilegesOnView",
+    "SnowflakeConnectionPool",
     "SnowflakeRunQueryPython",
     "SnowflakeBaseModel",
     "SnowflakeStep",
     "SnowflakeTableStep",
+    "get_connection_pool",
     "safe_import_snowflake_connector",
 ]
 
@@ -345,6 +352,200 @@ class SnowflakeTableStep(SnowflakeStep, ABC):
         return f"{self.database}.{self.sfSchema}.{self.table}"
 
 
+class SnowflakeConnectionPool(BaseModel):
+    """
+    Process-wide pool of Snowflake python-connector connections
+
+    Authenticating and setting up a Snowflake session takes 1-3 seconds per connection, which quickly dominates small
+    queries (e.g. a MERGE per micro-batch, or a GRANT per role). The pool keeps connections open between steps and
+    hands them out again to steps that use the same connection options (account, user, credentials, authenticator,
+    role, warehouse, ...). Only the database and schema may differ between the steps that share a connection.
+
+    Before a pooled connection is handed out again, its session is reset: open transactions are rolled back and the
+    role, warehouse, database and schema of the caller are (re)applied with `USE ...`. Connections for which the reset
+    fails are closed and replaced by a new one. Session parameters set with `ALTER SESSION` and temporary tables are
+    kept for the lifetime of the connection though, steps that rely on those should not use the pool.
+
+    - Connections that have been idle for longer than `max_idle_time` are closed (idle eviction).
+    - At most `max_size` connections are opened per key; when all of them are in use, callers wait for up to
+      `acquire_timeout` seconds for a connection to be released.
+    - Connections are discarded (instead of returned to the pool) when the caller raised an exception while using it.
+
+    The pool used by `SnowflakeRunQueryPython` (and all steps based on it) is returned by `get_connection_pool()`.
+
+    Example
+    -------
+    ```python
+    pool = get_connection_pool()
+    with pool.connection(
+        snowflake_connector,
+        account="my_account",
+        user="...",
+        role="...",
+        warehouse="...",
+    ) as conn:
+        conn.execute_string("SELECT 1")
+    ```
+    """
+
+    max_size: int = Field(default=8, gt=0, description="Maximum number of connections per key")
+    max_idle_time: float = Field(
+        default=600, gt=0, description="Seconds after which an idle connection is closed and removed from the pool"
+    )
+    acquire_timeout: float = Field(
+        default=300, gt=0, description="Seconds to wait for a connection when `max_size` connections are in use"
+    )
+
+    # key -> list of (connection, last used time)
+    _idle: Dict[Tuple, List[Tuple[Any, float]]] = PrivateAttr(default_factory=dict)
+    _in_use: Dict[Tuple, int] = PrivateAttr(default_factory=dict)
+    _condition: threading.Condition = PrivateAttr(default_factory=threading.Condition)
+
+    @staticmethod
+    def key(options: Dict[str, Any]) -> Tuple:
+        """Pool key of a set of connection options: all options except database and schema
+
+        The credentials are part of the key, they are hashed so that the key does not hold them in plain text.
+        """
+        options = {k: v for k, v in options.items() if k not in ("database", "schema")}
+        credentials = hashlib.sha256(repr(sorted(options.items())).encode()).hexdigest()
+        return tuple(options.get(k) for k in ("account", "user", "role", "warehouse")) + (credentials,)
+
+    @staticmethod
+    def _close(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:  # nosec B110 pylint: disable=broad-except
+            pass
+
+    def _evict_idle(self) -> None:
+        """Close the connections that have been idle for longer than `max_idle_time`, caller must hold the lock"""
+        now = time.monotonic()
+        for key, idle in self._idle.items():
+            keep = []
+            for conn, last_used in idle:
+                if now - last_used > self.max_idle_time:
+                    self._close(conn)
+                else:
+                    keep.append((conn, last_used))
+            self._idle[key] = keep
+
+    def _checkout(self, key: Tuple) -> Optional[Tuple[Any, float]]:
+        """Reserve a slot for the given key, returns an idle connection if there is one"""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            self._evict_idle()
+            while True:
+                idle = self._idle.setdefault(key, [])
+                if idle or self._in_use.get(key, 0) < self.max_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No Snowflake connection became available within {self.acquire_timeout}s")
+                self._condition.wait(remaining)
+
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+            # most recently used connection first, so that rarely used connections get evicted
+            return idle.pop() if idle else None
+
+    def _release(self, key: Tuple, conn: Optional[Any], reuse: bool) -> None:
+        with self._condition:
+            self._in_use[key] -= 1
+            if conn is not None:
+                if reuse and not conn.is_closed():
+                    self._idle[key].append((conn, time.monotonic()))
+                else:
+                    self._close(conn)
+            self._condition.notify()
+
+    @staticmethod
+    def _reset_session(conn: Any, options: Dict[str, Any]) -> bool:
+        """Reset the session of a pooled connection for the given options, returns False if the connection is broken
+
+        Open transactions are rolled back and the role, warehouse, database and schema are (re)applied, as a step may
+        have switched them with `USE ...`.
+        """
+        if conn.is_closed():
+            return False
+
+        statements = [
+            f"USE {object_type} {_quote_identifier(options[option])}"
+            for object_type, option in (
+                ("ROLE", "role"),
+                ("WAREHOUSE", "warehouse"),
+                ("DATABASE", "database"),
+                ("SCHEMA", "schema"),
+            )
+            if options.get(option)
+        ]
+        try:
+            conn.rollback()
+            if statements:
+                conn.execute_string(";\n".join(statements))
+            return True
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    @contextmanager
+    def connection(self, snowflake_connector: ModuleType, **options: Any) -> Generator:
+        """Get a connection from the pool, a new connection is opened if no idle connection can be reset
+
+        Parameters
+        ----------
+        snowflake_connector : ModuleType
+            The `snowflake.connector` module to use to open new connections
+        options : Any
+            The options to pass to `snowflake.connector.connect`
+        """
+        key = self.key(options)
+        conn = None
+        reuse = False
+
+        try:
+            if pooled := self._checkout(key):
+                conn, _ = pooled
+                if not self._reset_session(conn, options):
+                    self._close(conn)
+                    conn = None
+
+            if conn is None:
+                conn = snowflake_connector.connect(**options)
+
+            yield conn
+            reuse = True
+        finally:
+            self._release(key, conn, reuse=reuse)
+
+    def close_all(self) -> None:
+        """Close all idle connections in the pool"""
+        with self._condition:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    self._close(conn)
+            self._idle.clear()
+
+
+def _quote_identifier(name: str) -> str:
+    """Quote an identifier that is not a valid unquoted Snowflake identifier, e.g. a role name with dots"""
+    if name.startswith('"') or re.fullmatch(r"[A-Za-z_][\w$]*", name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+_connection_pool: Optional[SnowflakeConnectionPool] = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> SnowflakeConnectionPool:
+    """Return the process-wide Snowflake connection pool"""
+    global _connection_pool  # pylint: disable=global-statement
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            _connection_pool = SnowflakeConnectionPool()
+            atexit.register(_connection_pool.close_all)
+        return _connection_pool
+
+
 class SnowflakeRunQueryPython(SnowflakeStep):
     """
     Run a query on Snowflake using the Python connector
@@ -362,10 +563,20 @@ class SnowflakeRunQueryPython(SnowflakeStep):
         query="CREATE TABLE test (col1 string)",
     ).execute()
     ```
+
+    By default, a dedicated connection is opened (and closed) for every execution. Set `use_connection_pool` to True to
+    take the connection from the process-wide `SnowflakeConnectionPool` (see `get_connection_pool`) instead, so that
+    subsequent steps with the same connection options reuse the same connection. Note that session parameters set
+    with `ALTER SESSION` and temporary tables are shared by the steps that use a pooled connection.
     """
 
     query: str = Field(default=..., description="The query to run", alias="sql", serialization_alias="query")
     account: Optional[str] = Field(default=None, description="Snowflake Account Name", alias="account")
+    use_connection_pool: bool = Field(
+        default=False,
+        description="Take the connection from the process-wide Snowflake connection pool, instead of opening a "
+        "dedicated connection. Session parameters and temporary tables are shared by the steps using the pool.",
+    )
 
     # for internal use
     _snowflake_connector: Optional[ModuleType] = PrivateAttr(default_factory=safe_import_snowflake_connector)
@@ -417,6 +628,12 @@ class SnowflakeRunQueryPython(SnowflakeStep):
 
         sf_options = self.get_options()
 
+        if self.use_connection_pool:
+            with get_connection_pool().connection(self._snowflake_connector, **sf_options) as _conn:
+                self.log.info(f"Using pooled connection to Snowflake account: {sf_options['account']}")
+                yield _conn
+            return
+
         _conn = self._snowflake_connector.connect(**sf_options)
         self.log.info(f"Connected to Snowflake account: {sf_options['account']}")
 
@@ -581,18 +798,12 @@ class GrantPrivilegesOnObject(SnowflakeRunQueryPython):
         return query
 
     def execute(self) -> None:
-        self.output.query = []
-        roles = self.roles
-
-        for role in roles:
-            query = self.get_query(role)
-            self.output.query.append(query)
-
-            # Create a new instance of SnowflakeRunQueryPython with the current query
-            instance = SnowflakeRunQueryPython.from_step(self, query=query)
-            instance.execute()
-            print(f"{instance.output = }")
-            self.output.results.extend(instance.output.results)
+        self.output.query = [self.get_query(role) for role in self.roles]
+
+        # All grants are sent in a single `execute_string` call, i.e. over a single connection
+        instance = SnowflakeRunQueryPython.from_step(self, query=";\n".join(self.output.query))
+        instance.execute()
+        self.output.results.extend(instance.output.results)
 
 
 class GrantPrivilegesOnFullyQualifiedObject(GrantPrivilegesOnObject):
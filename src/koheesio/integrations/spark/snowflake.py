@@ -43,25 +43,32 @@ format : str, optional, default="snowflake"
 
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List, Optional, Set, Union
+from typing import Any, Callable, Dict, List, Literal, Optional, Set, Union
 from abc import ABC
 from copy import deepcopy
+from datetime import date, datetime
+from decimal import Decimal
 import json
+import math
+import os
 from textwrap import dedent
+import time
+import uuid
 
-from pyspark.sql import Window
 from pyspark.sql import functions as f
 from pyspark.sql import types as t
 
 from koheesio import Step, StepOutput
 from koheesio.integrations.snowflake import *
 from koheesio.logger import LoggingFactory, warn
-from koheesio.models import ExtraParamsMixin, Field, field_validator, model_validator
+from koheesio.models import ExtraParamsMixin, Field, InstanceOf, field_validator, model_validator
 from koheesio.spark import DataFrame, DataType, SparkStep
 from koheesio.spark.delta import DeltaTableStep
-from koheesio.spark.readers.delta import DeltaTableReader, DeltaTableStreamReader
+from koheesio.spark.readers.delta import DeltaTableChangeFeedReader, DeltaTableReader, DeltaTableStreamReader
+from koheesio.spark.readers.incremental import WatermarkStore
 from koheesio.spark.readers.jdbc import JdbcReader
 from koheesio.spark.transformations import Transformation
+from koheesio.spark.utils.staging import StagingDir, create_staging_dir, is_local_master
 from koheesio.spark.writers import BatchOutputMode, Writer
 from koheesio.spark.writers.stream import (
     ForEachBatchStreamWriter,
@@ -624,6 +631,38 @@ class SyncTableAndDataFrameSchema(SnowflakeStep, SnowflakeTransformation):
 class SnowflakeWriter(SnowflakeBaseModel, Writer):
     """Class for writing to Snowflake
 
+    Two load methods are available:
+
+    - `spark` (default): write through the Spark `snowflake` format.
+    - `copy`: bulk load through an internal stage. The DataFrame is written as compressed parquet parts (in parallel, by
+        Spark) to a staging directory, the parts are uploaded to a temporary internal stage with `PUT` (using
+        `put_parallel` upload threads) and loaded into the table with a single `COPY INTO`. The number (and with that
+        the size) of the parquet parts can be controlled with `copy_num_files`. Throughput (rows, bytes, files and
+        duration) is reported in the Output of the writer.
+
+    The `copy` load method uses the python connector, set `use_connection_pool` to take its connection from the
+    process-wide connection pool of `SnowflakeRunQueryPython` (see `get_connection_pool`). Note that the staging
+    directory must be accessible from the local filesystem of the driver (for the `PUT`) and be writable by Spark.
+    Unless Spark runs in local mode, `staging_dir_spark_path` is required and should point to a shared location, e.g.
+    `staging_dir_spark_path="dbfs:/tmp/koheesio"` (accessed by the driver as `/dbfs/tmp/koheesio`, or set
+    `staging_dir`).
+
+    With `mode=overwrite`, the parts are loaded into a new staging table that then atomically replaces the target
+    table (`CREATE OR REPLACE TABLE ... CLONE ... COPY GRANTS`), so a failed load leaves the target table untouched and
+    its grants are kept.
+
+    Example
+    -------
+    ```python
+    SnowflakeWriter(
+        **sf_options,
+        table="MY_TABLE",
+        mode=BatchOutputMode.APPEND,
+        load_method="copy",
+        copy_num_files=16,
+    ).write(df)
+    ```
+
     See Also
     --------
     - [koheesio.spark.writers.Writer](writers/index.md#koheesio.spark.writers.Writer)
@@ -636,15 +675,171 @@ class SnowflakeWriter(SnowflakeBaseModel, Writer):
         BatchOutputMode.APPEND, alias="mode", description="The insertion type, append or overwrite"
     )
     format: str = Field("snowflake", description="The format to use when writing to Snowflake")
+    load_method: Literal["spark", "copy"] = Field(
+        default="spark",
+        description="Write through the Spark `snowflake` format ('spark') or bulk load through an internal stage with "
+        "PUT and COPY INTO ('copy')",
+    )
+    account: Optional[str] = Field(
+        default=None,
+        description="The Snowflake account, only used by the 'copy' load method. Derived from the url if not provided.",
+    )
+    staging_dir: Optional[str] = Field(
+        default=None,
+        description="Directory (on the local filesystem of the driver) to write the parquet parts to when using the "
+        "'copy' load method. Derived from `staging_dir_spark_path` if not provided, a temporary directory is used in "
+        "local mode.",
+    )
+    staging_dir_spark_path: Optional[str] = Field(
+        default=None,
+        description="Path under which Spark can write to `staging_dir`, e.g. 'dbfs:/tmp/koheesio' for "
+        "'/dbfs/tmp/koheesio'. Required unless Spark runs in local mode, where it defaults to `file://<staging_dir>`.",
+    )
+    copy_num_files: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Number of parquet parts to write (and load in parallel) when using the 'copy' load method. "
+        "Defaults to the number of partitions of the DataFrame.",
+    )
+    put_parallel: int = Field(
+        default=8, ge=1, le=99, description="Number of threads used by PUT to upload the parquet parts"
+    )
+    copy_options: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Additional copy options for COPY INTO, e.g. {'ON_ERROR': 'ABORT_STATEMENT'}",
+    )
+    use_connection_pool: bool = Field(
+        default=False,
+        description="Take the python connector connection of the 'copy' load method from the process-wide Snowflake "
+        "connection pool, instead of opening a dedicated connection",
+    )
+
+    class Output(Writer.Output):
+        """Output class for SnowflakeWriter, throughput is only reported by the 'copy' load method"""
+
+        files: Optional[int] = Field(default=None, description="Number of parquet parts that were loaded")
+        bytes: Optional[int] = Field(default=None, description="Number of (compressed) bytes that were loaded")
+        rows_loaded: Optional[int] = Field(default=None, description="Number of rows that were loaded")
+        duration: Optional[float] = Field(default=None, description="Duration of the load in seconds")
+        rows_per_second: Optional[float] = Field(default=None, description="Throughput in rows per second")
+        mb_per_second: Optional[float] = Field(default=None, description="Throughput in (compressed) MB per second")
+
+    _copy_fields = {
+        "load_method",
+        "staging_dir",
+        "staging_dir_spark_path",
+        "copy_num_files",
+        "put_parallel",
+        "copy_options",
+        "use_connection_pool",
+    }
 
     def execute(self) -> SnowflakeWriter.Output:
         """Write to Snowflake"""
-        self.log.debug(f"writing to {self.table} with mode {self.insert_type}")
+        self.log.debug(f"writing to {self.table} with mode {self.insert_type} using {self.load_method}")
 
-        options = self.get_options()
+        if self.load_method == "copy":
+            self._copy_into()
+            return
+
+        options = {k: v for k, v in self.get_options().items() if k not in self._copy_fields}
 
         self.df.write.format(self.format).options(**options).option("dbtable", self.table).mode(self.insert_type).save()
 
+    def _get_copy_statements(self, local_dir: str, stage: str, staging_table: Optional[str] = None) -> List[str]:
+        """Statements to create the table (if needed), upload the parquet parts and COPY them into the table
+
+        When a `staging_table` is given (overwrite), the parts are copied into the staging table, which then replaces
+        the target table while keeping its grants.
+        """
+        snowflake_schema = ", ".join(f"{c.name} {map_spark_type(c.dataType)}" for c in self.df.schema)
+        copy_options = {"MATCH_BY_COLUMN_NAME": "CASE_INSENSITIVE", "PURGE": "TRUE", **self.copy_options}
+        copy_target = staging_table or self.table
+
+        statements = [
+            f"CREATE TEMPORARY STAGE {stage} FILE_FORMAT = (TYPE = PARQUET)",
+            f"PUT 'file://{local_dir}/*.parquet' @{stage} PARALLEL = {self.put_parallel} AUTO_COMPRESS = FALSE",
+            f"CREATE OR REPLACE TABLE {staging_table} ({snowflake_schema})"
+            if staging_table
+            else f"CREATE TABLE IF NOT EXISTS {self.table} ({snowflake_schema})",
+            f"COPY INTO {copy_target} FROM @{stage} FILE_FORMAT = (TYPE = PARQUET) "
+            + " ".join(f"{k} = {v}" for k, v in copy_options.items()),
+        ]
+        if staging_table:
+            statements += [
+                f"CREATE OR REPLACE TABLE {self.table} CLONE {staging_table} COPY GRANTS",
+                f"DROP TABLE IF EXISTS {staging_table}",
+            ]
+        return [*statements, f"DROP STAGE IF EXISTS {stage}"]
+
+    def _staging_dir(self) -> StagingDir:
+        """The directory to write the parquet parts to, as seen by the driver and by Spark"""
+        if self.staging_dir_spark_path:
+            return create_staging_dir(
+                self.spark, self.staging_dir_spark_path, prefix="koheesio_sf_copy_", local_path=self.staging_dir
+            )
+        if not is_local_master(self.spark):
+            raise ValueError(
+                "`staging_dir_spark_path` is required for the 'copy' load method when Spark does not run in local "
+                "mode, e.g. 'dbfs:/tmp/koheesio' on Databricks"
+            )
+        staging_dir = create_staging_dir(self.spark, self.staging_dir, prefix="koheesio_sf_copy_")
+        return StagingDir(local_path=staging_dir.local_path, spark_path=f"file://{staging_dir.local_path}")
+
+    def _copy_into(self) -> None:
+        """Bulk load the DataFrame through an internal stage: parquet parts -> PUT -> COPY INTO"""
+        start = time.monotonic()
+        staging_dir = self._staging_dir()
+        local_dir, spark_path = staging_dir.local_path, staging_dir.spark_path
+        staging_table = (
+            f"{self.table}_koheesio_copy_{uuid.uuid4().hex[:8]}"
+            if self.insert_type == BatchOutputMode.OVERWRITE
+            else None
+        )
+
+        try:
+            df = self.df.repartition(self.copy_num_files) if self.copy_num_files else self.df
+            df.write.mode("overwrite").option("compression", "snappy").parquet(spark_path)
+
+            parts = [os.path.join(local_dir, p) for p in os.listdir(local_dir) if p.endswith(".parquet")]
+            self.output.files = len(parts)
+            self.output.bytes = sum(os.path.getsize(p) for p in parts)
+
+            options = {**self.get_options(), "use_connection_pool": self.use_connection_pool}
+            runner = SnowflakeRunQueryPython(**options, query="-- stage and copy")
+            stage = f"koheesio_stage_{uuid.uuid4().hex}"
+            rows_loaded = 0
+            with runner.conn as conn:
+                try:
+                    for statement in self._get_copy_statements(
+                        local_dir=local_dir, stage=stage, staging_table=staging_table
+                    ):
+                        self.log.debug(f"Running: {statement}")
+                        for cursor in conn.execute_string(statement):
+                            if statement.startswith("COPY INTO"):
+                                columns = [c[0].lower() for c in cursor.description or []]
+                                if "rows_loaded" in columns:
+                                    idx = columns.index("rows_loaded")
+                                    rows_loaded += sum(row[idx] or 0 for row in cursor.fetchall())
+                except Exception:
+                    if staging_table:
+                        # the target table is untouched, only the staging table has to be removed
+                        conn.execute_string(f"DROP TABLE IF EXISTS {staging_table}")
+                    raise
+        finally:
+            staging_dir.cleanup()
+
+        duration = time.monotonic() - start
+        self.output.rows_loaded = rows_loaded
+        self.output.duration = duration
+        self.output.rows_per_second = rows_loaded / duration if duration else None
+        self.output.mb_per_second = self.output.bytes / 1024**2 / duration if duration else None
+        self.log.info(
+            f"Loaded {rows_loaded} rows ({self.output.files} files, {self.output.bytes / 1024**2:.1f} MB) into "
+            f"{self.table} in {duration:.1f}s: {self.output.rows_per_second or 0:.0f} rows/s, "
+            f"{self.output.mb_per_second or 0:.1f} MB/s"
+        )
+
 
 class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
     """
@@ -652,7 +847,11 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
 
     * Overwrite - only in batch mode
     * Append - supports batch and streaming mode
-    * Merge - only in streaming mode
+    * Merge - supports streaming mode, and batch mode when a `version_store` is given
+
+    In batch MERGE mode, the change data feed is read from the version after the last merged version (kept in the
+    `version_store`) in ranges of at most `max_versions_per_batch` versions. Every range is merged and its last version
+    is stored before the next range is read, so an interrupted run continues where it stopped.
 
     Example
     -------
@@ -682,6 +881,21 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
         description="Determines if synchronisation will 'overwrite' any existing table, 'append' new rows or "
         "'merge' with existing rows.",
     )
+    version_store: Optional[InstanceOf[WatermarkStore]] = Field(
+        default=None,
+        description="Store that keeps the last merged version of the source table, enables MERGE in batch mode",
+    )
+    max_versions_per_batch: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="In batch MERGE mode, the maximum number of versions of the source table to merge at once",
+    )
+    starting_version: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="In batch MERGE mode, the version of the source table to start from when no version is stored "
+        "yet. Defaults to the version at which CDF was enabled on the source table.",
+    )
     checkpoint_location: Optional[str] = Field(default=None, description="Checkpoint location to use")
     schema_tracking_location: Optional[str] = Field(
         default=None,
@@ -698,7 +912,8 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
     streaming: bool = Field(
         default=False,
         description="Should synchronisation happen in streaming or in batch mode. Streaming is supported in 'APPEND' "
-        "and 'MERGE' mode. Batch is supported in 'OVERWRITE' and 'APPEND' mode.",
+        "and 'MERGE' mode. Batch is supported in 'OVERWRITE' and 'APPEND' mode, and in 'MERGE' mode when a "
+        "`version_store` is given.",
     )
     persist_staging: bool = Field(
         default=False,
@@ -714,6 +929,39 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
         description="The Snowflake account to connect to. "
         "If not provided, the `truncate_table` and `drop_table` methods will fail.",
     )
+    load_method: Literal["spark", "copy"] = Field(
+        default="spark",
+        description="How the SnowflakeWriter loads data: through the Spark `snowflake` format ('spark') or through an "
+        "internal stage with PUT and COPY INTO ('copy'). See `SnowflakeWriter` for details.",
+    )
+    merge_values_max_rows: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="In MERGE mode, micro-batches with at most this many (compacted) changes skip the staging table "
+        "and are merged directly from a `VALUES` block. Batches containing values that can't be expressed as SQL "
+        "literals (e.g. arrays, maps, structs or binary) always go through the staging table. Disabled by default.",
+    )
+    metrics_history_size: int = Field(
+        default=1000,
+        gt=0,
+        description="Number of micro-batches to keep the metrics of in `output.batch_metrics`, the oldest are dropped",
+    )
+    use_connection_pool: bool = Field(
+        default=False,
+        description="Take the python connector connections (truncate, drop and merge statements, and the 'copy' load "
+        "method) from the process-wide Snowflake connection pool, so that all micro-batches reuse the same connection "
+        "instead of opening a new one for every statement",
+    )
+
+    class Output(SnowflakeSparkStep.Output):
+        """Output class for SynchronizeDeltaToSnowflakeTask"""
+
+        batch_metrics: List[Dict[str, Any]] = Field(
+            default_factory=list,
+            description="Row counts and phase timings (in seconds) of the last `metrics_history_size` micro-batches "
+            "that were merged: `batch_id`, `rows`, `merge_source` ('staging' or 'values'), `compact_time`, "
+            "`stage_time`, `merge_time` and `total_time`",
+        )
 
     writer_: Optional[Union[ForEachBatchStreamWriter, SnowflakeWriter]] = None
 
@@ -754,8 +1002,8 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
             )
         if synchronisation_mode == BatchOutputMode.OVERWRITE and streaming is True:
             raise ValueError("Synchronisation mode can't be 'OVERWRITE' with streaming enabled")
-        if synchronisation_mode == BatchOutputMode.MERGE and streaming is False:
-            raise ValueError("Synchronisation mode can't be 'MERGE' with streaming disabled")
+        if synchronisation_mode == BatchOutputMode.MERGE and streaming is False and not values.get("version_store"):
+            raise ValueError("Synchronisation mode can't be 'MERGE' with streaming disabled without a `version_store`")
         if synchronisation_mode == BatchOutputMode.MERGE and len(key_columns) < 1:  # type: ignore
             raise ValueError("MERGE synchronisation mode requires a list of PK columns in `key_columns`.")
 
@@ -778,7 +1026,7 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
         return f"{self.source_table.table}_stg"
 
     @property
-    def reader(self) -> Union[DeltaTableReader, DeltaTableStreamReader]:
+    def reader(self) -> Union[DeltaTableReader, DeltaTableStreamReader, DeltaTableChangeFeedReader]:
         """
         DeltaTable reader
 
@@ -789,6 +1037,13 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
         """
         # Wrap in lambda functions to mimic lazy evaluation.
         # This ensures the Task doesn't fail if a config isn't provided for a reader/writer that isn't used anyway
+        if self.synchronisation_mode == BatchOutputMode.MERGE and not self.streaming:
+            return DeltaTableChangeFeedReader(
+                table=self.source_table,
+                version_store=self.version_store,
+                max_versions_per_batch=self.max_versions_per_batch,
+                starting_version=self.starting_version,
+            )
         map_mode_reader = {
             BatchOutputMode.OVERWRITE: lambda: DeltaTableReader(
                 table=self.source_table, streaming=False, schema_tracking_location=self.schema_tracking_location
@@ -865,73 +1120,156 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
     def truncate_table(self, snowflake_table: str) -> None:
         """Truncate a given snowflake table"""
         truncate_query = f"""TRUNCATE TABLE IF EXISTS {snowflake_table}"""  # nosec B608: hardcoded_sql_expressions
-        query_executor = SnowflakeRunQueryPython(
-            **self.get_options(),
-            query=truncate_query,
-        )
-        query_executor.execute()
+        self._run_query(truncate_query)
 
     def drop_table(self, snowflake_table: str) -> None:
         """Drop a given snowflake table"""
         self.log.warning(f"Dropping table {snowflake_table} from snowflake")
         drop_table_query = f"""DROP TABLE IF EXISTS {snowflake_table}"""  # nosec B608: hardcoded_sql_expressions
-        query_executor = SnowflakeRunQueryPython(**self.get_options(), query=drop_table_query)
-        query_executor.execute()
+        self._run_query(drop_table_query)
+
+    def _run_query(self, query: str) -> None:
+        """Run a query through the python connector, on a pooled connection when `use_connection_pool` is set"""
+        options = {**self.get_options(), "use_connection_pool": self.use_connection_pool}
+        SnowflakeRunQueryPython(**options, query=query).execute()
 
     def _merge_batch_write_fn(self, key_columns: List[str], non_key_columns: List[str], staging_table: str) -> Callable:
         """Build a batch write function for merge mode"""
 
-        # pylint: disable=unused-argument
-        # noinspection PyUnusedLocal,PyPep8Naming
+        # noinspection PyPep8Naming
         def inner(dataframe: DataFrame, batchId: int):  # type: ignore
-            self._build_staging_table(dataframe, key_columns, non_key_columns, staging_table)
-            self._merge_staging_table_into_target()
+            self._merge_batch(dataframe, batchId, key_columns, non_key_columns, staging_table)
 
-        # pylint: enable=unused-argument
         return inner
 
+    def _merge_batch(
+        self,
+        dataframe: DataFrame,
+        batch_id: int,
+        key_columns: List[str],
+        non_key_columns: List[str],
+        staging_table: str,
+    ) -> None:
+        """Compact a CDF micro-batch and merge it into the target table, recording row counts and phase timings
+
+        Small batches (see `merge_values_max_rows`) are merged directly from a `VALUES` block, other batches are
+        written to the (truncated) staging table first.
+        """
+        metrics: Dict[str, Any] = {"batch_id": batch_id, "merge_source": "staging", "stage_time": 0.0}
+        start = time.monotonic()
+
+        compacted = self._compute_latest_changes_per_pk(dataframe, key_columns, non_key_columns).persist()
+        try:
+            metrics["rows"] = rows = compacted.count()
+            metrics["compact_time"] = time.monotonic() - start
+
+            if rows == 0:
+                self.log.info(f"Batch {batch_id} contains no changes, skipping merge")
+                metrics["merge_time"] = 0.0
+            else:
+                merge_source = None
+                if self.merge_values_max_rows is not None and rows <= self.merge_values_max_rows:
+                    merge_source = self._build_values_source(compacted, key_columns, non_key_columns)
+
+                if merge_source is None:
+                    stage_start = time.monotonic()
+                    self.truncate_table(staging_table)
+                    self._build_staging_table(compacted, key_columns, non_key_columns, staging_table, compacted=True)
+                    metrics["stage_time"] = time.monotonic() - stage_start
+                else:
+                    metrics["merge_source"] = "values"
+
+                merge_start = time.monotonic()
+                self._merge_staging_table_into_target(stage_table=merge_source)
+                metrics["merge_time"] = time.monotonic() - merge_start
+        finally:
+            compacted.unpersist()
+
+        metrics["total_time"] = time.monotonic() - start
+        self.log.info(f"Merged batch {batch_id}: {metrics}")
+        self.output.batch_metrics.append(metrics)
+        # bounded, a long-running stream merges an unbounded number of micro-batches
+        del self.output.batch_metrics[: -self.metrics_history_size]
+
+    @staticmethod
+    def _to_sql_literal(value: Any) -> str:
+        """Convert a python value to a Snowflake SQL literal, raises a TypeError for unsupported types"""
+        if value is None:
+            return "NULL"
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"'{value}'::FLOAT"
+        if isinstance(value, (int, float, Decimal)):
+            return str(value)
+        if isinstance(value, (str, date, datetime)):
+            escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+            return f"'{escaped}'"
+        raise TypeError(f"Unsupported type for a SQL literal: {type(value)}")
+
+    def _build_values_source(
+        self, dataframe: DataFrame, key_columns: List[str], non_key_columns: List[str]
+    ) -> Optional[str]:
+        """Build a `(SELECT ... FROM VALUES ...)` merge source from a (small) compacted batch
+
+        Returns None if the batch contains values that can't be expressed as SQL literals.
+        """
+        columns = [*key_columns, *non_key_columns, "_change_type"]
+        try:
+            values = ",\n".join(
+                f"({', '.join(self._to_sql_literal(v) for v in row)})" for row in dataframe.select(*columns).collect()
+            )
+        except TypeError as e:
+            self.log.info(f"Falling back to the staging table: {e}")
+            return None
+
+        projection = ", ".join(f"column{i} AS {c}" for i, c in enumerate(columns, start=1))
+        return f"(SELECT {projection} FROM VALUES\n{values})"
+
     @staticmethod
     def _compute_latest_changes_per_pk(
         dataframe: DataFrame, key_columns: List[str], non_key_columns: List[str]
     ) -> DataFrame:
-        """Compute the latest changes per primary key"""
-        window_spec = Window.partitionBy(*key_columns).orderBy(f.col("_commit_version").desc())
-        ranked_df = (
-            dataframe.filter("_change_type != 'update_preimage'")
-            .withColumn("rank", f.rank().over(window_spec))  # type: ignore
-            .filter("rank = 1")
-            .select(*key_columns, *non_key_columns, "_change_type")  # discard unused columns
-            .distinct()
+        """Compute the latest changes per primary key, see `DeltaTableChangeFeedReader.latest_changes`"""
+        return DeltaTableChangeFeedReader.latest_changes(
+            dataframe, key_columns, columns=[*non_key_columns, "_change_type"]
         )
-        return ranked_df
 
     def _build_staging_table(
-        self, dataframe: DataFrame, key_columns: List[str], non_key_columns: List[str], staging_table: str
+        self,
+        dataframe: DataFrame,
+        key_columns: List[str],
+        non_key_columns: List[str],
+        staging_table: str,
+        compacted: bool = False,
     ) -> None:
         """Build snowflake staging table"""
-        ranked_df = self._compute_latest_changes_per_pk(dataframe, key_columns, non_key_columns)
+        ranked_df = (
+            dataframe if compacted else self._compute_latest_changes_per_pk(dataframe, key_columns, non_key_columns)
+        )
         batch_writer = SnowflakeWriter(
             table=staging_table, df=ranked_df, insert_type=BatchOutputMode.APPEND, **self.get_options()
         )
         batch_writer.execute()
 
-    def _merge_staging_table_into_target(self) -> None:
+    def _merge_staging_table_into_target(self, stage_table: Optional[str] = None) -> None:
         """
         Merge snowflake staging table into final snowflake table
+
+        Parameters
+        ----------
+        stage_table : Optional[str]
+            The table (or subquery) to merge from, defaults to the staging table
         """
         merge_query = self._build_sf_merge_query(
             target_table=self.target_table,
-            stage_table=self.staging_table,
+            stage_table=stage_table or self.staging_table,
             pk_columns=[*(self.key_columns or [])],
             non_pk_columns=self.non_key_columns,
             enable_deletion=self.enable_deletion,
         )  # type: ignore
 
-        query_executor = SnowflakeRunQueryPython(
-            **self.get_options(),
-            query=merge_query,
-        )
-        query_executor.execute()
+        self._run_query(merge_query)
 
     @staticmethod
     def _build_sf_merge_query(
@@ -981,17 +1319,21 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
 
         return query
 
+    def _check_cdf_active(self) -> None:
+        """Raise a RuntimeError if the change data feed is not enabled on the source table"""
+        if not self.source_table.is_cdf_active:
+            raise RuntimeError(
+                f"Source table {self.source_table.table_name} does not have CDF enabled. "
+                f"Set TBLPROPERTIES ('delta.enableChangeDataFeed' = true) to enable. "
+                f"Current properties = {self.source_table.get_persisted_properties()}"
+            )
+
     def extract(self) -> DataFrame:
         """
         Extract source table
         """
         if self.synchronisation_mode == BatchOutputMode.MERGE:
-            if not self.source_table.is_cdf_active:
-                raise RuntimeError(
-                    f"Source table {self.source_table.table_name} does not have CDF enabled. "
-                    f"Set TBLPROPERTIES ('delta.enableChangeDataFeed' = true) to enable. "
-                    f"Current properties = {self.source_table.get_persisted_properties()}"
-                )
+            self._check_cdf_active()
 
         df = self.reader.read()
         self.output.source_df = df
@@ -1006,7 +1348,31 @@ class SynchronizeDeltaToSnowflakeTask(SnowflakeSparkStep):
         self.output.target_df = df
         return df
 
+    def merge_versions(self) -> None:
+        """Merge the change data feed of the source table into the target table in batch, one version range at a time
+
+        Every range is compacted and merged like a streaming micro-batch (the last version of the range is used as the
+        batch id), after which the version is stored in the `version_store`.
+        """
+        self._check_cdf_active()
+        reader = self.reader
+        while True:
+            df = reader.read()
+            if (ending_version := reader.output.ending_version) is None:
+                break
+            self.output.source_df = self.output.target_df = df
+            self._merge_batch(df, ending_version, self.key_columns, self.non_key_columns, self.staging_table)  # type: ignore[arg-type]
+            reader.commit_version()
+            if not reader.output.has_more:
+                break
+
     def execute(self) -> SynchronizeDeltaToSnowflakeTask.Output:
+        if self.synchronisation_mode == BatchOutputMode.MERGE and not self.streaming:
+            self.merge_versions()
+            if not self.persist_staging:
+                self.drop_table(self.staging_table)
+            return
+
         # extract
         df = self.extract()
         self.output.source_df = df
@@ -33,13 +33,12 @@ from pyspark.sql.types import (
     ShortType,
     StringType,
     StructField,
-    StructType,
     TimestampType,
 )
 
 from koheesio.spark import DataFrame, SparkStep
-from koheesio.spark.transformations.cast_to_datatype import CastToDatatype
 from koheesio.spark.utils import SPARK_MINOR_VERSION
+from koheesio.spark.utils.staging import create_staging_dir
 from koheesio.steps import Step, StepOutput
 
 
@@ -63,6 +62,10 @@ class HyperFileReader(HyperFile, SparkStep):
     """
     Read a Hyper file and return a Spark DataFrame.
 
+    The table is exported to a parquet file by Hyper itself (`COPY ... TO ... WITH (FORMAT PARQUET)`) and read with
+    `spark.read.parquet`, so the rows never pass through the Python driver. Dates and timestamps are exported with
+    their native types.
+
     Examples
     --------
     ```python
@@ -73,29 +76,59 @@ class HyperFileReader(HyperFile, SparkStep):
         .execute()
         .df
     )
+
+    # or in Databricks, the staging location has to be accessible by the executors
+    df = (
+        HyperFileReader(
+            path=PurePath(hw.hyper_path),
+            staging_path="dbfs:/tmp/hyper/staging/",
+        )
+        .execute()
+        .df
+    )
     ```
     """
 
     path: PurePath = Field(
         default=..., description="Path to the Hyper file", examples=["PurePath(~/data/my-file.hyper)"]
     )
+    staging_path: Optional[PurePath] = Field(
+        default=None,
+        description="Directory to export the parquet file to, should be accessible by the driver and by Spark. Required "
+        "unless Spark runs in local mode. If executing in Databricks ensure to specify the scheme `dbfs:/`.",
+        examples=["PurePath(/tmp/hyper/staging/)", "PurePath(dbfs:/tmp/hyper/staging/)"],
+    )
 
-    def execute(self) -> SparkStep.Output:
+    @staticmethod
+    def spark_type(tableau_type: str) -> Any:
+        """
+        Convert a Tableau Hyper type to a Spark DataType, returns None for types that are not supported natively
+        """
         type_mapping = {
-            "date": StringType,
+            "date": DateType,
             "text": StringType,
             "double": FloatType,
             "bool": BooleanType,
             "small_int": ShortType,
             "big_int": LongType,
-            "timestamp": StringType,
-            "timestamp_tz": StringType,
+            "timestamp": TimestampType,
+            "timestamp_tz": TimestampType,
             "int": IntegerType,
-            "numeric": DecimalType,
         }
+        if tableau_type.startswith("numeric"):
+            return DecimalType(precision=18, scale=5)
+        if tableau_type.startswith("varchar") or tableau_type.startswith("char"):
+            return StringType()
+        return type_mapping[tableau_type]() if tableau_type in type_mapping else None
+
+    def execute(self) -> SparkStep.Output:
         df_cols = []
-        timestamp_cols = []
-        date_cols = []
+        # Hyper runs on the driver and writes to the local path of the staging directory (/dbfs on Databricks)
+        staging_dir = create_staging_dir(
+            self.spark, self.staging_path.as_posix() if self.staging_path else None, prefix="koheesio_hyper_"
+        )
+        file_name = f"{self.path.stem}_{self.schema_}_{self.table}.parquet"
+        local_file = os.path.join(staging_dir.local_path, file_name)
 
         with HyperProcess(telemetry=Telemetry.DO_NOT_SEND_USAGE_DATA_TO_TABLEAU) as hp:
             with Connection(endpoint=hp.endpoint, database=self.path) as connection:
@@ -108,34 +141,36 @@ class HyperFileReader(HyperFile, SparkStep):
 
                     column_name = column.name.unescaped.__str__()
                     tableau_type = column.type.__str__().lower()
+                    spark_type = self.spark_type(tableau_type)
 
-                    if tableau_type.startswith("numeric"):
-                        spark_type = DecimalType(precision=18, scale=5)
-                    else:
-                        spark_type = type_mapping.get(tableau_type, StringType)()
-
-                    if tableau_type == "timestamp" or tableau_type == "timestamp_tz":
-                        timestamp_cols.append(column_name)
-                        _col = f'cast("{column_name}" as text)'
-                    elif tableau_type == "date":
-                        date_cols.append(column_name)
-                        _col = f'cast("{column_name}" as text)'
+                    if spark_type is None:
+                        spark_type = StringType()
+                        _col = f'cast("{column_name}" as text) as "{column_name}"'
                     elif tableau_type.startswith("numeric"):
-                        _col = f'cast("{column_name}" as decimal(18,5))'
+                        _col = f'cast("{column_name}" as decimal(18,5)) as "{column_name}"'
                     else:
                         _col = f'"{column_name}"'
 
                     df_cols.append(StructField(column_name, spark_type))
                     select_cols.append(_col)
 
-                data = connection.execute_list_query(f"select {','.join(select_cols)} from {self.table_name}")
+                sql = (
+                    f"copy (select {','.join(select_cols)} from {self.table_name}) "
+                    f"to '{local_file}' with (format parquet)"
+                )
+                self.log.debug(f"Executing SQL: {sql}")
+                connection.execute_command(sql)
 
-        df_schema = StructType(df_cols)
-        df = self.spark.createDataFrame(data, schema=df_schema)
-        if timestamp_cols:
-            df = CastToDatatype(column=timestamp_cols, datatype="timestamp").transform(df)
-        if date_cols:
-            df = CastToDatatype(column=date_cols, datatype="date").transform(df)
+        df = self.spark.read.parquet(f"{staging_dir.spark_path}/{file_name}")
+
+        # Only align the types that differ, e.g. Hyper's timestamp is read as TimestampNTZType by Spark 3.4+
+        df_types = {field.name: field.dataType for field in df.schema}
+        df = df.select(
+            *[
+                col(field.name) if df_types[field.name] == field.dataType else col(field.name).cast(field.dataType)
+                for field in df_cols
+            ]
+        )
 
         self.output.df = df
 
@@ -350,9 +385,12 @@ class HyperFileParquetWriter(HyperFileWriter):
 class HyperFileDataFrameWriter(HyperFileWriter):
     """
     Write a Spark DataFrame to a Hyper file.
-    The process will write the DataFrame to a parquet file and then use the HyperFileParquetWriter to write to the
+    The process will write the DataFrame to parquet files and then use the HyperFileParquetWriter to write to the
     Hyper file.
 
+    The DataFrame is written in parallel, keeping its natural partitioning (or `num_files` parts, when provided). All
+    parquet parts are loaded into the Hyper file with a single multi-file `COPY` statement.
+
     Examples
     --------
     ```python
@@ -372,6 +410,13 @@ class HyperFileDataFrameWriter(HyperFileWriter):
         path="dbfs:/tmp/hyper/",
     ).execute()
 
+    # or with a fixed number of parquet parts
+    hw = HyperFileDataFrameWriter(
+        df=df,
+        name="test",
+        num_files=16,
+    ).execute()
+
     # do somthing with returned file path
     hw.hyper_path
     ```
@@ -379,6 +424,12 @@ class HyperFileDataFrameWriter(HyperFileWriter):
 
     df: DataFrame = Field(default=..., description="Spark DataFrame to write to the Hyper file")
     table_definition: Optional[TableDefinition] = None  # table_definition is not required for this class
+    num_files: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Number of parquet parts to write before loading them into the Hyper file. Defaults to the number "
+        "of partitions of the DataFrame.",
+    )
 
     @staticmethod
     def table_definition_column(column: StructField) -> TableDefinition.Column:
@@ -491,26 +542,26 @@ class HyperFileDataFrameWriter(HyperFileWriter):
         return _df
 
     def write_parquet(self) -> List[PurePath]:
+        """Write the (cleaned) DataFrame to parquet and return the paths of all parquet parts"""
         _path = self.path.joinpath("parquet")
-        (
-            self.clean_dataframe()
-            .coalesce(1)
-            .write.option("delimiter", ",")
-            .option("header", "true")
-            .mode("overwrite")
-            .parquet(_path.as_posix())
-        )
+        _df = self.clean_dataframe()
+        if self.num_files:
+            _df = _df.repartition(self.num_files)
+
+        _df.write.mode("overwrite").parquet(_path.as_posix())
 
         if _path.as_posix().startswith("dbfs:"):
             _path = PurePath(_path.as_posix().replace("dbfs:", "/dbfs"))
             self.log.debug("Parquet location on DBFS: %s}", _path)
 
-        for _, _, files in os.walk(_path):
-            for file in files:
-                if file.endswith(".parquet"):
-                    fp = PurePath(_path, file)
-                    self.log.info("Parquet file created: %s", fp)
-                    return [fp]
+        files = sorted(
+            PurePath(root, file)
+            for root, _, file_names in os.walk(_path)
+            for file in file_names
+            if file.endswith(".parquet") and not file.startswith((".", "_"))
+        )
+        self.log.info("%d parquet file(s) created in %s", len(files), _path)
+        return files
 
     def _execute(self) -> HyperFileWriter.Output:
         w = HyperFileParquetWriter(
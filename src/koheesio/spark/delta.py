@@ -8,16 +8,43 @@ import warnings
 
 from py4j.protocol import Py4JJavaError  # type: ignore
 
-from pyspark.sql.types import DataType
+from pyspark.sql.types import (
+    BooleanType,
+    DataType,
+    LongType,
+    MapType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
 
 from koheesio.logger import LoggingFactory
 from koheesio.models import Field, field_validator, model_validator
 from koheesio.spark import AnalysisException, DataFrame, SparkStep
+from koheesio.spark.delta_log import DeltaLogReader
 from koheesio.spark.utils import on_databricks
 from koheesio.steps import Step, StepOutput
 
 log = LoggingFactory.get_logger(name=__name__, inherit_from_koheesio=True)
 
+# Subset of the `DESCRIBE HISTORY` columns that can be derived from the transaction log (used for path-based tables)
+HISTORY_SCHEMA = StructType(
+    [
+        StructField("version", LongType()),
+        StructField("timestamp", TimestampType()),
+        StructField("userId", StringType()),
+        StructField("userName", StringType()),
+        StructField("operation", StringType()),
+        StructField("operationParameters", MapType(StringType(), StringType())),
+        StructField("readVersion", LongType()),
+        StructField("isolationLevel", StringType()),
+        StructField("isBlindAppend", BooleanType()),
+        StructField("operationMetrics", MapType(StringType(), StringType())),
+        StructField("engineInfo", StringType()),
+    ]
+)
+
 
 class DeltaTableStep(SparkStep):
     """
@@ -75,10 +102,16 @@ class DeltaTableStep(SparkStep):
         Returns a DataFrame to be able to interact with this table.
     - columns -> Optional[List[str]]
         Returns all column names as a list.
+    - partition_columns -> List[str]
+        Returns the partition columns of the table.
     - has_change_type -> bool
         Checks if a column named `_change_type` is present in the table.
     - exists -> bool
         Check if table exists.
+    - path -> Optional[str]
+        Location of the table for path-based tables (e.g. ``delta.`/path/to/table` ``).
+    - delta_log -> Optional[DeltaLogReader]
+        Reader of the transaction log for path-based tables. Used to read metadata without running Spark SQL.
 
     Parameters
     ----------
@@ -140,6 +173,12 @@ class DeltaTableStep(SparkStep):
         """Validate that catalog, database/schema, and table are correctly set"""
         database, catalog, table = self.database, self.catalog, self.table
 
+        if table.startswith("delta.`") and table.endswith("`"):
+            # path-based table, e.g. delta.`/path/to/table`. The path can contain dots, so it should not be split
+            self.log.debug("Path-based table was given")
+            self.database, self.catalog, self.table = "delta", None, table[len("delta.") :]
+            return self
+
         try:
             self.log.debug(f"Value of `table` input parameter: {table}")
             catalog, database, table = table.split(".")
@@ -164,6 +203,9 @@ class DeltaTableStep(SparkStep):
         Dict[str, str]
             Persisted properties as a dictionary.
         """
+        if delta_log := self.delta_log:
+            return delta_log.properties
+
         persisted_properties = {}
         raw_options = self.spark.sql(f"SHOW TBLPROPERTIES {self.table_name}").collect()
 
@@ -199,42 +241,15 @@ class DeltaTableStep(SparkStep):
             Enable override of existing value for property in table.
 
         """
-        persisted_properties = self.get_persisted_properties()
-        v_str = str(value) if not isinstance(value, bool) else str(value).lower()
-
-        def _alter_table() -> None:
-            property_pair = f"'{key}'='{v_str}'"
-
-            try:
-                # noinspection SqlNoDataSourceInspection
-                self.spark.sql(f"ALTER TABLE {self.table_name} SET TBLPROPERTIES ({property_pair})")
-                self.log.debug(f"Table `{self.table_name}` has been altered. Property `{property_pair}` added.")
-            except Py4JJavaError as e:
-                msg = f"Property `{key}` can not be applied to table `{self.table_name}`. Exception: {e}"
-                self.log.warning(msg)
-                warnings.warn(msg)
-
-        if self.exists:
-            if key in persisted_properties and persisted_properties[key] != v_str:
-                if override:
-                    self.log.debug(
-                        f"Property `{key}` presents in `{self.table_name}` and has value `{persisted_properties[key]}`."
-                        f"Override is enabled. The value will be changed to `{v_str}`."
-                    )
-                    _alter_table()
-                else:
-                    self.log.debug(
-                        f"Skipping adding property `{key}`, because it is already set "
-                        f"for table `{self.table_name}` to `{v_str}`. To override it, provide override=True"
-                    )
-            else:
-                _alter_table()
-        else:
-            self.default_create_properties[key] = v_str
+        self.add_properties(properties={key: value}, override=override)
 
     def add_properties(self, properties: Dict[str, Union[str, bool, int]], override: bool = False) -> None:
         """Alter table and add properties.
 
+        The persisted properties are read once and compared against the given properties. All properties that need to
+        be changed are then applied through a single `ALTER TABLE ... SET TBLPROPERTIES` statement (i.e. a single Delta
+        commit). No statement is issued when nothing changed.
+
         Parameters
         ----------
         properties : Dict[str, Union[str, int, bool]]
@@ -243,9 +258,50 @@ class DeltaTableStep(SparkStep):
             Enable override of existing value for property in table.
 
         """
-        for k, v in properties.items():
-            v_str = str(v) if not isinstance(v, bool) else str(v).lower()
-            self.add_property(key=k, value=v_str, override=override)
+        properties_str = {k: str(v) if not isinstance(v, bool) else str(v).lower() for k, v in properties.items()}
+
+        if not self.exists:
+            self.default_create_properties.update(properties_str)
+            return
+
+        persisted_properties = self.get_persisted_properties()
+        changed_properties = {}
+
+        for key, v_str in properties_str.items():
+            if key not in persisted_properties:
+                changed_properties[key] = v_str
+            elif persisted_properties[key] == v_str:
+                self.log.debug(f"Property `{key}` is already set for table `{self.table_name}` to `{v_str}`.")
+            elif override:
+                self.log.debug(
+                    f"Property `{key}` presents in `{self.table_name}` and has value `{persisted_properties[key]}`."
+                    f"Override is enabled. The value will be changed to `{v_str}`."
+                )
+                changed_properties[key] = v_str
+            else:
+                self.log.debug(
+                    f"Skipping adding property `{key}`, because it is already set "
+                    f"for table `{self.table_name}` to `{persisted_properties[key]}`. "
+                    "To override it, provide override=True"
+                )
+
+        if not changed_properties:
+            self.log.debug(f"No properties to alter for table `{self.table_name}`.")
+            return
+
+        property_pairs = ", ".join(f"'{k}'='{v}'" for k, v in changed_properties.items())
+
+        try:
+            # noinspection SqlNoDataSourceInspection
+            self.spark.sql(f"ALTER TABLE {self.table_name} SET TBLPROPERTIES ({property_pairs})")
+            self.log.debug(f"Table `{self.table_name}` has been altered. Properties `{property_pairs}` added.")
+        except Py4JJavaError as e:
+            msg = (
+                f"Properties `{list(changed_properties)}` can not be applied to table `{self.table_name}`. "
+                f"Exception: {e}"
+            )
+            self.log.warning(msg)
+            warnings.warn(msg)
 
     def execute(self) -> None:
         """Nothing to execute on a Table"""
@@ -255,6 +311,25 @@ class DeltaTableStep(SparkStep):
         """Fully qualified table name in the form of `catalog.database.table`"""
         return ".".join([n for n in [self.catalog, self.database, self.table] if n])
 
+    @property
+    def path(self) -> Optional[str]:
+        """Location of the table for path-based tables (i.e. `delta.`/path/to/table``), None otherwise"""
+        if self.database == "delta" and not self.catalog and self.table.startswith("`") and self.table.endswith("`"):
+            return self.table[1:-1]
+        return None
+
+    @property
+    def delta_log(self) -> Optional[DeltaLogReader]:
+        """Cached reader of the transaction log for path-based tables, None for catalog tables
+
+        Metadata of path-based tables (existence, properties, history) is read from the `_delta_log` directly through
+        the `DeltaLogReader`, without running any Spark SQL statements. When pyarrow can not access the location (e.g.
+        `s3a://` or `dbfs:/` paths) or no log is found there, this is None and Spark SQL is used instead.
+        """
+        if (path := self.path) is None:
+            return None
+        return DeltaLogReader.try_for_path(path)
+
     @property
     def dataframe(self) -> DataFrame:
         """Returns a DataFrame to be able to interact with this table"""
@@ -288,6 +363,19 @@ class DeltaTableStep(SparkStep):
         """
         return self.dataframe.schema[column].dataType if self.columns and column in self.columns else None
 
+    @property
+    def partition_columns(self) -> List[str]:
+        """Returns the partition columns of the table, an empty list if the table is not partitioned or doesn't exist"""
+        if delta_log := self.delta_log:
+            return delta_log.partition_columns
+
+        if not self.exists:
+            return []
+
+        # noinspection SqlNoDataSourceInspection
+        detail = self.spark.sql(f"DESCRIBE DETAIL {self.table_name}").select("partitionColumns").first()
+        return list(detail["partitionColumns"] or []) if detail else []
+
     @property
     def has_change_type(self) -> bool:
         """Checks if a column named `_change_type` is present in the table"""
@@ -297,6 +385,11 @@ class DeltaTableStep(SparkStep):
     def exists(self) -> bool:
         """Check if table exists.
         Depending on the value of the boolean flag `create_if_not_exists` a different logging level is provided."""
+        if delta_log := self.delta_log:
+            if not (result := delta_log.exists):
+                self.log.debug(f"Table `{self.table_name}` does not exist.")
+            return result
+
         result = False
 
         try:
@@ -312,7 +405,14 @@ class DeltaTableStep(SparkStep):
             result = True
         except AnalysisException as e:
             err_msg = str(e).lower()
-            if err_msg.startswith("[table_or_view_not_found]") or err_msg.startswith("table or view not found"):
+            if (
+                err_msg.startswith("[table_or_view_not_found]")
+                or err_msg.startswith("table or view not found")
+                # path-based tables
+                or err_msg.startswith("[delta_path_does_not_exist]")
+                or err_msg.startswith("[delta_missing_delta_table]")
+                or "is not a delta table" in err_msg
+            ):
                 self.log.debug(f"Table `{self.table_name}` does not exist.")
             else:
                 raise e
@@ -346,6 +446,17 @@ class DeltaTableStep(SparkStep):
         ```
         Would return the last 10 operations from the Delta Log.
         """
+        if self.exists and (delta_log := self.delta_log):
+            history = [
+                {
+                    **{k: commit.get(k) for k in HISTORY_SCHEMA.fieldNames()},
+                    "operationParameters": {k: str(v) for k, v in (commit.get("operationParameters") or {}).items()},
+                    "operationMetrics": {k: str(v) for k, v in (commit.get("operationMetrics") or {}).items()},
+                }
+                for commit in delta_log.history(limit=limit)
+            ]
+            return self.spark.createDataFrame(history, schema=HISTORY_SCHEMA)
+
         if self.exists:
             history_df = self.spark.sql(f"DESCRIBE HISTORY {self.table_name}")
             history_df = history_df.orderBy("version", ascending=False)
@@ -356,6 +467,19 @@ class DeltaTableStep(SparkStep):
             self.log.warning(f"Table `{self.table_name}` does not exist.")
 
 
+MODIFICATION_OPERATIONS = [
+    "WRITE",
+    "MERGE",
+    "DELETE",
+    "UPDATE",
+    "REPLACE TABLE AS SELECT",
+    "CREATE TABLE AS SELECT",
+    "TRUNCATE",
+    "RESTORE",
+]
+"""Delta log operations that modify the data of a table"""
+
+
 class StaleDataCheckStep(Step):
     """
     Determines if the data inside the Delta table is stale based on the elapsed time since
@@ -499,39 +623,39 @@ class StaleDataCheckStep(Step):
 
         return self
 
+    def _get_last_modification_timestamp(self, history_df: DataFrame) -> Optional[datetime]:
+        """Get the timestamp of the last data modification operation from the table history"""
+        # Filter the history to data modification operations only
+        history_df = history_df.filter(history_df["operation"].isin(MODIFICATION_OPERATIONS))
+
+        # Get the last modification operation's timestamp
+        last_modification = history_df.select("timestamp").first()
+        return last_modification["timestamp"] if last_modification else None
+
     def execute(self) -> Output:
-        # Get the history of the Delta table
-        history_df = self.table.describe_history()
+        if delta_log := self.table.delta_log:
+            # Path-based table: the history is read from the transaction log directly, no Spark SQL is needed
+            has_history = delta_log.exists
+            last_modification_timestamp = (
+                delta_log.last_commit_timestamp(operations=MODIFICATION_OPERATIONS) if has_history else None
+            )
+        else:
+            # Get the history of the Delta table
+            history_df = self.table.describe_history()
+            has_history = bool(history_df)
+            last_modification_timestamp = self._get_last_modification_timestamp(history_df) if has_history else None
 
-        if not history_df:
+        if not has_history:
             log.debug(f"No history found for `{self.table.table_name}`.")
             self.output.is_data_stale = True  # Consider data stale if the table does not exist
             return self.output
 
-        modification_operations = [
-            "WRITE",
-            "MERGE",
-            "DELETE",
-            "UPDATE",
-            "REPLACE TABLE AS SELECT",
-            "CREATE TABLE AS SELECT",
-            "TRUNCATE",
-            "RESTORE",
-        ]
-
-        # Filter the history to data modification operations only
-        history_df = history_df.filter(history_df["operation"].isin(modification_operations))
-
-        # Get the last modification operation's timestamp
-        last_modification = history_df.select("timestamp").first()
-
-        if not last_modification:
+        if not last_modification_timestamp:
             log.debug(f"No modification operation found in the history for `{self.table.table_name}`.")
             self.output.is_data_stale = True
             return self.output
 
         current_time = datetime.now()
-        last_modification_timestamp = last_modification["timestamp"]
 
         cut_off_date = current_time - self.interval
 
@@ -0,0 +1,405 @@
+"""
+Pure-Python reader for the Delta Lake transaction log (`_delta_log`).
+
+Reading table metadata through Spark (`DESCRIBE HISTORY`, `SHOW TBLPROPERTIES`, ...) launches Spark jobs just to read a
+handful of JSON files. The `DeltaLogReader` reads the transaction log directly (JSON commits plus parquet checkpoints
+through pyarrow) and is able to answer metadata queries without a Spark session:
+
+- latest version of the table
+- commit history (timestamps, operations, operation metrics)
+- schema, partition columns and table properties
+- list of active data files
+
+Only the metadata (schema, partition columns and properties) can also be read without loading the list of data files,
+through `read_metadata`, which is considerably cheaper for large tables.
+
+The log is tailed incrementally: after the initial load (latest checkpoint + subsequent commits), every refresh only
+reads the commits that were added after the last known version. Readers are cached per table location, so repeated
+calls (e.g. freshness checks in monitoring jobs) reuse the already loaded state. Every refresh checks that the commit
+of the last known version is unchanged; when a table was dropped and recreated at the same location, the state is
+reloaded.
+
+Any filesystem supported by `pyarrow.fs` can be used (local, S3, GCS, HDFS, ...). Locations that pyarrow can not
+resolve (e.g. `s3a://`, `dbfs:/`, or a `/mnt/...` mount that is not visible on the driver) are not supported;
+`DeltaLogReader.try_for_path` returns None for those, so callers can fall back to Spark.
+
+Example
+-------
+```python
+from koheesio.spark.delta_log import DeltaLogReader
+
+delta_log = DeltaLogReader.for_path("/path/to/delta/table")
+delta_log.version  # latest version, e.g. 42
+delta_log.properties  # {"delta.enableChangeDataFeed": "true", ...}
+delta_log.history(limit=5)  # the 5 most recent commits
+```
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+import json
+import threading
+
+from pyarrow import ArrowException
+from pyarrow import compute as pc
+from pyarrow import fs as pa_fs
+from pyarrow import parquet as pq
+
+from koheesio.models import BaseModel, Field, PrivateAttr
+
+__all__ = ["DeltaLogReader", "DELTA_LOG_DIR"]
+
+DELTA_LOG_DIR = "_delta_log"
+
+_readers: Dict[str, "DeltaLogReader"] = {}
+_readers_lock = threading.Lock()
+
+
+def _to_datetime(epoch_millis: Optional[int]) -> Optional[datetime]:
+    """Convert epoch milliseconds to a (naive, local time) datetime, similar to what `DESCRIBE HISTORY` returns"""
+    return datetime.fromtimestamp(epoch_millis / 1000) if epoch_millis is not None else None
+
+
+def _map_to_dict(value: Any) -> Dict[str, Any]:
+    """Parquet maps are read by pyarrow as a list of (key, value) tuples, JSON maps are read as dicts"""
+    if value is None:
+        return {}
+    return dict(value)
+
+
+class DeltaLogReader(BaseModel):
+    """Reads the Delta transaction log of a path-based Delta table without the need of a Spark session
+
+    Use `DeltaLogReader.for_path` to get a cached reader for a given table location. The state of the reader is
+    refreshed (incrementally) every time one of its properties or methods is accessed.
+
+    Note: only classic checkpoints (single and multi-part) are supported. V2 checkpoints with sidecar files are not.
+
+    Parameters
+    ----------
+    path : str
+        Location of the Delta table, i.e. the directory containing the `_delta_log` folder.
+    """
+
+    path: str = Field(default=..., description="Location of the Delta table (the directory containing `_delta_log`)")
+
+    _fs: Optional[pa_fs.FileSystem] = PrivateAttr(default=None)
+    _fs_path: Optional[str] = PrivateAttr(default=None)
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+    _version: int = PrivateAttr(default=-1)
+    _checkpoint_version: int = PrivateAttr(default=-1)
+    _metadata: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _protocol: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _files: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _commits: Dict[int, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _fingerprint: Optional[Tuple[Optional[int], Optional[int]]] = PrivateAttr(default=None)
+
+    @classmethod
+    def for_path(cls, path: str) -> DeltaLogReader:
+        """Return a cached `DeltaLogReader` for the given table location (one reader per table)"""
+        key = path.rstrip("/")
+        with _readers_lock:
+            if key not in _readers:
+                _readers[key] = cls(path=key)
+            return _readers[key]
+
+    @classmethod
+    def try_for_path(cls, path: str) -> Optional[DeltaLogReader]:
+        """Return a cached `DeltaLogReader` for the given location, None if pyarrow can not resolve the location or no
+        transaction log is found there"""
+        try:
+            delta_log = cls.for_path(path)
+            if delta_log.exists:
+                return delta_log
+        except (ArrowException, OSError, ValueError, NotImplementedError):
+            pass
+        return None
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Remove all cached readers"""
+        with _readers_lock:
+            _readers.clear()
+
+    # -- filesystem helpers --
+
+    @property
+    def filesystem(self) -> Tuple[pa_fs.FileSystem, str]:
+        """Return the pyarrow filesystem and the table path within that filesystem"""
+        if self._fs is None:
+            if "://" in self.path:
+                self._fs, self._fs_path = pa_fs.FileSystem.from_uri(self.path)
+            else:
+                self._fs, self._fs_path = pa_fs.LocalFileSystem(), self.path
+        return self._fs, self._fs_path.rstrip("/")  # type: ignore[union-attr]
+
+    @property
+    def log_path(self) -> str:
+        """Path to the `_delta_log` folder within the filesystem"""
+        _, table_path = self.filesystem
+        return f"{table_path}/{DELTA_LOG_DIR}"
+
+    def _commit_file(self, version: int) -> str:
+        return f"{self.log_path}/{version:020d}.json"
+
+    def _read_text(self, file_path: str) -> Optional[str]:
+        """Read a file from the filesystem, returns None if the file does not exist"""
+        fs, _ = self.filesystem
+        try:
+            with fs.open_input_stream(file_path) as stream:
+                return stream.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def _read_commit(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Read the actions of a single JSON commit, returns None if the commit does not exist"""
+        content = self._read_text(self._commit_file(version))
+        if content is None:
+            return None
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    def _find_last_checkpoint(self) -> Tuple[int, List[str]]:
+        """Find the latest checkpoint, returns the checkpoint version and the list of checkpoint files
+
+        The `_last_checkpoint` file is used when available, otherwise the `_delta_log` folder is listed.
+        """
+        fs, _ = self.filesystem
+
+        if content := self._read_text(f"{self.log_path}/_last_checkpoint"):
+            last_checkpoint = json.loads(content)
+            version, parts = last_checkpoint["version"], last_checkpoint.get("parts")
+            if parts:
+                return version, [
+                    f"{self.log_path}/{version:020d}.checkpoint.{part:010d}.{parts:010d}.parquet"
+                    for part in range(1, parts + 1)
+                ]
+            return version, [f"{self.log_path}/{version:020d}.checkpoint.parquet"]
+
+        checkpoints: Dict[int, List[str]] = {}
+        try:
+            file_infos = fs.get_file_info(pa_fs.FileSelector(self.log_path))
+        except FileNotFoundError:
+            return -1, []
+
+        for file_info in file_infos:
+            if ".checkpoint." in file_info.base_name and file_info.base_name.endswith(".parquet"):
+                checkpoints.setdefault(int(file_info.base_name.split(".")[0]), []).append(file_info.path)
+
+        if not checkpoints:
+            return -1, []
+
+        version = max(checkpoints)
+        return version, sorted(checkpoints[version])
+
+    # -- state management --
+
+    def _commit_fingerprint(self, version: int) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Size and modification time of the commit file of a version, None if the file does not exist"""
+        fs, _ = self.filesystem
+        file_info = fs.get_file_info(self._commit_file(version))
+        if file_info.type == pa_fs.FileType.NotFound:
+            return None
+        return file_info.size, file_info.mtime_ns
+
+    def _reset(self) -> None:
+        """Forget the loaded state, the next update reloads the log from the latest checkpoint"""
+        self._version = self._checkpoint_version = -1
+        self._metadata, self._protocol, self._files, self._commits = {}, {}, {}, {}
+        self._fingerprint = None
+
+    def _apply_actions(self, actions: Iterator[Dict[str, Any]]) -> None:
+        """Apply log actions to the current snapshot state"""
+        for action in actions:
+            if (add := action.get("add")) is not None:
+                add["partitionValues"] = _map_to_dict(add.get("partitionValues"))
+                self._files[add["path"]] = add
+            elif (remove := action.get("remove")) is not None:
+                self._files.pop(remove["path"], None)
+            elif (metadata := action.get("metaData")) is not None:
+                metadata["configuration"] = _map_to_dict(metadata.get("configuration"))
+                self._metadata = metadata
+            elif (protocol := action.get("protocol")) is not None:
+                self._protocol = protocol
+
+    def _load_checkpoint(self) -> None:
+        """Load the snapshot state from the latest checkpoint (if any)"""
+        version, checkpoint_files = self._find_last_checkpoint()
+        if version < 0:
+            return
+
+        fs, _ = self.filesystem
+        for checkpoint_file in checkpoint_files:
+            table = pq.read_table(checkpoint_file, filesystem=fs, columns=["add", "metaData", "protocol"])
+            self._apply_actions(
+                {name: row[name] for name in ("add", "metaData", "protocol") if row[name] is not None}
+                for row in table.to_pylist()
+            )
+
+        self._version = self._checkpoint_version = version
+
+    def read_metadata(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """The latest `metaData` and `protocol` actions, without loading the data files of the table
+
+        When the snapshot of the reader is already loaded, it is brought up to date and used. Otherwise only the
+        `metaData` and `protocol` actions of the latest checkpoint and of the subsequent commits are read, and nothing
+        is cached. Both are empty when there is no table at the location.
+        """
+        with self._lock:
+            if self._version >= 0:
+                self.update()
+                return self._metadata, self._protocol
+
+        metadata: Dict[str, Any] = {}
+        protocol: Dict[str, Any] = {}
+
+        def apply(action: Dict[str, Any]) -> None:
+            nonlocal metadata, protocol
+            if (_metadata := action.get("metaData")) is not None:
+                metadata = {**_metadata, "configuration": _map_to_dict(_metadata.get("configuration"))}
+            elif (_protocol := action.get("protocol")) is not None:
+                protocol = _protocol
+
+        version, checkpoint_files = self._find_last_checkpoint()
+        fs, _ = self.filesystem
+        for checkpoint_file in checkpoint_files:
+            table = pq.read_table(checkpoint_file, filesystem=fs, columns=["metaData", "protocol"])
+            table = table.filter(pc.or_(pc.is_valid(table["metaData"]), pc.is_valid(table["protocol"])))
+            for row in table.to_pylist():
+                apply({name: value for name, value in row.items() if value is not None})
+
+        while (actions := self._read_commit(version + 1)) is not None:
+            version += 1
+            for action in actions:
+                apply(action)
+
+        return metadata, protocol
+
+    @staticmethod
+    def table_properties(metadata: Dict[str, Any], protocol: Dict[str, Any]) -> Dict[str, str]:
+        """Table properties based on the `metaData` and `protocol` actions, see `properties`"""
+        properties = dict(metadata.get("configuration") or {})
+        for key in ("minReaderVersion", "minWriterVersion"):
+            if key in protocol:
+                properties[f"delta.{key}"] = str(protocol[key])
+        return properties
+
+    def update(self) -> int:
+        """Bring the snapshot up to date by tailing the log from the last known version
+
+        Returns
+        -------
+        int
+            The latest version of the table, -1 if the table does not exist (yet).
+        """
+        with self._lock:
+            if self._version >= 0 and self._commit_fingerprint(self._version) != self._fingerprint:
+                # the table was removed or recreated at the same location since the last update
+                self._reset()
+
+            if self._version < 0:
+                self._load_checkpoint()
+
+            while (actions := self._read_commit(self._version + 1)) is not None:
+                self._version += 1
+                self._apply_actions(iter(actions))
+                for action in actions:
+                    if (commit_info := action.get("commitInfo")) is not None:
+                        self._commits[self._version] = commit_info
+
+            if self._version >= 0:
+                self._fingerprint = self._commit_fingerprint(self._version)
+            return self._version
+
+    # -- metadata queries --
+
+    @property
+    def exists(self) -> bool:
+        """Whether the location contains a Delta table (i.e. at least one version is committed)"""
+        return self.update() >= 0
+
+    @property
+    def version(self) -> int:
+        """Latest version of the table, -1 if the table does not exist"""
+        return self.update()
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """The latest `metaData` action of the table"""
+        self.update()
+        return self._metadata
+
+    @property
+    def protocol(self) -> Dict[str, Any]:
+        """The latest `protocol` action of the table"""
+        self.update()
+        return self._protocol
+
+    @property
+    def schema(self) -> Optional[Dict[str, Any]]:
+        """Schema of the table as a (Spark compatible) JSON dict, use `StructType.fromJson` to convert it"""
+        schema_string = self.metadata.get("schemaString")
+        return json.loads(schema_string) if schema_string else None
+
+    @property
+    def partition_columns(self) -> List[str]:
+        """Partition columns of the table"""
+        return list(self.metadata.get("partitionColumns") or [])
+
+    @property
+    def properties(self) -> Dict[str, str]:
+        """Table properties, similar to the output of `SHOW TBLPROPERTIES`"""
+        return self.table_properties(self.metadata, self.protocol)
+
+    @property
+    def files(self) -> List[Dict[str, Any]]:
+        """Active data files (the `add` actions) of the latest snapshot"""
+        self.update()
+        return list(self._files.values())
+
+    def commit(self, version: int) -> Optional[Dict[str, Any]]:
+        """Commit information of a given version, None if that commit is not (or no longer) available in the log
+
+        Next to the original fields of the `commitInfo` action, the `version` is added and the `timestamp` is
+        converted to a datetime.
+        """
+        with self._lock:
+            if version not in self._commits:
+                actions = self._read_commit(version)
+                commit_info = next((a["commitInfo"] for a in actions or [] if "commitInfo" in a), None)
+                if commit_info is None:
+                    return None
+                self._commits[version] = commit_info
+
+            commit_info = self._commits[version]
+
+        return {**commit_info, "version": version, "timestamp": _to_datetime(commit_info.get("timestamp"))}
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Commit history in reverse chronological order, similar to the output of `DESCRIBE HISTORY`
+
+        Commits that have been cleaned up from the log (log retention) are not returned.
+
+        Parameters
+        ----------
+        limit : Optional[int]
+            Number of commits to return. Returns all available commits if not provided.
+        """
+        history = []
+        for version in range(self.update(), -1, -1):
+            if limit is not None and len(history) >= limit:
+                break
+            if (commit := self.commit(version)) is None:
+                break
+            history.append(commit)
+        return history
+
+    def last_commit_timestamp(self, operations: Optional[List[str]] = None) -> Optional[datetime]:
+        """Timestamp of the most recent commit, optionally limited to the given operations (e.g. WRITE, MERGE)"""
+        for version in range(self.update(), -1, -1):
+            if (commit := self.commit(version)) is None:
+                break
+            if operations is None or commit.get("operation") in operations:
+                return commit["timestamp"]
+        return None
@@ -10,6 +10,9 @@ from koheesio import Step
 from koheesio.models import Field, InstanceOf, conlist
 from koheesio.spark import DataFrame
 from koheesio.spark.readers import Reader
+from koheesio.spark.readers.delta import DeltaTableChangeFeedReader
+from koheesio.spark.readers.file_loader import FileLoader
+from koheesio.spark.readers.incremental import IncrementalReaderMixin
 from koheesio.spark.transformations import Transformation
 from koheesio.spark.writers import Writer
 from koheesio.utils import utc_now
@@ -76,6 +79,13 @@ class EtlTask(Step):
     - It is easy to maintain and refactor
     - It is easy to integrate with other tools and libraries
     - It is easy to use in a production environment
+
+    Incremental sources
+    -------------------
+    When the source reads incrementally (e.g. a `DeltaTableReader` with an `incremental_column`, a `FileLoader` with
+    a `manifest` or a `DeltaTableChangeFeedReader`, see `koheesio.spark.readers.incremental`), its watermark, manifest
+    or version is committed by `commit()` once the target was written successfully. A failed load never advances the
+    source, so the same data is read again by the next run.
     """
 
     source: InstanceOf[Reader] = Field(default=..., description="Source to read from [extract]")
@@ -123,6 +133,15 @@ class EtlTask(Step):
         writer.write(df)
         return df
 
+    def commit(self) -> None:
+        """Commit the state of an incremental source, called once the target was written successfully"""
+        if isinstance(self.source, IncrementalReaderMixin):
+            self.source.commit_watermark()
+        if isinstance(self.source, FileLoader):
+            self.source.commit_manifest()
+        if isinstance(self.source, DeltaTableChangeFeedReader):
+            self.source.commit_version()
+
     def execute(self) -> Step.Output:
         """Run the ETL process"""
         self.log.info(f"Task started at {self.etl_date}")
@@ -135,3 +154,6 @@ class EtlTask(Step):
 
         # load to target
         self.output.target_df = self.load(self.output.transform_df)
+
+        # only now that the target is written, the source can move on
+        self.commit()
@@ -0,0 +1,417 @@
+"""
+Serialization of Kafka keys and values with native Spark expressions.
+
+The Kafka source and sink of Spark work with binary `key` and `value` columns. The classes in this module describe how
+these columns are (de)serialized, so that `KafkaReader` and `KafkaWriter` can do this with the built-in
+`from_json`/`to_json`, `from_avro`/`to_avro` and `from_protobuf`/`to_protobuf` functions instead of Python UDFs.
+
+Schemas can be supplied directly, read from a local schema file or looked up in a schema registry. `LocalSchemaRegistry`
+is a file based stand-in for a registry like the Confluent Schema Registry. Values written in the Confluent wire format
+(a magic byte and the 4 byte schema id in front of the payload) are supported through `confluent_wire_format`. Avro data
+in the Confluent wire format is decoded with the schema of the id in every message (the writer schema) and read as the
+latest schema of the subject, see `KafkaDeserializer`.
+
+Notes
+-----
+* Avro requires the `spark-avro` package, e.g. `org.apache.spark:spark-avro_2.12:<spark version>`.
+* Protobuf requires the `spark-protobuf` package and Spark 3.5 or higher.
+
+Example
+-------
+```python
+from koheesio.spark.kafka import (
+    KafkaDeserializer,
+    LocalSchemaRegistry,
+)
+from koheesio.spark.readers.kafka import KafkaReader
+
+reader = KafkaReader(
+    read_broker="broker:9092",
+    topic="orders",
+    key_deserializer=KafkaDeserializer(format="string"),
+    value_deserializer=KafkaDeserializer(
+        format="avro",
+        registry=LocalSchemaRegistry(
+            path="/dbfs/schemas/registry.json"
+        ),
+    ),
+    headers=["trace_id"],
+    columns=[
+        "key",
+        "value.order_id",
+        "value.amount",
+        "timestamp",
+        "trace_id",
+    ],
+)
+```
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from abc import ABC, abstractmethod
+import base64
+from enum import Enum
+import json
+import os
+import threading
+
+from pyspark.sql import Column
+from pyspark.sql import functions as f
+from pyspark.sql.types import StructType
+
+from koheesio.models import BaseModel, Field, InstanceOf, PrivateAttr, model_validator
+from koheesio.spark.readers.schema_cache import SchemaCache
+from koheesio.utils import utc_now
+
+__all__ = [
+    "KafkaDeserializer",
+    "KafkaFormat",
+    "KafkaSerde",
+    "KafkaSerializer",
+    "LocalSchemaRegistry",
+    "SchemaRegistry",
+]
+
+
+class KafkaFormat(str, Enum):
+    """Formats of Kafka keys and values"""
+
+    RAW = "raw"
+    STRING = "string"
+    JSON = "json"
+    AVRO = "avro"
+    PROTOBUF = "protobuf"
+
+
+class SchemaRegistry(BaseModel, ABC):
+    """Registry of schemas by subject
+
+    Implement `get_latest`, `get_by_id` and `register` to add another backend, and `get_ids` when the backend can
+    list all versions of a subject.
+    """
+
+    @abstractmethod
+    def get_latest(self, subject: str) -> Tuple[int, str]:
+        """The id and the schema of the latest version registered for the subject"""
+
+    @abstractmethod
+    def get_by_id(self, schema_id: int) -> str:
+        """The schema registered with the given id"""
+
+    def get_ids(self, subject: str) -> List[int]:
+        """The ids of the schemas of all versions registered for the subject, only the latest one unless overridden"""
+        return [self.get_latest(subject)[0]]
+
+    @abstractmethod
+    def register(self, subject: str, schema: str) -> int:
+        """Register the schema for the subject, returns the id of the schema
+
+        Registering a schema that is already the latest version of the subject returns the existing id.
+        """
+
+
+class LocalSchemaRegistry(SchemaRegistry):
+    """Stand-in for a schema registry that keeps the schemas in a JSON file on a local (or mounted) file system
+
+    Schema ids are unique over all subjects, like in the Confluent Schema Registry. For Protobuf, register the
+    base64 encoded descriptor set (as produced by `protoc --descriptor_set_out`) as the schema.
+
+    Parameters
+    ----------
+    path : str
+        The JSON file to keep the schemas in, created on the first `register`
+    """
+
+    path: str = Field(default=..., description="The JSON file to keep the schemas in, created on the first `register`")
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _read(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as file:
+            return json.load(file)["schemas"]
+
+    def get_latest(self, subject: str) -> Tuple[int, str]:
+        with self._lock:
+            versions = [entry for entry in self._read() if entry["subject"] == subject]
+        if not versions:
+            raise KeyError(f"No schema registered for subject '{subject}' in {self.path}")
+        return versions[-1]["id"], versions[-1]["schema"]
+
+    def get_ids(self, subject: str) -> List[int]:
+        with self._lock:
+            return [entry["id"] for entry in self._read() if entry["subject"] == subject]
+
+    def get_by_id(self, schema_id: int) -> str:
+        with self._lock:
+            for entry in self._read():
+                if entry["id"] == schema_id:
+                    return entry["schema"]
+        raise KeyError(f"No schema registered with id {schema_id} in {self.path}")
+
+    def register(self, subject: str, schema: str) -> int:
+        with self._lock:
+            schemas = self._read()
+            versions = [entry for entry in schemas if entry["subject"] == subject]
+            if versions and versions[-1]["schema"] == schema:
+                return versions[-1]["id"]
+
+            schema_id = max((entry["id"] for entry in schemas), default=0) + 1
+            schemas.append(
+                {
+                    "id": schema_id,
+                    "subject": subject,
+                    "version": len(versions) + 1,
+                    "schema": schema,
+                    "created_at": utc_now().isoformat(),
+                }
+            )
+
+            if directory := os.path.dirname(self.path):
+                os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as file:
+                json.dump({"schemas": schemas}, file)
+            os.replace(f"{self.path}.tmp", self.path)
+        return schema_id
+
+
+class KafkaSerde(BaseModel):
+    """Format and schema of a Kafka key or value
+
+    The schema is taken from `schema`, `schema_path` or `registry`, in that order.
+
+    Parameters
+    ----------
+    format : KafkaFormat, optional, default=KafkaFormat.JSON
+        Format of the data: raw (binary), string, json, avro or protobuf
+    schema : Optional[Union[str, StructType]]
+        The schema: a `StructType` or DDL string for JSON, the JSON of the Avro schema for Avro
+    schema_path : Optional[str]
+        Local file with the schema: an Avro schema (`.avsc`), a Spark schema in JSON for JSON or a descriptor set for
+        Protobuf
+    registry : Optional[SchemaRegistry]
+        Registry to look up the schema in, by `subject`
+    subject : Optional[str]
+        Subject of the schema in the registry, defaults to `<topic>-key` or `<topic>-value`
+    message_name : Optional[str]
+        Name of the Protobuf message, required for Protobuf
+    confluent_wire_format : Optional[bool]
+        Whether the data is prefixed with a magic byte and the 4 byte schema id, defaults to True when a registry is
+        used. Not supported for Protobuf.
+    options : Dict[str, str]
+        Options for the Spark (de)serialization function, e.g. `{"mode": "FAILFAST"}`
+    """
+
+    format: KafkaFormat = Field(default=KafkaFormat.JSON, description="Format of the data")
+    schema_: Optional[Union[str, StructType]] = Field(
+        default=None, alias="schema", description="The schema: StructType or DDL for JSON, Avro schema JSON for Avro"
+    )
+    schema_path: Optional[str] = Field(default=None, description="Local file with the schema")
+    registry: Optional[InstanceOf[SchemaRegistry]] = Field(
+        default=None, description="Registry to look up the schema in"
+    )
+    subject: Optional[str] = Field(
+        default=None, description="Subject of the schema in the registry, defaults to `<topic>-key` or `<topic>-value`"
+    )
+    message_name: Optional[str] = Field(default=None, description="Name of the Protobuf message")
+    confluent_wire_format: Optional[bool] = Field(
+        default=None, description="Whether the data is prefixed with a magic byte and the schema id"
+    )
+    options: Dict[str, str] = Field(
+        default_factory=dict, description="Options for the Spark (de)serialization function"
+    )
+
+    @model_validator(mode="after")
+    def _validate_format(self) -> "KafkaSerde":
+        """Check that the format has what it needs"""
+        has_schema = any(source is not None for source in (self.schema_, self.schema_path, self.registry))
+        if self.format in (KafkaFormat.AVRO, KafkaFormat.PROTOBUF) and not has_schema:
+            raise ValueError(f"A `schema`, `schema_path` or `registry` is required for {self.format}")
+        if self.format == KafkaFormat.PROTOBUF:
+            if not self.message_name:
+                raise ValueError("`message_name` is required for protobuf")
+            if self.confluent_wire_format:
+                raise ValueError("The Confluent wire format is not supported for protobuf")
+        if self.confluent_wire_format is None:
+            self.confluent_wire_format = self.registry is not None and self.format != KafkaFormat.PROTOBUF
+        return self
+
+    def resolve_schema(self, subject: str) -> Tuple[Optional[int], Optional[Union[str, StructType]]]:
+        """The schema id (for registry schemas) and the schema, using `subject` when no subject is set"""
+        if self.schema_ is not None:
+            return None, self.schema_
+        if self.schema_path is not None:
+            mode = "rb" if self.format == KafkaFormat.PROTOBUF else "r"
+            with open(self.schema_path, mode) as file:
+                content = file.read()
+            if self.format == KafkaFormat.PROTOBUF:
+                return None, base64.b64encode(content).decode("ascii")
+            if self.format == KafkaFormat.JSON:
+                return None, StructType.fromJson(json.loads(content))
+            return None, content
+        if self.registry is not None:
+            return self.registry.get_latest(self.subject or subject)
+        return None, None
+
+
+class KafkaDeserializer(KafkaSerde):
+    """Deserializes a Kafka key or value with a native Spark expression
+
+    For JSON without a schema, the schema is inferred from a sample of the topic. Use `schema_cache` to infer it only
+    once and reuse it across runs.
+
+    Avro data in the Confluent wire format is decoded with the writer schema of the schema id in every message, looked
+    up in the registry with `get_by_id`, and read as the latest schema of the subject (or `schema`), like a Kafka
+    consumer does. The schema ids of all versions of the subject (see `SchemaRegistry.get_ids`) and the ids in
+    `schema_ids` are accepted. Messages with another schema id fail the read, or are read as null with the
+    `PERMISSIVE` mode. For the other formats, the schema id is not needed to decode the data and is ignored.
+
+    Parameters
+    ----------
+    schema_cache : Optional[SchemaCache]
+        Cache for the inferred JSON schema, see `koheesio.spark.readers.schema_cache`
+    sample_size : int, optional, default=1000
+        Number of messages to infer the JSON schema from
+    schema_ids : List[int]
+        Ids of other schemas that reads of Avro in the Confluent wire format accept next to the versions of the subject
+    """
+
+    schema_cache: Optional[InstanceOf[SchemaCache]] = Field(
+        default=None, description="Cache for the inferred JSON schema"
+    )
+    sample_size: int = Field(default=1000, gt=0, description="Number of messages to infer the JSON schema from")
+    schema_ids: List[int] = Field(
+        default_factory=list,
+        description="Ids of other schemas that reads of Avro in the Confluent wire format accept next to the versions "
+        "of the subject",
+    )
+
+    @property
+    def decodes_by_schema_id(self) -> bool:
+        """Whether every message is decoded with the (writer) schema of its schema id"""
+        return self.format == KafkaFormat.AVRO and bool(self.confluent_wire_format) and self.registry is not None
+
+    @staticmethod
+    def schema_id(column: Column) -> Column:
+        """The schema id in the Confluent wire format header of the column"""
+        return f.conv(f.hex(f.substring(column, 2, 4)), 16, 10).cast("int")
+
+    def payload(self, column: Column) -> Column:
+        """The column without the Confluent wire format header, if any"""
+        if self.confluent_wire_format:
+            return f.substring(column, 6, 2**31 - 1)
+        return column
+
+    def column(
+        self,
+        column: Column,
+        schema: Optional[Union[str, StructType]],
+        writer_schemas: Optional[Dict[int, str]] = None,
+    ) -> Column:
+        """The expression that deserializes the column with the given (resolved) schema
+
+        With `writer_schemas`, Avro is decoded with the writer schema of the schema id of every message, see
+        `decodes_by_schema_id`.
+        """
+        payload = self.payload(column)
+
+        if self.format == KafkaFormat.RAW:
+            return column
+        if self.format == KafkaFormat.STRING:
+            return payload.cast("string")
+        if self.format == KafkaFormat.JSON:
+            if schema is None:
+                raise ValueError("A schema is required to deserialize JSON")
+            return f.from_json(payload.cast("string"), schema, self.options)
+        if self.format == KafkaFormat.AVRO:
+            from pyspark.sql.avro.functions import from_avro
+
+            if not writer_schemas:
+                return from_avro(payload, schema, self.options)
+            return self._by_schema_id(
+                column,
+                {
+                    schema_id: from_avro(payload, writer_schema, {**self.options, "avroSchema": schema})  # type: ignore[dict-item]
+                    for schema_id, writer_schema in writer_schemas.items()
+                },
+            )
+
+        from pyspark.sql.protobuf.functions import from_protobuf
+
+        return from_protobuf(
+            payload,
+            self.message_name,
+            options=self.options,
+            binaryDescriptorSet=base64.b64decode(schema),  # type: ignore[arg-type]
+        )
+
+    def _by_schema_id(self, column: Column, decoded: Dict[int, Column]) -> Column:
+        """Pick the decoded column for the schema id of every message, other schema ids are rejected"""
+        schema_id = self.schema_id(column)
+        if str(self.options.get("mode", "")).upper() == "PERMISSIVE":
+            unknown = f.lit(None)
+        else:
+            unknown = f.raise_error(
+                f.concat(f.lit("Unable to deserialize a message with unknown schema id "), schema_id.cast("string"))
+            )
+
+        result = f.when(column.isNull(), f.lit(None))
+        for expected_id, value in decoded.items():
+            result = result.when(schema_id == f.lit(expected_id), value)
+        return result.otherwise(unknown)
+
+
+class KafkaSerializer(KafkaSerde):
+    """Serializes columns into a Kafka key or value with a native Spark expression
+
+    Raw and string serialize a single column, the other formats serialize a struct of the columns. When a `schema` is
+    given together with a `registry`, the schema is registered under the subject and its id is used for the
+    Confluent wire format.
+
+    Parameters
+    ----------
+    columns : Optional[List[str]]
+        Columns to serialize, all columns of the DataFrame if not set
+    """
+
+    columns: Optional[List[str]] = Field(default=None, description="Columns to serialize, all columns if not set")
+
+    def _resolve_schema(self, subject: str) -> Tuple[Optional[int], Optional[Union[str, StructType]]]:
+        """The schema id and schema to serialize with, registering the given schema when a registry is used"""
+        subject = self.subject or subject
+        if self.registry is not None and isinstance(self.schema_, str):
+            return self.registry.register(subject, self.schema_), self.schema_
+        return self.resolve_schema(subject)
+
+    def column(self, columns: List[str], subject: str) -> Column:
+        """The expression that serializes the given columns, `subject` is used when no subject is set"""
+        schema_id, schema = self._resolve_schema(subject)
+
+        if self.format in (KafkaFormat.RAW, KafkaFormat.STRING):
+            if len(columns) != 1:
+                raise ValueError(f"Exactly one column can be serialized as {self.format}, got {columns}")
+            data = f.col(columns[0]) if self.format == KafkaFormat.RAW else f.col(columns[0]).cast("string")
+        elif self.format == KafkaFormat.JSON:
+            data = f.to_json(f.struct(*columns), self.options)
+        elif self.format == KafkaFormat.AVRO:
+            from pyspark.sql.avro.functions import to_avro
+
+            data = to_avro(f.struct(*columns), schema or "")  # type: ignore[arg-type]
+        else:
+            from pyspark.sql.protobuf.functions import to_protobuf
+
+            data = to_protobuf(
+                f.struct(*columns),
+                self.message_name,
+                options=self.options,
+                binaryDescriptorSet=base64.b64decode(schema),  # type: ignore[arg-type]
+            )
+
+        if self.confluent_wire_format:
+            if schema_id is None:
+                raise ValueError("A `registry` is required to write the Confluent wire format")
+            data = f.concat(f.lit(b"\x00" + schema_id.to_bytes(4, "big")), data.cast("binary"))
+        return data
@@ -6,25 +6,33 @@ DeltaTableReader
     Reads data from a Delta table and returns a DataFrame
 DeltaTableStreamReader
     Reads data from a Delta table and returns a DataStream
+DeltaTableChangeFeedReader
+    Reads the change data feed of a Delta table in batch, in bounded version ranges from the last consumed version
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+import json
+import re
 
 from pydantic import PrivateAttr
 
 from pyspark.sql import DataFrameReader
 from pyspark.sql import functions as f
+from pyspark.sql.types import LongType, StringType, StructField, StructType, TimestampType
 
 from koheesio.logger import LoggingFactory
-from koheesio.models import Field, ListOfColumns, field_validator, model_validator
-from koheesio.spark import Column, DataStreamReader
+from koheesio.models import Field, InstanceOf, ListOfColumns, field_validator, model_validator
+from koheesio.spark import Column, DataFrame, DataStreamReader
 from koheesio.spark.delta import DeltaTableStep
+from koheesio.spark.delta_log import DeltaLogReader
 from koheesio.spark.readers import Reader
+from koheesio.spark.readers.delta_scan import DeltaScanPlan, DeltaScanPlanner
+from koheesio.spark.readers.incremental import IncrementalReaderMixin, WatermarkStore
 from koheesio.utils import get_random_string
 
-__all__ = ["DeltaTableReader", "DeltaTableStreamReader"]
+__all__ = ["DeltaTableChangeFeedReader", "DeltaTableReader", "DeltaTableStreamReader"]
 STREAMING_SCHEMA_WARNING = (
     "\nImportant!\n"
     "Although you can start the streaming source from a specified version or timestamp, the schema of the streaming "
@@ -39,10 +47,12 @@ STREAMING_ONLY_OPTIONS = [
     "starting_version",
     "starting_timestamp",
     "schema_tracking_location",
+    "max_files_per_trigger",
+    "max_bytes_per_trigger",
 ]
 
 
-class DeltaTableReader(Reader):
+class DeltaTableReader(Reader, IncrementalReaderMixin):
     """Reads data from a Delta table and returns a DataFrame
     Delta Table can be read in batch or streaming mode
     It also supports reading change data feed (CDF) in both batch mode and streaming mode
@@ -72,6 +82,9 @@ class DeltaTableReader(Reader):
         startingTimestamp: The timestamp to start from. All table changes committed at or after the timestamp
         (inclusive) will be read by the streaming source. Either provide a timestamp string
         (e.g. 2019-01-01T00:00:00.000Z) or a date string (e.g. 2019-01-01)
+    ending_version : str
+        endingVersion: The last Delta Lake version (inclusive) to read the change data feed up to. Note: Only
+        supported for batch reads of the change data feed.
     ignore_deletes : bool
         ignoreDeletes: Ignore transactions that delete data at partition boundaries. Note: Only supported for
         streaming tables.
@@ -82,6 +95,16 @@ class DeltaTableReader(Reader):
         emitted, therefore your downstream consumers should be able to handle duplicates. Deletes are not propagated
         downstream. ignoreChanges subsumes ignoreDeletes. Therefore, if you use ignoreChanges, your stream will not be
         disrupted by either deletions or updates to the source table.
+    incremental_column : Optional[str]
+        Column to read incrementally on in batch mode, see [koheesio.spark.readers.incremental](incremental.md)
+    watermark_store : Optional[WatermarkStore]
+        Store that persists the watermark, required when `incremental_column` is set
+    optimize_filter : bool, optional, default=True
+        Rewrite conjuncts of a string `filter_cond` that wrap partition columns (e.g. `to_date(p) = '2024-01-01'`)
+        into prunable predicates, and warn when a batch read will be a full scan. See
+        [koheesio.spark.readers.delta_scan](delta_scan.md)
+    count_pruned_files : bool, optional, default=False
+        Estimate the number of files that are pruned from the Delta log, reported in `output.scan_plan`
 
     """
 
@@ -126,6 +149,12 @@ class DeltaTableReader(Reader):
         "Either provide a timestamp string (e.g. 2019-01-01T00:00:00.000Z) or a date string (e.g. 2019-01-01)"
         + STREAMING_SCHEMA_WARNING,
     )
+    ending_version: Optional[str] = Field(
+        default=None,
+        alias="endingVersion",
+        description="endingVersion: The last Delta Lake version (inclusive) to read the change data feed up to. "
+        "Note: Only supported for batch reads of the change data feed.",
+    )
 
     # Streaming only options
     # ---
@@ -163,6 +192,38 @@ class DeltaTableReader(Reader):
         "For more info see https://docs.delta.io/latest/delta-column-mapping.html" + STREAMING_SCHEMA_WARNING,
     )
 
+    # Rate limits, see https://docs.delta.io/latest/delta-streaming.html#limit-input-rate
+    max_files_per_trigger: Optional[int] = Field(
+        default=None,
+        alias="maxFilesPerTrigger",
+        gt=0,
+        description="maxFilesPerTrigger: The maximum number of new files to be considered in every micro-batch. "
+        "Note: Only supported for streaming tables.",
+    )
+    max_bytes_per_trigger: Optional[str] = Field(
+        default=None,
+        alias="maxBytesPerTrigger",
+        description="maxBytesPerTrigger: How much data gets processed in each micro-batch, e.g. '10g'. This is a "
+        "soft max, a batch processes at least one file. Note: Only supported for streaming tables.",
+    )
+
+    optimize_filter: bool = Field(
+        default=True,
+        description="Rewrite conjuncts of a string `filter_cond` that wrap partition columns into prunable predicates, "
+        "and warn when a batch read will be a full scan",
+    )
+    count_pruned_files: bool = Field(
+        default=False,
+        description="Estimate the number of files that are pruned from the Delta log, reported in `output.scan_plan`",
+    )
+
+    class Output(Reader.Output):
+        """Output of the DeltaTableReader"""
+
+        scan_plan: Optional[DeltaScanPlan] = Field(
+            default=None, description="The planned scan: rewritten filter, partition and data skipping filters"
+        )
+
     # private attrs
     __temp_view_name__: Optional[str] = None
     __reader: Optional[Union[DataStreamReader, DataFrameReader]] = PrivateAttr(default=None)
@@ -203,6 +264,13 @@ class DeltaTableReader(Reader):
 
         return self
 
+    @model_validator(mode="after")
+    def _validate_incremental_column(self) -> "DeltaTableReader":
+        """Incremental reads based on a watermark are only supported in batch mode"""
+        if self.streaming and self.incremental_column:
+            raise ValueError("'incremental_column' is not supported for streaming reads, use a checkpoint instead")
+        return self
+
     @model_validator(mode="after")
     def _validate_ignore_deletes_and_changes_and_skip_commits(self) -> "DeltaTableReader":
         """Validate 'ignore_deletes' and 'ignore_changes' - Only one of each should be provided"""
@@ -221,7 +289,14 @@ class DeltaTableReader(Reader):
     @model_validator(mode="before")
     def _warn_on_streaming_options_without_streaming(cls, options: Dict) -> Dict:
         """throws a warning if streaming options were provided, but streaming was not set to true"""
-        streaming_options = [val for opt, val in options.items() if opt in STREAMING_ONLY_OPTIONS]
+        batch_cdf_options = (
+            ["starting_version", "starting_timestamp"]
+            if options.get("read_change_feed", options.get("readChangeFeed"))
+            else []
+        )
+        streaming_options = [
+            val for opt, val in options.items() if opt in STREAMING_ONLY_OPTIONS and opt not in batch_cdf_options
+        ]
         streaming_toggled_on = options.get("streaming")
 
         if any(streaming_options) and not streaming_toggled_on:
@@ -240,6 +315,11 @@ class DeltaTableReader(Reader):
         self.__temp_view_name__ = vw_name
         return self
 
+    @property
+    def watermark_source(self) -> str:
+        """The table name, used in the default watermark key"""
+        return self.table.table_name
+
     @property
     def view(self) -> str:
         """Create a temporary view of the dataframe for SQL queries"""
@@ -274,10 +354,16 @@ class DeltaTableReader(Reader):
                 "ignoreChanges": self.ignore_changes,
                 "skipChangeCommits": self.skip_change_commits,
                 "schemaTrackingLocation": self.schema_tracking_location,
+                # Rate limits
+                "maxFilesPerTrigger": self.max_files_per_trigger,
+                "maxBytesPerTrigger": self.max_bytes_per_trigger,
             }
         # Batch only options
         else:
-            pass  # there are none... for now :)
+            options = {
+                **options,
+                "endingVersion": self.ending_version,
+            }
 
         def normalize(v: Union[str, bool]) -> str:
             """normalize values"""
@@ -309,10 +395,89 @@ class DeltaTableReader(Reader):
     def reader(self, value: Union[DataStreamReader, DataFrameReader]):
         self.__reader = value
 
+    def _delta_log(self) -> Optional[Tuple[DeltaLogReader, Dict[str, Any], Dict[str, Any]]]:
+        """The reader of the transaction log of the table and its `metaData` and `protocol` actions, also for catalog
+        tables when their location is readable
+
+        Only the metadata is read, the data files of the table are not loaded until they are needed to count the
+        pruned files.
+        """
+        try:
+            if (location := self.table.path) is None:
+                # noinspection SqlNoDataSourceInspection
+                location = self.spark.sql(f"DESCRIBE DETAIL {self.table.table_name}").select("location").first()[0]
+            delta_log = DeltaLogReader.for_path(re.sub(r"^file:(?!//)", "", location))
+            metadata, protocol = delta_log.read_metadata()
+            return (delta_log, metadata, protocol) if metadata.get("schemaString") else None
+        except Exception as e:  # pylint: disable=broad-except
+            self.log.debug(f"Unable to read the Delta log of {self.table.table_name}: {e}")
+            return None
+
+    def _scan_planner(self, df: DataFrame) -> Tuple[DeltaScanPlanner, Optional[DeltaLogReader]]:
+        """The scan planner for the table, based on the Delta log when it is readable"""
+        if (log := self._delta_log()) is not None:
+            delta_log, metadata, protocol = log
+            planner = DeltaScanPlanner(
+                schema=StructType.fromJson(json.loads(metadata["schemaString"])),
+                partition_columns=list(metadata.get("partitionColumns") or []),
+                properties=DeltaLogReader.table_properties(metadata, protocol),
+            )
+            return planner, delta_log
+        planner = DeltaScanPlanner(
+            schema=df.schema,
+            partition_columns=self.table.partition_columns,
+            properties=self.table.get_persisted_properties(),
+        )
+        return planner, None
+
+    def plan_scan(self, df: DataFrame) -> DeltaScanPlan:
+        """Plan the scan: rewrite the filter condition, find the partition and data skipping filters and count files"""
+        planner, delta_log = self._scan_planner(df)
+        if isinstance(self.filter_cond, str) or self.filter_cond is None:
+            plan = planner.plan(self.filter_cond)
+        else:
+            plan = DeltaScanPlan(full_scan=None)
+
+        for conjunct, rewritten in plan.rewrites.items():
+            self.log.info(f"Rewrote filter `{conjunct}` into `{rewritten}` to prune partitions")
+
+        batch_read = not self.streaming and not self.read_change_feed
+        if batch_read and self.filter_cond is not None and plan.full_scan:
+            self.log.warning(
+                f"The filter on {self.table.table_name} does not use the partition columns {planner.partition_columns} "
+                f"or columns with statistics, this read will be a full scan: {self.filter_cond}"
+            )
+
+        if batch_read and self.count_pruned_files:
+            if delta_log is not None:
+                plan = planner.count_files(self.spark, delta_log.files, plan)
+                self.log.info(f"Reading {plan.files_to_read} of {plan.total_files} files of {self.table.table_name}")
+            else:
+                self.log.warning(
+                    f"Unable to count the pruned files, the Delta log of {self.table.table_name} is not readable"
+                )
+        return plan
+
     def execute(self) -> Reader.Output:
         df = self.reader.table(self.table.table_name)
-        if self.filter_cond is not None:
-            df = df.filter(f.expr(self.filter_cond) if isinstance(self.filter_cond, str) else self.filter_cond)  # type: ignore
+        filter_cond = self.filter_cond
+        filtered = None
+        if self.optimize_filter and (isinstance(filter_cond, str) or self.count_pruned_files):
+            try:
+                self.output.scan_plan = self.plan_scan(df)
+                if (rewritten := self.output.scan_plan.filter_cond) is not None:
+                    # the rewritten condition is parsed here, so that the original one is used if it is not valid
+                    filtered = df.filter(f.expr(rewritten))
+            except Exception as e:  # pylint: disable=broad-except
+                self.log.warning(
+                    f"Unable to plan the scan of {self.table.table_name}, the filter is applied as is: {e}"
+                )
+        if filtered is not None:
+            df = filtered
+        elif filter_cond is not None:
+            df = df.filter(f.expr(filter_cond) if isinstance(filter_cond, str) else filter_cond)  # type: ignore
+        if not self.streaming:
+            df = self._apply_watermark(df)
         if self.columns is not None:
             df = df.select(*self.columns)
         self.output.df = df
@@ -332,4 +497,214 @@ class DeltaTableStreamReader(DeltaTableReader):
     #     """TODO: implement create_datastream_from_sql_file"""
 
 
+CDF_METADATA_FIELDS = [
+    StructField("_change_type", StringType()),
+    StructField("_commit_version", LongType()),
+    StructField("_commit_timestamp", TimestampType()),
+]
+
+
+class DeltaTableChangeFeedReader(Reader):
+    """Reads the change data feed (CDF) of a Delta table in batch, from the last consumed version onwards
+
+    Every read covers the versions after the version stored in the `version_store`, up to the latest version of the
+    table, or at most `max_versions_per_batch` versions so that a large backlog is processed in bounded batches. When
+    no version is stored yet, the first read starts at `starting_version`, which defaults to the version at which the
+    change data feed was enabled on the table. The
+    last version that was read is stored by `commit_version()`, which `EtlTask` calls once the target was written
+    successfully. While `output.has_more` is True, more versions are waiting to be read.
+
+    With `key_columns`, the changes are compacted to the latest change per key: update pre-images are dropped and only
+    the change with the highest `_commit_version` is kept for every key.
+
+    Example
+    -------
+    ```python
+    from koheesio.spark.readers.delta import DeltaTableChangeFeedReader
+    from koheesio.spark.readers.incremental import (
+        DeltaTableWatermarkStore,
+    )
+
+    reader = DeltaTableChangeFeedReader(
+        table="my_table",
+        version_store=DeltaTableWatermarkStore(
+            table="catalog.schema.watermarks"
+        ),
+        max_versions_per_batch=100,
+        key_columns=["id"],
+    )
+    df = reader.read()  # changes of (at most) the next 100 versions
+    ...  # write the changes
+    reader.commit_version()
+    ```
+
+    Parameters
+    ----------
+    table : Union[DeltaTableStep, str]
+        The table to read the change data feed of, CDF has to be enabled on the table
+    version_store : WatermarkStore
+        Store that persists the last consumed version, see [koheesio.spark.readers.incremental](incremental.md)
+    version_key : Optional[str]
+        Key of the version in the store, defaults to `<table name>._commit_version`
+    starting_version : Optional[int]
+        Version to start from when no version is stored yet, defaults to the version at which CDF was enabled
+    max_versions_per_batch : Optional[int]
+        Maximum number of versions to read at once, all available versions if not set
+    key_columns : Optional[ListOfColumns]
+        Compact the changes to the latest change per key when set
+    filter_cond : Optional[Union[Column, str]]
+        Filter condition to apply to the changes
+    columns : Optional[ListOfColumns]
+        Columns to select, the CDF metadata columns are always kept
+    """
+
+    table: Union[DeltaTableStep, str] = Field(default=..., description="The table to read the change data feed of")
+    version_store: InstanceOf[WatermarkStore] = Field(
+        default=..., description="Store that persists the last consumed version"
+    )
+    version_key: Optional[str] = Field(
+        default=None, description="Key of the version in the store, defaults to `<table name>._commit_version`"
+    )
+    starting_version: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Version to start from when no version is stored yet, defaults to the version at which CDF was "
+        "enabled on the table",
+    )
+    max_versions_per_batch: Optional[int] = Field(
+        default=None, gt=0, description="Maximum number of versions to read at once, all available if not set"
+    )
+    key_columns: Optional[ListOfColumns] = Field(
+        default=None, description="Compact the changes to the latest change per key when set"
+    )
+    filter_cond: Optional[Union[Column, str]] = Field(
+        default=None, description="Filter condition to apply to the changes"
+    )
+    columns: Optional[ListOfColumns] = Field(
+        default=None, description="Columns to select, the CDF metadata columns are always kept"
+    )
+
+    class Output(Reader.Output):
+        """Output of the DeltaTableChangeFeedReader"""
+
+        starting_version: Optional[int] = Field(default=None, description="First version that was read")
+        ending_version: Optional[int] = Field(default=None, description="Last version that was read")
+        latest_version: Optional[int] = Field(default=None, description="Latest version of the table")
+        has_more: bool = Field(default=False, description="Whether versions after `ending_version` are available")
+
+    @field_validator("table")
+    def _validate_table_name(cls, tbl: Union[DeltaTableStep, str]) -> DeltaTableStep:
+        """Validate the table name provided as a string or a DeltaTableStep instance."""
+        return DeltaTableStep(table=tbl) if isinstance(tbl, str) else tbl
+
+    @property
+    def _version_key(self) -> str:
+        return self.version_key or f"{self.table.table_name}._commit_version"  # type: ignore[union-attr]
+
+    @property
+    def last_version(self) -> Optional[int]:
+        """The last consumed version"""
+        return self.version_store.get(self._version_key)
+
+    @property
+    def latest_version(self) -> int:
+        """The latest version of the table"""
+        history = self.table.describe_history(limit=1)  # type: ignore[union-attr]
+        if history is None or (row := history.select("version").first()) is None:
+            raise RuntimeError(f"Table {self.table.table_name} does not exist")  # type: ignore[union-attr]
+        return int(row[0])
+
+    @property
+    def cdf_enabled_version(self) -> int:
+        """The version at which the change data feed was (last) enabled on the table
+
+        Falls back to the oldest version in the history of the table, e.g. when the history was cleaned up.
+        """
+        history = self.table.describe_history()  # type: ignore[union-attr]
+        if history is None:
+            raise RuntimeError(f"Table {self.table.table_name} does not exist")  # type: ignore[union-attr]
+        enabled = f.lower(f.col("operationParameters").getItem("properties")).rlike(
+            r'"delta\.enablechangedatafeed"\s*:\s*"?true'
+        )
+        row = history.agg(f.max(f.when(enabled, f.col("version"))), f.min("version")).first()
+        return int(row[0] if row[0] is not None else row[1])  # type: ignore[index]
+
+    def next_range(self) -> Optional[Tuple[int, int]]:
+        """The range of versions (inclusive) to read next, None if there are no new versions"""
+        last_version = self.last_version
+        if last_version is not None:
+            start = last_version + 1
+        elif self.starting_version is not None:
+            start = self.starting_version
+        else:
+            start = self.cdf_enabled_version
+        latest = self.output.latest_version = self.latest_version
+        if start > latest:
+            return None
+        end = latest if self.max_versions_per_batch is None else min(latest, start + self.max_versions_per_batch - 1)
+        return start, end
+
+    @staticmethod
+    def latest_changes(df: DataFrame, key_columns: List[str], columns: Optional[List[str]] = None) -> DataFrame:
+        """Compact the changes to the latest change per key
+
+        Update pre-images are dropped and a single aggregation (`max_by` on `_commit_version`) picks the latest change
+        for every key, which avoids a sort-based window and a distinct over the whole batch. `columns` are the columns
+        to keep next to the keys, all other columns by default.
+        """
+        columns = columns or [c for c in df.columns if c not in key_columns]
+        other_columns = ", ".join(f"`{c}`" for c in columns)
+        return (
+            df.filter("_change_type != 'update_preimage'")
+            .groupBy(*key_columns)
+            .agg(f.expr(f"max_by(struct({other_columns}), _commit_version)").alias("__latest"))
+            .select(*key_columns, "__latest.*")
+        )
+
+    def _empty(self) -> DataFrame:
+        """An empty DataFrame with the schema of the change data feed"""
+        schema = StructType([*self.table.dataframe.schema.fields, *CDF_METADATA_FIELDS])  # type: ignore[union-attr]
+        df = self.spark.createDataFrame([], schema)
+        return df.select(*self.columns, *[field.name for field in CDF_METADATA_FIELDS]) if self.columns else df
+
+    def execute(self) -> Output:
+        self.output.starting_version = self.output.ending_version = None
+        self.output.has_more = False
+
+        if (version_range := self.next_range()) is None:
+            self.log.info(f"No new versions of {self.table.table_name} after version {self.last_version}")  # type: ignore[union-attr]
+            self.output.df = self._empty()
+            return
+
+        start, end = version_range
+        self.log.info(f"Reading the change data feed of {self.table.table_name} from version {start} to {end}")  # type: ignore[union-attr]
+        columns = [*self.columns, *[field.name for field in CDF_METADATA_FIELDS]] if self.columns else None
+        df = DeltaTableReader(
+            table=self.table,
+            read_change_feed=True,
+            starting_version=str(start),
+            ending_version=str(end),
+            filter_cond=self.filter_cond,
+            columns=columns,
+        ).read()
+        if self.key_columns:
+            df = self.latest_changes(df, self.key_columns)  # type: ignore[arg-type]
+
+        self.output.df = df
+        self.output.starting_version, self.output.ending_version = start, end
+        self.output.has_more = end < self.output.latest_version  # type: ignore[operator]
+
+    def commit_version(self) -> Optional[int]:
+        """Store the last version that was read, call this once the changes have been processed successfully
+
+        Returns the committed version, None if no versions were read.
+        """
+        if (version := self.output.ending_version) is None:
+            return None
+        self.version_store.set(self._version_key, version)
+        self.log.info(f"Committed version {self._version_key} = {version}")
+        self.output.ending_version = None
+        return version
+
+
 # TODO: add support to extra read options for DeltaTableReader
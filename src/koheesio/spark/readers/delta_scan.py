@@ -0,0 +1,426 @@
+"""
+Scan planning for `DeltaTableReader`.
+
+Delta tables skip data in two ways: partition pruning for filters on partition columns, and data skipping based on the
+min/max statistics that are collected for the first `delta.dataSkippingNumIndexedCols` (32 by default) columns, or the
+columns listed in `delta.dataSkippingStatsColumns`. Both only work when the filter compares the column itself; a filter
+like `to_date(event_date) = '2024-01-01'` or `year(event_date) = 2024` wraps the partition column and disables pruning.
+
+The `DeltaScanPlanner` splits a (string) filter condition into its conjuncts and rewrites the following forms into
+equivalent, prunable predicates (a condition with an `OR` at its top level is a single conjunct, and only simple
+comparisons are rewritten, so anything else is kept as is):
+
+- `to_date(p)`, `date(p)` or `CAST(p AS DATE)` compared to a date, for a date partition column `p` (the function is
+  dropped) or a timestamp partition column `p` (rewritten into a range on `p`)
+- `year(p)` compared to an integer, for a date or timestamp partition column `p` (rewritten into a range on `p`)
+- `CAST(p AS STRING)` compared to a string, for a date or integer partition column `p`, when the string is the
+  canonical representation of a value of `p`
+- an expression that is the generation expression of a generated partition column, e.g. `to_date(ts) = '2024-01-01'`
+  for a partition column `event_date` generated as `CAST(ts AS DATE)`
+
+The plan lists the conjuncts that prune partitions and the ones that can use data skipping. When neither is present,
+the read is a full scan. The number of files to read is estimated from the Delta log by evaluating the partition
+filters on the partition values, and simple comparisons on the min/max statistics of the data files.
+
+Example
+-------
+```python
+from koheesio.spark.readers.delta import DeltaTableReader
+
+reader = DeltaTableReader(
+    table="events",
+    filter_cond="to_date(event_date) = '2024-01-01' AND country = 'NL'",
+    count_pruned_files=True,
+)
+df = reader.read()
+reader.output.scan_plan.filter_cond  # "(event_date = CAST('2024-01-01' AS DATE)) AND (country = 'NL')"
+reader.output.scan_plan.pruned_files  # e.g. 1234
+```
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import re
+
+from pyspark.sql import functions as f
+from pyspark.sql.types import (
+    ByteType,
+    DataType,
+    DateType,
+    IntegerType,
+    LongType,
+    ShortType,
+    StringType,
+    StructField,
+    StructType,
+    TimestampType,
+)
+
+from koheesio.models import BaseModel, Field
+from koheesio.spark import SparkSession
+
+__all__ = ["DeltaScanPlan", "DeltaScanPlanner", "split_conjuncts"]
+
+DEFAULT_NUM_INDEXED_COLS = 32
+GENERATION_EXPRESSION_KEY = "delta.generationExpression"
+
+_INTEGER_TYPES = (ByteType, ShortType, IntegerType, LongType)
+_IDENTIFIER = r"`?([A-Za-z_][A-Za-z0-9_]*)`?"
+_COMPARISON = re.compile(r"^(?P<lhs>.+?)\s*(?P<op><=|>=|<>|!=|==|=|<|>)\s*(?P<rhs>.+)$", re.S)
+_LITERAL = re.compile(
+    r"^(?:(?:DATE|TIMESTAMP)\s*)?'[^']*'$|^(?:DATE|TIMESTAMP)\s*\"[^\"]*\"$|^\"[^\"]*\"$|^-?\d+(?:\.\d+)?[LDF]?$",
+    re.I,
+)
+_TO_DATE = re.compile(rf"^(?:to_date|date)\(\s*{_IDENTIFIER}\s*\)$|^cast\(\s*{_IDENTIFIER}\s+as\s+date\s*\)$", re.I)
+_YEAR = re.compile(rf"^year\(\s*{_IDENTIFIER}\s*\)$", re.I)
+_TO_STRING = re.compile(rf"^cast\(\s*{_IDENTIFIER}\s+as\s+string\s*\)$|^string\(\s*{_IDENTIFIER}\s*\)$", re.I)
+_BOOLEAN_KEYWORDS = re.compile(r"\b(?:and|or|not|between|in|like|rlike|ilike|is|case|exists)\b", re.I)
+_FLIPPED = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "=": "=", "==": "="}
+
+
+def _mask_literals(expression: str) -> str:
+    """Replace the contents of quoted literals by spaces, so keywords and parentheses inside literals are ignored"""
+    return re.sub(
+        r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"", lambda m: "'" + " " * (len(m.group()) - 2) + "'", expression
+    )
+
+
+def _strip_comments(expression: str) -> str:
+    """Replace SQL comments (outside of quoted literals) by a space"""
+    masked = _mask_literals(expression)
+    for match in reversed(list(re.finditer(r"--[^\n]*|/\*.*?\*/", masked, re.S))):
+        expression = expression[: match.start()] + " " + expression[match.end() :]
+    return expression
+
+
+def _strip_parentheses(expression: str) -> str:
+    """Remove parentheses that enclose the whole expression"""
+    expression = expression.strip()
+    while expression.startswith("(") and expression.endswith(")"):
+        depth = 0
+        masked = _mask_literals(expression)
+        for i, char in enumerate(masked):
+            depth += char == "("
+            depth -= char == ")"
+            if depth == 0 and i < len(expression) - 1:
+                return expression
+        expression = expression[1:-1].strip()
+    return expression
+
+
+def split_conjuncts(condition: str) -> List[str]:
+    """Split a SQL condition on its `AND`s, also in nested parentheses, the `AND` of a `BETWEEN` is kept
+
+    `AND` binds stronger than `OR`, so a condition (or a parenthesized part of it) with an `OR` at its top level is
+    not split: `a AND b OR c` is `(a AND b) OR c`. The `AND`s within a `CASE ... END` expression are not split either,
+    and comments are removed.
+    """
+    condition = _strip_parentheses(_strip_comments(condition))
+    masked = _mask_literals(condition)
+    conjuncts, start, depth, open_between = [], 0, 0, False
+
+    for match in re.finditer(r"\(|\)|\bcase\b|\bend\b|\bbetween\b|\band\b|\bor\b", masked, re.I):
+        token = match.group().lower()
+        if token in ("(", "case"):
+            depth += 1
+        elif token in (")", "end"):
+            depth -= 1
+        elif depth == 0 and token == "or":
+            return [condition.strip()] if condition.strip() else []
+        elif depth == 0 and token == "between":
+            open_between = True
+        elif depth == 0 and token == "and":
+            if open_between:
+                open_between = False
+                continue
+            conjuncts.append(condition[start : match.start()])
+            start = match.end()
+    conjuncts.append(condition[start:])
+
+    # conjuncts in parentheses may be conjunctions themselves
+    return [
+        nested
+        for conjunct in conjuncts
+        if conjunct.strip()
+        for nested in (
+            split_conjuncts(conjunct) if _strip_parentheses(conjunct) != conjunct.strip() else [conjunct.strip()]
+        )
+    ]
+
+
+def _normalize(expression: str) -> str:
+    """Normalize an expression to compare it to a generation expression"""
+    normalized = re.sub(r"[\s`]", "", expression.lower())
+    return re.sub(r"\b(?:to_date|date)\(([a-z_][a-z0-9_]*)\)", r"cast(\1asdate)", normalized)
+
+
+def _date_literal(literal: str) -> str:
+    return literal if literal.upper().startswith("DATE") else f"CAST({literal} AS DATE)"
+
+
+class DeltaScanPlan(BaseModel):
+    """The result of planning a scan of a Delta table
+
+    Parameters
+    ----------
+    filter_cond : Optional[str]
+        The (rewritten) filter condition
+    rewrites : Dict[str, str]
+        The conjuncts that were rewritten, mapped to their rewritten form
+    partition_filters : List[str]
+        Conjuncts that only reference partition columns and prune partitions
+    data_skipping_filters : List[str]
+        Conjuncts that compare a column with statistics to a literal, used for data skipping
+    full_scan : Optional[bool]
+        Whether all files of the table are read, unknown (None) for filter conditions given as a Column
+    total_files : Optional[int]
+        Number of files in the table, when counted
+    files_to_read : Optional[int]
+        Estimated number of files to read, when counted
+    pruned_files : Optional[int]
+        Estimated number of files that are skipped, when counted
+    """
+
+    filter_cond: Optional[str] = Field(default=None, description="The (rewritten) filter condition")
+    rewrites: Dict[str, str] = Field(default_factory=dict, description="Rewritten conjuncts and their rewritten form")
+    partition_filters: List[str] = Field(default_factory=list, description="Conjuncts that prune partitions")
+    data_skipping_filters: List[str] = Field(default_factory=list, description="Conjuncts used for data skipping")
+    full_scan: Optional[bool] = Field(default=True, description="Whether all files of the table are read")
+    total_files: Optional[int] = Field(default=None, description="Number of files in the table, when counted")
+    files_to_read: Optional[int] = Field(default=None, description="Estimated number of files to read, when counted")
+    pruned_files: Optional[int] = Field(default=None, description="Estimated number of files skipped, when counted")
+
+
+class DeltaScanPlanner(BaseModel):
+    """Rewrites filter conditions into prunable forms and plans the scan of a Delta table
+
+    Parameters
+    ----------
+    schema : StructType
+        Schema of the table, including the metadata of generated columns
+    partition_columns : List[str]
+        Partition columns of the table
+    properties : Dict[str, str]
+        Table properties, used to determine the columns with statistics
+    """
+
+    schema_: StructType = Field(default=..., alias="schema", description="Schema of the table")
+    partition_columns: List[str] = Field(default_factory=list, description="Partition columns of the table")
+    properties: Dict[str, str] = Field(default_factory=dict, description="Table properties")
+
+    @property
+    def types(self) -> Dict[str, DataType]:
+        """Data types of the top level columns, by lower case name"""
+        return {field.name.lower(): field.dataType for field in self.schema_.fields}
+
+    @property
+    def _partitions(self) -> Dict[str, str]:
+        """Partition columns by lower case name"""
+        return {column.lower(): column for column in self.partition_columns}
+
+    @property
+    def generated_partitions(self) -> Dict[str, str]:
+        """Normalized generation expressions of the generated partition columns, mapped to the partition column"""
+        return {
+            _normalize(field.metadata[GENERATION_EXPRESSION_KEY]): field.name
+            for field in self.schema_.fields
+            if field.name.lower() in self._partitions and GENERATION_EXPRESSION_KEY in (field.metadata or {})
+        }
+
+    @property
+    def stats_columns(self) -> List[str]:
+        """Top level columns for which Delta collects min/max statistics"""
+        if stats_columns := self.properties.get("delta.dataSkippingStatsColumns"):
+            return [column.strip().strip("`") for column in stats_columns.split(",") if column.strip()]
+
+        num_indexed = int(self.properties.get("delta.dataSkippingNumIndexedCols", DEFAULT_NUM_INDEXED_COLS))
+        columns, leaves = [], 0
+
+        def count_leaves(data_type: DataType) -> int:
+            if isinstance(data_type, StructType):
+                return sum(count_leaves(field.dataType) for field in data_type.fields)
+            return 1
+
+        for field in self.schema_.fields:
+            if num_indexed >= 0 and leaves >= num_indexed:
+                break
+            leaves += count_leaves(field.dataType)
+            if not isinstance(field.dataType, StructType):
+                columns.append(field.name)
+        return columns
+
+    def _field_name(self, column: str) -> str:
+        """The name of the column as it is in the schema"""
+        return next(field.name for field in self.schema_.fields if field.name.lower() == column.strip("`").lower())
+
+    def references(self, expression: str) -> List[str]:
+        """The top level columns of the table referenced in the expression"""
+        masked = re.sub(r"'[^']*'|\"[^\"]*\"", "", expression)
+        names = {name.lower() for name in re.findall(r"`?([A-Za-z_][A-Za-z0-9_]*)`?", masked)}
+        return [field.name for field in self.schema_.fields if field.name.lower() in names]
+
+    def _comparison(self, conjunct: str) -> Optional[Tuple[str, str, str]]:
+        """Split a comparison of an expression with a literal into (expression, operator, literal)
+
+        Returns None for anything but a single comparison, e.g. when the conjunct holds `OR`, `NOT` or `IN`.
+        """
+        masked = _mask_literals(conjunct)
+        if _BOOLEAN_KEYWORDS.search(masked) or not (match := _COMPARISON.match(masked)):
+            return None
+        lhs, op = conjunct[: match.end("lhs")].strip(), match.group("op")
+        rhs = conjunct[match.start("rhs") :].strip()
+        if op in ("<>", "!="):
+            return None
+        if _LITERAL.match(rhs):
+            return lhs, "=" if op == "==" else op, rhs
+        if _LITERAL.match(lhs) and op in _FLIPPED:
+            return rhs, _FLIPPED[op], lhs
+        return None
+
+    def rewrite_conjunct(self, conjunct: str) -> Optional[str]:
+        """The prunable form of the conjunct, None if it can not be rewritten"""
+        if (comparison := self._comparison(conjunct)) is None:
+            return None
+        expression, op, literal = comparison
+        partitions, types = self._partitions, self.types
+
+        if (partition := self.generated_partitions.get(_normalize(expression))) is not None:
+            return f"{partition} {op} {literal}"
+
+        if (match := _TO_DATE.match(expression)) and (column := match.group(1) or match.group(2)).lower() in partitions:
+            data_type, date = types.get(column.lower()), _date_literal(literal)
+            if isinstance(data_type, DateType):
+                return f"{column} {op} {date}"
+            if isinstance(data_type, TimestampType):
+                start, end = f"CAST({date} AS TIMESTAMP)", f"CAST(date_add({date}, 1) AS TIMESTAMP)"
+                return {
+                    "=": f"{column} >= {start} AND {column} < {end}",
+                    "<": f"{column} < {start}",
+                    "<=": f"{column} < {end}",
+                    ">": f"{column} >= {end}",
+                    ">=": f"{column} >= {start}",
+                }[op]
+
+        if (match := _YEAR.match(expression)) and (column := match.group(1)).lower() in partitions:
+            data_type = types.get(column.lower())
+            if isinstance(data_type, (DateType, TimestampType)) and re.fullmatch(r"\d{4}", literal):
+                kind = "DATE" if isinstance(data_type, DateType) else "TIMESTAMP"
+                start, end = f"{kind} '{literal}-01-01'", f"{kind} '{int(literal) + 1}-01-01'"
+                return {
+                    "=": f"{column} >= {start} AND {column} < {end}",
+                    "<": f"{column} < {start}",
+                    "<=": f"{column} < {end}",
+                    ">": f"{column} >= {end}",
+                    ">=": f"{column} >= {start}",
+                }[op]
+
+        if (
+            (match := _TO_STRING.match(expression))
+            and (column := match.group(1) or match.group(2)).lower() in partitions
+            and op == "="
+        ):
+            data_type, value = types.get(column.lower()), literal.strip("'\"")
+            if isinstance(data_type, DateType) and re.fullmatch(r"\d{4}-\d{2}-\d{2}", value):
+                return f"{column} = DATE '{value}'"
+            if isinstance(data_type, _INTEGER_TYPES) and re.fullmatch(r"-?[1-9]\d*|0", value):
+                return f"{column} = {value}"
+            if isinstance(data_type, StringType):
+                return f"{column} = {literal}"
+
+        return None
+
+    def plan(self, condition: Optional[str]) -> DeltaScanPlan:
+        """Rewrite the condition and determine the partition and data skipping filters"""
+        if not condition:
+            return DeltaScanPlan()
+
+        conjuncts, rewrites = [], {}
+        for conjunct in split_conjuncts(condition):
+            if (rewritten := self.rewrite_conjunct(conjunct)) is not None:
+                rewrites[conjunct] = rewritten
+                conjuncts.extend(split_conjuncts(rewritten))
+            else:
+                conjuncts.append(conjunct)
+
+        partitions, stats_columns = self._partitions, {column.lower() for column in self.stats_columns}
+        partition_filters, data_skipping_filters = [], []
+        for conjunct in conjuncts:
+            references = self.references(conjunct)
+            if references and all(column.lower() in partitions for column in references):
+                partition_filters.append(conjunct)
+            elif (comparison := self._comparison(conjunct)) and re.fullmatch(_IDENTIFIER, comparison[0]):
+                if comparison[0].strip("`").lower() in stats_columns:
+                    data_skipping_filters.append(conjunct)
+
+        return DeltaScanPlan(
+            filter_cond=" AND ".join(f"({conjunct})" for conjunct in conjuncts) if rewrites else condition,
+            rewrites=rewrites,
+            partition_filters=partition_filters,
+            data_skipping_filters=data_skipping_filters,
+            full_scan=not (partition_filters or data_skipping_filters),
+        )
+
+    def _skipping_predicate(self, conjunct: str) -> str:
+        """The predicate on the min/max statistics of a file that keeps the file when the conjunct may be true"""
+        column, op, literal = self._comparison(conjunct)  # type: ignore[misc]
+        column = self._field_name(column)
+        min_value, max_value = f"`__min_{column}`", f"`__max_{column}`"
+        predicate = {
+            "=": f"{min_value} <= {literal} AND {max_value} >= {literal}",
+            "<": f"{min_value} < {literal}",
+            "<=": f"{min_value} <= {literal}",
+            ">": f"{max_value} > {literal}",
+            ">=": f"{max_value} >= {literal}",
+        }[op]
+        return f"coalesce({predicate}, true)"
+
+    def count_files(self, spark: SparkSession, files: List[Dict[str, Any]], plan: DeltaScanPlan) -> DeltaScanPlan:
+        """Estimate the number of files to read by evaluating the filters on the Delta log entries of the files
+
+        The partition filters are evaluated on the partition values, the data skipping filters on the min/max
+        statistics of the files. Returns a copy of the plan with the file counts.
+        """
+        total = len(files)
+        if plan.full_scan is None:
+            return plan.model_copy(update={"total_files": total})
+        if not total or plan.full_scan:
+            return plan.model_copy(update={"total_files": total, "files_to_read": total, "pruned_files": 0})
+
+        types = self.types
+        stats_columns = sorted(
+            {self._field_name(self._comparison(c)[0]) for c in plan.data_skipping_filters}  # type: ignore[index]
+        )
+        names = [*self.partition_columns, *[f"__{k}_{c}" for c in stats_columns for k in ("min", "max")]]
+
+        rows = []
+        for file in files:
+            stats = json.loads(file.get("stats") or "{}")
+            partition_values = file.get("partitionValues") or {}
+            rows.append(
+                (
+                    *[partition_values.get(column) for column in self.partition_columns],
+                    *[
+                        None if (value := stats.get(kind, {}).get(column)) is None else str(value)
+                        for column in stats_columns
+                        for kind in ("minValues", "maxValues")
+                    ],
+                )
+            )
+
+        df = spark.createDataFrame(rows, StructType([StructField(name, StringType()) for name in names]))
+        df = df.select(
+            *[f.col(f"`{column}`").cast(types[column.lower()]).alias(column) for column in self.partition_columns],
+            *[
+                f.col(f"`__{kind}_{column}`").cast(types[column.lower()]).alias(f"__{kind}_{column}")
+                for column in stats_columns
+                for kind in ("min", "max")
+            ],
+        )
+        predicates = [*plan.partition_filters, *[self._skipping_predicate(c) for c in plan.data_skipping_filters]]
+        files_to_read = df.filter(" AND ".join(f"({predicate})" for predicate in predicates)).count()
+
+        return plan.model_copy(
+            update={"total_files": total, "files_to_read": files_to_read, "pruned_files": total - files_to_read}
+        )
@@ -7,16 +7,156 @@ Ensure the 'excel' extra is installed before using this reader.
 Default implementation uses openpyxl as the engine for reading Excel files.
 Other implementations can be used by passing the correct keyword arguments to the reader.
 
+For large workbooks, use `mode="streaming"`: the rows of the sheets are streamed with openpyxl in `read_only` mode,
+in batches, into Arrow record batches that are written to Parquet files in a staging directory. Spark then reads these
+files, so the workbook is never fully materialized as Python objects. Multiple sheets, or all sheets matching a
+pattern, are read in parallel processes.
+
 See Also
 --------
 - https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.read_excel.html
 - koheesio.pandas.readers.excel.ExcelReader
 """
 
+from typing import Any, Dict, List, Literal, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+import multiprocessing
+import os
+from pathlib import Path
+import re
+
 from pyspark.pandas import DataFrame as PandasDataFrame
+from pyspark.sql import functions as f
+from pyspark.sql.types import DataType, DoubleType, IntegralType, LongType, NumericType, StringType
 
+from koheesio.models import Field, model_validator
 from koheesio.pandas.readers.excel import ExcelReader as PandasExcelReader
 from koheesio.spark.readers import Reader
+from koheesio.spark.utils.staging import create_staging_dir
+
+
+def _arrow_array(values: Sequence[Any], type_: Any = None) -> Any:
+    """Convert the values of a column to an Arrow array, of the given type or of an inferred type
+
+    Types that Spark can not read (no values at all, time of day) and columns with mixed types become strings.
+    """
+    import pyarrow as pa
+
+    if type_ is not None:
+        if pa.types.is_string(type_):
+            return pa.array([None if v is None else str(v) for v in values], type=type_)
+        return pa.array(values, type=type_)
+
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return _arrow_array(values, pa.string())
+    if pa.types.is_null(array.type) or pa.types.is_time(array.type):
+        return _arrow_array(values, pa.string())
+    return array
+
+
+def _common_type(types: Sequence[DataType]) -> DataType:
+    """The type to read a column as, that was inferred with the given types for different sheets
+
+    Integer and floating point types are widened, any other conflict is resolved by reading the column as strings.
+    """
+    if all(type_ == types[0] for type_ in types):
+        return types[0]
+    if all(isinstance(type_, IntegralType) for type_ in types):
+        return LongType()
+    if all(isinstance(type_, NumericType) for type_ in types):
+        return DoubleType()
+    return StringType()
+
+
+def _stream_sheet_to_parquet(
+    path: str,
+    sheet_name: str,
+    header: Optional[int],
+    batch_size: int,
+    sheet_name_column: Optional[str],
+    all_strings: bool,
+    output_file: str,
+) -> int:
+    """Stream the rows of a sheet in batches to a Parquet file, returns the number of rows
+
+    Runs in a separate process, so it has to be a module level function.
+    """
+    import openpyxl
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+
+        columns: Optional[List[str]] = None
+        if header is not None:
+            for _ in range(header):
+                next(rows, None)
+            header_row = next(rows, None) or ()
+            columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header_row)]
+
+        writer = None
+        schema = None
+        total = 0
+        batch: List[tuple] = []
+
+        def write(batch: List[tuple]) -> None:
+            nonlocal writer, schema, columns
+            if columns is None:
+                columns = [str(i) for i in range(max(len(row) for row in batch))]
+            width = len(columns)
+            values = list(zip(*[tuple(row[:width]) + (None,) * (width - len(row)) for row in batch]))
+
+            if schema is None:
+                arrays = [_arrow_array(v, pa.string() if all_strings else None) for v in values]
+                names = list(columns)
+                if sheet_name_column:
+                    arrays.append(pa.array([sheet_name] * len(batch), type=pa.string()))
+                    names.append(sheet_name_column)
+                table = pa.Table.from_arrays(arrays, names=names)
+                schema = table.schema
+                writer = pq.ParquetWriter(output_file, schema)
+            else:
+                arrays = []
+                for i, v in enumerate(values):
+                    try:
+                        arrays.append(_arrow_array(v, schema.field(i).type))
+                    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                        raise ValueError(
+                            f"Column '{columns[i]}' of sheet '{sheet_name}' has values that do not match the type "
+                            f"{schema.field(i).type} inferred from the first {batch_size} rows, increase the "
+                            f"`batch_size` or use `all_strings=True`: {e}"
+                        ) from e
+                if sheet_name_column:
+                    arrays.append(pa.array([sheet_name] * len(batch), type=pa.string()))
+                table = pa.Table.from_arrays(arrays, schema=schema)
+            writer.write_table(table)
+
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) == batch_size:
+                write(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            write(batch)
+            total += len(batch)
+
+        if writer is None:
+            # no rows, only the columns of the header (as strings)
+            names = (columns or []) + ([sheet_name_column] if sheet_name_column else [])
+            pq.write_table(pa.table({name: pa.array([], type=pa.string()) for name in names}), output_file)
+        else:
+            writer.close()
+        return total
+    finally:
+        workbook.close()
 
 
 class ExcelReader(Reader, PandasExcelReader):
@@ -25,6 +165,13 @@ class ExcelReader(Reader, PandasExcelReader):
     This class is a wrapper around the PandasExcelReader class. It reads an Excel file first using pandas, and then
     converts the pandas DataFrame to a Spark DataFrame.
 
+    With `mode="streaming"`, pandas is not used: the rows are streamed with openpyxl (`read_only` mode) in batches
+    of `batch_size` rows, converted to Arrow and written to Parquet files in `staging_path`, from where Spark reads
+    them. The types of the columns are inferred from the first batch of every sheet. Multiple sheets (`sheet_names`,
+    or all sheets matching `sheet_pattern`) are read in parallel processes, and their rows are combined, by column
+    name, in a single DataFrame. A column with different types in different sheets is read as a wider numeric type
+    (e.g. integers and doubles as doubles), or as strings.
+
     Attributes
     ----------
     path: str
@@ -33,8 +180,143 @@ class ExcelReader(Reader, PandasExcelReader):
         The name of the sheet to read
     header: int
         The row to use as the column names
+    mode: str, optional, default="pandas"
+        "pandas" reads the sheet with `pd.read_excel`, "streaming" streams the rows with openpyxl
+    sheet_names: Optional[List[str]]
+        The names of the sheets to read, streaming mode only
+    sheet_pattern: Optional[str]
+        Regular expression, all sheets with a matching name are read, streaming mode only
+    sheet_name_column: Optional[str]
+        Name of a column to add with the name of the sheet every row was read from, streaming mode only
+    batch_size: int, optional, default=10000
+        Number of rows per Arrow record batch, streaming mode only
+    max_workers: int, optional, default=4
+        Maximum number of processes to read sheets with in parallel, streaming mode only
+    all_strings: bool, optional, default=False
+        Read all values as strings instead of inferring the types, streaming mode only
+    staging_path: Optional[str]
+        Directory to write the Parquet files to, should be accessible by the driver and by Spark, e.g. `dbfs:/tmp/` on
+        Databricks. Required unless Spark runs in local mode, see `koheesio.spark.utils.staging`.
+
+    Example
+    -------
+    ```python
+    reader = ExcelReader(
+        path="path/to/workbook.xlsx",
+        mode="streaming",
+        sheet_pattern="sales_.*",
+        sheet_name_column="sheet",
+    )
+    df = reader.read()
+    ```
     """
 
+    mode: Literal["pandas", "streaming"] = Field(
+        default="pandas",
+        description="'pandas' reads the sheet with `pd.read_excel`, 'streaming' streams the rows with openpyxl",
+    )
+    sheet_names: Optional[List[str]] = Field(default=None, description="The names of the sheets to read")
+    sheet_pattern: Optional[str] = Field(
+        default=None, description="Regular expression, all sheets with a matching name are read"
+    )
+    sheet_name_column: Optional[str] = Field(
+        default=None, description="Name of a column to add with the name of the sheet every row was read from"
+    )
+    batch_size: int = Field(default=10_000, gt=0, description="Number of rows per Arrow record batch")
+    max_workers: int = Field(default=4, gt=0, description="Maximum number of processes to read sheets with")
+    all_strings: bool = Field(default=False, description="Read all values as strings instead of inferring the types")
+    staging_path: Optional[str] = Field(
+        default=None,
+        description="Directory to write the Parquet files to, should be accessible by the driver and by Spark, e.g. "
+        "`dbfs:/tmp/` on Databricks. Required unless Spark runs in local mode.",
+    )
+
+    @model_validator(mode="after")
+    def _validate_streaming_options(self) -> "ExcelReader":
+        """Multiple sheets are only supported in streaming mode"""
+        if self.mode == "pandas" and (self.sheet_names or self.sheet_pattern or self.sheet_name_column):
+            raise ValueError("'sheet_names', 'sheet_pattern' and 'sheet_name_column' require mode='streaming'")
+        if self.mode == "streaming" and isinstance(self.header, list):
+            raise ValueError("A multi-row header is not supported in streaming mode")
+        return self
+
+    def _sheets(self) -> List[str]:
+        """The names of the sheets to read"""
+        if not self.sheet_pattern:
+            return self.sheet_names or [self.sheet_name]
+
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(self.path, read_only=True)
+        try:
+            sheets = [name for name in workbook.sheetnames if re.fullmatch(self.sheet_pattern, name)]
+        finally:
+            workbook.close()
+        if not sheets:
+            raise ValueError(f"No sheets in {self.path} match the pattern '{self.sheet_pattern}'")
+        return sheets
+
+    def _read_streaming(self) -> None:
+        sheets = self._sheets()
+        # a unique directory per read, so files behind an earlier (lazily read) DataFrame are never overwritten
+        staging_dir = create_staging_dir(self.spark, self.staging_path, prefix="koheesio_excel_")
+
+        file_names = [f"{Path(self.path).stem}_{i}.parquet" for i in range(len(sheets))]
+        args = [
+            (
+                str(self.path),
+                sheet,
+                self.header,
+                self.batch_size,
+                self.sheet_name_column,
+                self.all_strings,
+                os.path.join(staging_dir.local_path, file_name),
+            )
+            for sheet, file_name in zip(sheets, file_names)
+        ]
+
+        if len(sheets) == 1:
+            rows = [_stream_sheet_to_parquet(*args[0])]
+        else:
+            # spawn, as forking a process that runs a JVM gateway is not safe
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(sheets)), mp_context=context) as executor:
+                rows = list(executor.map(_stream_sheet_to_parquet, *zip(*args)))
+
+        self.log.info(
+            f"Streamed {sum(rows)} rows from {len(sheets)} sheet(s) of {self.path} to '{staging_dir.spark_path}'"
+        )
+        # the types are inferred per sheet, and Parquet can not merge e.g. an integer and a double column, so every
+        # file is read separately and the columns are cast to a common type before the rows are combined
+        dfs = [self.spark.read.parquet(f"{staging_dir.spark_path}/{file_name}") for file_name in file_names]
+        types: Dict[str, List[DataType]] = {}
+        for df in dfs:
+            for field in df.schema.fields:
+                types.setdefault(field.name, []).append(field.dataType)
+        common_types = {name: _common_type(column_types) for name, column_types in types.items()}
+        for name, column_types in types.items():
+            if any(type_ != common_types[name] for type_ in column_types):
+                self.log.warning(
+                    f"Column '{name}' has different types in the sheets of {self.path}, reading it as "
+                    f"{common_types[name].simpleString()}"
+                )
+
+        dfs = [
+            df.select(
+                *[f.col(f"`{name.replace('`', '``')}`").cast(common_types[name]).alias(name) for name in df.columns]
+            )
+            for df in dfs
+        ]
+        self.output.df = reduce(lambda left, right: left.unionByName(right, allowMissingColumns=True), dfs)
+
     def execute(self) -> Reader.Output:
-        pdf: PandasDataFrame = PandasExcelReader.from_step(self).execute().df
+        if self.mode == "streaming":
+            self._read_streaming()
+            return
+
+        pdf: PandasDataFrame = (
+            PandasExcelReader(path=self.path, sheet_name=self.sheet_name, header=self.header, params=self.params)
+            .execute()
+            .df
+        )
         self.output.df = self.spark.createDataFrame(pdf)
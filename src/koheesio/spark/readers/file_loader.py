@@ -28,16 +28,48 @@ orc_reader = OrcReader(path="path/to/file.orc")
 
 For more information about the available options, see Spark's
 [official documentation](https://spark.apache.org/docs/latest/sql-data-sources.html).
+
+Incremental batch reads
+-----------------------
+By providing a `manifest` (see `koheesio.spark.readers.incremental`), a batch read only loads the files that are new
+or changed (by size or modification time) since the last commit of the manifest:
+
+```python
+from koheesio.spark.readers.incremental import LocalFileManifest
+
+reader = JsonReader(
+    path="path/to/landing_zone",
+    manifest=LocalFileManifest(path="/dbfs/state/landing_zone.json"),
+)
+df = reader.read()  # only the new files
+...  # process the data
+reader.commit_manifest()  # EtlTask does this after a successful load
+```
+
+Schema cache
+------------
+To avoid the extra scan Spark does to infer the schema of JSON (and CSV with `inferSchema`) files, provide a
+`schema_cache` (see `koheesio.spark.readers.schema_cache`). The schema is inferred from a sample of the files once,
+and reused on later runs.
 """
 
-from typing import Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from enum import Enum
+import fnmatch
 from pathlib import Path
 
+from pyspark.sql import functions as f
 from pyspark.sql.types import StructType
 
-from koheesio.models import ExtraParamsMixin, Field, field_validator
+from koheesio.models import ExtraParamsMixin, Field, InstanceOf, PrivateAttr, field_validator, model_validator
+from koheesio.spark import DataFrame, DataFrameReader
 from koheesio.spark.readers import Reader
+from koheesio.spark.readers.incremental import FileEntries, FileManifest
+from koheesio.spark.readers.schema_cache import SchemaCache, merge_schemas
+from koheesio.spark.utils.connect import is_remote_session
+
+_GLOB_CHARACTERS = "*?[{"
 
 
 class FileFormat(str, Enum):
@@ -93,6 +125,23 @@ class FileLoader(Reader, ExtraParamsMixin):
     and [read about text data source](https://spark.apache.org/docs/latest/sql-data-sources-text.html).
 
     Also see the [data sources generic options](https://spark.apache.org/docs/3.5.0/sql-data-sources-generic-options.html).
+
+    Incremental batch reads:
+    When a `manifest` is provided, the files under `path` are listed (directories are listed in parallel, using
+    `listing_workers` threads) and only the files that are not in the manifest, or whose size or modification time
+    changed, are loaded. The manifest is updated with these files by `commit_manifest()`, which `EtlTask` calls once the
+    target was written. Hidden files (starting with `_` or `.`) are skipped, and `pathGlobFilter` is applied to the
+    file names.
+    When there are no new files, the DataFrame is empty, with the `schema` if given, or else with the schema of the most
+    recently modified file that was already processed.
+
+    Schema cache:
+    When a `schema_cache` is provided and no `schema` is given, the schema of JSON files (and CSV files with
+    `inferSchema`) is inferred from the `schema_sample_files` most recently modified files and stored in the cache,
+    keyed by format and path. Later runs use the cached schema, so Spark does not scan the input to infer it. With
+    `detect_schema_drift`, the files are listed and the sample is inferred on every run, and new fields are merged
+    into a new version of the cached schema. Spark applies a schema to CSV files by position, so for CSV files a
+    drift is only merged when the new columns are added at the end; other changes raise a ValueError.
     """
 
     format: FileFormat = Field(default=FileFormat.text, description="File format to read")
@@ -101,6 +150,41 @@ class FileLoader(Reader, ExtraParamsMixin):
         default=None, description="Schema to use when reading the file", validate_default=False, alias="schema"
     )
     streaming: Optional[bool] = Field(default=False, description="Whether to read the files as a Stream or not")
+    manifest: Optional[InstanceOf[FileManifest]] = Field(
+        default=None, description="Manifest of the processed files, to only read new or changed files in batch mode"
+    )
+    listing_workers: int = Field(default=8, gt=0, description="Number of threads to list directories with")
+    schema_cache: Optional[InstanceOf[SchemaCache]] = Field(
+        default=None, description="Cache for the inferred schema, used when no schema is given"
+    )
+    schema_sample_files: int = Field(
+        default=100, gt=0, description="Number of most recently modified files to infer the schema from"
+    )
+    schema_sampling_ratio: Optional[float] = Field(
+        default=None, gt=0, le=1, description="Fraction of the rows of the sampled files to infer the schema from"
+    )
+    detect_schema_drift: bool = Field(
+        default=False,
+        description="List the files and infer the schema of a sample on every run, and merge new fields into the cache",
+    )
+
+    _pending_files: FileEntries = PrivateAttr(default_factory=dict)
+    _listed_files: FileEntries = PrivateAttr(default_factory=dict)
+
+    class Output(Reader.Output):
+        """Output class for FileLoader"""
+
+        files: Optional[List[str]] = Field(
+            default=None, description="The files that were read, when reading incrementally with a manifest"
+        )
+        schema_version: Optional[int] = Field(default=None, description="Version of the cached schema that was used")
+
+    @model_validator(mode="after")
+    def _validate_manifest(self) -> "FileLoader":
+        """A manifest is only supported in batch mode, streams keep track of the processed files in the checkpoint"""
+        if self.manifest is not None and self.streaming:
+            raise ValueError("'manifest' is not supported for streaming reads, the checkpoint tracks processed files")
+        return self
 
     @field_validator("path")
     def ensure_path_is_str(cls, path: Union[Path, str]) -> Union[Path, str]:
@@ -109,18 +193,190 @@ class FileLoader(Reader, ExtraParamsMixin):
             return str(path.absolute().as_posix())
         return path
 
-    def execute(self) -> Reader.Output:
+    @property
+    def _reader_options(self) -> Dict[str, Any]:
+        """The options that are passed to the Spark reader, i.e. the extra keyword arguments"""
+        return self.extra_params or {}
+
+    def _list_directory(self, fs, directory) -> Tuple[FileEntries, list]:  # type: ignore[no-untyped-def]
+        """List the files and subdirectories of a single directory through the Hadoop FileSystem"""
+        files, subdirectories = {}, []
+        glob_filter = self._reader_options.get("pathGlobFilter")
+        for status in fs.listStatus(directory):
+            name = status.getPath().getName()
+            if name.startswith(("_", ".")):
+                continue
+            if status.isDirectory():
+                subdirectories.append(status.getPath())
+            elif not glob_filter or fnmatch.fnmatch(name, glob_filter):
+                files[status.getPath().toString()] = (status.getLen(), status.getModificationTime())
+        return files, subdirectories
+
+    def list_files(self) -> FileEntries:
+        """List the files under `path` (a file, directory or glob pattern) with their size and modification time
+
+        Directories are listed in parallel through the Hadoop FileSystem. On Spark Connect, the files are listed by
+        Spark through the `binaryFile` source instead.
+        """
+        if is_remote_session(self.spark):
+            df = (
+                self.spark.read.format("binaryFile")
+                .options(
+                    recursiveFileLookup="true",
+                    **{k: v for k, v in self._reader_options.items() if k == "pathGlobFilter"},
+                )
+                .load(self.path)
+                .select("path", "length", f.expr("unix_millis(modificationTime)").alias("modification_time"))
+            )
+            return {row["path"]: (row["length"], row["modification_time"]) for row in df.collect()}
+
+        jvm = self.spark._jvm  # type: ignore[union-attr]
+        pattern = jvm.org.apache.hadoop.fs.Path(self.path)
+        fs = pattern.getFileSystem(self.spark._jsc.hadoopConfiguration())  # type: ignore[union-attr]
+
+        files: FileEntries = {}
+        directories = []
+        for status in fs.globStatus(pattern) or []:
+            if status.isDirectory():
+                directories.append(status.getPath())
+            else:
+                files[status.getPath().toString()] = (status.getLen(), status.getModificationTime())
+
+        with ThreadPoolExecutor(max_workers=self.listing_workers) as executor:
+            pending = {executor.submit(self._list_directory, fs, directory) for directory in directories}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, subdirectories = future.result()
+                    files.update(found)
+                    pending |= {executor.submit(self._list_directory, fs, directory) for directory in subdirectories}
+
+        return files
+
+    def _new_files(self) -> FileEntries:
+        """The files under `path` that are not in the manifest, or that changed since they were added to it"""
+        processed = self.manifest.load()  # type: ignore[union-attr]
+        listed = self._listed_files = self.list_files()
+        new_files = {path: entry for path, entry in listed.items() if tuple(processed.get(path, ())) != entry}
+        self.log.info(f"Found {len(new_files)} new or changed files out of {len(listed)} files under {self.path}")
+        return new_files
+
+    def commit_manifest(self) -> int:
+        """Add the files that were read to the manifest, call this once the data has been processed successfully
+
+        Returns the number of files that were added.
+        """
+        if self.manifest is None or not (files := self._pending_files):
+            return 0
+        self.manifest.add(files)
+        self._pending_files = {}
+        self.log.info(f"Committed {len(files)} files to the manifest")
+        return len(files)
+
+    @property
+    def _infers_schema(self) -> bool:
+        """Whether Spark infers the schema by scanning the data"""
+        return self.format == FileFormat.json or (
+            self.format == FileFormat.csv and str(self._reader_options.get("inferSchema", False)).lower() == "true"
+        )
+
+    def _infer_schema(self, files: List[str]) -> StructType:
+        """Infer the schema from the given files"""
+        options = dict(self._reader_options)
+        if self.schema_sampling_ratio:
+            options["samplingRatio"] = self.schema_sampling_ratio
+        return self.spark.read.format(self.format).options(**options).load(files).schema
+
+    def _cached_schema(self, files: Optional[FileEntries]) -> Optional[StructType]:
+        """The schema from the cache, inferred from a sample of the files (and stored) when needed"""
+        key = f"{self.format}:{self.path}"
+        cached = self.schema_cache.get(key)  # type: ignore[union-attr]
+        if cached is not None and not self.detect_schema_drift:
+            self.output.schema_version = cached[0]
+            return cached[1]
+
+        files = self.list_files() if files is None else files
+        sample = sorted(files, key=lambda path: files[path][1], reverse=True)[: self.schema_sample_files]  # type: ignore[index]
+        if not sample:
+            self.output.schema_version = cached[0] if cached else None
+            return cached[1] if cached else None
+
+        inferred = self._infer_schema(sample)
+        if cached is None:
+            self.output.schema_version = self.schema_cache.put(key, inferred)  # type: ignore[union-attr]
+            self.log.info(f"Inferred the schema of {key} from {len(sample)} files: {inferred.simpleString()}")
+            return inferred
+
+        version, schema = cached
+        if self.format == FileFormat.csv and inferred.fieldNames()[: len(schema)] != schema.fieldNames():
+            # the schema is applied to the columns of a CSV file by position, not by name
+            raise ValueError(
+                f"The columns of the CSV files of {key} changed from {schema.fieldNames()} to {inferred.fieldNames()}. "
+                "A schema is applied to CSV files by position, so only columns that are added at the end can be "
+                "merged into the cached schema. Store a new schema in the cache or provide a `schema`."
+            )
+        merged = merge_schemas(schema, inferred)
+        if merged != schema:
+            version = self.schema_cache.put(key, merged)  # type: ignore[union-attr]
+            self.log.warning(f"Schema drift detected for {key}, stored version {version}: {merged.simpleString()}")
+        self.output.schema_version = version
+        return merged
+
+    def execute(self) -> Output:
         """Reads the file, in batch or as a stream, using the specified format and schema, while applying any extra parameters."""
         reader = self.spark.readStream if self.streaming else self.spark.read
         reader = reader.format(self.format)
 
-        if self.schema_:
-            reader.schema(self.schema_)
+        if self.manifest is not None:
+            self._pending_files = self._new_files()
+            self.output.files = sorted(self._pending_files)
+
+        schema = self.schema_
+        if schema is None and self.schema_cache is not None and self._infers_schema:
+            schema = self._cached_schema(self._pending_files if self.manifest is not None else None)
+
+        if schema:
+            reader.schema(schema)
 
         if self.extra_params:
             reader = reader.options(**self.extra_params)
 
-        self.output.df = reader.load(self.path)  # type: ignore
+        if self.manifest is None:
+            self.output.df = reader.load(self.path)  # type: ignore
+            return
+
+        if not self.output.files:
+            self.output.df = self._empty(reader, schema)
+            return
+
+        self.output.df = self._load_files(reader, self.output.files)
+
+    def _load_files(self, reader: DataFrameReader, files: List[str]) -> DataFrame:
+        """Load the given files, keeping the partition columns of the directory layout as when loading `path`"""
+        path = str(self.path).rstrip("/")
+        is_single_file = len(files) == 1 and files[0].endswith(path)
+        if (
+            "basePath" not in self._reader_options
+            and not is_single_file
+            and not any(c in path for c in _GLOB_CHARACTERS)
+        ):
+            reader = reader.option("basePath", path)
+        return reader.load(files)  # type: ignore
+
+    def _empty(self, reader: DataFrameReader, schema: Optional[Union[StructType, str]]) -> DataFrame:
+        """An empty DataFrame, when there are no new files, with the columns a load of the files would have
+
+        Without a schema, the schema is inferred from the most recently modified file that was already processed.
+        """
+        if schema:
+            return self.spark.createDataFrame([], schema)
+        if not self._listed_files:
+            raise ValueError(
+                f"No files found under {self.path} to infer the schema from, provide a `schema` to read an empty "
+                "DataFrame instead"
+            )
+        latest = max(self._listed_files, key=lambda file: self._listed_files[file][1])
+        return self._load_files(reader, [latest]).limit(0)
 
 
 class CsvReader(FileLoader):
@@ -0,0 +1,387 @@
+"""
+Incremental batch reads based on a persisted high-water mark.
+
+Batch readers read their full source on every run. By setting an `incremental_column` and a `watermark_store` on a
+reader that supports it (`DeltaTableReader`, `JdbcReader`, `SparkSqlReader`), only the rows with a value greater than
+the last committed watermark are read. The new watermark (the maximum of the column) is computed when the data is read,
+the DataFrame is bounded by it, and it is only stored when `commit_watermark()` is called.
+`EtlTask` does this after the target was written successfully, so a failed load never advances the watermark.
+
+Watermark stores
+----------------
+- `LocalFileWatermarkStore`: a JSON document on a local (or mounted) file system
+- `DeltaTableWatermarkStore`: a Delta table with one row per watermark key
+- any other backend by implementing `WatermarkStore.get` and `WatermarkStore.set`
+
+File manifests
+--------------
+File based readers (`FileLoader` and its subclasses) read incrementally based on the files themselves rather than a
+column: a `FileManifest` keeps the path, size and modification time of the files that were processed, and only new or
+changed files are loaded. Like the watermark, the manifest is only updated by `commit_manifest()`, which `EtlTask`
+calls after a successful load.
+
+- `LocalFileManifest`: a JSON document on a local (or mounted) file system
+- `DeltaTableManifest`: a Delta table with one row per file
+
+Example
+-------
+```python
+from koheesio.spark.etl_task import EtlTask
+from koheesio.spark.readers.incremental import (
+    DeltaTableWatermarkStore,
+)
+from koheesio.spark.readers.jdbc import JdbcReader
+
+task = EtlTask(
+    source=JdbcReader(
+        ...,
+        dbtable="sales.orders",
+        incremental_column="updated_at",
+        watermark_store=DeltaTableWatermarkStore(
+            table="etl.watermarks"
+        ),
+    ),
+    target=DeltaTableWriter(table="orders", output_mode="append"),
+)
+task.execute()  # reads the orders updated since the previous run, commits the new watermark after the write
+```
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+from abc import ABC, abstractmethod
+import datetime
+import decimal
+import json
+import os
+import threading
+
+from pyspark.sql import functions as f
+
+from koheesio.models import BaseModel, Field, InstanceOf, PrivateAttr, model_validator
+from koheesio.spark import DataFrame, SparkSession
+from koheesio.spark.utils.common import get_active_session
+from koheesio.utils import get_random_string, utc_now
+
+__all__ = [
+    "DeltaTableManifest",
+    "DeltaTableWatermarkStore",
+    "FileManifest",
+    "IncrementalReaderMixin",
+    "LocalFileManifest",
+    "LocalFileWatermarkStore",
+    "WatermarkStore",
+]
+
+_TYPES = {
+    "int": int,
+    "float": float,
+    "decimal": decimal.Decimal,
+    "str": str,
+    "date": datetime.date.fromisoformat,
+    "datetime": datetime.datetime.fromisoformat,
+}
+
+
+def _serialize(value: Any) -> Dict[str, str]:
+    """Serialize a watermark value to a string and its type, so it can be restored with the same type"""
+    # datetime is a subclass of date, and bool of int, so the order of the checks matters
+    for type_name, type_ in [
+        ("datetime", datetime.datetime),
+        ("date", datetime.date),
+        ("decimal", decimal.Decimal),
+        ("float", float),
+        ("int", int),
+    ]:
+        if isinstance(value, type_):
+            return {"type": type_name, "value": value.isoformat() if type_name in ("datetime", "date") else str(value)}
+    return {"type": "str", "value": str(value)}
+
+
+def _deserialize(value: str, type_name: str) -> Any:
+    """Restore a watermark value serialized by `_serialize`"""
+    return _TYPES[type_name](value)
+
+
+def _write_json(path: str, content: Any) -> None:
+    """Write to a temporary file first, so that a failure never leaves a corrupt document behind"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f_:
+        json.dump(content, f_)
+    os.replace(tmp_path, path)
+
+
+class WatermarkStore(BaseModel, ABC):
+    """Persists high-water marks by key
+
+    Implement `get` and `set` to add another backend.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """The watermark stored for the given key, None if there is none"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Store the watermark for the given key"""
+
+
+class LocalFileWatermarkStore(WatermarkStore):
+    """Stores the watermarks in a JSON document on a local (or mounted) file system
+
+    Parameters
+    ----------
+    path : str
+        Path to the JSON file, created on the first `set`
+    """
+
+    path: str = Field(default=..., description="Path to the JSON file, created on the first `set`")
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as f_:
+            return json.load(f_)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._load().get(key)
+        return _deserialize(entry["value"], entry["type"]) if entry else None
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            watermarks = self._load()
+            watermarks[key] = {**_serialize(value), "updated_at": utc_now().isoformat()}
+            _write_json(self.path, watermarks)
+
+
+class DeltaTableWatermarkStore(WatermarkStore):
+    """Stores the watermarks in a Delta table, one row per key
+
+    The table is created if it does not exist, with the columns `key`, `value`, `value_type` and `updated_at`.
+
+    Parameters
+    ----------
+    table : str
+        Name of the Delta table, e.g. `catalog.schema.watermarks`
+    """
+
+    table: str = Field(default=..., description="Name of the Delta table, e.g. `catalog.schema.watermarks`")
+
+    @property
+    def spark(self) -> SparkSession:
+        """The active SparkSession"""
+        return get_active_session()
+
+    def _create_table(self) -> None:
+        self.spark.sql(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(key STRING, value STRING, value_type STRING, updated_at TIMESTAMP) USING DELTA"
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        self._create_table()
+        row = self.spark.table(self.table).filter(f.col("key") == key).select("value", "value_type").first()
+        return _deserialize(row["value"], row["value_type"]) if row else None
+
+    def set(self, key: str, value: Any) -> None:
+        self._create_table()
+        serialized = _serialize(value)
+        source = self.spark.createDataFrame(
+            [(key, serialized["value"], serialized["type"], utc_now().replace(tzinfo=None))],
+            schema="key STRING, value STRING, value_type STRING, updated_at TIMESTAMP",
+        )
+        view_name = get_random_string(prefix="watermark")
+        source.createOrReplaceTempView(view_name)
+        self.spark.sql(
+            f"MERGE INTO {self.table} t USING {view_name} s ON t.key = s.key "
+            "WHEN MATCHED THEN UPDATE SET * WHEN NOT MATCHED THEN INSERT *"
+        )
+
+
+FileEntries = Dict[str, Tuple[int, int]]
+"""Files by path, with their size in bytes and modification time in milliseconds since epoch"""
+
+
+class FileManifest(BaseModel, ABC):
+    """Keeps track of the files that were processed, by path with their size and modification time
+
+    Implement `load` and `add` to add another backend.
+    """
+
+    @abstractmethod
+    def load(self) -> FileEntries:
+        """All files in the manifest"""
+
+    @abstractmethod
+    def add(self, files: FileEntries) -> None:
+        """Add the given files to the manifest, replacing the entries of files that are already in it"""
+
+
+class LocalFileManifest(FileManifest):
+    """Stores the manifest as a JSON document, `{path: [size, modification_time]}`, on a local (or mounted) file system
+
+    Parameters
+    ----------
+    path : str
+        Path to the JSON file, created on the first `add`
+    """
+
+    path: str = Field(default=..., description="Path to the JSON file, created on the first `add`")
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _read(self) -> FileEntries:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as f_:
+            return {path: (size, mtime) for path, (size, mtime) in json.load(f_).items()}
+
+    def load(self) -> FileEntries:
+        with self._lock:
+            return self._read()
+
+    def add(self, files: FileEntries) -> None:
+        with self._lock:
+            entries = {**self._read(), **files}
+            _write_json(self.path, {path: list(entry) for path, entry in entries.items()})
+
+
+class DeltaTableManifest(FileManifest):
+    """Stores the manifest in a Delta table, one row per file
+
+    The table is created if it does not exist, with the columns `path`, `size`, `modification_time` and
+    `committed_at`.
+
+    Parameters
+    ----------
+    table : str
+        Name of the Delta table, e.g. `catalog.schema.file_manifest`
+    """
+
+    table: str = Field(default=..., description="Name of the Delta table, e.g. `catalog.schema.file_manifest`")
+
+    @property
+    def spark(self) -> SparkSession:
+        """The active SparkSession"""
+        return get_active_session()
+
+    def _create_table(self) -> None:
+        self.spark.sql(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(path STRING, size BIGINT, modification_time BIGINT, committed_at TIMESTAMP) USING DELTA"
+        )
+
+    def load(self) -> FileEntries:
+        self._create_table()
+        rows = self.spark.table(self.table).select("path", "size", "modification_time").collect()
+        return {row["path"]: (row["size"], row["modification_time"]) for row in rows}
+
+    def add(self, files: FileEntries) -> None:
+        if not files:
+            return
+        self._create_table()
+        committed_at = utc_now().replace(tzinfo=None)
+        source = self.spark.createDataFrame(
+            [(path, size, mtime, committed_at) for path, (size, mtime) in files.items()],
+            schema="path STRING, size BIGINT, modification_time BIGINT, committed_at TIMESTAMP",
+        )
+        view_name = get_random_string(prefix="file_manifest")
+        source.createOrReplaceTempView(view_name)
+        self.spark.sql(
+            f"MERGE INTO {self.table} t USING {view_name} s ON t.path = s.path "
+            "WHEN MATCHED THEN UPDATE SET * WHEN NOT MATCHED THEN INSERT *"
+        )
+
+
+class IncrementalReaderMixin(BaseModel):
+    """Adds incremental reads based on a high-water mark to a Reader
+
+    When `incremental_column` is set, the DataFrame of the reader only holds the rows with a value greater than the
+    watermark in the `watermark_store`. The maximum value of the column is computed upfront and the DataFrame is
+    bounded by it, so rows that arrive in between are read by the next run. The maximum is stored as the new watermark
+    by `commit_watermark()`. Readers call `_apply_watermark` on the DataFrame they read.
+
+    The maximum is not observed while the DataFrame is written: an `Observation` only fires when the DataFrame is the
+    top-level query, which is not the case for e.g. the source of a Delta MERGE, and waiting for it would never return.
+
+    Parameters
+    ----------
+    incremental_column : Optional[str]
+        Monotonically increasing column to read incrementally on, e.g. an update timestamp or a sequence id
+    watermark_store : Optional[WatermarkStore]
+        Store that persists the watermark, required when `incremental_column` is set
+    watermark_key : Optional[str]
+        Key of the watermark in the store, derived from the source and the column if not provided
+    """
+
+    incremental_column: Optional[str] = Field(
+        default=None, description="Monotonically increasing column to read incrementally on, e.g. `updated_at`"
+    )
+    watermark_store: Optional[InstanceOf[WatermarkStore]] = Field(
+        default=None, description="Store that persists the watermark, required when `incremental_column` is set"
+    )
+    watermark_key: Optional[str] = Field(
+        default=None, description="Key of the watermark in the store, derived from the source if not provided"
+    )
+
+    _pending_watermark: Any = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def _validate_watermark_store(self) -> "IncrementalReaderMixin":
+        """A watermark store is needed to read incrementally"""
+        if self.incremental_column and self.watermark_store is None:
+            raise ValueError("A `watermark_store` is required when `incremental_column` is set")
+        return self
+
+    @property
+    def watermark_source(self) -> str:
+        """Identifies the source in the default watermark key, readers override this to return e.g. the table name"""
+        return self.name
+
+    @property
+    def _watermark_key(self) -> str:
+        return self.watermark_key or f"{self.watermark_source}.{self.incremental_column}"
+
+    @property
+    def last_watermark(self) -> Optional[Any]:
+        """The last committed watermark"""
+        return self.watermark_store.get(self._watermark_key) if self.watermark_store else None
+
+    def _apply_watermark(self, df: DataFrame) -> DataFrame:
+        """Only keep the rows after the last committed watermark, and up to the new watermark"""
+        self._pending_watermark = None
+        if not self.incremental_column:
+            return df
+
+        column = f.col(self.incremental_column)
+        if (last_watermark := self.last_watermark) is not None:
+            self.log.info(f"Reading rows with {self.incremental_column} > {last_watermark}")
+            df = df.filter(column > f.lit(last_watermark))
+        else:
+            self.log.info(f"No watermark found for {self._watermark_key}, reading all rows")
+
+        self._pending_watermark = df.agg(f.max(column)).first()[0]  # type: ignore[index]
+        return df.filter(column <= f.lit(self._pending_watermark)) if self._pending_watermark is not None else df
+
+    @property
+    def new_watermark(self) -> Optional[Any]:
+        """The maximum value of the `incremental_column` in the data that was read"""
+        return self._pending_watermark
+
+    def commit_watermark(self) -> Optional[Any]:
+        """Store the new watermark, call this once the data that was read has been processed successfully
+
+        The watermark is not changed if no rows were read. Returns the committed watermark.
+        """
+        if not self.incremental_column or (new_watermark := self.new_watermark) is None:
+            return None
+
+        self.watermark_store.set(self._watermark_key, new_watermark)  # type: ignore[union-attr]
+        self.log.info(f"Committed watermark {self._watermark_key} = {new_watermark}")
+        self._pending_watermark = None
+        return new_watermark
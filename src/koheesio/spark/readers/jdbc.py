@@ -7,14 +7,37 @@ JdbcReader
     Reader for JDBC tables.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+import math
+
+from pyspark.sql.types import DateType, NumericType, StructField, TimestampType
 
 from koheesio import ExtraParamsMixin
 from koheesio.models import Field, SecretStr, model_validator
+from koheesio.spark import DataFrame
 from koheesio.spark.readers import Reader
+from koheesio.spark.readers.incremental import IncrementalReaderMixin
+from koheesio.spark.utils.connect import is_remote_session
+
+DEFAULT_FETCHSIZE = 10_000
+"""Fetch size used for auto partitioned reads when no `fetchsize` is configured"""
+
+DEFAULT_NUM_PARTITIONS = 8
+"""Number of partitions used for auto partitioned reads when no `numPartitions` is configured"""
+
+HASH_EXPRESSIONS = {
+    "jdbc:sqlserver:": "ABS(CAST(CHECKSUM({column}) AS BIGINT)) % {num_partitions}",
+    "jdbc:oracle:": "ORA_HASH({column}, {num_partitions} - 1)",
+    "jdbc:postgresql:": "MOD(MOD(CAST(HASHTEXT(CAST({column} AS TEXT)) AS BIGINT), {num_partitions}) + {num_partitions}, "
+    "{num_partitions})",
+    "jdbc:mysql:": "MOD(CRC32({column}), {num_partitions})",
+    "jdbc:mariadb:": "MOD(CRC32({column}), {num_partitions})",
+    "jdbc:teradata:": "HASHBUCKET(HASHROW({column})) MOD {num_partitions}",
+}
+"""Per JDBC URL prefix, the SQL expression that maps a (non-numeric) column to a bucket in `[0, num_partitions)`"""
 
 
-class JdbcReader(Reader, ExtraParamsMixin):
+class JdbcReader(Reader, IncrementalReaderMixin, ExtraParamsMixin):
     """
     Reader for JDBC tables.
 
@@ -27,7 +50,8 @@ class JdbcReader(Reader, ExtraParamsMixin):
         for details: https://spark.apache.org/docs/latest/sql-data-sources-jdbc.html
     * Consider using `fetchsize` as one of the options, as it is greatly increases the performance of the reader
     * Consider using `numPartitions`, `partitionColumn`, `lowerBound`, `upperBound` together with real or synthetic
-        partitioning column as it will improve the reader performance
+        partitioning column as it will improve the reader performance, or let the reader do this through
+        `auto_partition` (see below)
 
     When implementing a JDBC reader, the `get_options()` method should be implemented. The method should return a dict
     of options required for the specific JDBC driver. The `get_options()` method can be overridden in the child class.
@@ -57,6 +81,36 @@ class JdbcReader(Reader, ExtraParamsMixin):
     df = jdbc_mssql.read()
     ```
 
+    ### Auto partitioning
+
+    With `auto_partition=True` the table is read in parallel over `num_partitions` connections:
+
+    * The split column is `partition_column`, or the first column of the primary key of `dbtable` (discovered through
+        the JDBC metadata of the driver) when not provided.
+    * For numeric, date and timestamp columns, the bounds are retrieved with a single `MIN`/`MAX` query that is
+        pushed down to the database, and used as `lowerBound`/`upperBound` for the `partitionColumn` of Spark.
+    * For other columns (e.g. string keys), every partition reads the rows for which a hash of the column modulo
+        `num_partitions` matches the partition, through the `predicates` of `spark.read.jdbc`. The hash expression is
+        derived from the JDBC URL for common databases, or can be set through `hash_expression`.
+    * `fetchsize` defaults to 10000 if not set through the field or the options.
+
+    ```python
+    jdbc_mssql = JdbcReader(
+        driver="com.microsoft.sqlserver.jdbc.SQLServerDriver",
+        url="jdbc:sqlserver://10.xxx.xxx.xxx:1433;databaseName=YOUR_DATABASE",
+        user="YOUR_USERNAME",
+        password="***",
+        dbtable="schema_name.table_name",
+        auto_partition=True,
+        num_partitions=16,
+    )
+    ```
+
+    ### Incremental reads
+
+    Set `incremental_column` and `watermark_store` to only read the rows added since the previous run, see
+    [koheesio.spark.readers.incremental](incremental.md). The filter on the watermark is pushed down to the database.
+
     ### ExtraParamsMixin
 
     The `ExtraParamsMixin` is a mixin class that provides a way to pass extra parameters to the reader. The extra
@@ -89,6 +143,26 @@ class JdbcReader(Reader, ExtraParamsMixin):
     params: Dict[str, Any] = Field(
         default_factory=dict, description="Extra options to pass to spark reader", alias="options"
     )
+    fetchsize: Optional[int] = Field(
+        default=None, gt=0, description="Number of rows to fetch per round trip, takes precedence over the options"
+    )
+    auto_partition: bool = Field(
+        default=False, description="Read the table in parallel, split on `partition_column` or the primary key"
+    )
+    partition_column: Optional[str] = Field(
+        default=None, description="Column to split the read on, defaults to the first column of the primary key"
+    )
+    num_partitions: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="Number of partitions for auto partitioning, defaults to `numPartitions` from the options or 8",
+    )
+    hash_expression: Optional[str] = Field(
+        default=None,
+        description="SQL expression mapping the partition column to a bucket, used for non-numeric columns. Use "
+        "`{column}` and `{num_partitions}` as placeholders, e.g. `MOD(ORA_HASH({column}), {num_partitions})`. Derived "
+        "from the url for common databases when not provided.",
+    )
 
     def get_options(self) -> Dict[str, Any]:
         """
@@ -97,6 +171,8 @@ class JdbcReader(Reader, ExtraParamsMixin):
         Note: override this method if driver requires custom names, e.g. Snowflake: `sfUrl`, `sfUser`, etc.
         """
         _options = {"driver": self.driver, "url": self.url, "user": self.user, "password": self.password, **self.params}
+        if self.fetchsize:
+            _options["fetchsize"] = self.fetchsize
 
         if query := self.query:
             _options["query"] = query
@@ -130,8 +206,58 @@ class JdbcReader(Reader, ExtraParamsMixin):
         """Shorthand for accessing self.params provided for backwards compatibility"""
         return self.params
 
-    def execute(self) -> "JdbcReader.Output":
-        """Wrapper around Spark's jdbc read format"""
+    @property
+    def watermark_source(self) -> str:
+        """The url and table or query, used in the default watermark key"""
+        return f"{self.url}/{self.query or self.dbtable}"
+
+    @property
+    def source(self) -> str:
+        """The table or query to read from, queries are wrapped as a subquery"""
+        return f"({self.query}) t" if self.query else self.dbtable  # type: ignore[return-value]
+
+    def primary_key(self) -> List[str]:
+        """Columns of the primary key of `dbtable`, retrieved through the metadata of the JDBC driver
+
+        Returns an empty list when the primary key can not be retrieved, e.g. when reading a query or on Spark Connect.
+        """
+        if self.query or not self.dbtable or is_remote_session(self.spark):
+            return []
+
+        schema, _, table = self.dbtable.rpartition(".")
+        try:
+            jvm = self.spark._jvm  # type: ignore[union-attr]
+            # makes the driver (loaded through the Spark classloader) available to the DriverManager
+            jvm.org.apache.spark.sql.execution.datasources.jdbc.DriverRegistry.register(self.driver)
+            properties = jvm.java.util.Properties()
+            properties.setProperty("user", self.user)
+            if self.password:
+                properties.setProperty("password", self.password.get_secret_value())
+
+            connection = jvm.java.sql.DriverManager.getConnection(self.url, properties)
+            try:
+                metadata = connection.getMetaData()
+                # identifiers can be stored in upper or lower case, depending on the database
+                for _schema, _table in [
+                    (schema, table),
+                    (schema.upper(), table.upper()),
+                    (schema.lower(), table.lower()),
+                ]:
+                    result = metadata.getPrimaryKeys(None, _schema or None, _table)
+                    key_columns = {}
+                    while result.next():
+                        key_columns[result.getInt("KEY_SEQ")] = result.getString("COLUMN_NAME")
+                    if key_columns:
+                        return [key_columns[seq] for seq in sorted(key_columns)]
+            finally:
+                connection.close()
+        except Exception as e:  # pylint: disable=broad-except
+            self.log.warning(f"Unable to retrieve the primary key of {self.dbtable}: {e}")
+
+        return []
+
+    def _spark_options(self) -> Dict[str, Any]:
+        """The options for the spark reader, including the secrets"""
         options = self.get_options()
 
         if pw := self.password:
@@ -140,4 +266,90 @@ class JdbcReader(Reader, ExtraParamsMixin):
             options["pem_private_key"] = pk.get_secret_value()
             options["private_key"] = pk.get_secret_value()
 
-        self.output.df = self.spark.read.format(self.format).options(**options).load()
+        return options
+
+    def _load(self, options: Dict[str, Any]) -> DataFrame:
+        return self.spark.read.format(self.format).options(**options).load()
+
+    def _read_auto_partitioned(self, options: Dict[str, Any]) -> DataFrame:
+        """Read the source in parallel, split on the partition column"""
+        options.setdefault("fetchsize", DEFAULT_FETCHSIZE)
+        num_partitions = int(self.num_partitions or options.pop("numPartitions", DEFAULT_NUM_PARTITIONS))
+
+        # partitionColumn can not be combined with the query option, the query is passed as a subquery instead
+        source = self.source
+        options.pop("query", None)
+        options["dbtable"] = source
+
+        column = self.partition_column
+        if not column:
+            if not (primary_key := self.primary_key()):
+                raise ValueError(
+                    f"Unable to determine the primary key of {source} for auto partitioning, provide `partition_column`"
+                )
+            column = primary_key[0]
+
+        # only the schema is resolved here, no data is read
+        field = self._find_field(self._load(options).schema.fields, column)
+
+        if isinstance(field.dataType, (NumericType, DateType, TimestampType)):
+            bounds_options = {k: v for k, v in options.items() if k != "dbtable"}
+            bounds_options["query"] = f"SELECT MIN({column}) AS lower_bound, MAX({column}) AS upper_bound FROM {source}"
+            lower_bound, upper_bound = self._load(bounds_options).first()  # type: ignore[misc]
+
+            if lower_bound is None:
+                self.log.info(f"No data found in {source}, reading it as a single partition")
+                return self._load(options)
+
+            if isinstance(field.dataType, NumericType):
+                lower_bound, upper_bound = math.floor(lower_bound), math.ceil(upper_bound)
+
+            self.log.info(
+                f"Reading {source} in {num_partitions} partitions on {column} between {lower_bound} and {upper_bound}"
+            )
+            options.update(
+                partitionColumn=column,
+                lowerBound=str(lower_bound),
+                upperBound=str(upper_bound),
+                numPartitions=num_partitions,
+            )
+            return self._load(options)
+
+        predicates = self.hash_predicates(column, num_partitions)
+        self.log.info(f"Reading {source} in {num_partitions} partitions on a hash of {column}")
+        properties = {k: str(v) for k, v in options.items() if k not in ("url", "dbtable") and v is not None}
+        return self.spark.read.jdbc(url=self.url, table=source, predicates=predicates, properties=properties)
+
+    @staticmethod
+    def _find_field(fields: List[StructField], column: str) -> StructField:
+        for field in fields:
+            if field.name.lower() == column.strip('"`[]').lower():
+                return field
+        raise ValueError(f"Partition column {column} not found, available columns: {[f.name for f in fields]}")
+
+    def hash_predicates(self, column: str, num_partitions: int) -> List[str]:
+        """One predicate per partition, selecting the rows for which the hash of the column falls in that partition
+
+        Rows with a NULL value in the column are read by the first partition.
+        """
+        hash_expression = self.hash_expression or next(
+            (expression for prefix, expression in HASH_EXPRESSIONS.items() if self.url.lower().startswith(prefix)),
+            None,
+        )
+        if not hash_expression:
+            raise ValueError(
+                f"No hash expression known for {':'.join(self.url.split(':')[:2])}, provide `hash_expression` to auto partition "
+                f"on non-numeric column {column}"
+            )
+
+        bucket = hash_expression.format(column=column, num_partitions=num_partitions)
+        predicates = [f"({bucket}) = {i}" for i in range(num_partitions)]
+        predicates[0] = f"{predicates[0]} OR {column} IS NULL"
+        return predicates
+
+    def execute(self) -> "JdbcReader.Output":
+        """Wrapper around Spark's jdbc read format"""
+        options = self._spark_options()
+
+        df = self._read_auto_partitioned(options) if self.auto_partition else self._load(options)
+        self.output.df = self._apply_watermark(df)
@@ -2,11 +2,17 @@
 Module for KafkaReader and KafkaStreamReader.
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
+
+from pyspark.sql import Column
+from pyspark.sql import functions as f
+from pyspark.sql.types import StructType
 
 from koheesio.models import ExtraParamsMixin, Field
-from koheesio.spark import DataFrameReader, DataStreamReader
+from koheesio.spark import DataFrame, DataFrameReader, DataStreamReader
+from koheesio.spark.kafka import KafkaDeserializer, KafkaFormat, SchemaRegistry
 from koheesio.spark.readers import Reader
+from koheesio.spark.utils.connect import is_remote_session
 
 
 class KafkaReader(Reader, ExtraParamsMixin):
@@ -28,6 +34,15 @@ class KafkaReader(Reader, ExtraParamsMixin):
         Arbitrary options to be applied when creating NSP Reader. If a user provides values for `subscribe` or
         `kafka.bootstrap.servers`, they will be ignored in favor of configuration passed through `topic` and
         `read_broker` respectively. Defaults to an empty dictionary.
+    key_deserializer : Optional[KafkaDeserializer]
+        How to deserialize the `key` column, it is kept as binary if not set
+    value_deserializer : Optional[KafkaDeserializer]
+        How to deserialize the `value` column, it is kept as binary if not set
+    headers : Union[bool, List[str]], optional, default=False
+        Extract the Kafka headers: `True` adds the `headers` column with string values, a list of header keys adds a
+        string column for each of these headers (the last value if a header occurs more than once)
+    columns : Optional[List[str]]
+        Columns to select after deserialization, e.g. `["key", "value.id", "timestamp"]`
 
     Notes
     -----
@@ -59,6 +74,31 @@ class KafkaReader(Reader, ExtraParamsMixin):
     > Note: The `KafkaStreamReader` could be used in the example above to achieve the same result. `streaming` would
         default to `True` in that case and could be omitted from the parameters.
 
+    Deserialization
+    ---------------
+    Keys and values can be deserialized by the reader, see `koheesio.spark.kafka`. The deserialization and the header
+    extraction compile to native Spark expressions (`from_json`, `from_avro`, ...) in a single projection. Fields of a
+    JSON key or value that are not selected in `columns` are left out of the schema, so they are not parsed at all:
+
+    ```python
+    from koheesio.spark.kafka import KafkaDeserializer
+
+    kafka_reader = KafkaReader(
+        read_broker="kafka-broker-1:9092",
+        topic="my-topic",
+        key_deserializer=KafkaDeserializer(format="string"),
+        value_deserializer=KafkaDeserializer(
+            format="json",
+            schema="id BIGINT, amount DOUBLE, details STRING",
+        ),
+        headers=["trace_id"],
+        columns=["key", "value.id", "value.amount", "trace_id"],
+    )
+    ```
+
+    When no schema is given for JSON, it is inferred from a sample of the topic, use a `schema_cache` on the
+    deserializer to only do this once.
+
     See Also
     --------
     - Official Spark Documentation: https://spark.apache.org/docs/latest/structured-streaming-kafka-integration.html
@@ -81,6 +121,20 @@ class KafkaReader(Reader, ExtraParamsMixin):
         "'subscribe' or 'kafka.bootstrap.servers', they will be ignored in favor of configuration passed through "
         "'topic' and 'read_broker' respectively.",
     )
+    key_deserializer: Optional[KafkaDeserializer] = Field(
+        default=None, description="How to deserialize the `key` column, it is kept as binary if not set"
+    )
+    value_deserializer: Optional[KafkaDeserializer] = Field(
+        default=None, description="How to deserialize the `value` column, it is kept as binary if not set"
+    )
+    headers: Union[bool, List[str]] = Field(
+        default=False,
+        description="Extract the Kafka headers: `True` adds the `headers` column with string values, a list of header "
+        "keys adds a string column for each of these headers",
+    )
+    columns: Optional[List[str]] = Field(
+        default=None, description="Columns to select after deserialization, e.g. `['key', 'value.id', 'timestamp']`"
+    )
 
     @property
     def stream_reader(self) -> DataStreamReader:
@@ -102,11 +156,14 @@ class KafkaReader(Reader, ExtraParamsMixin):
     @property
     def options(self) -> Dict[str, str]:
         """Merge fixed parameters with arbitrary options provided by user."""
-        return {
+        options = {
             **self.params,
             "subscribe": self.topic,
             "kafka.bootstrap.servers": self.read_broker,
         }
+        if self.headers:
+            options["includeHeaders"] = "true"
+        return options
 
     @property
     def logged_option_keys(self) -> set:
@@ -127,7 +184,113 @@ class KafkaReader(Reader, ExtraParamsMixin):
         applied_options = {k: v for k, v in self.options.items() if k in self.logged_option_keys}
         self.log.debug(f"Applying options {applied_options}")
 
-        self.output.df = self.reader.format("kafka").options(**self.options).load()  # type: ignore
+        df = self.reader.format("kafka").options(**self.options).load()  # type: ignore
+        self.output.df = self.deserialize(df)
+
+    def _sample(self, df: DataFrame) -> DataFrame:
+        """The data to infer schemas from: the DataFrame itself for batch reads, a batch read of the topic otherwise"""
+        if not df.isStreaming:
+            return df
+        options = {**self.options, "startingOffsets": "earliest", "endingOffsets": "latest"}
+        return self.batch_reader.format("kafka").options(**options).load()
+
+    def _json_schema(self, name: str, deserializer: KafkaDeserializer, df: DataFrame) -> StructType:
+        """Infer the schema of the JSON in the `key` or `value` column from a sample, or take it from the cache"""
+        cache_key = f"kafka:{self.read_broker}:{self.topic}:{name}"
+        if deserializer.schema_cache and (cached := deserializer.schema_cache.get(cache_key)):
+            return cached[1]
+
+        if is_remote_session():
+            raise ValueError(f"Unable to infer the JSON schema of `{name}` on Spark Connect, provide a schema")
+
+        self.log.info(f"Inferring the JSON schema of `{name}` from {deserializer.sample_size} messages")
+        sample = (
+            self._sample(df)
+            .select(deserializer.payload(f.col(name)).cast("string"))
+            .where(f.col(name).isNotNull())
+            .limit(deserializer.sample_size)
+        )
+        schema = self.spark.read.json(sample.rdd.map(lambda row: row[0])).schema
+
+        if deserializer.schema_cache:
+            deserializer.schema_cache.put(cache_key, schema)
+        return schema
+
+    def _writer_schemas(
+        self, name: str, deserializer: KafkaDeserializer, subject: str, schema_id: Optional[int]
+    ) -> Optional[Dict[int, str]]:
+        """The writer schemas by schema id for Avro in the Confluent wire format, None when these are not needed
+
+        The schema ids are taken from the registry, so the data does not have to be read an extra time to find them.
+        """
+        if not deserializer.decodes_by_schema_id:
+            return None
+        registry: SchemaRegistry = deserializer.registry  # type: ignore[assignment]
+        schema_ids = {*deserializer.schema_ids, *registry.get_ids(subject), *([] if schema_id is None else [schema_id])}
+        self.log.debug(f"Deserializing `{name}` with the schemas with ids {sorted(schema_ids)}")
+        return {i: registry.get_by_id(i) for i in sorted(schema_ids)}
+
+    def _deserialize_column(self, name: str, deserializer: KafkaDeserializer, df: DataFrame) -> Column:
+        """The expression to deserialize the `key` or `value` column"""
+        subject = deserializer.subject or f"{self.topic}-{name}"
+        schema_id, schema = deserializer.resolve_schema(subject=subject)
+        if schema is None and deserializer.format == KafkaFormat.JSON:
+            schema = self._json_schema(name, deserializer, df)
+        if isinstance(schema, StructType):
+            schema = self._prune(name, schema)
+        writer_schemas = self._writer_schemas(name, deserializer, subject, schema_id)
+        return deserializer.column(f.col(name), schema, writer_schemas).alias(name)
+
+    def _prune(self, name: str, schema: StructType) -> StructType:
+        """Only keep the fields of the JSON schema that are selected in `columns`, so the others are not parsed"""
+        if not self.columns or name in self.columns:
+            return schema
+        selected = {column.split(".")[1] for column in self.columns if column.startswith(f"{name}.")}
+        if "*" in selected:
+            return schema
+        return StructType([field for field in schema.fields if field.name in selected])
+
+    def _header_columns(self) -> List[Column]:
+        """The expressions to extract the headers"""
+        if self.headers is True:
+            return [
+                f.transform(
+                    "headers", lambda h: f.struct(h["key"].alias("key"), h["value"].cast("string").alias("value"))
+                ).alias("headers")
+            ]
+        return [
+            f.aggregate(
+                f.filter("headers", lambda h: h["key"] == f.lit(header)),
+                f.lit(None).cast("binary"),
+                lambda _, h: h["value"],
+            )
+            .cast("string")
+            .alias(header)
+            for header in self.headers  # type: ignore[union-attr]
+        ]
+
+    def deserialize(self, df: DataFrame) -> DataFrame:
+        """Deserialize the key and value, extract the headers and select the `columns` of a DataFrame read from Kafka
+
+        The DataFrame is returned as is when none of these are configured.
+        """
+        deserializers = {"key": self.key_deserializer, "value": self.value_deserializer}
+        if not (any(deserializers.values()) or self.headers or self.columns):
+            return df
+
+        projection: List[Column] = []
+        for name in df.columns:
+            if deserializer := deserializers.get(name):
+                projection.append(self._deserialize_column(name, deserializer, df))
+            elif name == "headers" and self.headers:
+                projection.extend(self._header_columns())
+            else:
+                projection.append(f.col(name))
+
+        df = df.select(*projection)
+        if self.columns:
+            df = df.select(*self.columns)
+        return df
 
 
 class KafkaStreamReader(KafkaReader):
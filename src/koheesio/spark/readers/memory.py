@@ -2,19 +2,23 @@
 Create Spark DataFrame directly from the data stored in a Python variable
 """
 
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 from enum import Enum
-from functools import partial
-from io import StringIO
+from functools import partial, reduce
+import io
 import json
+import os
+import tempfile
+import uuid
 
-import pandas as pd
-
-from pyspark.sql.types import StructType
+from pyspark.sql.types import IntegerType, LongType, StructType
 
 from koheesio.models import ExtraParamsMixin, Field
 from koheesio.spark import DataFrame
 from koheesio.spark.readers import Reader
+from koheesio.spark.utils import SPARK_MINOR_VERSION
+from koheesio.spark.utils.connect import is_remote_session
+from koheesio.spark.utils.staging import StagingDir, create_staging_dir, is_local_master
 
 
 class DataFormat(Enum):
@@ -24,6 +28,17 @@ class DataFormat(Enum):
     CSV = "csv"
 
 
+class ParserEngine(Enum):
+    """Engines the InMemoryDataReader can parse the data with
+
+    - SPARK: Spark's own CSV / JSON readers, the data is handed to Spark as lines of text
+    - ARROW: pyarrow's CSV / JSON readers, the resulting Arrow batches are converted to a Spark DataFrame
+    """
+
+    SPARK = "spark"
+    ARROW = "arrow"
+
+
 class InMemoryDataReader(Reader, ExtraParamsMixin):
     """Directly read data from a Python variable and convert it to a Spark DataFrame.
 
@@ -47,6 +62,27 @@ class InMemoryDataReader(Reader, ExtraParamsMixin):
         Set of extra parameters that should be passed to the appropriate reader (csv / json). Optionally, the user can
         pass the parameters that are specific to the reader (e.g. `multiLine` for JSON reader) as key-word arguments.
         These will be merged with the `params` parameter.
+    engine : ParserEngine, optional, default=ParserEngine.SPARK
+        Engine to parse the data with, Spark's CSV / JSON readers or pyarrow
+    spool_threshold : int, optional, default=64MB
+        Payloads larger than this number of bytes are written to a file in `staging_path` first, and read from there
+    staging_path : Optional[str]
+        Directory for spooled payloads, should be accessible by Spark, e.g. `dbfs:/tmp/` on Databricks. A temporary
+        directory is used in local mode. Spooled files are removed when the Python process exits, as Spark reads them
+        lazily.
+    chunk_size : int, optional, default=16MB
+        Number of bytes the ARROW engine parses at a time, should be larger than the largest record
+
+    Notes
+    -----
+    * The data is parsed without pandas: the SPARK engine hands the records of the payload to Spark's readers, so the
+        `params` are Spark's CSV / JSON options. For CSV, `header` and `inferSchema` default to True and quotes are
+        escaped by doubling them, as with pandas. Without a `schema`, inferred integer columns are read as longs.
+    * On Spark Connect, the Spark session has no access to the driver's memory: the SPARK engine spools the payload to
+        `staging_path`. Without a `staging_path` (and for large payloads on a cluster), the payload is parsed on the
+        driver with the ARROW engine instead.
+    * With the ARROW engine, `header`, `sep` (or `delimiter`) and `quote` are supported for CSV. On Spark < 4.0, the Arrow
+        batches are converted to Spark through `pandas`, which then needs to be installed.
 
     Example
     -------
@@ -57,6 +93,9 @@ class InMemoryDataReader(Reader, ExtraParamsMixin):
     # Read JSON data from a string
     df2 = InMemoryDataReader(format=DataFormat.JSON, data='{"foo": A, "bar": 1}'
     df3 = InMemoryDataReader(format=DataFormat.JSON, data=['{"foo": "A", "bar": 1}', '{"foo": "B", "bar": 2}']
+
+    # Parse a large payload with pyarrow, 16MB at a time
+    df4 = InMemoryDataReader(format=DataFormat.CSV, data=large_payload, engine=ParserEngine.ARROW)
     ```
     """
 
@@ -73,41 +112,193 @@ class InMemoryDataReader(Reader, ExtraParamsMixin):
         description="[Optional] Set of extra parameters that should be passed to the appropriate reader (csv / json)",
     )
 
-    def _csv(self) -> DataFrame:
-        """Method for reading CSV data"""
-        if isinstance(self.data, list):
-            csv_data: str = "\n".join(self.data)
-        else:
-            csv_data: str = self.data  # type: ignore
+    engine: ParserEngine = Field(default=ParserEngine.SPARK, description="Engine to parse the data with")
+    spool_threshold: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Payloads larger than this number of bytes are written to a file in `staging_path` first",
+    )
+    staging_path: Optional[str] = Field(
+        default=None,
+        description="Directory for spooled payloads, should be accessible by Spark, e.g. `dbfs:/tmp/` on Databricks. "
+        "A temporary directory is used in local mode.",
+    )
+    chunk_size: int = Field(
+        default=16 * 1024 * 1024, gt=0, description="Number of bytes the ARROW engine parses at a time"
+    )
 
-        if "header" in self.params and self.params["header"] is True:
-            self.params["header"] = 0
+    @property
+    def _header(self) -> bool:
+        """Whether the CSV data has a header, the first line is the header unless specified otherwise"""
+        header = self.params.get("header", True)
+        return header is True or header == 0 or str(header).lower() in ("true", "infer")
 
-        pandas_df = pd.read_csv(StringIO(csv_data), **self.params)  # type: ignore
-        df = self.spark.createDataFrame(pandas_df, schema=self.schema_)  # type: ignore
+    def _json_lines(self) -> List[str]:
+        """The JSON records, one per line"""
+        if isinstance(self.data, dict):
+            return [json.dumps(self.data)]
+        if isinstance(self.data, str):
+            document = json.loads(self.data)
+            return [json.dumps(r) for r in document] if isinstance(document, list) else [json.dumps(document)]
+        # records spanning multiple lines are compacted, others are passed as is
+        return [
+            (json.dumps(json.loads(r)) if "\n" in r else r) if isinstance(r, str) else json.dumps(r)
+            for r in self.data  # type: ignore[union-attr]
+        ]
 
-        return df
+    def _lines(self) -> Union[str, List[str]]:
+        """The payload as text, or as a list of lines / records"""
+        if self.format == DataFormat.CSV.value:
+            return self.data if isinstance(self.data, (str, list)) else str(self.data)  # type: ignore[return-value]
+        if isinstance(self.data, str) and self.engine == ParserEngine.SPARK.value:
+            # a single JSON document, Spark reads it as is (a list of records becomes multiple rows)
+            return [self.data]
+        return self._json_lines()
 
-    def _json(self) -> DataFrame:
-        """Method for reading JSON data"""
-        if isinstance(self.data, str):
-            json_data = [json.loads(self.data)]
-        elif isinstance(self.data, list):
-            if all(isinstance(x, str) for x in self.data):
-                json_data = [json.loads(x) for x in self.data]
+    def _csv_records(self, text: str) -> List[str]:
+        """Split CSV text into records, keeping line breaks that are part of a quoted field"""
+        quote = self.params.get("quote", '"')
+        records: List[str] = []
+        record: List[str] = []
+        quotes = 0
+        for line in text.splitlines():
+            record.append(line)
+            # doubled (escaped) quotes do not change whether the record is complete
+            quotes += line.count(quote)
+            if quotes % 2 == 0:
+                records.append("\n".join(record))
+                record, quotes = [], 0
+        if record:
+            records.append("\n".join(record))
+        return records
+
+    @staticmethod
+    def _size(lines: Union[str, List[str]]) -> int:
+        return len(lines) if isinstance(lines, str) else sum(len(line) + 1 for line in lines)
+
+    def _spool(self, lines: Union[str, Iterable[str]], driver_only: bool = False) -> StagingDir:
+        """Write the lines to a file in a staging directory, returns the (driver and Spark) path of the file
+
+        With `driver_only`, the file is only read on the driver, and a temporary directory is fine on a cluster too.
+        """
+        staging_path = self.staging_path or (tempfile.gettempdir() if driver_only else None)
+        staging_dir = create_staging_dir(self.spark, staging_path, prefix="koheesio_memory_")
+
+        file_name = f"{uuid.uuid4().hex}.{self.format}"
+        with open(os.path.join(staging_dir.local_path, file_name), "w", encoding="utf-8") as f:
+            if isinstance(lines, str):
+                f.write(lines)
             else:
-                json_data = self.data
+                for line in lines:
+                    f.write(line)
+                    f.write("\n")
+
+        self.log.info(f"Spooled the {self.format} payload to {staging_dir.spark_path}")
+        return StagingDir(
+            local_path=os.path.join(staging_dir.local_path, file_name),
+            spark_path=f"{staging_dir.spark_path}/{file_name}",
+        )
+
+    def _read_with_spark(self) -> DataFrame:
+        """Parse the data with Spark's CSV / JSON reader"""
+        options = dict(self.params)
+        if self.format == DataFormat.CSV.value:
+            options["header"] = self._header
+            options.setdefault("inferSchema", True)
+            options.setdefault("escape", '"')
+
+        lines = self._lines()
+        spool = self._size(lines) > self.spool_threshold or is_remote_session(self.spark)
+        if spool and not (self.staging_path or is_local_master(self.spark)):
+            self.log.info("No `staging_path` to spool the payload to, parsing it on the driver instead")
+            return self._read_with_arrow()
+
+        # a single JSON document or a quoted CSV field can span multiple lines
+        multi_line = spool and (self.format == DataFormat.CSV.value or isinstance(self.data, str))
+        if multi_line:
+            options["multiLine"] = True
+
+        reader = self.spark.read.options(**options)
+        if self.schema_:
+            reader = reader.schema(self.schema_)
+        read = reader.csv if self.format == DataFormat.CSV.value else reader.json
+
+        if spool:
+            spooled = lines[0] if multi_line and self.format == DataFormat.JSON.value else lines
+            df = read(self._spool(spooled).spark_path)
+        else:
+            records = self._csv_records(lines) if isinstance(lines, str) else lines
+            df = read(self.spark.sparkContext.parallelize(records))  # type: ignore[union-attr]
+
+        if self.schema_ or self.format == DataFormat.JSON.value:
+            return df
+        # pandas (and Spark's JSON reader) infer integers as 64-bit
+        return df.select(
+            *[
+                df[f.name].cast(LongType()) if isinstance(f.dataType, IntegerType) else df[f.name]
+                for f in df.schema.fields
+            ]
+        )
+
+    def _arrow_to_spark(self, table: Any) -> DataFrame:
+        """Convert an Arrow table to a Spark DataFrame"""
+        import pyarrow as pa
+
+        # Spark can not derive a type for columns without any values
+        if any(pa.types.is_null(field.type) for field in table.schema):
+            table = table.cast(
+                pa.schema(
+                    [field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema]
+                )
+            )
+
+        if SPARK_MINOR_VERSION >= 4.0:
+            return self.spark.createDataFrame(table, schema=self.schema_)  # type: ignore[arg-type]
+        return self.spark.createDataFrame(table.to_pandas(), schema=self.schema_)  # type: ignore[arg-type]
+
+    def _read_with_arrow(self) -> DataFrame:
+        """Parse the data with pyarrow, `chunk_size` bytes at a time"""
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+        from pyarrow import json as pa_json
+
+        if self.format == DataFormat.CSV.value:
+            lines = self.data if isinstance(self.data, (str, bytes)) else "\n".join(self._lines())
         else:
-            json_data = [self.data]
+            lines = "\n".join(self._json_lines())
 
-        # Use pyspark.pandas to read the JSON data from the string
-        # noinspection PyUnboundLocalVariable
-        pandas_df = pd.read_json(StringIO(json.dumps(json_data)), **self.params)  # type: ignore
+        if self._size(lines) > self.spool_threshold:  # type: ignore[arg-type]
+            spooled = self._spool(lines.decode("utf-8") if isinstance(lines, bytes) else lines, driver_only=True)  # type: ignore[arg-type]
+            source = spooled.local_path
+        else:
+            source = io.BytesIO(lines.encode("utf-8") if isinstance(lines, str) else lines)  # type: ignore[assignment]
+
+        if self.format == DataFormat.CSV.value:
+            batches = pa_csv.open_csv(
+                source,
+                read_options=pa_csv.ReadOptions(block_size=self.chunk_size, autogenerate_column_names=not self._header),
+                parse_options=pa_csv.ParseOptions(
+                    delimiter=self.params.get("sep", self.params.get("delimiter", ",")),
+                    quote_char=self.params.get("quote", '"'),
+                    newlines_in_values=True,
+                ),
+            )
+        else:
+            # the JSON records are parsed per chunk, into a single table with a consistent schema
+            batches = [pa_json.read_json(source, read_options=pa_json.ReadOptions(block_size=self.chunk_size))]
 
-        # Convert pyspark.pandas DataFrame to Spark DataFrame
-        df = self.spark.createDataFrame(pandas_df, schema=self.schema_)  # type: ignore
+        dfs = [self._arrow_to_spark(b if isinstance(b, pa.Table) else pa.Table.from_batches([b])) for b in batches]
+        if not dfs:
+            return self.spark.createDataFrame([], schema=self.schema_ or StructType([]))
+        return reduce(lambda a, b: a.unionByName(b), dfs)
 
-        return df
+    def _csv(self) -> DataFrame:
+        """Method for reading CSV data"""
+        return self._read_with_arrow() if self.engine == ParserEngine.ARROW.value else self._read_with_spark()
+
+    def _json(self) -> DataFrame:
+        """Method for reading JSON data"""
+        return self._read_with_arrow() if self.engine == ParserEngine.ARROW.value else self._read_with_spark()
 
     def execute(self) -> Reader.Output:
         """
@@ -116,7 +307,7 @@ class InMemoryDataReader(Reader, ExtraParamsMixin):
         if self.data is None:
             raise ValueError("Data is not provided")
 
-        if isinstance(self.data, bytes):
+        if isinstance(self.data, bytes) and self.engine == ParserEngine.SPARK.value:
             self.data = self.data.decode("utf-8")
 
         _func = getattr(InMemoryDataReader, f"_{self.format}")
@@ -0,0 +1,145 @@
+"""
+Cache for the schemas that Spark infers for file sources.
+
+When no schema is given, Spark scans the input an extra time to infer the schema of JSON files, and of CSV files when
+`inferSchema` is set. On large landing zones this scan costs as much as the read itself. With a `schema_cache` on a
+`FileLoader` (`JsonReader`, `CsvReader`, ...), the schema is inferred once from a sample of the files and stored, keyed
+by the format and the path (pattern) of the reader. Later runs reuse the stored schema.
+
+Schema drift is detected (with `detect_schema_drift`) by inferring the schema of a sample of the files that are read,
+the most recently modified ones. New fields are merged into the cached schema, which is stored as a new version; the
+types of existing fields are never changed. CSV columns are matched by position, so for CSV files only columns that
+are added at the end are merged.
+
+Example
+-------
+```python
+from koheesio.spark.readers.file_loader import JsonReader
+from koheesio.spark.readers.schema_cache import LocalFileSchemaCache
+
+reader = JsonReader(
+    path="path/to/landing_zone",
+    schema_cache=LocalFileSchemaCache(path="/dbfs/state/schemas"),
+    schema_sample_files=50,
+)
+df = reader.read()
+reader.output.schema_version  # version of the cached schema that was used
+```
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import os
+import threading
+
+from pyspark.sql.types import ArrayType, DataType, MapType, StructField, StructType
+
+from koheesio.models import BaseModel, Field, PrivateAttr
+from koheesio.utils import utc_now
+
+__all__ = ["LocalFileSchemaCache", "SchemaCache", "merge_schemas"]
+
+
+def _merge_types(base: DataType, other: DataType) -> DataType:
+    """Merge the fields of `other` into `base`, recursing into structs, arrays and maps. Types in `base` are kept."""
+    if isinstance(base, StructType) and isinstance(other, StructType):
+        return merge_schemas(base, other)
+    if isinstance(base, ArrayType) and isinstance(other, ArrayType):
+        return ArrayType(_merge_types(base.elementType, other.elementType), base.containsNull)
+    if isinstance(base, MapType) and isinstance(other, MapType):
+        return MapType(base.keyType, _merge_types(base.valueType, other.valueType), base.valueContainsNull)
+    return base
+
+
+def merge_schemas(base: StructType, other: StructType) -> StructType:
+    """Add the fields of `other` that are missing in `base` (also in nested structs) at the end of `base`
+
+    The types of the fields in `base` are kept, conflicting types in `other` are ignored.
+    """
+    other_fields = {field.name: field for field in other.fields}
+    fields = [
+        StructField(
+            field.name, _merge_types(field.dataType, other_fields[field.name].dataType), field.nullable, field.metadata
+        )
+        if field.name in other_fields
+        else field
+        for field in base.fields
+    ]
+    base_names = set(base.fieldNames())
+    fields += [
+        StructField(field.name, field.dataType, True, field.metadata)
+        for field in other.fields
+        if field.name not in base_names
+    ]
+    return StructType(fields)
+
+
+class SchemaCache(BaseModel, ABC):
+    """Stores versions of schemas by key
+
+    Implement `get_versions` and `add_version` to add another backend.
+    """
+
+    @abstractmethod
+    def get_versions(self, key: str) -> List[Dict[str, Any]]:
+        """All versions of the schema for the given key, oldest first, as dicts with `version`, `schema` (the JSON of
+        the `StructType`) and `created_at`"""
+
+    @abstractmethod
+    def add_version(self, key: str, schema: str) -> int:
+        """Store the JSON of a `StructType` as the new version of the schema for the given key, returns the version"""
+
+    def get(self, key: str) -> Optional[Tuple[int, StructType]]:
+        """The latest version of the schema for the given key, None if there is none"""
+        if not (versions := self.get_versions(key)):
+            return None
+        latest = versions[-1]
+        return latest["version"], StructType.fromJson(json.loads(latest["schema"]))
+
+    def put(self, key: str, schema: StructType) -> int:
+        """Store the schema as the new version for the given key, returns the version"""
+        return self.add_version(key, schema.json())
+
+
+class LocalFileSchemaCache(SchemaCache):
+    """Stores the schemas in a directory on a local (or mounted) file system, one JSON document per key
+
+    Parameters
+    ----------
+    path : str
+        Directory to store the schemas in, created on the first `put`
+    """
+
+    path: str = Field(default=..., description="Directory to store the schemas in, created on the first `put`")
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+    def _read(self, key: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(file := self._file(key)):
+            return []
+        with open(file, encoding="utf-8") as f:
+            return json.load(f)["versions"]
+
+    def get_versions(self, key: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._read(key)
+
+    def add_version(self, key: str, schema: str) -> int:
+        with self._lock:
+            versions = self._read(key)
+            version = versions[-1]["version"] + 1 if versions else 1
+            versions.append({"version": version, "schema": schema, "created_at": utc_now().isoformat()})
+
+            os.makedirs(self.path, exist_ok=True)
+            file = self._file(key)
+            with open(f"{file}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"key": key, "versions": versions}, f)
+            os.replace(f"{file}.tmp", file)
+        return version
@@ -4,9 +4,10 @@ This module contains the SparkSqlReader class which reads the SparkSQL compliant
 
 from koheesio.models.sql import SqlBaseStep
 from koheesio.spark.readers import Reader
+from koheesio.spark.readers.incremental import IncrementalReaderMixin
 
 
-class SparkSqlReader(SqlBaseStep, Reader):
+class SparkSqlReader(SqlBaseStep, Reader, IncrementalReaderMixin):
     """
     SparkSqlReader reads the SparkSQL compliant query and returns the dataframe.
 
@@ -52,11 +53,20 @@ class SparkSqlReader(SqlBaseStep, Reader):
         SQL query to execute
     params : dict
         Placeholders (parameters) for templating. These are identified with ${placeholder} in the SQL script.
+    incremental_column : Optional[str]
+        Column to read incrementally on, see [koheesio.spark.readers.incremental](incremental.md)
+    watermark_store : Optional[WatermarkStore]
+        Store that persists the watermark, required when `incremental_column` is set
 
     Notes
     -----
     Any arbitrary kwargs passed to the class will be added to params.
     """
 
+    @property
+    def watermark_source(self) -> str:
+        """The query, used in the default watermark key"""
+        return self.query
+
     def execute(self) -> Reader.Output:
-        self.output.df = self.spark.sql(self.query)
+        self.output.df = self._apply_watermark(self.spark.sql(self.query))
@@ -0,0 +1,118 @@
+"""Staging directories for files that are written on the driver and read by Spark.
+
+Several readers and writers produce files on the driver (downloads, spooled payloads, exports) that Spark then reads,
+lazily, on the executors. The files therefore have to be written to a location that is visible to both the driver
+and the executors, e.g. `dbfs:/tmp/...` on Databricks, which the driver accesses through its `/dbfs` mount.
+
+`create_staging_dir` creates a unique directory for every call, so files of different runs never overwrite each other,
+and removes it when the Python process exits (Spark may still read the files until then). A driver-local temporary
+directory is only used as a default when Spark runs in local mode; on a cluster or with Spark Connect a `staging_path`
+has to be provided.
+
+Example
+-------
+```python
+from koheesio.spark.utils.staging import create_staging_dir
+
+staging = create_staging_dir(
+    spark, staging_path="dbfs:/tmp/koheesio", prefix="box_"
+)
+# staging.local_path: /dbfs/tmp/koheesio/box_<uuid>, staging.spark_path: dbfs:/tmp/koheesio/box_<uuid>
+with open(f"{staging.local_path}/file.csv", "w") as f:
+    ...
+df = spark.read.csv(f"{staging.spark_path}/file.csv")
+```
+"""
+
+from typing import NamedTuple, Optional
+import atexit
+import os
+import re
+import shutil
+import tempfile
+import uuid
+
+from pyspark.sql import SparkSession
+
+from koheesio.spark.utils.connect import is_remote_session
+
+__all__ = ["StagingDir", "create_staging_dir", "is_local_master", "to_local_path"]
+
+
+class StagingDir(NamedTuple):
+    """A staging directory, as seen by the driver (`local_path`) and by Spark (`spark_path`)"""
+
+    local_path: str
+    spark_path: str
+
+    def cleanup(self) -> None:
+        """Remove the directory and its files, only call this once Spark no longer needs the files"""
+        shutil.rmtree(self.local_path, ignore_errors=True)
+
+
+def is_local_master(spark: SparkSession) -> bool:
+    """Whether Spark runs in local mode, i.e. the executors share the filesystem of the driver"""
+    if is_remote_session(spark):
+        return False
+    try:
+        return spark.sparkContext.master.startswith("local")
+    except Exception:  # pragma: no cover - e.g. a session without a SparkContext
+        return False
+
+
+def to_local_path(spark_path: str) -> str:
+    """The path under which the driver accesses a Spark path, `dbfs:/` paths are accessed through the `/dbfs` mount
+
+    Raises a ValueError for paths that are not accessible from the filesystem of the driver, e.g. `s3://` paths.
+    """
+    if spark_path.startswith("dbfs:"):
+        return "/dbfs" + spark_path[len("dbfs:") :]
+    if spark_path.startswith("file:"):
+        return "/" + spark_path[len("file:") :].lstrip("/")
+    if re.match(r"^[A-Za-z][\w+.-]+:", spark_path):
+        raise ValueError(
+            f"Staging path '{spark_path}' is not accessible from the filesystem of the driver, use a local path or a "
+            "mounted location, e.g. `dbfs:/tmp/` on Databricks"
+        )
+    return spark_path
+
+
+def create_staging_dir(
+    spark: SparkSession, staging_path: Optional[str], prefix: str, local_path: Optional[str] = None
+) -> StagingDir:
+    """Create a unique staging directory in `staging_path`, removed when the Python process exits
+
+    Parameters
+    ----------
+    spark : SparkSession
+        The session that reads the staged files
+    staging_path : Optional[str]
+        Location accessible by the driver and by Spark, e.g. `dbfs:/tmp/` on Databricks. Defaults to a temporary
+        directory on the driver, which is only allowed when Spark runs in local mode.
+    prefix : str
+        Prefix of the name of the directory
+    local_path : Optional[str]
+        The path under which the driver accesses `staging_path`, derived from `staging_path` if not provided
+
+    Raises
+    ------
+    ValueError
+        When no `staging_path` is provided and Spark does not run in local mode
+    """
+    if staging_path is None:
+        if not is_local_master(spark):
+            raise ValueError(
+                "A `staging_path` is required when Spark does not run in local mode: a temporary directory on the "
+                "driver is not accessible by the executors. Use a location that is accessible by the driver and by "
+                "Spark, e.g. `dbfs:/tmp/` on Databricks."
+            )
+        staging_path = tempfile.gettempdir()
+
+    name = f"{prefix}{uuid.uuid4().hex}"
+    staging_dir = StagingDir(
+        local_path=os.path.join(local_path or to_local_path(staging_path), name),
+        spark_path=f"{staging_path.rstrip('/')}/{name}",
+    )
+    os.makedirs(staging_dir.local_path, exist_ok=True)
+    atexit.register(staging_dir.cleanup)
+    return staging_dir
@@ -6,10 +6,18 @@ It imports and exposes the DeltaTableWriter and DeltaTableStreamWriter classes f
 Classes:
     DeltaTableWriter: Class to write data in batch mode to a Delta table.
     DeltaTableStreamWriter: Class to write data in streaming mode to a Delta table.
+    DeltaTableMaintenance: Class to run OPTIMIZE/VACUUM on a Delta table, also usable as writer maintenance policy.
 """
 
 from koheesio.spark.writers.delta.batch import BatchOutputMode, DeltaTableWriter
+from koheesio.spark.writers.delta.maintenance import DeltaTableMaintenance
 from koheesio.spark.writers.delta.scd import SCD2DeltaTableWriter
 from koheesio.spark.writers.delta.stream import DeltaTableStreamWriter
 
-__all__ = ["DeltaTableWriter", "DeltaTableStreamWriter", "SCD2DeltaTableWriter", "BatchOutputMode"]
+__all__ = [
+    "DeltaTableWriter",
+    "DeltaTableStreamWriter",
+    "SCD2DeltaTableWriter",
+    "BatchOutputMode",
+    "DeltaTableMaintenance",
+]
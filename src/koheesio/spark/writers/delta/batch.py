@@ -35,17 +35,21 @@ DeltaTableWriter(
 """
 
 from typing import Callable, Dict, List, Optional, Set, Type, Union
-from functools import partial
+from functools import partial, reduce
+import threading
 
 from delta.tables import DeltaMergeBuilder
 from py4j.protocol import Py4JError
 
 from pyspark.sql import DataFrameWriter
+from pyspark.sql import functions as f
 
 from koheesio.models import ExtraParamsMixin, Field, field_validator
+from koheesio.spark import Column
 from koheesio.spark.delta import DeltaTableStep
 from koheesio.spark.utils import on_databricks
 from koheesio.spark.writers import BatchOutputMode, StreamingOutputMode, Writer
+from koheesio.spark.writers.delta.maintenance import DeltaTableMaintenance
 from koheesio.spark.writers.delta.utils import get_delta_table_for_name, log_clauses
 
 
@@ -114,6 +118,32 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
     )
     ```
 
+    ### Example for `MERGEALL` with partition pruning
+    only the partitions of the target that are present in the source are scanned during the merge
+    ```python
+    DeltaTableWriter(
+        table="test_table",
+        output_mode=BatchOutputMode.MERGEALL,
+        output_mode_params={
+            "merge_cond": "target.id=source.id AND target.date=source.date",
+        },
+        merge_partition_pruning=True,
+        merge_pruning_max_values=500,
+    )
+    ```
+
+    ### Example for APPEND with post-write maintenance
+    the table is compacted (and Z-ordered) after the write once 200 files have been added since the last OPTIMIZE
+    ```python
+    DeltaTableWriter(
+        table="test_table",
+        output_mode=BatchOutputMode.APPEND,
+        maintenance=DeltaTableMaintenance(
+            zorder_by=["id"], vacuum=True, min_files_added=200
+        ),
+    )
+    ```
+
     ### Example for APPEND
     dataframe writer options can be passed as keyword arguments
     ```python
@@ -133,6 +163,15 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
         The output mode to use. Default is BatchOutputMode.APPEND. For streaming, use StreamingOutputMode.
     params : Optional[dict]
         Additional parameters to use for specific mode
+    merge_partition_pruning : bool, optional, default=False
+        Inject the partition values of the source into the merge condition, so that MERGE/MERGEALL only scans the
+        target partitions that actually change.
+    merge_pruning_max_values : int, optional, default=1000
+        Maximum number of distinct partition values listed in `IN (...)` predicates, above which a range predicate
+        (min/max) is used instead.
+    maintenance : Optional[DeltaTableMaintenance]
+        Maintenance policy (OPTIMIZE, VACUUM, statistics) to run after every write when its thresholds are crossed,
+        at least one threshold is required. See `koheesio.spark.writers.delta.maintenance` for more details.
     """
 
     table: Union[DeltaTableStep, str] = Field(default=..., description="The table to write to")
@@ -152,7 +191,31 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
     )
     format: str = "delta"  # The format to use for writing the dataframe to the Delta table
 
+    merge_partition_pruning: bool = Field(
+        default=False,
+        description="Restrict the target side of a MERGE/MERGEALL to the partitions present in the source DataFrame. "
+        "The partition values of the source are injected into the merge condition, so only the partitions that "
+        "actually change are scanned. Only use this when a target row can only match source rows of the same "
+        "partition (i.e. the merge condition implies equality on the partition columns) and no "
+        "`whenNotMatchedBySource` clauses are used. Note: the source DataFrame is evaluated to determine the partition "
+        "values, consider caching it. Not applied when a DeltaMergeBuilder instance is provided.",
+    )
+    merge_pruning_max_values: int = Field(
+        default=1000,
+        gt=0,
+        description="Maximum number of distinct partition values to list in the `IN (...)` predicates of the merge "
+        "condition. When the source contains more distinct partition values, a range predicate (min/max) is used "
+        "instead.",
+    )
+    maintenance: Optional[DeltaTableMaintenance] = Field(
+        default=None,
+        description="Maintenance policy (OPTIMIZE, VACUUM, statistics) to run after every write when its thresholds "
+        "are crossed, at least one threshold is required. Runs on a background thread when `background` is set on the "
+        "policy.",
+    )
+
     _merge_builder: Optional[DeltaMergeBuilder] = None
+    _maintenance_thread: Optional[threading.Thread] = None
 
     # noinspection PyProtectedMember
     def __merge(self, merge_builder: Optional[DeltaMergeBuilder] = None) -> Union[DeltaMergeBuilder, DataFrameWriter]:
@@ -223,6 +286,7 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
         source_alias = self.params.get("target_alias", "source")
 
         if self.table.exists:
+            merge_cond = self._prune_merge_cond(merge_cond=merge_cond, target_alias=target_alias)
             builder = (
                 get_delta_table_for_name(spark_session=self.spark, table_name=self.table.table_name)
                 .alias(target_alias)
@@ -274,6 +338,7 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
         merge_cond = self.params.get("merge_cond", None)
         source_alias = self.params.get("source_alias", "source")
         target_alias = self.params.get("target_alias", "target")
+        merge_cond = self._prune_merge_cond(merge_cond=merge_cond, target_alias=target_alias)
 
         builder = (
             get_delta_table_for_name(spark_session=self.spark, table_name=self.table.table_name)
@@ -290,6 +355,71 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
 
         return builder
 
+    def _get_partition_pruning_predicate(self, target_alias: str) -> Optional[Column]:
+        """Build a predicate on the target's partition columns, based on the partition values present in the source
+
+        The distinct partition values of the source are listed in `IN (...)` predicates when there are at most
+        `merge_pruning_max_values` of them. Otherwise, a range predicate (min/max) per partition column is used.
+
+        Returns None when the target is not partitioned, the source does not contain the partition columns, or the
+        source is empty.
+        """
+        partition_columns = [c for c in self.table.partition_columns if c in self.df.columns]  # type: ignore
+        if not partition_columns:
+            self.log.debug(f"No partition columns of `{self.table.table_name}` found in source, skipping pruning")
+            return None
+
+        max_values = self.merge_pruning_max_values
+        distinct_values = self.df.select(*partition_columns).distinct().limit(max_values + 1).collect()  # type: ignore
+        if not distinct_values:
+            return None
+
+        predicates = []
+
+        if len(distinct_values) <= max_values:
+            for column in partition_columns:
+                target_column = f.col(f"{target_alias}.`{column}`")
+                values = {row[column] for row in distinct_values}
+                predicate = target_column.isin(sorted(v for v in values if v is not None))
+                if None in values:
+                    predicate = predicate | target_column.isNull()
+                predicates.append(predicate)
+        else:
+            self.log.debug(
+                f"More than {max_values} distinct partition values found in source, using a range predicate instead"
+            )
+            bounds = self.df.agg(  # type: ignore
+                *[
+                    agg(f.col(f"`{column}`")).alias(f"{name}_{i}")
+                    for i, column in enumerate(partition_columns)
+                    for name, agg in [("min", f.min), ("max", f.max)]
+                ],
+                *[
+                    f.max(f.col(f"`{column}`").isNull().cast("int")).alias(f"has_null_{i}")
+                    for i, column in enumerate(partition_columns)
+                ],
+            ).first()
+            for i, column in enumerate(partition_columns):
+                target_column = f.col(f"{target_alias}.`{column}`")
+                predicate = target_column.between(f.lit(bounds[f"min_{i}"]), f.lit(bounds[f"max_{i}"]))
+                if bounds[f"has_null_{i}"]:
+                    predicate = predicate | target_column.isNull()
+                predicates.append(predicate)
+
+        return reduce(lambda a, b: a & b, predicates)
+
+    def _prune_merge_cond(self, merge_cond: Union[str, Column], target_alias: str) -> Union[str, Column]:
+        """Add a partition pruning predicate to the merge condition, if `merge_partition_pruning` is enabled"""
+        if not self.merge_partition_pruning:
+            return merge_cond
+
+        if (predicate := self._get_partition_pruning_predicate(target_alias=target_alias)) is None:
+            return merge_cond
+
+        self.log.debug(f"Adding partition pruning predicate to merge condition: {predicate}")
+        merge_cond = f.expr(merge_cond) if isinstance(merge_cond, str) else merge_cond
+        return merge_cond & predicate
+
     @field_validator("output_mode")
     def _validate_output_mode(cls, mode: Union[str, BatchOutputMode, StreamingOutputMode]) -> str:
         """Validate `output_mode` value"""
@@ -314,6 +444,16 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
             return DeltaTableStep(table=table)
         return table
 
+    @field_validator("maintenance")
+    def _validate_maintenance(cls, maintenance: Optional[DeltaTableMaintenance]) -> Optional[DeltaTableMaintenance]:
+        """Validate that the maintenance policy has a threshold, it would otherwise run after every write"""
+        if maintenance is not None and not maintenance.has_thresholds:
+            raise ValueError(
+                "A maintenance policy requires at least one threshold (`min_files_added`, `min_commits` or "
+                "`max_small_file_ratio`), otherwise the table is optimized after every write"
+            )
+        return maintenance
+
     @field_validator("params")
     def _validate_params(cls, params: dict) -> dict:
         """Validates params. If an array of merge clauses is provided, they will be validated against the available
@@ -396,3 +536,26 @@ class DeltaTableWriter(Writer, ExtraParamsMixin):
                 # should we add options only if mode is not merge?
                 _writer = _writer.options(**options)
             _writer.saveAsTable(self.table.table_name)
+
+        self._run_maintenance()
+
+    def _run_maintenance(self) -> None:
+        """Run the maintenance policy (if any) for the table that was written to"""
+        if self.maintenance is None:
+            return
+
+        # the maintenance of the previous write is finished before starting a new one
+        self.await_maintenance()
+        maintenance = self.maintenance.for_table(self.table)
+        if maintenance.background:
+            self._maintenance_thread = maintenance.run_in_background()
+        else:
+            maintenance.execute()
+
+    def await_maintenance(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background maintenance started by the last write (if any) to finish
+
+        For streaming writers, this waits for the maintenance monitor, which stops when the streaming query terminates.
+        """
+        if self._maintenance_thread is not None:
+            self._maintenance_thread.join(timeout)
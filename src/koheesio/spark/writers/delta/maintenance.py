@@ -0,0 +1,271 @@
+"""
+Post-write table maintenance for Delta tables.
+
+Frequent appends and streaming micro-batches leave many small files behind, which degrades read performance until
+the table is compacted. The `DeltaTableMaintenance` step runs `OPTIMIZE` (optionally with `ZORDER BY`), `VACUUM` and
+statistics collection on a Delta table, but only when one of the configured thresholds is crossed:
+
+- `min_files_added`: number of files added since the last `OPTIMIZE`
+- `min_commits`: number of commits since the last `OPTIMIZE`
+- `max_small_file_ratio`: ratio of active files smaller than `small_file_size` (path-based tables only, since this
+  requires the list of active files from the transaction log)
+
+If no threshold is configured, maintenance runs every time the step is executed directly. A maintenance policy of a
+Delta writer requires at least one threshold, as it would otherwise run an `OPTIMIZE` after every write.
+
+The thresholds are evaluated from the Delta log: path-based tables are read through the `DeltaLogReader` directly,
+for catalog tables `DESCRIBE HISTORY` is used.
+
+The Delta writers accept a `maintenance` policy, in which case the thresholds are checked after every write, or at
+`check_interval` while a streaming writer runs (next to the stream, so it never blocks a trigger). A batch write
+waits for the maintenance to finish, unless `background` is set: the maintenance then runs on a background thread,
+which the next write of the writer (and the Python process, before exiting) waits for, see `await_maintenance`.
+
+Example
+-------
+```python
+from koheesio.spark.writers.delta import DeltaTableWriter
+from koheesio.spark.writers.delta.maintenance import (
+    DeltaTableMaintenance,
+)
+
+DeltaTableWriter(
+    table="my_table",
+    output_mode="append",
+    maintenance=DeltaTableMaintenance(
+        zorder_by=["customer_id"],
+        vacuum=True,
+        min_files_added=200,
+    ),
+)
+```
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Union
+import threading
+
+from koheesio.models import Field, ListOfColumns, field_validator
+from koheesio.spark import SparkStep
+from koheesio.spark.delta import DeltaTableStep
+from koheesio.spark.utils import on_databricks
+
+__all__ = ["DeltaTableMaintenance"]
+
+_table_locks: Dict[str, threading.Lock] = {}
+_table_locks_lock = threading.Lock()
+
+
+def _get_table_lock(table_name: str) -> threading.Lock:
+    """Get a lock per table, to prevent concurrent maintenance runs on the same table"""
+    with _table_locks_lock:
+        return _table_locks.setdefault(table_name, threading.Lock())
+
+
+def _files_added(operation_metrics: Optional[Dict[str, Any]]) -> int:
+    """Number of files added by a commit, the name of the metric depends on the operation"""
+    metrics = operation_metrics or {}
+    for metric in ("numAddedFiles", "numTargetFilesAdded", "numFiles"):
+        if metrics.get(metric) is not None:
+            return int(metrics[metric])
+    return 0
+
+
+class DeltaTableMaintenance(SparkStep):
+    """Runs OPTIMIZE, VACUUM and statistics collection on a Delta table when the configured thresholds are crossed
+
+    Parameters
+    ----------
+    table : Optional[Union[DeltaTableStep, str]]
+        The table to maintain. Can be omitted when used as maintenance policy of a Delta writer.
+    optimize : bool, optional, default=True
+        Run `OPTIMIZE` on the table.
+    zorder_by : Optional[ListOfColumns]
+        Columns to pass to `ZORDER BY` when optimizing.
+    vacuum : bool, optional, default=False
+        Run `VACUUM` on the table.
+    vacuum_retention_hours : Optional[int]
+        Retention to pass to `VACUUM ... RETAIN n HOURS`. The table's retention settings are used if not provided.
+    compute_statistics : bool, optional, default=False
+        Collect table statistics after optimizing.
+    min_files_added : Optional[int]
+        Threshold on the number of files added since the last `OPTIMIZE`.
+    min_commits : Optional[int]
+        Threshold on the number of commits since the last `OPTIMIZE`.
+    max_small_file_ratio : Optional[float]
+        Threshold on the ratio of active files smaller than `small_file_size` (path-based tables only).
+    small_file_size : int, optional, default=32MB
+        Files smaller than this size (in bytes) are considered small.
+    history_limit : int, optional, default=1000
+        Maximum number of commits to inspect when looking for the last `OPTIMIZE`.
+    background : bool, optional, default=False
+        Whether batch writers should run the maintenance on a background thread instead of waiting for it.
+    check_interval : int, optional, default=60
+        Interval in seconds at which streaming writers check the thresholds while the stream is running.
+    """
+
+    table: Optional[Union[DeltaTableStep, str]] = Field(
+        default=None, description="The table to maintain. Can be omitted when used as policy of a Delta writer."
+    )
+    optimize: bool = Field(default=True, description="Run `OPTIMIZE` on the table")
+    zorder_by: Optional[ListOfColumns] = Field(default=None, description="Columns to `ZORDER BY` when optimizing")
+    vacuum: bool = Field(default=False, description="Run `VACUUM` on the table")
+    vacuum_retention_hours: Optional[int] = Field(
+        default=None, ge=0, description="Retention for `VACUUM`, the table's retention settings are used if not set"
+    )
+    compute_statistics: bool = Field(default=False, description="Collect table statistics after optimizing")
+    min_files_added: Optional[int] = Field(
+        default=None, gt=0, description="Threshold on the number of files added since the last `OPTIMIZE`"
+    )
+    min_commits: Optional[int] = Field(
+        default=None, gt=0, description="Threshold on the number of commits since the last `OPTIMIZE`"
+    )
+    max_small_file_ratio: Optional[float] = Field(
+        default=None,
+        ge=0,
+        le=1,
+        description="Threshold on the ratio of active files smaller than `small_file_size` (path-based tables only)",
+    )
+    small_file_size: int = Field(
+        default=32 * 1024 * 1024, gt=0, description="Files smaller than this size (in bytes) are considered small"
+    )
+    history_limit: int = Field(
+        default=1000, gt=0, description="Maximum number of commits to inspect when looking for the last `OPTIMIZE`"
+    )
+    background: bool = Field(
+        default=False,
+        description="Whether batch writers should run the maintenance on a background thread instead of waiting for it",
+    )
+    check_interval: int = Field(
+        default=60, gt=0, description="Interval in seconds at which streaming writers check the thresholds"
+    )
+
+    class Output(SparkStep.Output):
+        """Output class for DeltaTableMaintenance"""
+
+        commits_since_optimize: int = Field(default=0, description="Number of commits since the last OPTIMIZE")
+        files_added_since_optimize: int = Field(default=0, description="Number of files added since the last OPTIMIZE")
+        small_file_ratio: Optional[float] = Field(default=None, description="Ratio of small files, if available")
+        triggered: bool = Field(default=False, description="Whether the maintenance was triggered")
+        statements: List[str] = Field(default_factory=list, description="The maintenance statements that were run")
+
+    @field_validator("table")
+    def _validate_table(cls, table: Optional[Union[DeltaTableStep, str]]) -> Optional[DeltaTableStep]:
+        """Validate `table` value"""
+        if isinstance(table, str):
+            return DeltaTableStep(table=table)
+        return table
+
+    @property
+    def has_thresholds(self) -> bool:
+        """Whether any threshold is configured"""
+        return any(t is not None for t in (self.min_files_added, self.min_commits, self.max_small_file_ratio))
+
+    def _collect_log_stats(self) -> None:
+        """Collect the number of commits and files added since the last OPTIMIZE and the ratio of small files"""
+        if delta_log := self.table.delta_log:
+            history = [
+                (c["version"], c.get("operation"), c.get("operationMetrics"))
+                for c in delta_log.history(limit=self.history_limit)
+            ]
+            files = delta_log.files
+            if files:
+                small_files = [f for f in files if (f.get("size") or 0) < self.small_file_size]
+                self.output.small_file_ratio = len(small_files) / len(files)
+        else:
+            history_df = self.table.describe_history(limit=self.history_limit)
+            history = [
+                (row["version"], row["operation"], row["operationMetrics"])
+                for row in history_df.select("version", "operation", "operationMetrics").collect()
+            ]
+
+        # history is in reverse chronological order: stop at the most recent OPTIMIZE
+        for _version, operation, operation_metrics in history:
+            if operation == "OPTIMIZE":
+                break
+            self.output.commits_since_optimize += 1
+            self.output.files_added_since_optimize += _files_added(operation_metrics)
+
+    def _thresholds_crossed(self) -> bool:
+        """Check the log stats against the configured thresholds"""
+        if not self.has_thresholds:
+            return True
+
+        output = self.output
+        checks = [
+            self.min_files_added is not None and output.files_added_since_optimize >= self.min_files_added,
+            self.min_commits is not None and output.commits_since_optimize >= self.min_commits,
+            self.max_small_file_ratio is not None
+            and output.small_file_ratio is not None
+            and output.small_file_ratio >= self.max_small_file_ratio,
+        ]
+        return any(checks)
+
+    @property
+    def statements(self) -> List[str]:
+        """The SQL statements that are run when the maintenance is triggered"""
+        table_name = self.table.table_name
+        statements = []
+
+        if self.optimize:
+            zorder = f" ZORDER BY ({', '.join(self.zorder_by)})" if self.zorder_by else ""
+            statements.append(f"OPTIMIZE {table_name}{zorder}")
+        if self.compute_statistics:
+            statements.append(
+                f"ANALYZE TABLE {table_name} COMPUTE DELTA STATISTICS"
+                if on_databricks()
+                else f"ANALYZE TABLE {table_name} COMPUTE STATISTICS FOR ALL COLUMNS"
+            )
+        if self.vacuum:
+            retain = f" RETAIN {self.vacuum_retention_hours} HOURS" if self.vacuum_retention_hours is not None else ""
+            statements.append(f"VACUUM {table_name}{retain}")
+
+        return statements
+
+    def execute(self) -> None:
+        if self.table is None:
+            raise ValueError("No table was provided to run the maintenance on")
+
+        if not self.table.exists:
+            self.log.debug(f"Table `{self.table.table_name}` does not exist, skipping maintenance")
+            return
+
+        lock = _get_table_lock(self.table.table_name)
+        if not lock.acquire(blocking=False):
+            self.log.info(f"Maintenance of `{self.table.table_name}` is already running, skipping")
+            return
+
+        try:
+            self._collect_log_stats()
+            if not self._thresholds_crossed():
+                self.log.debug(f"No maintenance thresholds crossed for `{self.table.table_name}`")
+                return
+
+            self.output.triggered = True
+            for statement in self.statements:
+                self.log.info(f"Running maintenance: {statement}")
+                self.spark.sql(statement)
+                self.output.statements.append(statement)
+        finally:
+            lock.release()
+
+    def for_table(self, table: DeltaTableStep) -> DeltaTableMaintenance:
+        """Return a fresh copy of this maintenance policy for the given table (used by the Delta writers)"""
+        return self.model_copy(update={"table": self.table or table})
+
+    def run_in_background(self) -> threading.Thread:
+        """Run the maintenance on a background thread, failures are logged and never propagated to the caller
+
+        The thread is not a daemon thread: the Python process waits for a running maintenance before exiting.
+        """
+
+        def _run() -> None:
+            try:
+                self.execute()
+            except Exception as e:  # pylint: disable=broad-except
+                self.log.warning(f"Maintenance of `{self.table.table_name}` failed: {e}")
+
+        thread = threading.Thread(target=_run, name=f"koheesio-maintenance-{self.table.table_name}")
+        thread.start()
+        return thread
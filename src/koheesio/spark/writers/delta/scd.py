@@ -15,7 +15,7 @@ and seamless integration with Delta tables in Spark.
 
 """
 
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from logging import Logger
 
 from delta.tables import DeltaMergeBuilder, DeltaTable
@@ -23,7 +23,7 @@ from delta.tables import DeltaMergeBuilder, DeltaTable
 from pydantic import InstanceOf
 
 from pyspark.sql import functions as f
-from pyspark.sql.types import DateType, TimestampType
+from pyspark.sql.types import DateType, LongType, StringType, StructType, TimestampType
 
 from koheesio.models import Field
 from koheesio.spark import Column, DataFrame, SparkSession
@@ -63,6 +63,29 @@ class SCD2DeltaTableWriter(Writer):
         End time col name.
     target_auto_generated_columns : List[str]
         Auto generated columns from target Delta table. Will be used to exclude from merge logic.
+    hash_diff : Optional[str]
+        Hash algorithm (`xxhash64` or `sha2`) to use for change detection. When set, a hash over the SCD2 attributes
+        and a hash over the SCD1 attributes are persisted in the SCD2 struct, and changes are detected by comparing
+        the incoming hashes with the persisted ones instead of comparing every attribute. Default is None (compare
+        attributes).
+    meta_scd2_hash_col_name : str
+        Name of the SCD2 attributes hash inside the SCD2 struct.
+    meta_scd1_hash_col_name : str
+        Name of the SCD1 attributes hash inside the SCD2 struct.
+
+    Example
+    -------
+    ```python
+    SCD2DeltaTableWriter(
+        table=DeltaTableStep(table="dim_customer"),
+        merge_key="customer_id",
+        scd2_columns=["address", "segment"],
+        scd1_columns=["email"],
+        hash_diff="xxhash64",
+    )
+    ```
+    Target rows written before `hash_diff` was enabled have no persisted hashes, for those the hash is computed on the
+    fly from the target attributes. The hash fields are added to the SCD2 struct of an existing table automatically.
     """
 
     table: InstanceOf[DeltaTableStep] = Field(..., description="The table to merge to")
@@ -87,6 +110,13 @@ class SCD2DeltaTableWriter(Writer):
         default_factory=list,
         description="Auto generated columns from target Delta table. Will be used to exclude from merge logic",
     )
+    hash_diff: Optional[Literal["xxhash64", "sha2"]] = Field(
+        default=None,
+        description="Hash algorithm to use for change detection. When set, hashes over the SCD2 and SCD1 attributes "
+        "are persisted in the SCD2 struct and compared instead of every single attribute",
+    )
+    meta_scd2_hash_col_name: str = Field(default="scd2_hash", description="SCD2 attributes hash col name")
+    meta_scd1_hash_col_name: str = Field(default="scd1_hash", description="SCD1 attributes hash col name")
 
     @staticmethod
     def _prepare_attr_clause(attrs: List[str], src_alias: str, dest_alias: str) -> Optional[str]:
@@ -119,6 +149,107 @@ class SCD2DeltaTableWriter(Writer):
 
         return attr_clause
 
+    @staticmethod
+    def _prepare_hash_expr(attrs: List[str], algorithm: str, alias: Optional[str] = None) -> str:
+        """
+        Prepare a SQL expression that hashes a set of attributes.
+
+        For `xxhash64` the null-ness of every attribute is hashed along, since `xxhash64` skips null values (and would
+        otherwise return the same hash for e.g. `('a', NULL)` and `(NULL, 'a')`). For `sha2` the attributes are
+        serialized to JSON, which includes the attribute names.
+
+        Parameters
+        ----------
+        attrs : List[str]
+            List of attributes to be hashed.
+        algorithm : str
+            Hash algorithm to use, `xxhash64` or `sha2`.
+        alias : Optional[str]
+            Alias of the table the attributes belong to.
+
+        Returns
+        -------
+        str
+            The prepared SQL expression.
+
+        """
+        cols = [f"{alias}.{attr}" if alias else attr for attr in attrs]
+
+        if algorithm == "sha2":
+            return f"sha2(to_json(struct({', '.join(cols)})), 256)"
+
+        return f"xxhash64({', '.join(f'{c}, {c} IS NULL' for c in cols)})"
+
+    @staticmethod
+    def _prepare_hash_clause(
+        attrs: List[str], algorithm: str, hash_col: str, src_alias: str, dest_alias: str
+    ) -> Optional[str]:
+        """
+        Prepare a hash comparison clause for SQL query.
+
+        The hash of the attributes in the source alias is compared with the hash persisted in the destination alias.
+        When the destination has no persisted hash (rows written before hash diffing was enabled), the destination
+        hash is computed from its attributes.
+
+        Parameters
+        ----------
+        attrs : List[str]
+            List of attributes to be checked.
+        algorithm : str
+            Hash algorithm to use, `xxhash64` or `sha2`.
+        hash_col : str
+            The (struct) column in the destination that holds the persisted hash.
+        src_alias : str
+            Alias for the source table in the SQL query.
+        dest_alias : str
+            Alias for the destination table in the SQL query.
+
+        Returns
+        -------
+        Optional[str]
+            The prepared SQL clause if attributes are provided, None otherwise.
+
+        """
+        if not attrs:
+            return None
+
+        src_hash = SCD2DeltaTableWriter._prepare_hash_expr(attrs=attrs, algorithm=algorithm, alias=src_alias)
+        dest_hash = SCD2DeltaTableWriter._prepare_hash_expr(attrs=attrs, algorithm=algorithm, alias=dest_alias)
+
+        return f"NOT ({src_hash} <=> coalesce({dest_alias}.{hash_col}, {dest_hash}))"
+
+    @property
+    def hash_columns(self) -> Dict[str, str]:
+        """Mapping of the hash fields inside the SCD2 struct to the SQL expressions computing them"""
+        if not self.hash_diff:
+            return {}
+
+        attr_sets = {self.meta_scd2_hash_col_name: self.scd2_columns, self.meta_scd1_hash_col_name: self.scd1_columns}
+        return {
+            name: self._prepare_hash_expr(attrs=attrs, algorithm=self.hash_diff)
+            for name, attrs in attr_sets.items()
+            if attrs
+        }
+
+    def _add_hash_fields_to_target(self, delta_table: DeltaTable) -> bool:
+        """Add the hash fields to the SCD2 struct of the target table, in case they are not there yet
+
+        Returns True if the table was altered.
+        """
+        hash_type = StringType() if self.hash_diff == "sha2" else LongType()
+        struct_type = delta_table.toDF().schema[self.meta_scd2_struct_col_name].dataType
+        existing_fields = struct_type.fieldNames() if isinstance(struct_type, StructType) else []
+
+        if missing := [name for name in self.hash_columns if name not in existing_fields]:
+            new_columns = ", ".join(
+                f"{self.meta_scd2_struct_col_name}.{name} {hash_type.simpleString()}" for name in missing
+            )
+            self.log.info(f"Adding hash fields {missing} to `{self.table.table_name}`")
+            self.spark.sql(f"ALTER TABLE {self.table.table_name} ADD COLUMNS ({new_columns})")
+            return True
+
+        return False
+
     @staticmethod
     def _scd2_timestamp(spark: SparkSession, scd2_timestamp_col: Optional[Column] = None, **_kwargs) -> Column:
         """
@@ -239,7 +370,8 @@ class SCD2DeltaTableWriter(Writer):
 
         This method prepares a DataFrame for staging by selecting the necessary columns, joining with the delta table,
         adding a merge action column, filtering based on the merge action, and cross joining with a DataFrame of two
-        rows.
+        rows. The current rows of the delta table are pre-filtered with a semi-join on the incoming merge keys, so
+        only the target rows that can actually change take part in the join.
 
         Parameters
         ----------
@@ -268,13 +400,17 @@ class SCD2DeltaTableWriter(Writer):
             The prepared DataFrame.
 
         """
+        current_target = (
+            delta_table.toDF()
+            .filter(f.col(meta_scd2_is_current_col).eqNullSafe(f.lit(True)))
+            .join(other=df.select(self.merge_key), on=self.merge_key, how="left_semi")
+        )
+
         df = (
             df.select(*columns_to_process, "__meta_scd2_timestamp")
             .alias(src_alias)
             .join(
-                other=delta_table.toDF()
-                .filter(f.col(meta_scd2_is_current_col).eqNullSafe(f.lit(True)))
-                .alias(dest_alias),
+                other=current_target.alias(dest_alias),
                 on=self.merge_key,
                 how="left",
             )
@@ -365,12 +501,14 @@ class SCD2DeltaTableWriter(Writer):
         meta_scd2_effective_time_col_name: str,
         meta_scd2_end_time_col_name: str,
         meta_scd2_is_current_col_name: str,
+        hash_columns: Optional[Dict[str, str]] = None,
         **_kwargs: dict,
     ) -> DataFrame:
         """
         Add SCD2 columns to the DataFrame.
 
         This method adds SCD2 columns to the DataFrame.
+
         Parameters
         ----------
         df : DataFrame
@@ -383,6 +521,8 @@ class SCD2DeltaTableWriter(Writer):
             The name of the end time column inside the struct.
         meta_scd2_is_current_col_name : str
             The name of the is_current column inside the struct.
+        hash_columns : Optional[Dict[str, str]]
+            Hash fields to add to the struct, mapping of the field name to the SQL expression computing the hash.
 
         Returns
         -------
@@ -396,6 +536,7 @@ class SCD2DeltaTableWriter(Writer):
                 f.col("__meta_scd2_effective_time").alias(meta_scd2_effective_time_col_name),
                 f.col("__meta_scd2_end_time").alias(meta_scd2_end_time_col_name),
                 f.col("__meta_scd2_is_current").alias(meta_scd2_is_current_col_name),
+                *[f.expr(expr).alias(name) for name, expr in (hash_columns or {}).items()],
             ),
         ).drop(
             "__meta_scd2_end_time",
@@ -516,14 +657,35 @@ class SCD2DeltaTableWriter(Writer):
         # Constructing system merge action logic
         system_merge_action = f"CASE WHEN tgt.{self.merge_key} is NULL THEN 'I' "
 
-        if updates_attrs_scd2 := self._prepare_attr_clause(
-            attrs=self.scd2_columns, src_alias=src_alias, dest_alias=dest_alias
-        ):
+        if self.hash_diff:
+            if self._add_hash_fields_to_target(delta_table=delta_table):
+                delta_table = get_delta_table_for_name(spark_session=self.spark, table_name=self.table.table_name)
+            updates_attrs_scd2 = self._prepare_hash_clause(
+                attrs=self.scd2_columns,
+                algorithm=self.hash_diff,
+                hash_col=f"{self.meta_scd2_struct_col_name}.{self.meta_scd2_hash_col_name}",
+                src_alias=src_alias,
+                dest_alias=dest_alias,
+            )
+            updates_attrs_scd1 = self._prepare_hash_clause(
+                attrs=self.scd1_columns,
+                algorithm=self.hash_diff,
+                hash_col=f"{self.meta_scd2_struct_col_name}.{self.meta_scd1_hash_col_name}",
+                src_alias=src_alias,
+                dest_alias=dest_alias,
+            )
+        else:
+            updates_attrs_scd2 = self._prepare_attr_clause(
+                attrs=self.scd2_columns, src_alias=src_alias, dest_alias=dest_alias
+            )
+            updates_attrs_scd1 = self._prepare_attr_clause(
+                attrs=self.scd1_columns, src_alias=src_alias, dest_alias=dest_alias
+            )
+
+        if updates_attrs_scd2:
             system_merge_action += f" WHEN {updates_attrs_scd2} THEN 'UC' "
 
-        if updates_attrs_scd1 := self._prepare_attr_clause(
-            attrs=self.scd1_columns, src_alias=src_alias, dest_alias=dest_alias
-        ):
+        if updates_attrs_scd1:
             system_merge_action += f" WHEN {updates_attrs_scd1} THEN 'U' "
 
         system_merge_action += " ELSE NULL END"
@@ -565,6 +727,7 @@ class SCD2DeltaTableWriter(Writer):
                 meta_scd2_effective_time_col_name=self.meta_scd2_effective_time_col_name,
                 meta_scd2_end_time_col_name=self.meta_scd2_end_time_col_name,
                 meta_scd2_is_current_col_name=self.meta_scd2_is_current_col_name,
+                hash_columns=self.hash_columns,
             )
         )
 
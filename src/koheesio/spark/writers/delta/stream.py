@@ -4,6 +4,7 @@ This module defines the DeltaTableStreamWriter class, which is used to write str
 
 from typing import Optional
 from email.policy import default
+import threading
 
 from pydantic import Field
 
@@ -34,3 +35,38 @@ class DeltaTableStreamWriter(StreamWriter, DeltaTableWriter):
             self.streaming_query = self.writer.start()
         else:
             self.streaming_query = self.writer.toTable(tableName=self.table.table_name)
+        self._track_progress()
+
+        if self.maintenance is not None:
+            self._maintenance_thread = threading.Thread(
+                target=self._monitor_maintenance,
+                name=f"koheesio-maintenance-monitor-{self.table.table_name}",
+                daemon=True,
+            )
+            self._maintenance_thread.start()
+
+    def _monitor_maintenance(self) -> None:
+        """Check the maintenance thresholds every `check_interval` seconds while the streaming query is active
+
+        Runs next to the stream, so the maintenance never blocks a trigger. The thresholds are only checked when new
+        micro-batches were processed since the previous check, and one final time when the query terminates.
+        """
+        last_batch_id = None
+        terminated = False
+        while not terminated:
+            try:
+                terminated = self.streaming_query.awaitTermination(self.maintenance.check_interval)
+            except Exception as e:  # pylint: disable=broad-except
+                self.log.warning(f"Streaming query failed, stopping maintenance monitor: {e}")
+                return
+
+            progress = self.streaming_query.lastProgress
+            batch_id = progress["batchId"] if progress else None
+            if batch_id is None or batch_id == last_batch_id:
+                continue
+            last_batch_id = batch_id
+
+            try:
+                self.maintenance.for_table(self.table).execute()
+            except Exception as e:  # pylint: disable=broad-except
+                self.log.warning(f"Maintenance of `{self.table.table_name}` failed: {e}")
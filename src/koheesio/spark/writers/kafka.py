@@ -1,14 +1,71 @@
 """Kafka writer to write batch or streaming data into kafka topics"""
 
-from typing import Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
+from enum import Enum
+import json
 
 from pyspark.sql import DataFrameWriter
+from pyspark.sql import functions as f
 from pyspark.sql.streaming import DataStreamWriter, StreamingQuery
 from pyspark.sql.types import BinaryType, StringType
 
-from koheesio.models import ExtraParamsMixin, Field, field_validator
+from koheesio.models import ExtraParamsMixin, Field, PrivateAttr, field_validator, model_validator
+from koheesio.spark import DataFrame
+from koheesio.spark.kafka import KafkaSerializer
+from koheesio.spark.utils import SPARK_MINOR_VERSION
+from koheesio.spark.utils.connect import is_remote_session
 from koheesio.spark.writers import Writer
 from koheesio.spark.writers.stream import Trigger
+from koheesio.utils import get_random_string
+
+
+class KafkaProducerProfile(str, Enum):
+    """Presets for the batching, compression and acknowledgement settings of the Kafka producer
+
+    - `low_latency`: send records right away, no compression, wait for the leader only
+    - `balanced`: short linger and lz4 compression
+    - `throughput`: long linger, large batches and lz4 compression
+    - `durable`: like `balanced`, with idempotence enabled explicitly
+
+    All profiles but `low_latency` keep the default `acks=all`: a write is acknowledged once all in-sync replicas have
+    the records. `low_latency` trades durability for latency with `acks=1`: records acknowledged by the leader are lost
+    when the leader fails before the replicas caught up, and the idempotent producer is disabled, so retries can
+    produce duplicates.
+    """
+
+    LOW_LATENCY = "low_latency"
+    BALANCED = "balanced"
+    THROUGHPUT = "throughput"
+    DURABLE = "durable"
+
+
+PRODUCER_PROFILES: Dict[str, Dict[str, str]] = {
+    "low_latency": {
+        "kafka.linger.ms": "0",
+        "kafka.batch.size": "16384",
+        "kafka.compression.type": "none",
+        "kafka.acks": "1",
+    },
+    "balanced": {
+        "kafka.linger.ms": "10",
+        "kafka.batch.size": "131072",
+        "kafka.compression.type": "lz4",
+        "kafka.acks": "all",
+    },
+    "throughput": {
+        "kafka.linger.ms": "100",
+        "kafka.batch.size": "1048576",
+        "kafka.compression.type": "lz4",
+        "kafka.acks": "all",
+    },
+    "durable": {
+        "kafka.linger.ms": "10",
+        "kafka.batch.size": "131072",
+        "kafka.compression.type": "lz4",
+        "kafka.acks": "all",
+        "kafka.enable.idempotence": "true",
+    },
+}
 
 
 class KafkaWriter(Writer, ExtraParamsMixin):
@@ -27,6 +84,17 @@ class KafkaWriter(Writer, ExtraParamsMixin):
     checkpoint_location : str
         In case of a failure or intentional shutdown, you can recover the previous progress and state of a previous
         query, and continue where it left off. This is done using checkpointing and write-ahead logs.
+    key_serializer : Optional[KafkaSerializer]
+        Builds the `key` column from the `columns` of the serializer
+    value_serializer : Optional[KafkaSerializer]
+        Builds the `value` column from the `columns` of the serializer, all columns if not set
+    header_columns : Optional[List[str]]
+        Columns to send as Kafka headers, named after the column and with the value as string
+    profile : Optional[KafkaProducerProfile]
+        Preset for `kafka.linger.ms`, `kafka.batch.size`, `kafka.compression.type` and `kafka.acks`, options that are
+        passed explicitly take precedence
+    metrics_history_size : int, optional, default=1000
+        Number of batches to keep the metrics of in `output.batches`, the oldest are dropped first
 
     Example
     -------
@@ -42,6 +110,31 @@ class KafkaWriter(Writer, ExtraParamsMixin):
         checkpoint_location: "s3://bucket/test-topic"
     )
     ```
+
+    Serialization
+    -------------
+    Instead of building the `key` and `value` columns upfront, serializers can be passed. These use the native
+    `to_json`, `to_avro` and `to_protobuf` functions, see `koheesio.spark.kafka`:
+
+    ```python
+    from koheesio.spark.kafka import KafkaSerializer
+
+    KafkaWriter(
+        broker="broker.com:9500",
+        topic="orders",
+        key_serializer=KafkaSerializer(
+            format="string", columns=["order_id"]
+        ),
+        value_serializer=KafkaSerializer(format="json"),
+        header_columns=["trace_id"],
+        profile="throughput",
+        checkpoint_location="s3://bucket/orders",
+    )
+    ```
+
+    The number of records and bytes (key and value) produced is reported per batch in `output.batches`. For streaming
+    queries, call `refresh_batch_metrics()` to collect the metrics of the micro-batches that have completed. Only the
+    metrics of the last `metrics_history_size` batches are kept.
     """
 
     format: str = "kafka"
@@ -60,6 +153,27 @@ class KafkaWriter(Writer, ExtraParamsMixin):
         "the running aggregates to the checkpoint location. This checkpoint location has to be a path in an HDFS "
         "compatible file system that is accessible by Spark (e.g. Databricks Unity Catalog External Location)",
     )
+    key_serializer: Optional[KafkaSerializer] = Field(
+        default=None, description="Builds the `key` column from the `columns` of the serializer"
+    )
+    value_serializer: Optional[KafkaSerializer] = Field(
+        default=None, description="Builds the `value` column from the `columns` of the serializer, all if not set"
+    )
+    header_columns: Optional[List[str]] = Field(
+        default=None, description="Columns to send as Kafka headers, named after the column and with string values"
+    )
+    profile: Optional[KafkaProducerProfile] = Field(
+        default=None,
+        description="Preset for `kafka.linger.ms`, `kafka.batch.size`, `kafka.compression.type` and `kafka.acks`",
+    )
+    metrics_history_size: int = Field(
+        default=1000, gt=0, description="Number of batches to keep the metrics of in `output.batches`"
+    )
+
+    _serialized_df: Optional[DataFrame] = PrivateAttr(default=None)
+    _observation: Any = PrivateAttr(default=None)
+    _observation_name: Optional[str] = PrivateAttr(default=None)
+    _last_batch_id: int = PrivateAttr(default=-1)
 
     class Output(Writer.Output):
         """Output of the KafkaWriter"""
@@ -67,6 +181,17 @@ class KafkaWriter(Writer, ExtraParamsMixin):
         streaming_query: Optional[Union[str, StreamingQuery]] = Field(
             default=None, description="Query ID of the stream query"
         )
+        batches: List[Dict[str, Any]] = Field(
+            default_factory=list,
+            description="Number of records and bytes produced, per batch, for the most recent batches",
+        )
+
+    @model_validator(mode="after")
+    def _validate_key_serializer(self) -> "KafkaWriter":
+        """The columns of the key need to be listed"""
+        if self.key_serializer is not None and not self.key_serializer.columns:
+            raise ValueError("The `columns` to build the key from are required for the `key_serializer`")
+        return self
 
     @property
     def streaming_query(self) -> Optional[Union[str, StreamingQuery]]:
@@ -83,16 +208,102 @@ class KafkaWriter(Writer, ExtraParamsMixin):
         """Validate the trigger value and convert it to a Trigger object if it is not already one."""
         return Trigger.from_any(trigger)
 
+    @property
+    def _df(self) -> DataFrame:
+        """The DataFrame to write, serialized when serializers are used"""
+        return self._serialized_df if self._serialized_df is not None else self.df
+
     def _validate_dataframe(self) -> None:
         """Validate the dataframe to be written to kafka"""
-        if "value" not in self.df.columns:
+        df = self._df
+        if "value" not in df.columns:
             raise ValueError('Dataframe should at least have a "value" column.')
-        if not isinstance(self.df.schema["value"].dataType, (StringType, BinaryType)):
+        if not isinstance(df.schema["value"].dataType, (StringType, BinaryType)):
             raise ValueError('The "value" column should be of type string or binary.')
-        if "key" in self.df.columns:
-            if not isinstance(self.df.schema["key"].dataType, (StringType, BinaryType)):
+        if "key" in df.columns:
+            if not isinstance(df.schema["key"].dataType, (StringType, BinaryType)):
                 raise ValueError('The "key" column should be of type string or binary.')
 
+    def serialize(self, df: DataFrame) -> DataFrame:
+        """Build the `key`, `value` and `headers` columns with the serializers and `header_columns`
+
+        The DataFrame is returned as is when none of these are configured.
+        """
+        if not (self.key_serializer or self.value_serializer or self.header_columns):
+            return df
+
+        projection = []
+        if self.key_serializer is not None:
+            key_columns = self.key_serializer.columns or []
+            projection.append(self.key_serializer.column(key_columns, subject=f"{self.topic}-key").alias("key"))
+        elif "key" in df.columns:
+            projection.append(f.col("key"))
+
+        if self.value_serializer is not None:
+            value_columns = self.value_serializer.columns or df.columns
+            projection.append(self.value_serializer.column(value_columns, subject=f"{self.topic}-value").alias("value"))
+        elif "value" in df.columns:
+            projection.append(f.col("value"))
+
+        if self.header_columns:
+            projection.append(
+                f.array(
+                    *[
+                        f.struct(f.lit(column).alias("key"), f.col(column).cast("string").cast("binary").alias("value"))
+                        for column in self.header_columns
+                    ]
+                ).alias("headers")
+            )
+        elif "headers" in df.columns:
+            projection.append(f.col("headers"))
+
+        if "partition" in df.columns:
+            projection.append(f.col("partition"))
+
+        return df.select(*projection)
+
+    def _observe(self, df: DataFrame) -> DataFrame:
+        """Count the records and bytes that are produced, in the same pass as the write"""
+        size = f.coalesce(f.length(f.col("value").cast("binary")), f.lit(0))
+        if "key" in df.columns:
+            size = size + f.coalesce(f.length(f.col("key").cast("binary")), f.lit(0))
+        metrics = [f.count(f.lit(1)).alias("records"), f.coalesce(f.sum(size), f.lit(0)).alias("bytes")]
+        self._observation, self._observation_name = None, None
+
+        if df.isStreaming:
+            self._observation_name = get_random_string(prefix="kafka_writer")
+            return df.observe(self._observation_name, *metrics)
+
+        if SPARK_MINOR_VERSION >= 3.3 and not is_remote_session():
+            from pyspark.sql import Observation
+
+            self._observation = Observation(get_random_string(prefix="kafka_writer"))
+            return df.observe(self._observation, *metrics)
+
+        self.log.debug("Batch metrics are not available for this session")
+        return df
+
+    def refresh_batch_metrics(self) -> List[Dict[str, Any]]:
+        """Collect the number of records and bytes produced by the micro-batches of the streaming query
+
+        The metrics are read from the recent progress of the query and are stored in `output.batches`.
+        """
+        query = self.streaming_query
+        if not isinstance(query, StreamingQuery) or self._observation_name is None:
+            return self.output.batches
+
+        for progress in query.recentProgress:
+            progress = progress if isinstance(progress, dict) else json.loads(progress.json)
+            observed = (progress.get("observedMetrics") or {}).get(self._observation_name)
+            # batch ids increase, so batches that were collected (and possibly dropped) before are skipped
+            if observed is not None and progress["batchId"] > self._last_batch_id:
+                self._last_batch_id = progress["batchId"]
+                self.output.batches.append(
+                    {"batch_id": progress["batchId"], "records": observed["records"], "bytes": observed["bytes"]}
+                )
+        del self.output.batches[: -self.metrics_history_size]
+        return self.output.batches
+
     @property
     def stream_writer(self) -> DataStreamWriter:
         """returns a stream writer
@@ -101,7 +312,7 @@ class KafkaWriter(Writer, ExtraParamsMixin):
         -------
         DataStreamWriter
         """
-        write_stream = self.df.writeStream
+        write_stream = self._df.writeStream
 
         if self._trigger:
             write_stream = write_stream.trigger(**self._trigger)
@@ -116,7 +327,7 @@ class KafkaWriter(Writer, ExtraParamsMixin):
         -------
         DataFrameWriter
         """
-        return self.df.write
+        return self._df.write
 
     @property
     def writer(self) -> Union[DataStreamWriter, DataFrameWriter]:
@@ -140,10 +351,13 @@ class KafkaWriter(Writer, ExtraParamsMixin):
             Dict being the combination of kafka options + topic + broker
         """
         options = {
+            **(PRODUCER_PROFILES[KafkaProducerProfile(self.profile).value] if self.profile else {}),
             **self.extra_params,
             "topic": self.topic,
             "kafka.bootstrap.servers": self.broker,
         }
+        if self.header_columns:
+            options["includeHeaders"] = "true"
 
         if self.checkpoint_location:
             options["checkpointLocation"] = self.checkpoint_location
@@ -159,6 +373,11 @@ class KafkaWriter(Writer, ExtraParamsMixin):
             "includeHeaders",
             "key.serializer",
             "value.serializer",
+            "kafka.linger.ms",
+            "kafka.batch.size",
+            "kafka.compression.type",
+            "kafka.acks",
+            "kafka.enable.idempotence",
             # "trigger",
             "checkpointLocation",
         }
@@ -174,7 +393,14 @@ class KafkaWriter(Writer, ExtraParamsMixin):
         applied_options = {k: v for k, v in self.options.items() if k in self.logged_option_keys}
         self.log.debug(f"Applying options {applied_options}")
 
+        self._serialized_df = self._observe(self.serialize(self.df))
         self._validate_dataframe()
 
         _writer = self.writer.format(self.format).options(**self.options)
         self.output.streaming_query = _writer.start() if self.streaming else _writer.save()
+
+        if self._observation is not None:
+            metrics = self._observation.get
+            self.output.batches.append({"batch_id": None, "records": metrics["records"], "bytes": metrics["bytes"]})
+            del self.output.batches[: -self.metrics_history_size]
+            self.log.info(f"Produced {metrics['records']} records ({metrics['bytes']} bytes) to {self.topic}")
@@ -8,6 +8,8 @@ StreamWriter
     abstract class for stream writers
 ForEachBatchStreamWriter
     class to run a writer for each batch
+ForEachBatchFanOut
+    batch function that runs multiple writers on the same (persisted) micro-batch
 
 Functions
 --------
@@ -15,13 +17,20 @@ writer_to_foreachbatch
     function to be used as batch_function for StreamWriter (sub)classes
 """
 
-from typing import Callable, Dict, Optional, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from pyspark import StorageLevel
 
 from koheesio import Step
-from koheesio.models import ConfigDict, Field, field_validator, model_validator
+from koheesio.models import BaseModel, ConfigDict, Field, InstanceOf, PrivateAttr, field_validator, model_validator
 from koheesio.spark import DataFrame, DataStreamWriter, StreamingQuery
 from koheesio.spark.writers import StreamingOutputMode, Writer
+from koheesio.spark.writers.stream_metrics import StreamingMetricsCollector
 from koheesio.utils import convert_str_to_bool
 
 
@@ -258,6 +267,19 @@ class StreamWriter(Writer, ABC):
         default=None, description="Query ID of the stream query"
     )
 
+    metrics: Optional[StreamingMetricsCollector] = Field(
+        default_factory=StreamingMetricsCollector,
+        description="Collects the progress metrics of the stream query, available as `output.metrics` once the query "
+        "is started. Set to None to disable.",
+    )
+
+    class Output(Writer.Output):
+        """Output class for StreamWriter"""
+
+        metrics: Optional[StreamingMetricsCollector] = Field(
+            default=None, description="Progress metrics of the stream query"
+        )
+
     @property
     def _trigger(self) -> dict:
         """Returns the trigger value as a dictionary"""
@@ -278,6 +300,14 @@ class StreamWriter(Writer, ABC):
     def await_termination(self, timeout: Optional[int] = None) -> None:
         """Await termination of the stream query"""
         self.streaming_query.awaitTermination(timeout=timeout)
+        if self.metrics is not None:
+            self.metrics.refresh(self.streaming_query)
+
+    def _track_progress(self) -> None:
+        """Attach the metrics collector to the started stream query"""
+        if self.metrics is not None and isinstance(self.streaming_query, StreamingQuery):
+            self.metrics.attach(self.streaming_query, self.spark)
+            self.output.metrics = self.metrics
 
     @property
     def stream_writer(self) -> DataStreamWriter:  # type: ignore
@@ -317,6 +347,7 @@ class ForEachBatchStreamWriter(StreamWriter):
 
     def execute(self) -> None:
         self.streaming_query = self.writer.start()
+        self._track_progress()
 
 
 def writer_to_foreachbatch(writer: Writer) -> Callable:
@@ -355,3 +386,126 @@ def writer_to_foreachbatch(writer: Writer) -> Callable:
         writer.write(df)
 
     return inner
+
+
+class ForEachBatchFanOut(BaseModel):
+    """Run multiple writers on each micro-batch, to be passed as batch_function for StreamWriter (sub)classes
+
+    The micro-batch is persisted once, all writers are run against the persisted DataFrame (sequentially or in
+    parallel threads) and the batch is unpersisted afterwards. This way a single streaming query can feed multiple
+    sinks without re-reading the source or recomputing the batch for every sink.
+
+    For every writer the duration and the error (if any) is recorded, the metrics of the last `history_size` runs are
+    available through `metrics`. Failures of individual writers do not prevent the other writers from running; once
+    all writers have finished, an exception is raised when any of them failed (unless `raise_on_failure` is False),
+    so that Spark retries the batch.
+
+    When `txn_app_id` is set, `txnAppId` and `txnVersion` (the batch id) are passed to the Delta writers, so that a
+    retried batch is not written twice to the Delta tables that already succeeded. Note that Delta only supports this
+    for `append` and `overwrite` writes, not for merges.
+
+    Example
+    -------
+    ### Writing every micro-batch to a Delta table and a Snowflake table
+    ```python
+    ForEachBatchStreamWriter(
+        checkpointLocation="my_checkpointlocation",
+        batch_function=ForEachBatchFanOut(
+            writers=[
+                DeltaTableWriter(table="my_table", output_mode="append"),
+                SnowflakeWriter(**sfOptions, table="snowflake_table"),
+            ],
+            parallel=True,
+            txn_app_id="my_stream",
+        ),
+    )
+    ```
+
+    Parameters
+    ----------
+    writers : List[Writer]
+        The writers to run on every micro-batch
+    parallel : bool, optional, default=False
+        Run the writers in parallel threads
+    max_workers : Optional[int]
+        Maximum number of threads when running in parallel, defaults to the number of writers
+    storage_level : str, optional, default=MEMORY_AND_DISK
+        Storage level used to persist the micro-batch
+    txn_app_id : Optional[str]
+        Application id to pass as `txnAppId` to the Delta writers, together with the batch id as `txnVersion`
+    raise_on_failure : bool, optional, default=True
+        Raise an exception when any of the writers failed
+    history_size : int, optional, default=100
+        Number of writer runs to keep in `metrics`
+    """
+
+    writers: List[InstanceOf[Writer]] = Field(default=..., min_length=1, description="Writers to run on every batch")
+    parallel: bool = Field(default=False, description="Run the writers in parallel threads")
+    max_workers: Optional[int] = Field(
+        default=None, gt=0, description="Maximum number of threads, defaults to the number of writers"
+    )
+    storage_level: str = Field(default="MEMORY_AND_DISK", description="Storage level used to persist the micro-batch")
+    txn_app_id: Optional[str] = Field(
+        default=None, description="`txnAppId` to pass to the Delta writers, the batch id is used as `txnVersion`"
+    )
+    raise_on_failure: bool = Field(default=True, description="Raise an exception when any of the writers failed")
+    history_size: int = Field(default=100, gt=0, description="Number of writer runs to keep in `metrics`")
+
+    _metrics: Deque[Dict[str, Any]] = PrivateAttr(default=None)
+    _metrics_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._metrics = deque(maxlen=self.history_size)
+
+    @property
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Per writer metrics of the most recent batches: batch_id, writer, duration (in seconds) and error"""
+        with self._metrics_lock:
+            return list(self._metrics)
+
+    def _writer_for_batch(self, writer: Writer, batch_id: int) -> Writer:
+        """Return the writer to use for the given batch, Delta writers get the transaction options when configured"""
+        # local import to prevent a circular import, the Delta writers depend on this module
+        from koheesio.spark.writers.delta import DeltaTableWriter
+
+        if self.txn_app_id and isinstance(writer, DeltaTableWriter):
+            txn_options = {"txnAppId": self.txn_app_id, "txnVersion": batch_id}
+            return writer.model_copy(update={"params": {**writer.params, **txn_options}})
+        return writer
+
+    def _run_writer(self, writer: Writer, df: DataFrame, batch_id: int) -> Dict[str, Any]:
+        """Run a single writer on the batch and return its metrics"""
+        writer_name = writer.name or writer.__class__.__name__
+        start = time.perf_counter()
+        error = None
+        try:
+            self._writer_for_batch(writer, batch_id).write(df)
+        except Exception as e:  # pylint: disable=broad-except
+            writer.log.error(f"Writer {writer_name} failed for batch {batch_id}: {e}")
+            error = e
+
+        return {"batch_id": batch_id, "writer": writer_name, "duration": time.perf_counter() - start, "error": error}
+
+    def __call__(self, df: DataFrame, batch_id: int) -> None:
+        """Run all writers on the given micro-batch"""
+        self.log.debug(f"Running {len(self.writers)} writers for batch {batch_id}")
+        df = df.persist(getattr(StorageLevel, self.storage_level))
+
+        try:
+            if self.parallel:
+                with ThreadPoolExecutor(max_workers=self.max_workers or len(self.writers)) as executor:
+                    results = list(executor.map(lambda w: self._run_writer(w, df, batch_id), self.writers))
+            else:
+                results = [self._run_writer(writer, df, batch_id) for writer in self.writers]
+        finally:
+            df.unpersist()
+
+        with self._metrics_lock:
+            self._metrics.extend(results)
+
+        if failures := [r for r in results if r["error"] is not None]:
+            message = ", ".join(f"{r['writer']}: {r['error']}" for r in failures)
+            if self.raise_on_failure:
+                raise RuntimeError(f"{len(failures)} writer(s) failed for batch {batch_id}: {message}")
+            self.log.warning(f"{len(failures)} writer(s) failed for batch {batch_id}: {message}")
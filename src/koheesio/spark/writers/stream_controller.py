@@ -0,0 +1,224 @@
+"""
+Adaptive rate control for streaming queries.
+
+Streams that alternate between catching up on a backlog and being idle are hard to configure with a static
+`maxOffsetsPerTrigger` or `maxFilesPerTrigger`: a low limit is too slow to catch up, a high limit gives long and bursty
+batches. The `AdaptiveStreamController` runs the stream as a sequence of `availableNow` runs and adjusts the per-trigger
+limit of the source between runs, based on the batch durations and the backlog of the source observed in the query
+progress, so that every batch lands near `target_batch_duration`.
+
+The limit is applied to the source through the option that matches the reader:
+
+- `KafkaReader`: `maxOffsetsPerTrigger`
+- `DeltaTableReader`: `maxFilesPerTrigger`
+- `FileLoader` (and the other file readers): `maxFilesPerTrigger`
+
+Use `limit_option` to set the option explicitly for other readers.
+
+Example
+-------
+```python
+from koheesio.spark.readers.kafka import KafkaStreamReader
+from koheesio.spark.writers.delta import DeltaTableStreamWriter
+from koheesio.spark.writers.stream_controller import (
+    AdaptiveStreamController,
+)
+
+controller = AdaptiveStreamController(
+    reader=KafkaStreamReader(
+        read_broker="broker:9092", topic="my-topic"
+    ),
+    writer=DeltaTableStreamWriter(
+        table="my_table", checkpointLocation="/checkpoints/my_table"
+    ),
+    target_batch_duration=120,
+    initial_limit=100_000,
+    max_runs=10,
+)
+controller.execute()
+controller.output.limit  # the limit to start the next run with
+```
+"""
+
+from typing import Any, Dict, List, Optional
+import time
+
+from koheesio import Step, StepOutput
+from koheesio.models import Field, InstanceOf, model_validator
+from koheesio.spark.readers import Reader
+from koheesio.spark.readers.delta import DeltaTableReader
+from koheesio.spark.readers.file_loader import FileLoader
+from koheesio.spark.readers.kafka import KafkaReader
+from koheesio.spark.writers.stream import StreamWriter, Trigger
+from koheesio.spark.writers.stream_metrics import StreamingMetricsCollector
+
+__all__ = ["AdaptiveStreamController"]
+
+# the backlog metric of the source progress that matches the limit option
+_BACKLOG_METRICS = {"maxOffsetsPerTrigger": "maxOffsetsBehindLatest", "maxFilesPerTrigger": "numFilesOutstanding"}
+
+
+class AdaptiveStreamController(Step):
+    """Runs a stream as a sequence of `availableNow` runs, adapting the per-trigger limit to a target batch duration
+
+    After every run, the average duration of the batches that processed data is compared to the target duration. The
+    limit is scaled proportionally (`limit * target / average`), smoothed with the previous limit and kept within
+    `min_limit` and `max_limit`. The next run is started with the new limit, until a run processes no data or
+    `max_runs` is reached.
+
+    When the source reports its backlog at the end of a run (`maxOffsetsBehindLatest` for Kafka, `numFilesOutstanding`
+    for Delta), the backlog is taken into account as well: while the source is still behind by more than the limit,
+    the limit grows without smoothing, and once the source has caught up the limit shrinks towards the backlog, so the
+    next run does not start with a burst of data.
+
+    Parameters
+    ----------
+    reader : Reader
+        Streaming reader of the source, e.g. `KafkaStreamReader` or `DeltaTableStreamReader`
+    writer : StreamWriter
+        Stream writer for the sink, its trigger is set to `availableNow`
+    target_batch_duration : float, optional, default=60
+        Target duration of a micro-batch, in seconds
+    initial_limit : int
+        Limit to use for the first run
+    min_limit : int, optional, default=1
+        Lower bound for the limit
+    max_limit : Optional[int]
+        Upper bound for the limit
+    smoothing : float, optional, default=0.5
+        Weight of the newly computed limit versus the previous limit, 1 means no smoothing
+    max_runs : Optional[int]
+        Maximum number of runs, runs until the source is idle if not set
+    interval : float, optional, default=0
+        Time to wait between runs, in seconds
+    limit_option : Optional[str]
+        Name of the source option to set the limit with, derived from the reader if not provided
+    """
+
+    reader: InstanceOf[Reader] = Field(default=..., description="Streaming reader of the source")
+    writer: InstanceOf[StreamWriter] = Field(default=..., description="Stream writer for the sink")
+    target_batch_duration: float = Field(default=60, gt=0, description="Target duration of a micro-batch in seconds")
+    initial_limit: int = Field(default=..., gt=0, description="Limit to use for the first run")
+    min_limit: int = Field(default=1, gt=0, description="Lower bound for the limit")
+    max_limit: Optional[int] = Field(default=None, gt=0, description="Upper bound for the limit")
+    smoothing: float = Field(
+        default=0.5, gt=0, le=1, description="Weight of the new limit versus the previous one, 1 means no smoothing"
+    )
+    max_runs: Optional[int] = Field(default=None, gt=0, description="Maximum number of runs, until idle if not set")
+    interval: float = Field(default=0, ge=0, description="Time to wait between runs in seconds")
+    limit_option: Optional[str] = Field(
+        default=None, description="Source option to set the limit with, derived from the reader if not provided"
+    )
+
+    class Output(StepOutput):
+        """Output class for AdaptiveStreamController"""
+
+        limit: Optional[int] = Field(default=None, description="The limit to use for the next run")
+        runs: List[Dict[str, Any]] = Field(
+            default_factory=list,
+            description="Per run: the limit, number of batches, rows, average batch duration and backlog",
+        )
+
+    @model_validator(mode="after")
+    def _validate_limit_option(self) -> "AdaptiveStreamController":
+        """Derive the limit option from the reader when it is not provided"""
+        if self.limit_option is None:
+            if isinstance(self.reader, KafkaReader):
+                self.limit_option = "maxOffsetsPerTrigger"
+            elif isinstance(self.reader, (DeltaTableReader, FileLoader)):
+                self.limit_option = "maxFilesPerTrigger"
+            else:
+                raise ValueError(
+                    f"Unable to derive the limit option for {type(self.reader).__name__}, provide `limit_option`"
+                )
+        return self
+
+    def _apply_limit(self, limit: int) -> None:
+        """Set the per-trigger limit on the reader"""
+        if isinstance(self.reader, DeltaTableReader) and self.limit_option == "maxFilesPerTrigger":
+            self.reader.max_files_per_trigger = limit
+            # the DataStreamReader is cached with its options, reset it
+            self.reader.reader = None
+        elif isinstance(self.reader, FileLoader):
+            # FileLoader passes its extra keyword arguments to Spark as options
+            self.reader.extra_params[self.limit_option] = str(limit)  # type: ignore[index]
+            self.reader.params[self.limit_option] = str(limit)
+        elif hasattr(self.reader, "params"):
+            self.reader.params[self.limit_option] = str(limit)  # type: ignore[index]
+        else:
+            raise ValueError(f"Unable to set `{self.limit_option}` on {type(self.reader).__name__}")
+
+    def next_limit(self, limit: int, batch_durations: List[float], backlog: Optional[float] = None) -> int:
+        """Compute the limit for the next run based on the durations (in seconds) of the batches of the last run and
+        the backlog of the source (in offsets or files) at the end of the last run, if known
+        """
+        if not batch_durations:
+            return limit
+
+        average_duration = sum(batch_durations) / len(batch_durations)
+        proposed = limit * self.target_batch_duration / max(average_duration, 1e-3)
+        smoothing = self.smoothing
+        if backlog is not None:
+            if backlog > limit:
+                # catching up: grow to the proposed limit right away
+                smoothing = 1 if proposed > limit else smoothing
+            else:
+                # caught up: a limit above the backlog is not needed
+                proposed = min(proposed, backlog)
+        new_limit = int(round(limit + smoothing * (proposed - limit)))
+
+        new_limit = max(new_limit, self.min_limit)
+        if self.max_limit is not None:
+            new_limit = min(new_limit, self.max_limit)
+        return new_limit
+
+    def _run(self, limit: int) -> Dict[str, Any]:
+        """Start a single availableNow run with the given limit and wait for it to finish"""
+        self._apply_limit(limit)
+        self.writer.df = self.reader.read()
+        self.writer.execute()
+        self.writer.await_termination()
+
+        query = self.writer.streaming_query
+        progress = [m for m in self.writer.metrics.progress(query_id=str(query.id)) if m["run_id"] == str(query.runId)]
+        batches = [m for m in progress if m["num_input_rows"]]
+        durations = [m["batch_duration_ms"] / 1000 for m in batches if m["batch_duration_ms"] is not None]
+        # the backlog reported by the source at the end of the run, not every source reports it
+        backlog = progress[-1]["backlog"].get(_BACKLOG_METRICS.get(self.limit_option)) if progress else None
+
+        return {
+            "limit": limit,
+            "batches": len(batches),
+            "rows": sum(m["num_input_rows"] for m in batches),
+            "average_batch_duration": sum(durations) / len(durations) if durations else None,
+            "backlog": backlog,
+            "durations": durations,
+        }
+
+    def execute(self) -> Output:
+        self.writer.trigger = Trigger(available_now=True)  # type: ignore[call-arg]
+        if self.writer.metrics is None:
+            self.writer.metrics = StreamingMetricsCollector()
+
+        limit = self.initial_limit
+        run_number = 0
+        while self.max_runs is None or run_number < self.max_runs:
+            if run_number and self.interval:
+                time.sleep(self.interval)
+            run_number += 1
+
+            run = self._run(limit)
+            durations = run.pop("durations")
+            self.output.runs.append(run)
+
+            limit = self.next_limit(limit, durations, run["backlog"])
+            self.log.info(
+                f"Run {run_number} processed {run['rows']} rows in {run['batches']} batches with limit {run['limit']} "
+                f"(average batch duration: {run['average_batch_duration']}, backlog: {run['backlog']}), "
+                f"next limit: {limit}"
+            )
+
+            if not run["batches"]:
+                break
+
+        self.output.limit = limit
@@ -0,0 +1,299 @@
+"""
+Collect progress metrics of the streaming queries started by the koheesio stream writers.
+
+Spark reports the progress of every micro-batch of a streaming query as a `QueryProgressEvent`. The
+`StreamingMetricsCollector` keeps the most relevant metrics of those events in a bounded in-memory ring buffer (and
+optionally appends them to a JSONL file), so that batch durations, input and processing rates, state size and
+watermark lag can be inspected without writing a custom `StreamingQueryListener`:
+
+- `batch_duration_ms`: total duration of the trigger, `duration_ms` holds the breakdown reported by Spark
+- `num_input_rows`, `input_rows_per_second`, `processed_rows_per_second`
+- `state_rows_total`, `state_rows_updated`, `state_memory_used_bytes`: summed over all state operators
+- `watermark` and `watermark_lag_seconds`: event time watermark and its lag behind the trigger timestamp
+- `backlog`: data that was still outstanding after the batch, as reported by the sources (Kafka offsets behind
+  latest, Delta/file sources outstanding files and bytes)
+
+Every koheesio `StreamWriter` has a collector attached by default, which is available as `writer.output.metrics`
+once the query is started. Events are received through a single `StreamingQueryListener` per Spark session (Spark
+3.4+, classic sessions). For Spark Connect sessions or older Spark versions, `collector.refresh(query)` reads the
+recent progress from the streaming query instead.
+
+Threshold based alerts can be configured through `StreamingMetricAlert`, these call a callback and/or execute a
+notification step from `koheesio.notifications` when a metric crosses its threshold.
+
+Example
+-------
+```python
+from koheesio.notifications.slack import SlackNotificationWithSeverity
+from koheesio.spark.writers.stream_metrics import (
+    StreamingMetricAlert,
+    StreamingMetricsCollector,
+)
+
+writer = DeltaTableStreamWriter(
+    table="my_table",
+    checkpointLocation="my_checkpointlocation",
+    metrics=StreamingMetricsCollector(
+        jsonl_path="/tmp/my_stream_metrics.jsonl",
+        alerts=[
+            StreamingMetricAlert(
+                metric="batch_duration_ms",
+                threshold=60_000,
+                notification=SlackNotificationWithSeverity(...),
+            )
+        ],
+    ),
+)
+writer.execute()
+...
+writer.output.metrics.progress()  # list of metrics, one dict per micro-batch
+```
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Deque, Dict, List, Optional
+from collections import deque
+from datetime import datetime
+import json
+import threading
+
+from koheesio import Step
+from koheesio.models import BaseModel, ConfigDict, Field, InstanceOf, PrivateAttr
+from koheesio.notifications import NotificationSeverity
+from koheesio.spark import SparkSession, StreamingQuery
+from koheesio.spark.utils import SPARK_MINOR_VERSION
+from koheesio.spark.utils.connect import is_remote_session
+
+__all__ = ["StreamingMetricAlert", "StreamingMetricsCollector", "progress_to_metrics"]
+
+_collectors: Dict[str, "StreamingMetricsCollector"] = {}
+_collectors_lock = threading.Lock()
+_listeners: Dict[int, Any] = {}
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse the ISO-8601 timestamps reported by Spark, e.g. `2024-01-01T00:00:00.000Z`"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+_BACKLOG_METRICS = ["maxOffsetsBehindLatest", "numFilesOutstanding", "numBytesOutstanding"]
+
+
+def _source_backlog(sources: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Sum the backlog metrics reported by the sources of the query"""
+    backlog: Dict[str, float] = {}
+    for source in sources:
+        for key, value in (source.get("metrics") or {}).items():
+            if key in _BACKLOG_METRICS and value is not None:
+                backlog[key] = backlog.get(key, 0) + float(value)
+    return backlog
+
+
+def progress_to_metrics(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the metrics of a `StreamingQueryProgress` (as a dict, e.g. `query.lastProgress`)"""
+    state_operators = progress.get("stateOperators") or []
+    duration_ms = progress.get("durationMs") or {}
+    timestamp = progress.get("timestamp")
+    watermark = (progress.get("eventTime") or {}).get("watermark")
+
+    watermark_lag_seconds = None
+    if timestamp and watermark:
+        watermark_lag_seconds = (_parse_timestamp(timestamp) - _parse_timestamp(watermark)).total_seconds()
+
+    return {
+        "query_id": progress.get("id"),
+        "run_id": progress.get("runId"),
+        "name": progress.get("name"),
+        "batch_id": progress.get("batchId"),
+        "timestamp": timestamp,
+        "num_input_rows": progress.get("numInputRows"),
+        "input_rows_per_second": progress.get("inputRowsPerSecond"),
+        "processed_rows_per_second": progress.get("processedRowsPerSecond"),
+        "batch_duration_ms": duration_ms.get("triggerExecution"),
+        "duration_ms": duration_ms,
+        "state_rows_total": sum(op.get("numRowsTotal") or 0 for op in state_operators),
+        "state_rows_updated": sum(op.get("numRowsUpdated") or 0 for op in state_operators),
+        "state_memory_used_bytes": sum(op.get("memoryUsedBytes") or 0 for op in state_operators),
+        "watermark": watermark,
+        "watermark_lag_seconds": watermark_lag_seconds,
+        "backlog": _source_backlog(progress.get("sources") or []),
+    }
+
+
+class StreamingMetricAlert(BaseModel):
+    """Alert when a streaming metric crosses a threshold
+
+    Parameters
+    ----------
+    metric : str
+        Name of the metric to check, e.g. `batch_duration_ms` or `watermark_lag_seconds`
+    threshold : float
+        Threshold for the metric
+    above : bool, optional, default=True
+        Alert when the metric is above the threshold, or below the threshold when set to False
+    severity : NotificationSeverity, optional, default=WARN
+        Severity of the alert
+    notification : Optional[Step]
+        Notification step (e.g. `SlackNotificationWithSeverity`) to execute, with its `message` set to the alert
+    callback : Optional[Callable]
+        Function to call with the alert message and the metrics of the micro-batch
+    """
+
+    metric: str = Field(default=..., description="Name of the metric to check, e.g. `batch_duration_ms`")
+    threshold: float = Field(default=..., description="Threshold for the metric")
+    above: bool = Field(default=True, description="Alert when above the threshold, or below when set to False")
+    severity: NotificationSeverity = Field(default=NotificationSeverity.WARN, description="Severity of the alert")
+    notification: Optional[InstanceOf[Step]] = Field(
+        default=None, description="Notification step to execute, its `message` is set to the alert message"
+    )
+    callback: Optional[Callable[[str, Dict[str, Any]], None]] = Field(
+        default=None, description="Function to call with the alert message and the metrics of the micro-batch"
+    )
+
+    model_config = ConfigDict(use_enum_values=False)
+
+    def is_breached(self, metrics: Dict[str, Any]) -> bool:
+        """Whether the threshold is crossed for the given metrics"""
+        value = metrics.get(self.metric)
+        if value is None:
+            return False
+        return value > self.threshold if self.above else value < self.threshold
+
+    def message(self, metrics: Dict[str, Any]) -> str:
+        """Alert message for the given metrics"""
+        direction = "above" if self.above else "below"
+        return (
+            f"Streaming query {metrics.get('name') or metrics.get('query_id')}, batch {metrics.get('batch_id')}: "
+            f"{self.metric}={metrics.get(self.metric)} is {direction} the threshold of {self.threshold}"
+        )
+
+    def check(self, metrics: Dict[str, Any]) -> bool:
+        """Check the metrics and send the alert when the threshold is crossed"""
+        if not self.is_breached(metrics):
+            return False
+
+        message = self.message(metrics)
+        self.log.warning(f"[{self.severity.name}] {message}")
+        if self.callback:
+            self.callback(message, metrics)
+        if self.notification:
+            self.notification.model_copy(update={"message": message}).execute()
+        return True
+
+
+class StreamingMetricsCollector(BaseModel):
+    """Collects the progress metrics of streaming queries into a bounded ring buffer and an optional JSONL file
+
+    Parameters
+    ----------
+    buffer_size : int, optional, default=1000
+        Number of micro-batches to keep in memory
+    jsonl_path : Optional[str]
+        Local file to append the metrics to, one JSON document per micro-batch
+    alerts : List[StreamingMetricAlert]
+        Alerts to check for every micro-batch
+    """
+
+    buffer_size: int = Field(default=1000, gt=0, description="Number of micro-batches to keep in memory")
+    jsonl_path: Optional[str] = Field(
+        default=None, description="Local file to append the metrics to, one JSON document per micro-batch"
+    )
+    alerts: List[StreamingMetricAlert] = Field(default_factory=list, description="Alerts to check for every batch")
+
+    _buffer: Deque[Dict[str, Any]] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._buffer = deque(maxlen=self.buffer_size)
+
+    def record(self, progress: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record the progress of a micro-batch, returns the extracted metrics (None if the batch was already seen)"""
+        metrics = progress_to_metrics(progress)
+
+        with self._lock:
+            if any(
+                m["run_id"] == metrics["run_id"]
+                and m["batch_id"] == metrics["batch_id"]
+                and m["timestamp"] == metrics["timestamp"]
+                for m in self._buffer
+            ):
+                return None
+            self._buffer.append(metrics)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(metrics) + "\n")
+
+        for alert in self.alerts:
+            try:
+                alert.check(metrics)
+            except Exception as e:  # pylint: disable=broad-except
+                self.log.warning(f"Sending alert for {alert.metric} failed: {e}")
+
+        return metrics
+
+    def progress(self, query_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The metrics of the recorded micro-batches, optionally for a single query only"""
+        with self._lock:
+            return [m for m in self._buffer if query_id is None or m["query_id"] == query_id]
+
+    @property
+    def last(self) -> Optional[Dict[str, Any]]:
+        """The metrics of the most recent micro-batch"""
+        with self._lock:
+            return self._buffer[-1] if self._buffer else None
+
+    def refresh(self, query: StreamingQuery) -> None:
+        """Record the progress that is still available on the streaming query (`query.recentProgress`)"""
+        for progress in query.recentProgress:
+            self.record(progress if isinstance(progress, dict) else json.loads(progress.json))
+
+    def attach(self, query: StreamingQuery, spark: SparkSession) -> None:
+        """Receive the progress events of the given streaming query
+
+        The events are received through a `StreamingQueryListener` that is registered once per Spark session. When
+        such a listener is not supported (Spark Connect, Spark < 3.4), use `refresh` to read the progress instead.
+        """
+        if SPARK_MINOR_VERSION < 3.4 or is_remote_session(spark):
+            self.log.debug("StreamingQueryListener is not supported for this session, use `refresh` instead")
+            return
+
+        try:
+            _ensure_listener(spark)
+        except Exception as e:  # pylint: disable=broad-except
+            self.log.warning(f"Unable to register the StreamingQueryListener, use `refresh` instead: {e}")
+            return
+
+        with _collectors_lock:
+            _collectors[str(query.id)] = self
+
+
+def _ensure_listener(spark: SparkSession) -> None:
+    """Register the koheesio StreamingQueryListener once per Spark session"""
+    from pyspark.sql.streaming import StreamingQueryListener
+
+    class _KoheesioStreamingQueryListener(StreamingQueryListener):
+        """Dispatches the progress events to the collector attached to the query"""
+
+        def onQueryStarted(self, event: Any) -> None:
+            pass
+
+        def onQueryProgress(self, event: Any) -> None:
+            with _collectors_lock:
+                collector = _collectors.get(str(event.progress.id))
+            if collector is not None:
+                collector.record(json.loads(event.progress.json))
+
+        def onQueryIdle(self, event: Any) -> None:
+            pass
+
+        def onQueryTerminated(self, event: Any) -> None:
+            with _collectors_lock:
+                _collectors.pop(str(event.id), None)
+
+    with _collectors_lock:
+        if id(spark) not in _listeners:
+            listener = _KoheesioStreamingQueryListener()
+            spark.streams.addListener(listener)
+            _listeners[id(spark)] = listener
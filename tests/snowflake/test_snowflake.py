@@ -1,6 +1,7 @@
 # flake8: noqa: F811
 from copy import deepcopy
 import os
+import time
 from unittest import mock
 
 import pytest
@@ -12,6 +13,7 @@ from koheesio.integrations.snowflake import (
     GrantPrivilegesOnTable,
     GrantPrivilegesOnView,
     SnowflakeBaseModel,
+    SnowflakeConnectionPool,
     SnowflakeRunQueryPython,
     SnowflakeStep,
     SnowflakeTableStep,
@@ -56,9 +58,10 @@ class TestGrantPrivilegesOnObject:
         kls = GrantPrivilegesOnObject(**self.options)
         output = kls.execute()
 
-        # Assert - 2 queries are expected, result should be None
+        # Assert - 2 queries are expected, sent in a single call, result should be None
         assert output.query == expected_query
-        assert output.results == [None, None]
+        mock_query.assert_called_with(";\n".join(expected_query))
+        assert output.results == [None]
 
 
 class TestGrantPrivilegesOnTable:
@@ -179,6 +182,135 @@ class TestSnowflakeRunQueryPython:
                 instance.execute()
 
 
+class FakeConnection:
+    """Stand-in for a Snowflake connection that records the executed statements"""
+
+    def __init__(self, **options):
+        self.options = options
+        self.statements = []
+        self.rollbacks = 0
+        self.closed = False
+        self.healthy = True
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        if not self.healthy:
+            raise RuntimeError("connection lost")
+        self.rollbacks += 1
+
+    def execute_string(self, query):
+        self.statements.append(query)
+        return []
+
+
+class TestSnowflakeConnectionPool:
+    options = {
+        "account": "42",
+        "user": "user",
+        "password": "secret",
+        "role": "role",
+        "warehouse": "warehouse",
+        "database": "db",
+    }
+
+    @pytest.fixture
+    def connector(self):
+        connector = mock.MagicMock()
+        connector.connect.side_effect = FakeConnection
+        return connector
+
+    def test_reuse(self, connector):
+        pool = SnowflakeConnectionPool()
+        with pool.connection(connector, **self.options) as conn1:
+            pass
+        with pool.connection(connector, **{**self.options, "database": "other_db"}) as conn2:
+            pass
+
+        assert conn1 is conn2
+        assert connector.connect.call_count == 1
+        # the session is reset before the connection is reused
+        assert conn2.rollbacks == 1
+        assert conn2.statements == ["USE ROLE role;\nUSE WAREHOUSE warehouse;\nUSE DATABASE other_db"]
+
+    @pytest.mark.parametrize(
+        "changed_options",
+        [
+            {"role": "other_role"},
+            {"password": "other_secret"},
+            {"authenticator": "externalbrowser"},
+            {"password": None, "private_key": "key"},
+        ],
+    )
+    def test_key_includes_all_connection_options(self, connector, changed_options):
+        pool = SnowflakeConnectionPool()
+        with pool.connection(connector, **self.options) as conn1:
+            pass
+        with pool.connection(connector, **{**self.options, **changed_options}) as conn2:
+            pass
+
+        assert conn2 is not conn1
+        assert "secret" not in repr(pool.key(self.options))
+
+    def test_reset_session_quotes_identifiers(self, connector):
+        pool = SnowflakeConnectionPool()
+        options = {**self.options, "role": "APPLICATION.SNOWFLAKE.ADMIN"}
+        with pool.connection(connector, **options):
+            pass
+        with pool.connection(connector, **options) as conn:
+            pass
+
+        assert conn.statements == ['USE ROLE "APPLICATION.SNOWFLAKE.ADMIN";\nUSE WAREHOUSE warehouse;\nUSE DATABASE db']
+
+    def test_nested_connections_and_max_size(self, connector):
+        pool = SnowflakeConnectionPool(max_size=2, acquire_timeout=0.1)
+        with pool.connection(connector, **self.options) as conn1, pool.connection(connector, **self.options) as conn2:
+            assert conn1 is not conn2
+            with pytest.raises(TimeoutError):
+                with pool.connection(connector, **self.options):
+                    pass
+
+    def test_discard_on_error_and_idle_eviction(self, connector):
+        pool = SnowflakeConnectionPool(max_idle_time=0.01)
+        with pytest.raises(ValueError):
+            with pool.connection(connector, **self.options) as conn1:
+                raise ValueError("query failed")
+        assert conn1.closed
+
+        with pool.connection(connector, **self.options) as conn2:
+            pass
+        time.sleep(0.02)
+        with pool.connection(connector, **self.options) as conn3:
+            pass
+        assert conn2.closed and conn3 is not conn2
+
+    @pytest.mark.parametrize("use_connection_pool, expected_connects", [(False, 2), (True, 1)])
+    def test_run_query_python_pool_is_opt_in(self, connector, use_connection_pool, expected_connects):
+        pool = SnowflakeConnectionPool()
+        with mock.patch("koheesio.integrations.snowflake.get_connection_pool", return_value=pool):
+            for _ in range(2):
+                step = SnowflakeRunQueryPython(
+                    **COMMON_OPTIONS, query="SELECT 1", account="42", use_connection_pool=use_connection_pool
+                )
+                step._snowflake_connector = connector
+                with step.conn:
+                    pass
+
+        assert connector.connect.call_count == expected_connects
+
+    def test_broken_connection_is_replaced(self, connector):
+        pool = SnowflakeConnectionPool()
+        with pool.connection(connector, **self.options) as conn1:
+            conn1.healthy = False
+        with pool.connection(connector, **self.options) as conn2:
+            pass
+        assert conn1.closed and conn2 is not conn1
+
+
 class TestSnowflakeBaseModel:
     def test_get_options_using_alias(self):
         """Test that the options are correctly generated using alias"""
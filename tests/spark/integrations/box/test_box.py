@@ -1,13 +1,16 @@
 from collections import namedtuple
+import hashlib
 from io import BytesIO
 from pathlib import PurePath
 
+from boxsdk.exception import BoxAPIException
 import pytest
 
 from pydantic import ValidationError
 
 from koheesio.integrations.box import (
     Box,
+    BoxBaseFileWriter,
     BoxBufferFileWriter,
     BoxCsvFileReader,
     BoxCsvPathReader,
@@ -71,6 +74,7 @@ def dummy_box(mocker):
             mf.name = name if name else kwargs["file_name"]
             mf.type = "file"
             mf.content.return_value = content
+            mf.download_to.side_effect = lambda stream: stream.write(content)
             Properties = namedtuple("Properties", "name")
             mf.get.return_value = Properties(name=mf.name)
             mf.get_shared_link.return_value = "https://my-ent.box.com/dummy"
@@ -119,6 +123,8 @@ def dummy_box(mocker):
 
     mocker.patch("koheesio.integrations.box.JWTAuth", spec=JWTAuth)
     mocker.patch("koheesio.integrations.box.Client", new=DummyBox)
+    yield
+    BoxBaseFileWriter.clear_folder_cache()
 
 
 class TestBox:
@@ -253,6 +259,42 @@ class TestBoxCsvReader:
             ("meta_load_timestamp", "timestamp"),
         ]
 
+    def test_execute_multiple_files(self, spark, dummy_box, tmp_path):
+        bcr = BoxCsvFileReader(
+            **COMMON_PARAMS,
+            file=["10", "20", "30"],
+            schema=CUSTOM_SCHEMA,
+            spark_options={},
+            staging_path=tmp_path.as_posix(),
+        ).execute()
+        # the files are downloaded to a directory of their own in the staging path
+        assert sorted(p.relative_to(tmp_path).name for p in tmp_path.glob("koheesio_box_*/*.csv")) == [
+            "10.csv",
+            "20.csv",
+            "30.csv",
+        ]
+        assert sorted(bcr.df.select("meta_file_id", "meta_file_name", "bar").collect()) == [
+            ("10", "f1.csv", 1),
+            ("20", "f2.csv", 2),
+            ("30", "upload.csv", 2),
+        ]
+
+    def test_execute_multiple_files_w_pandas_params(self, spark, dummy_box):
+        bcr = BoxCsvFileReader(
+            **COMMON_PARAMS,
+            file=["10", "20"],
+            params={"dtype": {"bar": str}},
+        ).execute()
+        assert bcr.df.dtypes[:2] == [("foo", "string"), ("bar", "string")]
+        assert sorted(bcr.df.select("meta_file_id", "meta_file_name", "bar").collect()) == [
+            ("10", "f1.csv", "1"),
+            ("20", "f2.csv", "2"),
+        ]
+
+    def test_spark_options_wo_staging_path(self, dummy_box):
+        with pytest.raises(AttributeError, match="staging_path"):
+            BoxCsvFileReader(**COMMON_PARAMS, file=["10"], spark_options={"sep": ";"})
+
     def test_file_attribute_validation(self, dummy_box):
         """Tests that if one single file id is provided, it will be converted to a list"""
         bcr = BoxCsvFileReader(**COMMON_PARAMS, file="this-is-a-single-file-id")
@@ -314,6 +356,118 @@ class TestBoxFileWriter:
         ).execute()
         assert f.file.get().name == "upload.txt"
 
+    def test_execute_multiple_files(self, dummy_box, tmp_path):
+        paths = []
+        for name in ["a.txt", "b.txt", "c.txt"]:
+            (tmp_path / name).write_bytes(b"my-data")
+            paths.append((tmp_path / name).as_posix())
+
+        f = BoxFileWriter(**COMMON_PARAMS, path="/foo", file=paths).execute()
+        assert sorted(file.get().name for file in f.files) == ["a.txt", "b.txt", "c.txt"]
+        assert len(f.shared_links) == 3
+        # the shared link is requested once per file
+        assert [file.get_shared_link.call_count for file in f.files] == [1, 1, 1]
+
+    def test_execute_multiple_files_w_file_name(self, dummy_box):
+        with pytest.raises(AttributeError):
+            BoxFileWriter(**COMMON_PARAMS, path="/foo", file=["a.txt", "b.txt"], file_name="upload.txt")
+
+    def test_folder_cache(self, dummy_box, mocker):
+        folder = Box(**COMMON_PARAMS).client.folder(folder_id="1")
+        writer = BoxFileWriter(**COMMON_PARAMS, path="/foo", file=BytesIO(b"my-data"), file_name="upload.txt")
+
+        assert writer.get_file(folder=folder, file_name="f1.csv").object_id == "10"
+        assert writer.get_file(folder=folder, file_name="upload.txt") is None
+        writer.write_or_overwrite_file_with_stream(folder=folder, file_stream=BytesIO(b"data"), file_name="upload.txt")
+        assert writer.get_file(folder=folder, file_name="upload.txt").name == "upload.txt"
+        folder.get_items.assert_called_once()
+
+        BoxBaseFileWriter.clear_folder_cache(folder_id="1")
+        assert writer.get_file(folder=folder, file_name="upload.txt") is None
+        assert folder.get_items.call_count == 2
+
+    def test_folder_cache_outdated_conflict(self, dummy_box):
+        folder = Box(**COMMON_PARAMS).client.folder(folder_id="1")
+        writer = BoxFileWriter(
+            **COMMON_PARAMS, path="/foo", file=BytesIO(b"my-data"), file_name="new.csv", overwrite=True
+        )
+        assert writer.get_file(folder=folder, file_name="new.csv") is None
+
+        # another process created the file after the folder was listed
+        created = folder.get_items.return_value[0]
+        created.name = "new.csv"
+        created.update_contents_with_stream.return_value = created
+        folder.preflight_check.side_effect = BoxAPIException(status=409, code="item_name_in_use")
+
+        stream = BytesIO(b"data")
+        new_file = writer.write_or_overwrite_file_with_stream(folder=folder, file_stream=stream, file_name="new.csv")
+        assert new_file is created
+        created.update_contents_with_stream.assert_called_once_with(file_stream=stream)
+        assert folder.get_items.call_count == 2
+
+    def test_folder_cache_outdated_not_found(self, dummy_box):
+        folder = Box(**COMMON_PARAMS).client.folder(folder_id="1")
+        writer = BoxFileWriter(
+            **COMMON_PARAMS, path="/foo", file=BytesIO(b"my-data"), file_name="f1.csv", overwrite=True
+        )
+        cached_file = writer.get_file(folder=folder, file_name="f1.csv")
+
+        # another process deleted the file after the folder was listed
+        cached_file.update_contents_with_stream.side_effect = BoxAPIException(status=404, code="not_found")
+        folder.get_items.return_value = folder.get_items.return_value[1:]
+
+        new_file = writer.write_or_overwrite_file_with_stream(
+            folder=folder, file_stream=BytesIO(b"data"), file_name="f1.csv"
+        )
+        assert new_file.name == "f1.csv"
+        folder.upload_stream.assert_called_once()
+        assert writer.get_file(folder=folder, file_name="f1.csv") is new_file
+
+    def test_folder_cache_other_errors_not_retried(self, dummy_box):
+        folder = Box(**COMMON_PARAMS).client.folder(folder_id="1")
+        writer = BoxFileWriter(**COMMON_PARAMS, path="/foo", file=BytesIO(b"my-data"), file_name="new.csv")
+        folder.preflight_check.side_effect = BoxAPIException(status=403, code="access_denied_insufficient_permissions")
+
+        with pytest.raises(BoxAPIException):
+            writer.write_or_overwrite_file_with_stream(folder=folder, file_stream=BytesIO(b"data"), file_name="new.csv")
+        folder.preflight_check.assert_called_once()
+
+    def test_write_file_unloaded_folder(self, dummy_box, mocker):
+        # a folder object that is not loaded (e.g. `client.folder(folder_id)`) has no name
+        folder = Box(**COMMON_PARAMS).client.folder(folder_id="1")
+        del folder.name
+        writer = BoxFileWriter(**COMMON_PARAMS, path="/foo", file=BytesIO(b"my-data"), file_name="upload.txt")
+
+        assert (
+            writer.write_file(file_stream=BytesIO(b"data"), file_name="upload.txt", folder=folder).name == "upload.txt"
+        )
+
+    def test_chunked_upload(self, dummy_box, mocker):
+        folder = Box(**COMMON_PARAMS).client.folder(folder_id="1")
+        upload_session = mocker.Mock(part_size=8 * 1024 * 1024)
+        upload_session.upload_part_bytes.side_effect = lambda part, offset, total: {"offset": offset, "size": len(part)}
+        folder.create_upload_session.return_value = upload_session
+
+        content = b"x" * (21 * 1024 * 1024)
+        writer = BoxFileWriter(
+            **COMMON_PARAMS,
+            path="/foo",
+            file=BytesIO(content),
+            file_name="large.csv",
+            chunked_upload_threshold=20 * 1024 * 1024,
+            upload_workers=2,
+        )
+        writer.write_or_overwrite_file_with_stream(folder=folder, file_stream=BytesIO(content), file_name="large.csv")
+
+        folder.create_upload_session.assert_called_once_with(file_size=len(content), file_name="large.csv")
+        folder.upload_stream.assert_not_called()
+        assert upload_session.commit.call_args.kwargs["parts"] == [
+            {"offset": 0, "size": 8 * 1024 * 1024},
+            {"offset": 8 * 1024 * 1024, "size": 8 * 1024 * 1024},
+            {"offset": 16 * 1024 * 1024, "size": 5 * 1024 * 1024},
+        ]
+        assert upload_session.commit.call_args.kwargs["content_sha1"] == hashlib.sha1(content).digest()
+
 
 class TestBoxBufferFileWriter:
     def test_execute(self, dummy_box, spark):
@@ -1,13 +1,16 @@
 # flake8: noqa: F811
 import logging
+import os
 from textwrap import dedent
 from unittest import mock
 from unittest.mock import Mock
 
 import pytest
 
+from pyspark.sql import functions as f
 from pyspark.sql import types as t
 
+from koheesio.integrations.snowflake import SnowflakeRunQueryPython
 from koheesio.integrations.snowflake.test_utils import mock_query
 from koheesio.integrations.spark.snowflake import (
     AddColumn,
@@ -149,6 +152,152 @@ class TestSnowflakeWriter:
         mock_df.write.format.assert_called_with("snowflake")
 
 
+class TestSnowflakeWriterCopy:
+    @pytest.fixture
+    def recording_conn(self):
+        """Local stand-in for a Snowflake connection, recording the statements and the uploaded parquet parts"""
+        with mock.patch(
+            "koheesio.integrations.snowflake.SnowflakeRunQueryPython.conn", new_callable=mock.MagicMock
+        ) as mock_conn:
+            conn = mock_conn.__enter__.return_value
+            conn.statements = []
+            conn.uploaded = []
+
+            def execute_string(statement):
+                conn.statements.append(statement)
+                cursor = mock.MagicMock()
+                if statement.startswith("PUT"):
+                    local_dir = statement.split("'file://")[1].split("/*.parquet")[0]
+                    conn.uploaded = sorted(p for p in os.listdir(local_dir) if p.endswith(".parquet"))
+                if statement.startswith("COPY INTO"):
+                    cursor.description = [("file",), ("status",), ("rows_parsed",), ("rows_loaded",)]
+                    cursor.fetchall.return_value = [(p, "LOADED", 5, 5) for p in conn.uploaded]
+                return [cursor]
+
+            conn.execute_string.side_effect = execute_string
+            yield conn
+
+    def test_execute_append(self, spark, recording_conn, tmp_path):
+        df = spark.range(10).withColumn("name", f.lit("foo"))
+        output = SnowflakeWriter(
+            **COMMON_OPTIONS,
+            table="foo",
+            mode=BatchOutputMode.APPEND,
+            load_method="copy",
+            copy_num_files=2,
+            put_parallel=4,
+            staging_dir=tmp_path.as_posix(),
+        ).write(df)
+
+        stage = recording_conn.statements[0].split()[3]
+        assert recording_conn.statements[0] == f"CREATE TEMPORARY STAGE {stage} FILE_FORMAT = (TYPE = PARQUET)"
+        assert recording_conn.statements[1].startswith(f"PUT 'file://{tmp_path.as_posix()}/")
+        assert recording_conn.statements[1].endswith(f"/*.parquet' @{stage} PARALLEL = 4 AUTO_COMPRESS = FALSE")
+        assert recording_conn.statements[2:] == [
+            "CREATE TABLE IF NOT EXISTS foo (id BIGINT, name STRING)",
+            f"COPY INTO foo FROM @{stage} FILE_FORMAT = (TYPE = PARQUET) MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE "
+            "PURGE = TRUE",
+            f"DROP STAGE IF EXISTS {stage}",
+        ]
+        assert len(recording_conn.uploaded) == 2
+        assert output.files == 2
+        assert output.rows_loaded == 10
+        assert output.bytes > 0
+        assert output.rows_per_second > 0
+        # local parquet parts are cleaned up
+        assert list(tmp_path.iterdir()) == []
+
+    def test_execute_overwrite(self, spark, recording_conn, tmp_path):
+        df = spark.range(10).withColumn("name", f.lit("foo"))
+        output = SnowflakeWriter(
+            **COMMON_OPTIONS,
+            table="foo",
+            mode=BatchOutputMode.OVERWRITE,
+            load_method="copy",
+            staging_dir=tmp_path.as_posix(),
+        ).write(df)
+
+        stage = recording_conn.statements[0].split()[3]
+        staging_table = recording_conn.statements[2].split()[4]
+        assert staging_table.startswith("foo_koheesio_copy_")
+        # the target table is only replaced once the COPY succeeded, keeping its grants
+        assert recording_conn.statements[2:] == [
+            f"CREATE OR REPLACE TABLE {staging_table} (id BIGINT, name STRING)",
+            f"COPY INTO {staging_table} FROM @{stage} FILE_FORMAT = (TYPE = PARQUET) "
+            "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE PURGE = TRUE",
+            f"CREATE OR REPLACE TABLE foo CLONE {staging_table} COPY GRANTS",
+            f"DROP TABLE IF EXISTS {staging_table}",
+            f"DROP STAGE IF EXISTS {stage}",
+        ]
+        assert output.rows_loaded == 5 * output.files
+
+    def test_execute_overwrite_failed_copy(self, spark, recording_conn, tmp_path):
+        execute_string = recording_conn.execute_string.side_effect
+
+        def failing_copy(statement):
+            if statement.startswith("COPY INTO"):
+                recording_conn.statements.append(statement)
+                raise RuntimeError("COPY failed")
+            return execute_string(statement)
+
+        recording_conn.execute_string.side_effect = failing_copy
+        writer = SnowflakeWriter(
+            **COMMON_OPTIONS,
+            table="foo",
+            mode=BatchOutputMode.OVERWRITE,
+            load_method="copy",
+            staging_dir=tmp_path.as_posix(),
+        )
+        with pytest.raises(RuntimeError, match="COPY failed"):
+            writer.write(spark.range(10))
+
+        staging_table = recording_conn.statements[2].split()[4]
+        # the target table is never touched, the staging table is dropped
+        assert not any(" foo " in s or s.endswith(" foo") for s in recording_conn.statements)
+        assert recording_conn.statements[-1] == f"DROP TABLE IF EXISTS {staging_table}"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_staging_dir_required_on_cluster(self, spark, tmp_path):
+        writer = SnowflakeWriter(**COMMON_OPTIONS, table="foo", load_method="copy", df=spark.range(1))
+        with mock.patch("koheesio.integrations.spark.snowflake.is_local_master", return_value=False):
+            with pytest.raises(ValueError, match="staging_dir_spark_path"):
+                writer.execute()
+
+    def test_staging_dir_spark_path(self, spark, recording_conn, tmp_path):
+        SnowflakeWriter(
+            **COMMON_OPTIONS,
+            table="foo",
+            load_method="copy",
+            staging_dir=tmp_path.as_posix(),
+            staging_dir_spark_path=f"file://{tmp_path.as_posix()}",
+        ).write(spark.range(10))
+
+        assert len(recording_conn.uploaded) == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_account_passed_to_spark(self, spark):
+        writer = SnowflakeWriter(**COMMON_OPTIONS, table="foo", account="my_account")
+        # a user-supplied account is passed on to the Spark connector
+        assert writer.get_options()["account"] == "my_account"
+        assert "account" not in writer._copy_fields
+
+    @pytest.mark.parametrize("use_connection_pool", [False, True])
+    def test_connection_pool(self, spark, recording_conn, tmp_path, use_connection_pool):
+        df = spark.range(10).withColumn("name", f.lit("foo"))
+        with mock.patch(
+            "koheesio.integrations.spark.snowflake.SnowflakeRunQueryPython", wraps=SnowflakeRunQueryPython
+        ) as runner:
+            SnowflakeWriter(
+                **COMMON_OPTIONS,
+                table="foo",
+                load_method="copy",
+                staging_dir=tmp_path.as_posix(),
+                use_connection_pool=use_connection_pool,
+            ).write(df)
+
+        assert runner.call_args.kwargs["use_connection_pool"] is use_connection_pool
+
+
 class TestSyncTableAndDataFrameSchema:
     @mock.patch("koheesio.integrations.spark.snowflake.AddColumn")
     @mock.patch("koheesio.integrations.spark.snowflake.GetTableSchema")
@@ -8,11 +8,12 @@ from spark.conftest import await_job_completion
 
 import pydantic
 
-from koheesio.integrations.snowflake import SnowflakeRunQueryPython
+from koheesio.integrations.snowflake import SnowflakeConnectionPool, SnowflakeRunQueryPython
 from koheesio.integrations.spark.snowflake import SnowflakeWriter, SynchronizeDeltaToSnowflakeTask
 from koheesio.spark import DataFrame
 from koheesio.spark.delta import DeltaTableStep
-from koheesio.spark.readers.delta import DeltaTableReader
+from koheesio.spark.readers.delta import DeltaTableChangeFeedReader, DeltaTableReader
+from koheesio.spark.readers.incremental import LocalFileWatermarkStore
 from koheesio.spark.writers import BatchOutputMode, StreamingOutputMode
 from koheesio.spark.writers.delta import DeltaTableWriter
 from koheesio.spark.writers.stream import ForEachBatchStreamWriter
@@ -345,6 +346,138 @@ class TestMerge:
 
         assertDataFrameEqual(result_df, expected_staging_df)
 
+    @pytest.mark.parametrize("merge_values_max_rows, merge_source", [(None, "staging"), (2, "staging"), (3, "values")])
+    def test_merge_batch(self, spark, merge_values_max_rows, merge_source):
+        df = spark.createDataFrame(
+            data=[
+                ("Australia", 100, "insert", 2),
+                ("USA", 10000, "update_preimage", 3),
+                ("USA", 11000, "update_postimage", 3),
+                ("USA", 12000, "update_postimage", 4),
+                ("O'Neill", None, "delete", 4),
+            ],
+            schema=["Country", "NumVaccinated", "_change_type", "_commit_version"],
+        )
+        task = SynchronizeDeltaToSnowflakeTask(
+            streaming=True,
+            synchronisation_mode=BatchOutputMode.MERGE,
+            merge_values_max_rows=merge_values_max_rows,
+            source_table=DeltaTableStep(table="test_merge_batch"),
+            **COMMON_OPTIONS,
+        )
+
+        with (
+            mock.patch.object(SynchronizeDeltaToSnowflakeTask, "truncate_table") as mocked_truncate,
+            mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_build_staging_table") as mocked_staging,
+            mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_merge_staging_table_into_target") as mocked_merge,
+        ):
+            task._merge_batch(df, 7, ["Country"], ["NumVaccinated"], "staging_table")
+
+        metrics = task.output.batch_metrics[0]
+        assert metrics["batch_id"] == 7
+        assert metrics["rows"] == 3
+        assert metrics["merge_source"] == merge_source
+        assert {"compact_time", "stage_time", "merge_time", "total_time"} <= set(metrics)
+
+        if merge_source == "staging":
+            mocked_truncate.assert_called_once_with("staging_table")
+            mocked_staging.assert_called_once()
+            mocked_merge.assert_called_once_with(stage_table=None)
+        else:
+            mocked_truncate.assert_not_called()
+            mocked_staging.assert_not_called()
+            values_source = mocked_merge.call_args.kwargs["stage_table"]
+            assert values_source.startswith(
+                "(SELECT column1 AS Country, column2 AS NumVaccinated, column3 AS _change_type FROM VALUES\n"
+            )
+            assert "('USA', 12000, 'update_postimage')" in values_source
+            assert "('O\\'Neill', NULL, 'delete')" in values_source
+
+    def test_merge_batch_metrics_history_size(self, spark):
+        df = spark.createDataFrame(
+            data=[("Australia", 100, "insert", 2)],
+            schema="Country string, NumVaccinated long, _change_type string, _commit_version long",
+        )
+        task = SynchronizeDeltaToSnowflakeTask(
+            streaming=True,
+            synchronisation_mode=BatchOutputMode.MERGE,
+            metrics_history_size=2,
+            source_table=DeltaTableStep(table="test_merge_batch_metrics"),
+            **COMMON_OPTIONS,
+        )
+
+        with (
+            mock.patch.object(SynchronizeDeltaToSnowflakeTask, "truncate_table"),
+            mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_build_staging_table"),
+            mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_merge_staging_table_into_target"),
+        ):
+            for batch_id in range(3):
+                task._merge_batch(df, batch_id, ["Country"], ["NumVaccinated"], "staging_table")
+
+        assert [m["batch_id"] for m in task.output.batch_metrics] == [1, 2]
+
+    @pytest.mark.parametrize("use_connection_pool, expected_connections", [(False, 3), (True, 1)])
+    def test_merge_batch_connection_pool(self, spark, use_connection_pool, expected_connections):
+        df = spark.createDataFrame(
+            data=[("Australia", 100, "insert", 2), ("USA", 11000, "update_postimage", 3)],
+            schema=["Country", "NumVaccinated", "_change_type", "_commit_version"],
+        )
+        task = SynchronizeDeltaToSnowflakeTask(
+            streaming=True,
+            synchronisation_mode=BatchOutputMode.MERGE,
+            merge_values_max_rows=10,
+            use_connection_pool=use_connection_pool,
+            source_table=DeltaTableStep(table="test_merge_batch_connection_pool"),
+            **COMMON_OPTIONS,
+        )
+
+        def connect(**options):
+            conn = mock.MagicMock()
+            conn.is_closed.return_value = False
+            conn.execute_string.return_value = []
+            return conn
+
+        with (
+            mock.patch("snowflake.connector.connect", side_effect=connect) as mocked_connect,
+            mock.patch("koheesio.integrations.snowflake.get_connection_pool", return_value=SnowflakeConnectionPool()),
+            mock.patch.object(SynchronizeDeltaToSnowflakeTask, "non_key_columns", new=["NumVaccinated"]),
+        ):
+            for batch_id in range(2):
+                task._merge_batch(df, batch_id, ["Country"], ["NumVaccinated"], "staging_table")
+            task.drop_table("staging_table")
+
+        # two merges and a drop, on a single pooled connection
+        assert mocked_connect.call_count == expected_connections
+
+    def test_writer_connection_pool(self):
+        task = SynchronizeDeltaToSnowflakeTask(
+            synchronisation_mode=BatchOutputMode.APPEND,
+            use_connection_pool=True,
+            load_method="copy",
+            source_table=DeltaTableStep(table="test_writer_connection_pool"),
+            **{**COMMON_OPTIONS, "checkpoint_location": None},
+        )
+        assert task.writer.use_connection_pool is True
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, "NULL"),
+            (True, "TRUE"),
+            (42, "42"),
+            (1.5, "1.5"),
+            (float("nan"), "'nan'::FLOAT"),
+            ("it's", "'it\\'s'"),
+            (datetime(2024, 5, 1, 12, 30), "'2024-05-01 12:30:00'"),
+        ],
+    )
+    def test_to_sql_literal(self, value, expected):
+        assert SynchronizeDeltaToSnowflakeTask._to_sql_literal(value) == expected
+
+    def test_to_sql_literal_unsupported(self):
+        with pytest.raises(TypeError):
+            SynchronizeDeltaToSnowflakeTask._to_sql_literal([1, 2])
+
 
 class TestValidations:
     options = {**COMMON_OPTIONS}
@@ -387,6 +520,71 @@ class TestValidations:
                 **COMMON_OPTIONS,
             )
 
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "drop_table")
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_merge_batch")
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "non_key_columns", new=["NumVaccinated"])
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_check_cdf_active")
+    @mock.patch.object(DeltaTableChangeFeedReader, "latest_version", new=4)
+    @mock.patch.object(DeltaTableChangeFeedReader, "cdf_enabled_version", new=0)
+    def test_snowflake_sync_task_batch_merge(self, _, mocked_merge, __, spark, tmp_path):
+        store = LocalFileWatermarkStore(path=(tmp_path / "versions.json").as_posix())
+        task = SynchronizeDeltaToSnowflakeTask(
+            streaming=False,
+            synchronisation_mode=BatchOutputMode.MERGE,
+            version_store=store,
+            max_versions_per_batch=2,
+            **{**self.options, "checkpoint_location": None},
+        )
+        assert isinstance(task.reader, DeltaTableChangeFeedReader)
+
+        df = spark.createDataFrame(
+            [("USA", 11000, 20000, "update_postimage", 3, datetime(2021, 4, 14, 20, 26, 39))],
+            "Country string, NumVaccinated int, AvailableDoses int, "
+            "_change_type string, _commit_version long, _commit_timestamp timestamp",
+        )
+        with mock.patch.object(DeltaTableReader, "read", return_value=df) as mocked_read:
+            task.execute()
+
+        # versions 0..4 are merged in ranges of at most 2 versions, the last merged version is stored
+        assert mocked_read.call_count == 3
+        assert [c.args[1] for c in mocked_merge.call_args_list] == [1, 3, 4]
+        assert store.get("<foo>._commit_version") == 4
+
+        # nothing new, nothing is merged
+        with (
+            mock.patch.object(DeltaTableReader, "read") as mocked_read,
+            mock.patch.object(DeltaTableChangeFeedReader, "_empty"),
+        ):
+            task.execute()
+        mocked_read.assert_not_called()
+        assert mocked_merge.call_count == 3
+
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "drop_table")
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_merge_batch")
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "non_key_columns", new=["NumVaccinated"])
+    @mock.patch.object(SynchronizeDeltaToSnowflakeTask, "_check_cdf_active")
+    @mock.patch.object(DeltaTableChangeFeedReader, "latest_version", new=4)
+    def test_snowflake_sync_task_batch_merge_starting_version(self, _, mocked_merge, __, spark, tmp_path):
+        task = SynchronizeDeltaToSnowflakeTask(
+            streaming=False,
+            synchronisation_mode=BatchOutputMode.MERGE,
+            version_store=LocalFileWatermarkStore(path=(tmp_path / "versions.json").as_posix()),
+            starting_version=3,
+            **{**self.options, "checkpoint_location": None},
+        )
+        assert task.reader.starting_version == 3
+
+        df = spark.createDataFrame(
+            [("USA", 11000, 20000, "update_postimage", 3, datetime(2021, 4, 14, 20, 26, 39))],
+            "Country string, NumVaccinated int, AvailableDoses int, "
+            "_change_type string, _commit_version long, _commit_timestamp timestamp",
+        )
+        with mock.patch.object(DeltaTableReader, "read", return_value=df):
+            task.execute()
+
+        # only versions 3..4 are merged
+        assert [c.args[1] for c in mocked_merge.call_args_list] == [4]
+
     def test_snowflake_sync_task_merge_keys(self):
         with pytest.raises(pydantic.ValidationError):
             SynchronizeDeltaToSnowflakeTask(
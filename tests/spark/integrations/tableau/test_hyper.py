@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from pathlib import Path, PurePath
 
 import pytest
@@ -71,6 +72,41 @@ class TestHyper:
         assert df.count() == 3
         assert df.dtypes == [("string", "string"), ("int", "int"), ("timestamp", "timestamp")]
 
+    def test_hyper_file_reader_native_types(self, spark, tmp_path):
+        hw = HyperFileListWriter(
+            name="test_types",
+            path=tmp_path.as_posix(),
+            table_definition=TableDefinition(
+                table_name=TableName("Extract", "Extract"),
+                columns=[
+                    TableDefinition.Column(name="date", type=SqlType.date(), nullability=NULLABLE),
+                    TableDefinition.Column(name="numeric", type=SqlType.numeric(10, 2), nullability=NULLABLE),
+                    TableDefinition.Column(name="double", type=SqlType.double(), nullability=NULLABLE),
+                    TableDefinition.Column(name="timestamp", type=SqlType.timestamp(), nullability=NULLABLE),
+                ],
+            ),
+            data=[
+                [date(2024, 1, 1), Decimal("1.50"), 1.5, datetime(2024, 1, 1, 12, 30, 0, 0)],
+                [None, None, None, None],
+            ],
+        ).execute()
+
+        df = HyperFileReader(path=PurePath(hw.hyper_path), staging_path=tmp_path / "staging").execute().df
+
+        assert df.dtypes == [
+            ("date", "date"),
+            ("numeric", "decimal(18,5)"),
+            ("double", "float"),
+            ("timestamp", "timestamp"),
+        ]
+        assert df.orderBy("date").collect()[1].asDict() == {
+            "date": date(2024, 1, 1),
+            "numeric": Decimal("1.50000"),
+            "double": 1.5,
+            "timestamp": datetime(2024, 1, 1, 12, 30),
+        }
+        assert list((tmp_path / "staging").glob("koheesio_hyper_*/*.parquet"))
+
     def test_hyper_file_parquet_writer(self, data_path, parquet_file):
         hw = HyperFileParquetWriter(
             name="test",
@@ -116,6 +152,18 @@ class TestHyper:
             ("date", "date"),
         ]
 
+    def test_hyper_file_dataframe_writer_multiple_files(self, spark, tmp_path):
+        df = spark.range(100).withColumn("name", lit("foo"))
+
+        hw = HyperFileDataFrameWriter(name="test", df=df, path=tmp_path.as_posix(), num_files=3)
+        assert len(hw.write_parquet()) == 3
+
+        hw.execute()
+        df = HyperFileReader(path=PurePath(hw.hyper_path)).execute().df
+
+        assert df.count() == 100
+        assert df.agg({"id": "sum"}).collect()[0][0] == sum(range(100))
+
     @pytest.fixture()
     def hyper_file_writer(self):
         return HyperFileListWriter(
@@ -0,0 +1,192 @@
+import datetime
+import json
+
+import pytest
+
+from pyspark.sql.types import DateType, LongType, StringType, StructField, StructType, TimestampType
+
+from koheesio.spark.readers.delta_scan import DeltaScanPlanner, split_conjuncts
+
+pytestmark = pytest.mark.spark
+
+SCHEMA = StructType(
+    [
+        StructField("id", LongType()),
+        StructField("ts", TimestampType()),
+        StructField("country", StringType()),
+        StructField("event_date", DateType()),
+        StructField("event_ts", TimestampType()),
+        StructField("ts_date", DateType(), metadata={"delta.generationExpression": "CAST(`ts` AS DATE)"}),
+        StructField("bucket", LongType()),
+    ]
+)
+
+
+@pytest.fixture
+def planner():
+    return DeltaScanPlanner(
+        schema=SCHEMA,
+        partition_columns=["event_date", "event_ts", "ts_date", "bucket"],
+        properties={"delta.dataSkippingNumIndexedCols": "2"},
+    )
+
+
+def test_split_conjuncts():
+    assert split_conjuncts("(a = 1 AND (b = 2 OR c = 3)) and d between 1 and 2 AND e = 'x and y'") == [
+        "a = 1",
+        "b = 2 OR c = 3",
+        "d between 1 and 2",
+        "e = 'x and y'",
+    ]
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        # AND binds stronger than OR, a top level OR is not split
+        ("a = 1 AND b = 2 OR c = 3", ["a = 1 AND b = 2 OR c = 3"]),
+        ("a = 1 OR b = 2 AND c = 3", ["a = 1 OR b = 2 AND c = 3"]),
+        ("(a = 1 AND b = 2 OR c = 3) AND d = 4", ["a = 1 AND b = 2 OR c = 3", "d = 4"]),
+        ("((a = 1 AND b = 2) OR c = 3)", ["(a = 1 AND b = 2) OR c = 3"]),
+        ("e = 'x or y' AND f = 1", ["e = 'x or y'", "f = 1"]),
+    ],
+)
+def test_split_conjuncts_or(condition, expected):
+    assert split_conjuncts(condition) == expected
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        # the ANDs of a CASE expression are not split
+        (
+            "a = 1 AND CASE WHEN b = 2 AND c = 3 THEN true ELSE false END",
+            ["a = 1", "CASE WHEN b = 2 AND c = 3 THEN true ELSE false END"],
+        ),
+        (
+            "(CASE WHEN b = 2 AND c = 3 THEN 1 END) = 1 AND d = 4",
+            ["(CASE WHEN b = 2 AND c = 3 THEN 1 END) = 1", "d = 4"],
+        ),
+        # comments are removed
+        ("a = 1 AND b = 2 -- AND c = 3", ["a = 1", "b = 2"]),
+        ("a = '--1' AND /* b = 2 AND */ c = 3", ["a = '--1'", "c = 3"]),
+    ],
+)
+def test_split_conjuncts_case_and_comments(condition, expected):
+    assert split_conjuncts(condition) == expected
+
+
+def test_plan_case_expression(spark, planner):
+    condition = "to_date(event_date) = '2024-01-01' AND CASE WHEN id = 1 AND bucket = 2 THEN true ELSE false END"
+    plan = planner.plan(condition)
+
+    assert plan.filter_cond == (
+        "(event_date = CAST('2024-01-01' AS DATE)) AND (CASE WHEN id = 1 AND bucket = 2 THEN true ELSE false END)"
+    )
+    # the rewritten condition is valid SQL
+    spark.range(1).selectExpr("1 AS id", "CAST(NULL AS DATE) AS event_date", "2 AS bucket").filter(plan.filter_cond)
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        ("to_date(event_date) = '2024-01-02'", "event_date = CAST('2024-01-02' AS DATE)"),
+        ("'2024-01-02' < CAST(event_date AS DATE)", "event_date > CAST('2024-01-02' AS DATE)"),
+        (
+            "to_date(event_ts) = '2024-01-02'",
+            "event_ts >= CAST(CAST('2024-01-02' AS DATE) AS TIMESTAMP) "
+            "AND event_ts < CAST(date_add(CAST('2024-01-02' AS DATE), 1) AS TIMESTAMP)",
+        ),
+        ("year(event_date) <= 2023", "event_date < DATE '2024-01-01'"),
+        ("year(event_ts) = 2024", "event_ts >= TIMESTAMP '2024-01-01' AND event_ts < TIMESTAMP '2025-01-01'"),
+        ("cast(event_date as string) = '2024-01-02'", "event_date = DATE '2024-01-02'"),
+        ("cast(bucket as string) = '7'", "bucket = 7"),
+        ("to_date(ts) >= '2024-01-02'", "ts_date >= '2024-01-02'"),
+        # not safe or not a partition column: no rewrite
+        ("cast(bucket as string) = '07'", None),
+        ("to_date(ts) = '2024-01-02' OR id = 1", None),
+        ("year(ts) = 2024", None),
+        ("to_date(event_date) <> '2024-01-02'", None),
+    ],
+)
+def test_rewrite_conjunct(spark, planner, condition, expected):
+    assert planner.rewrite_conjunct(condition) == expected
+
+    if expected is not None:
+        # the rewritten predicate selects the same rows
+        df = spark.createDataFrame(
+            [
+                (i, ts, "NL", ts.date(), ts, ts.date(), i % 10)
+                for i, ts in enumerate(
+                    datetime.datetime(2023, 12, 1, 1) + datetime.timedelta(hours=7 * n) for n in range(400)
+                )
+            ],
+            SCHEMA,
+        )
+        assert df.filter(condition).count() == df.filter(expected).count() > 0
+
+
+def test_plan(planner):
+    plan = planner.plan("to_date(ts) = '2024-01-02' AND country = 'NL' AND id > 10")
+    assert plan.filter_cond == "(ts_date = '2024-01-02') AND (country = 'NL') AND (id > 10)"
+    assert plan.rewrites == {"to_date(ts) = '2024-01-02'": "ts_date = '2024-01-02'"}
+    assert plan.partition_filters == ["ts_date = '2024-01-02'"]
+    # only the first 2 columns have statistics
+    assert plan.data_skipping_filters == ["id > 10"]
+    assert plan.full_scan is False
+
+    plan = planner.plan("country = 'NL'")
+    assert plan.filter_cond == "country = 'NL'"
+    assert plan.full_scan is True
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        "to_date(event_date) = '2024-01-02' AND id = 1 OR country = 'NL'",
+        "country = 'NL' OR to_date(event_date) = '2024-01-02' AND id = 1",
+        "NOT to_date(event_date) = '2024-01-02'",
+    ],
+)
+def test_plan_mixed_and_or(spark, planner, condition):
+    # a condition that can not be split safely is left untouched
+    plan = planner.plan(condition)
+    assert plan.filter_cond == condition
+    assert plan.rewrites == {}
+
+
+def test_plan_or_in_parentheses(spark, planner):
+    condition = "to_date(event_date) = '2024-01-02' AND (id = 1 OR country = 'NL')"
+    plan = planner.plan(condition)
+    assert plan.filter_cond == "(event_date = CAST('2024-01-02' AS DATE)) AND (id = 1 OR country = 'NL')"
+
+    df = spark.createDataFrame(
+        [
+            (i, datetime.datetime(2024, 1, 1 + i % 3), "NL" if i % 2 else "BE", datetime.date(2024, 1, 1 + i % 3))
+            for i in range(12)
+        ],
+        "id long, ts timestamp, country string, event_date date",
+    )
+    assert df.filter(condition).count() == df.filter(plan.filter_cond).count() > 0
+
+
+def test_count_files(spark, planner):
+    def file(path, event_date, min_id, max_id):
+        return {
+            "path": path,
+            "partitionValues": {"event_date": event_date, "event_ts": None, "ts_date": None, "bucket": "1"},
+            "stats": json.dumps({"numRecords": 10, "minValues": {"id": min_id}, "maxValues": {"id": max_id}}),
+        }
+
+    files = [
+        file("a", "2024-01-01", 0, 9),
+        file("b", "2024-01-02", 0, 9),
+        file("c", "2024-01-02", 10, 19),
+        {"path": "d", "partitionValues": {"event_date": "2024-01-02"}},
+    ]
+
+    plan = planner.count_files(spark, files, planner.plan("to_date(event_date) = '2024-01-02' AND id >= 10"))
+    assert (plan.total_files, plan.files_to_read, plan.pruned_files) == (4, 2, 2)
+
+    plan = planner.count_files(spark, files, planner.plan("country = 'NL'"))
+    assert (plan.total_files, plan.files_to_read, plan.pruned_files) == (4, 4, 0)
@@ -163,3 +163,136 @@ def test_orc_reader(orc_file):
     df = reader.read()
     actual_data = [row.asDict() for row in df.collect()]
     assert actual_data == expected_data
+
+
+def test_file_loader_with_manifest(spark, tmp_path):
+    from koheesio.spark.readers.incremental import LocalFileManifest
+
+    landing_zone = tmp_path / "landing_zone"
+    for day in ["2024-01-01", "2024-01-02"]:
+        (landing_zone / f"day={day}").mkdir(parents=True)
+        (landing_zone / f"day={day}" / "data.json").write_text(f'{{"id": 1, "source": "{day}"}}\n')
+    (landing_zone / "_SUCCESS").write_text("")
+    (landing_zone / "day=2024-01-01" / "notes.txt").write_text("not json")
+
+    manifest = LocalFileManifest(path=(tmp_path / "manifest.json").as_posix())
+
+    def read():
+        reader = JsonReader(path=landing_zone.as_posix(), manifest=manifest, pathGlobFilter="*.json")
+        return reader, reader.read()
+
+    # first run reads all files, with the partition columns of the layout
+    reader, df = read()
+    assert len(reader.output.files) == 2
+    assert sorted((r.day.isoformat(), r.source) for r in df.collect()) == [
+        ("2024-01-01", "2024-01-01"),
+        ("2024-01-02", "2024-01-02"),
+    ]
+
+    # without a commit, the same files are read again
+    reader, _ = read()
+    assert len(reader.output.files) == 2
+    assert reader.commit_manifest() == 2
+
+    # only new and changed files are read after the commit
+    (landing_zone / "day=2024-01-03").mkdir()
+    (landing_zone / "day=2024-01-03" / "data.json").write_text('{"id": 3, "source": "new"}\n')
+    (landing_zone / "day=2024-01-01" / "data.json").write_text('{"id": 1, "source": "changed"}\n')
+    reader, df = read()
+    assert sorted(r.source for r in df.collect()) == ["changed", "new"]
+    reader.commit_manifest()
+
+    # nothing new, the empty DataFrame has the columns of the files that were already processed
+    reader, df = read()
+    assert reader.output.files == []
+    assert df.count() == 0
+    assert sorted(df.columns) == ["day", "id", "source"]
+
+
+def test_file_loader_manifest_without_files(spark, tmp_path):
+    from pyspark.sql.types import LongType, StructField, StructType
+
+    from koheesio.spark.readers.incremental import LocalFileManifest
+
+    landing_zone = tmp_path / "landing_zone"
+    landing_zone.mkdir()
+    manifest = LocalFileManifest(path=(tmp_path / "manifest.json").as_posix())
+
+    with pytest.raises(ValueError, match="schema"):
+        JsonReader(path=landing_zone.as_posix(), manifest=manifest).read()
+
+    schema = StructType([StructField("id", LongType())])
+    df = JsonReader(path=landing_zone.as_posix(), manifest=manifest, schema=schema).read()
+    assert df.count() == 0
+    assert df.schema == schema
+
+
+def test_file_loader_manifest_not_for_streaming(tmp_path):
+    from koheesio.spark.readers.incremental import LocalFileManifest
+
+    with pytest.raises(ValueError, match="manifest"):
+        JsonReader(path="path", streaming=True, manifest=LocalFileManifest(path=(tmp_path / "m.json").as_posix()))
+
+
+def test_file_loader_with_schema_cache(spark, tmp_path):
+    from koheesio.spark.readers.schema_cache import LocalFileSchemaCache
+
+    landing_zone = tmp_path / "landing_zone"
+    landing_zone.mkdir()
+    (landing_zone / "1.json").write_text('{"id": 1, "name": "a"}\n')
+    cache = LocalFileSchemaCache(path=(tmp_path / "schemas").as_posix())
+
+    def read(**kwargs):
+        reader = JsonReader(path=landing_zone.as_posix(), schema_cache=cache, **kwargs)
+        return reader, reader.read()
+
+    reader, df = read()
+    assert reader.output.schema_version == 1
+    assert df.columns == ["id", "name"]
+
+    # the cached schema is reused
+    reader, _ = read()
+    assert reader.output.schema_version == 1
+
+    # new fields are merged into a new version of the cached schema
+    (landing_zone / "2.json").write_text('{"id": "2", "name": "b", "extra": true}\n')
+    reader, df = read(detect_schema_drift=True)
+    assert reader.output.schema_version == 2
+    assert df.dtypes == [("id", "bigint"), ("name", "string"), ("extra", "boolean")]
+
+    # without drift detection, the cache is used as is
+    (landing_zone / "3.json").write_text('{"id": 3, "other": 1}\n')
+    reader, df = read()
+    assert reader.output.schema_version == 2
+    assert df.columns == ["id", "name", "extra"]
+    assert df.count() == 3
+
+
+def test_file_loader_csv_schema_drift(spark, tmp_path):
+    from koheesio.spark.readers.schema_cache import LocalFileSchemaCache
+
+    landing_zone = tmp_path / "landing_zone"
+    landing_zone.mkdir()
+    (landing_zone / "1.csv").write_text("id,name\n1,a\n")
+    cache = LocalFileSchemaCache(path=(tmp_path / "schemas").as_posix())
+
+    def read():
+        reader = CsvReader(
+            path=landing_zone.as_posix(), schema_cache=cache, detect_schema_drift=True, header=True, inferSchema=True
+        )
+        return reader, reader.read()
+
+    read()
+
+    # a column added at the end is merged
+    (landing_zone / "2.csv").write_text("id,name,extra\n2,b,true\n")
+    (landing_zone / "1.csv").unlink()
+    reader, df = read()
+    assert reader.output.schema_version == 2
+    assert df.columns == ["id", "name", "extra"]
+
+    # a column inserted in the middle would shift the columns after it, as CSV columns are read by position
+    (landing_zone / "3.csv").write_text("id,inserted,name,extra\n3,x,c,false\n")
+    (landing_zone / "2.csv").unlink()
+    with pytest.raises(ValueError, match="by position"):
+        read()
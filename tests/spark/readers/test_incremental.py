@@ -0,0 +1,115 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from koheesio.spark.etl_task import EtlTask
+from koheesio.spark.readers.incremental import LocalFileWatermarkStore
+from koheesio.spark.readers.spark_sql_reader import SparkSqlReader
+from koheesio.spark.transformations.transform import Transform
+from koheesio.spark.writers.delta import BatchOutputMode, DeltaTableWriter
+from koheesio.spark.writers.file_writer import ParquetFileWriter
+
+pytestmark = pytest.mark.spark
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        10,
+        1.5,
+        Decimal("1.50"),
+        "abc",
+        datetime.date(2024, 1, 1),
+        datetime.datetime(2024, 1, 1, 12, 30, 15, 123456),
+    ],
+)
+def test_local_file_watermark_store(tmp_path, value):
+    store = LocalFileWatermarkStore(path=(tmp_path / "state" / "watermarks.json").as_posix())
+    assert store.get("key") is None
+
+    store.set("key", value)
+    store.set("other", 1)
+
+    actual = LocalFileWatermarkStore(path=store.path).get("key")
+    assert actual == value
+    assert type(actual) is type(value)
+
+
+def test_incremental_column_requires_store():
+    with pytest.raises(ValueError, match="watermark_store"):
+        SparkSqlReader(sql="SELECT 1", incremental_column="id")
+
+
+def test_incremental_etl_task(spark, tmp_path):
+    store = LocalFileWatermarkStore(path=(tmp_path / "watermarks.json").as_posix())
+    target = (tmp_path / "target").as_posix()
+
+    def run(ids, transformations=()):
+        spark.createDataFrame([(i, f"name_{i}") for i in ids], "id long, name string").createOrReplaceTempView(
+            "incremental_source"
+        )
+        task = EtlTask(
+            source=SparkSqlReader(
+                sql="SELECT * FROM incremental_source", incremental_column="id", watermark_store=store
+            ),
+            target=ParquetFileWriter(path=target),
+            transformations=list(transformations),
+        )
+        task.execute()
+        return task
+
+    run([1, 2, 3])
+    assert store.get("SELECT * FROM incremental_source.id") == 3
+
+    # only the new rows are read
+    run([1, 2, 3, 4, 5])
+    assert sorted(r.id for r in spark.read.parquet(target).collect()) == [1, 2, 3, 4, 5]
+    assert store.get("SELECT * FROM incremental_source.id") == 5
+
+    # a failed load does not advance the watermark
+    def fail(df):
+        raise RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError, match="load failed"):
+        run([1, 2, 3, 4, 5, 6], transformations=[Transform(fail)])
+    assert store.get("SELECT * FROM incremental_source.id") == 5
+
+    # nothing new, the watermark is kept
+    task = run([1, 2, 3, 4, 5])
+    assert task.output.target_df.count() == 0
+    assert store.get("SELECT * FROM incremental_source.id") == 5
+
+
+def test_incremental_etl_task_delta_merge(spark, tmp_path):
+    """The source of a MERGE is not the top-level query, the watermark must not depend on observing the write"""
+    store = LocalFileWatermarkStore(path=(tmp_path / "watermarks.json").as_posix())
+    target = "incremental_merge_target"
+    spark.sql(f"DROP TABLE IF EXISTS {target}")
+    spark.createDataFrame([], "id long, name string").write.format("delta").saveAsTable(target)
+
+    def run(rows):
+        spark.createDataFrame(rows, "id long, name string").createOrReplaceTempView("incremental_merge_source")
+        EtlTask(
+            source=SparkSqlReader(
+                sql="SELECT * FROM incremental_merge_source", incremental_column="id", watermark_store=store
+            ),
+            target=DeltaTableWriter(
+                table=target,
+                output_mode=BatchOutputMode.MERGE,
+                output_mode_params={
+                    "merge_builder": [
+                        {"clause": "whenMatchedUpdateAll", "condition": "source.id = target.id"},
+                        {"clause": "whenNotMatchedInsertAll"},
+                    ],
+                    "merge_cond": "source.id = target.id",
+                },
+            ),
+        ).execute()
+
+    run([(1, "a"), (2, "b")])
+    assert store.get("SELECT * FROM incremental_merge_source.id") == 2
+
+    run([(1, "a"), (2, "b"), (3, "c")])
+    assert sorted(r.id for r in spark.table(target).collect()) == [1, 2, 3]
+    assert store.get("SELECT * FROM incremental_merge_source.id") == 3
@@ -1,9 +1,54 @@
+import importlib
+
 import pytest
 
+from koheesio.spark.readers.incremental import IncrementalReaderMixin
 from koheesio.spark.readers.jdbc import JdbcReader
+from koheesio.spark.readers.teradata import TeradataReader
 
 pytestmark = pytest.mark.spark
 
+DERBY_URL = "jdbc:derby:memory:koheesio_jdbc;create=true"
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "koheesio.integrations.spark.snowflake",
+        "koheesio.spark.snowflake",
+        "koheesio.spark.readers.snowflake",
+        "koheesio.spark.writers.snowflake",
+        "koheesio.spark.readers.hana",
+        "koheesio.spark.readers.teradata",
+    ],
+)
+def test_jdbc_reader_subclass_modules_import(module):
+    # the bases of JdbcReader have to linearize with the bases of its subclasses, e.g. SnowflakeReader
+    importlib.import_module(module)
+
+
+def test_snowflake_reader_is_incremental():
+    from koheesio.integrations.spark.snowflake import SnowflakeReader
+
+    assert issubclass(SnowflakeReader, IncrementalReaderMixin)
+
+
+@pytest.fixture(scope="module")
+def derby(spark):
+    """In-memory Derby database (its driver ships with Spark) as a local stand-in for a JDBC source"""
+    jvm = spark._jvm
+    connection = jvm.java.sql.DriverManager.getConnection(DERBY_URL)
+    statement = connection.createStatement()
+    statement.execute("CREATE TABLE items (id INT PRIMARY KEY, code VARCHAR(10), created DATE)")
+    statement.execute("CREATE TABLE codes (code VARCHAR(10), amount INT)")
+    statement.execute("CREATE TABLE empty_items (id INT PRIMARY KEY)")
+    for i in range(1, 21):
+        statement.execute(f"INSERT INTO items VALUES ({i}, 'c{i}', DATE('2024-01-{i:02d}'))")
+        statement.execute(f"INSERT INTO codes VALUES ('{'x' * (i % 5 + 1)}', {i})")
+    statement.execute("INSERT INTO codes VALUES (NULL, 0)")
+    connection.close()
+    return {"driver": "org.apache.derby.jdbc.EmbeddedDriver", "url": DERBY_URL, "user": "app", "password": "pw"}
+
 
 class TestJdbcReader:
     common_options = {
@@ -72,3 +117,66 @@ class TestJdbcReader:
 
         assert jr.df.count() == 3
         assert dummy_spark.options_dict["dbtable"] == "foo"
+
+
+class TestJdbcReaderAutoPartition:
+    def test_primary_key(self, derby):
+        assert JdbcReader(**derby, dbtable="items").primary_key() == ["ID"]
+        assert JdbcReader(**derby, dbtable="codes").primary_key() == []
+        assert JdbcReader(**derby, query="SELECT * FROM items").primary_key() == []
+
+    def test_numeric_primary_key(self, derby):
+        reader = JdbcReader(**derby, dbtable="items", auto_partition=True, num_partitions=4)
+        df = reader.read()
+
+        assert df.rdd.getNumPartitions() == 4
+        assert sorted(r.ID for r in df.collect()) == list(range(1, 21))
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"dbtable": "items", "partition_column": "created"},
+            {"query": "SELECT id, created FROM items WHERE id > 0", "partition_column": "id"},
+        ],
+    )
+    def test_partition_column(self, derby, kwargs):
+        df = JdbcReader(**derby, **kwargs, auto_partition=True, options={"numPartitions": 3}).read()
+
+        assert df.rdd.getNumPartitions() == 3
+        assert df.count() == 20
+
+    def test_hash_partitioning(self, derby):
+        reader = JdbcReader(
+            **derby,
+            dbtable="codes",
+            auto_partition=True,
+            partition_column="code",
+            num_partitions=3,
+            hash_expression="MOD(LENGTH({column}), {num_partitions})",
+        )
+        df = reader.read()
+
+        assert df.rdd.getNumPartitions() == 3
+        # rows with a NULL key are read as well
+        assert df.count() == 21
+        assert sorted(r.AMOUNT for r in df.collect()) == list(range(21))
+
+    def test_empty_table(self, derby):
+        df = JdbcReader(**derby, dbtable="empty_items", auto_partition=True).read()
+        assert df.count() == 0
+
+    def test_without_primary_key(self, derby):
+        with pytest.raises(ValueError, match="provide `partition_column`"):
+            JdbcReader(**derby, dbtable="codes", auto_partition=True).read()
+
+    def test_hash_predicates(self):
+        reader = TeradataReader(url="jdbc:teradata://host/database=db", user="user", password="pw", dbtable="t")
+        assert reader.hash_predicates("code", 2) == [
+            "(HASHBUCKET(HASHROW(code)) MOD 2) = 0 OR code IS NULL",
+            "(HASHBUCKET(HASHROW(code)) MOD 2) = 1",
+        ]
+
+        with pytest.raises(ValueError, match="provide `hash_expression`"):
+            JdbcReader(
+                driver="driver", url="jdbc:derby:memory:db", user="user", password="pw", dbtable="t"
+            ).hash_predicates("code", 2)
@@ -0,0 +1,202 @@
+import datetime
+import json
+from unittest import mock
+
+import pytest
+
+from pyspark.sql import functions as f
+from pyspark.sql.types import DoubleType, StructType
+
+from koheesio.spark.kafka import KafkaDeserializer, LocalSchemaRegistry
+from koheesio.spark.readers.kafka import KafkaReader
+from koheesio.spark.readers.schema_cache import LocalFileSchemaCache
+
+pytestmark = pytest.mark.spark
+
+KAFKA_SCHEMA = (
+    "key binary, value binary, topic string, partition int, offset long, timestamp timestamp, timestampType int, "
+    "headers array<struct<key: string, value: binary>>"
+)
+
+SCHEMA = json.dumps(
+    {
+        "type": "struct",
+        "fields": [
+            {"name": "id", "type": "long", "nullable": True, "metadata": {}},
+            {"name": "amount", "type": "double", "nullable": True, "metadata": {}},
+            {
+                "name": "tags",
+                "type": {"type": "array", "elementType": "string", "containsNull": True},
+                "nullable": True,
+                "metadata": {},
+            },
+        ],
+    }
+)
+
+
+@pytest.fixture
+def kafka_df(spark):
+    timestamp = datetime.datetime(2024, 1, 1)
+    messages = [
+        ("a", {"id": 1, "amount": 1.5, "tags": ["x"]}, [("trace_id", "t1"), ("source", "web")]),
+        ("b", {"id": 2, "amount": 2.5, "tags": []}, [("trace_id", "t2"), ("trace_id", "t3")]),
+        ("c", {"id": 3, "amount": None, "tags": None}, []),
+    ]
+    return spark.createDataFrame(
+        [
+            (
+                key.encode(),
+                json.dumps(value).encode(),
+                "topic",
+                0,
+                offset,
+                timestamp,
+                0,
+                [(k, v.encode()) for k, v in headers],
+            )
+            for offset, (key, value, headers) in enumerate(messages)
+        ],
+        KAFKA_SCHEMA,
+    )
+
+
+def test_kafka_reader_without_deserialization(kafka_df):
+    reader = KafkaReader(read_broker="broker:9092", topic="topic")
+    assert reader.deserialize(kafka_df) is kafka_df
+    assert "includeHeaders" not in reader.options
+
+
+def test_kafka_reader_deserialize_json(kafka_df):
+    reader = KafkaReader(
+        read_broker="broker:9092",
+        topic="topic",
+        key_deserializer=KafkaDeserializer(format="string"),
+        value_deserializer=KafkaDeserializer(format="json", schema="id BIGINT, amount DOUBLE"),
+        headers=["trace_id", "source"],
+        columns=["key", "value.id", "value.amount", "offset", "trace_id", "source"],
+    )
+    df = reader.deserialize(kafka_df)
+
+    assert reader.options["includeHeaders"] == "true"
+    assert df.columns == ["key", "id", "amount", "offset", "trace_id", "source"]
+    assert [tuple(row) for row in df.orderBy("offset").collect()] == [
+        ("a", 1, 1.5, 0, "t1", "web"),
+        ("b", 2, 2.5, 1, "t3", None),
+        ("c", 3, None, 2, None, None),
+    ]
+    # fields that are not selected are not parsed
+    reader.value_deserializer = KafkaDeserializer(format="json", schema=StructType.fromJson(json.loads(SCHEMA)))
+    assert reader.deserialize(kafka_df).schema["amount"].dataType == DoubleType()
+    assert "tags" not in reader.deserialize(kafka_df)._jdf.queryExecution().optimizedPlan().toString()
+
+
+def test_kafka_reader_all_headers(kafka_df):
+    reader = KafkaReader(read_broker="broker:9092", topic="topic", headers=True)
+    row = reader.deserialize(kafka_df).orderBy("offset").first()
+    assert [tuple(header) for header in row.headers] == [("trace_id", "t1"), ("source", "web")]
+
+
+def test_kafka_reader_infer_json_schema(kafka_df, tmp_path):
+    cache = LocalFileSchemaCache(path=(tmp_path / "schemas").as_posix())
+
+    def read():
+        reader = KafkaReader(
+            read_broker="broker:9092",
+            topic="topic",
+            value_deserializer=KafkaDeserializer(format="json", schema_cache=cache),
+        )
+        return reader.deserialize(kafka_df)
+
+    df = read()
+    assert df.schema["value"].dataType.simpleString() == "struct<amount:double,id:bigint,tags:array<string>>"
+    assert sorted(row.value.id for row in df.collect()) == [1, 2, 3]
+
+    # the second read takes the schema from the cache
+    assert read().schema == df.schema
+    assert len(cache.get_versions("kafka:broker:9092:topic:value")) == 1
+
+
+def test_kafka_reader_confluent_wire_format(spark, tmp_path):
+    registry = LocalSchemaRegistry(path=(tmp_path / "registry.json").as_posix())
+    registry.register("topic-value", json.dumps({"type": "string"}))
+    schema_id = registry.register("topic-value", json.dumps({"type": "string"}))
+    assert registry.get_latest("topic-value") == (1, '{"type": "string"}')
+    assert schema_id == 1
+
+    df = spark.createDataFrame([(b"\x00\x00\x00\x00\x01hello",)], "value binary")
+    reader = KafkaReader(
+        read_broker="broker:9092",
+        topic="topic",
+        value_deserializer=KafkaDeserializer(format="string", registry=registry),
+    )
+    assert reader.deserialize(df).first().value == "hello"
+
+
+@pytest.fixture
+def fake_from_avro():
+    """Stand-in for `from_avro`, shows the writer schema, the reader schema and the payload of every message"""
+
+    def from_avro(data, schema, options=None):
+        return f.concat_ws("|", f.lit(schema), f.lit((options or {}).get("avroSchema")), data.cast("string"))
+
+    with mock.patch("pyspark.sql.avro.functions.from_avro", new=from_avro):
+        yield
+
+
+def _wire_format(schema_id, payload):
+    return b"\x00" + schema_id.to_bytes(4, "big") + payload
+
+
+def test_kafka_reader_avro_by_schema_id(spark, tmp_path, fake_from_avro):
+    registry = LocalSchemaRegistry(path=(tmp_path / "registry.json").as_posix())
+    registry.register("topic-value", "v1")
+    registry.register("other-value", "other")
+    registry.register("topic-value", "v2")
+    assert registry.get_ids("topic-value") == [1, 3]
+
+    df = spark.createDataFrame(
+        [(0, _wire_format(1, b"old")), (1, _wire_format(3, b"new")), (2, None)], "offset long, value binary"
+    )
+    reader = KafkaReader(
+        read_broker="broker:9092",
+        topic="topic",
+        value_deserializer=KafkaDeserializer(format="avro", registry=registry),
+    )
+
+    # the schema ids are taken from the registry, the data is not read to find them
+    with mock.patch.object(type(df), "collect", side_effect=AssertionError("the data is read")):
+        deserialized = reader.deserialize(df)
+
+    # every message is decoded with the schema of its own id, and read as the latest schema
+    assert [row.value for row in deserialized.orderBy("offset").collect()] == [
+        "v1|v2|old",
+        "v2|v2|new",
+        None,
+    ]
+
+
+@pytest.mark.parametrize("mode, expected", [(None, "unknown schema id 3"), ("PERMISSIVE", None)])
+def test_kafka_deserializer_unknown_schema_id(spark, tmp_path, fake_from_avro, mode, expected):
+    registry = LocalSchemaRegistry(path=(tmp_path / "registry.json").as_posix())
+    deserializer = KafkaDeserializer(format="avro", registry=registry, options={"mode": mode} if mode else {})
+    df = spark.createDataFrame([(_wire_format(3, b"other"),)], "value binary")
+    column = deserializer.column(f.col("value"), "v2", writer_schemas={1: "v1", 2: "v2"})
+
+    if expected is None:
+        assert df.select(column.alias("value")).first().value is None
+    else:
+        with pytest.raises(Exception, match=expected):
+            df.select(column.alias("value")).collect()
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [
+        ({"format": "avro"}, "schema"),
+        ({"format": "protobuf", "schema_path": "schema.desc"}, "message_name"),
+    ],
+)
+def test_kafka_deserializer_validation(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        KafkaDeserializer(**kwargs)
@@ -1,9 +1,11 @@
+from unittest import mock
+
 import pytest
 from spark._testing import assertDataFrameEqual
 
 from pyspark.sql.types import StructType
 
-from koheesio.spark.readers.memory import DataFormat, InMemoryDataReader
+from koheesio.spark.readers.memory import DataFormat, InMemoryDataReader, ParserEngine
 
 pytestmark = pytest.mark.spark
 
@@ -54,3 +56,64 @@ class TestInMemoryDataReader:
             .df
         )
         assertDataFrameEqual(df, sample_df_with_strings.where(expect_filter))
+
+    @pytest.mark.parametrize("engine", [ParserEngine.SPARK, ParserEngine.ARROW])
+    @pytest.mark.parametrize("spool_threshold", [0, 1024])
+    @pytest.mark.parametrize(
+        "data,format",
+        [
+            ("id,string\n1,hello\n2,world\n3,", DataFormat.CSV),
+            (["id,string", "1,hello", "2,world", "3,"], DataFormat.CSV),
+            ('[{"id": 1, "string": "hello"},\n {"id": 2, "string": "world"},\n {"id": 3}]', DataFormat.JSON),
+            ([{"id": 1, "string": "hello"}, '{"id": 2,\n "string": "world"}', '{"id": 3}'], DataFormat.JSON),
+        ],
+    )
+    def test_engines(self, spark, tmp_path, data, format, engine, spool_threshold):
+        reader = InMemoryDataReader(
+            data=data,
+            format=format,
+            engine=engine,
+            spool_threshold=spool_threshold,
+            staging_path=tmp_path.as_posix(),
+            chunk_size=32,
+        )
+        df = reader.read()
+
+        assert df.schema["id"].dataType.simpleString() == "bigint"
+        assert sorted((r.id, r.string or None) for r in df.collect()) == [(1, "hello"), (2, "world"), (3, None)]
+        # payloads above the threshold are spooled to the staging path
+        assert len(list(tmp_path.iterdir())) == (0 if spool_threshold else 1)
+
+    @pytest.mark.parametrize("engine", [ParserEngine.SPARK, ParserEngine.ARROW])
+    @pytest.mark.parametrize("spool_threshold", [0, 1024])
+    def test_csv_quoted_fields(self, spark, tmp_path, engine, spool_threshold):
+        data = 'id,amount,text\n1,1.5,"multi\nline"\n2,2.5,"say ""hi"", then go"'
+        df = InMemoryDataReader(
+            data=data,
+            format=DataFormat.CSV,
+            engine=engine,
+            spool_threshold=spool_threshold,
+            staging_path=tmp_path.as_posix(),
+        ).read()
+
+        assert [(f.name, f.dataType.simpleString()) for f in df.schema.fields] == [
+            ("id", "bigint"),
+            ("amount", "double"),
+            ("text", "string"),
+        ]
+        assert sorted(tuple(r) for r in df.collect()) == [(1, 1.5, "multi\nline"), (2, 2.5, 'say "hi", then go')]
+
+    def test_remote_session_without_staging_path(self, spark):
+        reader = InMemoryDataReader(data="id,string\n1,hello", format=DataFormat.CSV)
+        assert reader.format == "csv"
+
+        with (
+            mock.patch("koheesio.spark.readers.memory.is_remote_session", return_value=True),
+            mock.patch("koheesio.spark.readers.memory.is_local_master", return_value=False),
+            mock.patch.object(InMemoryDataReader, "_spool") as spool,
+        ):
+            df = reader.read()
+
+        # the payload is parsed on the driver instead of being spooled to a driver-local directory
+        spool.assert_not_called()
+        assert [tuple(r) for r in df.collect()] == [(1, "hello")]
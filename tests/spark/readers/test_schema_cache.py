@@ -0,0 +1,49 @@
+import pytest
+
+from pyspark.sql.types import ArrayType, LongType, StringType, StructField, StructType
+
+from koheesio.spark.readers.schema_cache import LocalFileSchemaCache, merge_schemas
+
+pytestmark = pytest.mark.spark
+
+
+def test_merge_schemas():
+    base = StructType(
+        [
+            StructField("id", LongType(), False),
+            StructField("nested", StructType([StructField("a", StringType())])),
+            StructField("items", ArrayType(StructType([StructField("x", LongType())]))),
+        ]
+    )
+    other = StructType(
+        [
+            StructField("new", StringType()),
+            StructField("id", StringType()),
+            StructField("nested", StructType([StructField("b", LongType()), StructField("a", StringType())])),
+            StructField("items", ArrayType(StructType([StructField("y", StringType())]))),
+        ]
+    )
+
+    merged = merge_schemas(base, other)
+
+    assert merged.simpleString() == (
+        "struct<id:bigint,nested:struct<a:string,b:bigint>,items:array<struct<x:bigint,y:string>>,new:string>"
+    )
+    # the type and nullability of existing fields are kept
+    assert merged["id"] == base["id"]
+    assert merge_schemas(base, base) == base
+
+
+def test_local_file_schema_cache(tmp_path):
+    cache = LocalFileSchemaCache(path=(tmp_path / "schemas").as_posix())
+    schema = StructType([StructField("id", LongType())])
+    assert cache.get("json:path") is None
+
+    assert cache.put("json:path", schema) == 1
+    assert cache.put("json:path", merge_schemas(schema, StructType([StructField("name", StringType())]))) == 2
+    assert cache.put("csv:path", schema) == 1
+
+    version, cached = LocalFileSchemaCache(path=cache.path).get("json:path")
+    assert version == 2
+    assert cached.fieldNames() == ["id", "name"]
+    assert [v["version"] for v in cache.get_versions("json:path")] == [1, 2]
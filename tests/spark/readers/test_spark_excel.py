@@ -1,6 +1,10 @@
 import datetime
 from pathlib import Path
 
+import pytest
+
+from pyspark.sql.functions import count
+
 from koheesio.spark.readers.excel import ExcelReader
 
 
@@ -25,3 +29,77 @@ def test_excel_reader(spark, data_path):
 
     # Assert that the output DataFrame is as expected
     assert sorted(reader.output.df.collect()) == sorted(expected_df.collect())
+
+
+def test_excel_reader_streaming(spark, tmp_path):
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    sales_eu = workbook.active
+    sales_eu.title = "sales_eu"
+    sales_eu.append(["id", "amount", "day"])
+    for i in range(5):
+        sales_eu.append([i, i * 1.5, datetime.datetime(2024, 1, i + 1)])
+    sales_us = workbook.create_sheet("sales_us")
+    sales_us.append(["id", "amount", "comment"])
+    sales_us.append([10, 2, "mixed"])
+    sales_us.append([11, 2.5, 3])
+    workbook.create_sheet("notes").append(["not", "a", "sales", "sheet"])
+    test_file = tmp_path / "workbook.xlsx"
+    workbook.save(test_file)
+
+    reader = ExcelReader(
+        path=test_file,
+        mode="streaming",
+        sheet_pattern="sales_.*",
+        sheet_name_column="sheet",
+        batch_size=2,
+        staging_path=(tmp_path / "staging").as_posix(),
+    )
+    df = reader.read()
+
+    assert sorted(df.columns) == ["amount", "comment", "day", "id", "sheet"]
+    assert df.count() == 7
+    assert {r.sheet: r.cnt for r in df.groupBy("sheet").agg(count("*").alias("cnt")).collect()} == {
+        "sales_eu": 5,
+        "sales_us": 2,
+    }
+    row = df.filter("id = 4").first()
+    assert (row.amount, row.day) == (6.0, datetime.datetime(2024, 1, 5))
+    # columns with mixed types are read as strings
+    assert sorted(r.comment for r in df.filter("sheet = 'sales_us'").collect()) == ["3", "mixed"]
+
+
+def test_excel_reader_streaming_conflicting_types(spark, tmp_path):
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    sales_eu = workbook.active
+    sales_eu.title = "sales_eu"
+    sales_eu.append(["id", "amount", "day"])
+    sales_eu.append([1, 10, datetime.datetime(2024, 1, 1)])
+    sales_us = workbook.create_sheet("sales_us")
+    sales_us.append(["id", "amount", "day"])
+    sales_us.append([2, 2.5, "yesterday"])
+    test_file = tmp_path / "workbook.xlsx"
+    workbook.save(test_file)
+
+    reader = ExcelReader(
+        path=test_file,
+        mode="streaming",
+        sheet_pattern="sales_.*",
+        staging_path=(tmp_path / "staging").as_posix(),
+    )
+    df = reader.read()
+
+    # integers and doubles are read as doubles, any other conflict as strings
+    assert dict(df.dtypes) == {"id": "bigint", "amount": "double", "day": "string"}
+    assert sorted((r.id, r.amount, r.day) for r in df.collect()) == [
+        (1, 10.0, "2024-01-01 00:00:00"),
+        (2, 2.5, "yesterday"),
+    ]
+
+
+def test_excel_reader_streaming_requires_mode():
+    with pytest.raises(ValueError, match="streaming"):
+        ExcelReader(path="workbook.xlsx", sheet_pattern=".*")
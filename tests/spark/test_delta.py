@@ -128,6 +128,30 @@ def test_delta_table_properties(spark, setup, delta_file):
         assert isinstance(v, str)
 
 
+def test_delta_table_add_properties_single_alter(mocker, spark):
+    mocker.patch.object(DeltaTableStep, "exists", new_callable=mocker.PropertyMock(return_value=True))
+    mocker.patch.object(
+        DeltaTableStep,
+        "get_persisted_properties",
+        return_value={"delta.enableChangeDataFeed": "true", "unchanged": "same", "protected": "old"},
+    )
+    spark_sql = mocker.patch.object(spark, "sql")
+    dt = DeltaTableStep(table="test_table")
+
+    # existing properties are only changed when override is enabled, unchanged properties are never re-applied
+    dt.add_properties({"delta.enableChangeDataFeed": False, "unchanged": "same", "new_prop": 1})
+    spark_sql.assert_called_once_with("ALTER TABLE test_table SET TBLPROPERTIES ('new_prop'='1')")
+
+    spark_sql.reset_mock()
+    dt.add_properties({"unchanged": "same", "protected": "new"})
+    spark_sql.assert_not_called()
+
+    dt.add_properties({"delta.enableChangeDataFeed": False, "unchanged": "same", "protected": "new"}, override=True)
+    spark_sql.assert_called_once_with(
+        "ALTER TABLE test_table SET TBLPROPERTIES ('delta.enableChangeDataFeed'='false', 'protected'='new')"
+    )
+
+
 @patch.dict(
     os.environ,
     {
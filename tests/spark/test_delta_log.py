@@ -0,0 +1,208 @@
+from datetime import datetime
+import json
+from pathlib import Path
+import shutil
+
+import pyarrow as pa
+from pyarrow import parquet as pq
+import pytest
+
+from koheesio.spark.delta import DeltaTableStep
+from koheesio.spark.delta_log import DeltaLogReader
+
+pytestmark = pytest.mark.spark
+
+SCHEMA_STRING = json.dumps(
+    {"type": "struct", "fields": [{"name": "id", "type": "long", "nullable": True, "metadata": {}}]}
+)
+
+
+def _write_commit(log_dir: Path, version: int, actions: list) -> None:
+    log_dir.mkdir(parents=True, exist_ok=True)
+    (log_dir / f"{version:020d}.json").write_text("\n".join(json.dumps(a) for a in actions))
+
+
+def _commit_info(operation: str, timestamp: int, **kwargs) -> dict:
+    return {"commitInfo": {"timestamp": timestamp, "operation": operation, **kwargs}}
+
+
+def _add(path: str, size: int = 10) -> dict:
+    return {"add": {"path": path, "partitionValues": {}, "size": size, "modificationTime": 0, "dataChange": True}}
+
+
+@pytest.fixture
+def delta_log_path(tmp_path):
+    log_dir = tmp_path / "table" / "_delta_log"
+    _write_commit(
+        log_dir,
+        0,
+        [
+            _commit_info("CREATE TABLE", 1_700_000_000_000),
+            {"protocol": {"minReaderVersion": 1, "minWriterVersion": 2}},
+            {
+                "metaData": {
+                    "id": "abc",
+                    "schemaString": SCHEMA_STRING,
+                    "partitionColumns": [],
+                    "configuration": {"delta.enableChangeDataFeed": "true"},
+                }
+            },
+        ],
+    )
+    _write_commit(
+        log_dir, 1, [_commit_info("WRITE", 1_700_000_100_000, operationMetrics={"numFiles": "2"}), _add("a"), _add("b")]
+    )
+    _write_commit(log_dir, 2, [_commit_info("DELETE", 1_700_000_200_000), {"remove": {"path": "a"}}])
+    yield (tmp_path / "table").as_posix()
+    DeltaLogReader.clear_cache()
+
+
+def test_delta_log_reader(delta_log_path):
+    delta_log = DeltaLogReader.for_path(delta_log_path)
+
+    assert delta_log is DeltaLogReader.for_path(delta_log_path + "/")
+    assert delta_log.exists is True
+    assert delta_log.version == 2
+    assert delta_log.schema["fields"][0]["name"] == "id"
+    assert delta_log.partition_columns == []
+    assert delta_log.properties == {
+        "delta.enableChangeDataFeed": "true",
+        "delta.minReaderVersion": "1",
+        "delta.minWriterVersion": "2",
+    }
+    assert [f["path"] for f in delta_log.files] == ["b"]
+
+    history = delta_log.history()
+    assert [c["version"] for c in history] == [2, 1, 0]
+    assert [c["operation"] for c in delta_log.history(limit=2)] == ["DELETE", "WRITE"]
+    assert history[1]["operationMetrics"] == {"numFiles": "2"}
+    assert history[0]["timestamp"] == datetime.fromtimestamp(1_700_000_200)
+    assert delta_log.last_commit_timestamp(operations=["WRITE"]) == datetime.fromtimestamp(1_700_000_100)
+
+
+def test_delta_log_reader_tails_new_commits(delta_log_path):
+    delta_log = DeltaLogReader.for_path(delta_log_path)
+    assert delta_log.version == 2
+
+    _write_commit(Path(delta_log_path) / "_delta_log", 3, [_commit_info("WRITE", 1_700_000_300_000), _add("c")])
+
+    assert delta_log.version == 3
+    assert sorted(f["path"] for f in delta_log.files) == ["b", "c"]
+
+
+def test_delta_log_reader_checkpoint(tmp_path):
+    log_dir = tmp_path / "_delta_log"
+    log_dir.mkdir()
+    checkpoint = pa.Table.from_pylist(
+        [
+            {"protocol": {"minReaderVersion": 1, "minWriterVersion": 2}},
+            {
+                "metaData": {
+                    "id": "abc",
+                    "schemaString": SCHEMA_STRING,
+                    "partitionColumns": ["id"],
+                    "configuration": [("foo", "bar")],
+                }
+            },
+            {"add": {"path": "id=1/a", "partitionValues": [("id", "1")], "size": 10}},
+        ],
+        schema=pa.schema(
+            [
+                (
+                    "add",
+                    pa.struct(
+                        [
+                            ("path", pa.string()),
+                            ("partitionValues", pa.map_(pa.string(), pa.string())),
+                            ("size", pa.int64()),
+                        ]
+                    ),
+                ),
+                (
+                    "metaData",
+                    pa.struct(
+                        [
+                            ("id", pa.string()),
+                            ("schemaString", pa.string()),
+                            ("partitionColumns", pa.list_(pa.string())),
+                            ("configuration", pa.map_(pa.string(), pa.string())),
+                        ]
+                    ),
+                ),
+                ("protocol", pa.struct([("minReaderVersion", pa.int32()), ("minWriterVersion", pa.int32())])),
+            ]
+        ),
+    )
+    pq.write_table(checkpoint, log_dir / f"{10:020d}.checkpoint.parquet")
+    (log_dir / "_last_checkpoint").write_text(json.dumps({"version": 10, "size": 3}))
+    _write_commit(log_dir, 11, [_commit_info("WRITE", 1_700_000_000_000), _add("id=2/b")])
+
+    metadata, protocol = DeltaLogReader(path=tmp_path.as_posix()).read_metadata()
+    assert metadata["partitionColumns"] == ["id"] and metadata["configuration"] == {"foo": "bar"}
+    assert protocol == {"minReaderVersion": 1, "minWriterVersion": 2}
+
+    delta_log = DeltaLogReader(path=tmp_path.as_posix())
+
+    assert delta_log.version == 11
+    assert delta_log.partition_columns == ["id"]
+    assert delta_log.properties["foo"] == "bar"
+    assert {f["path"]: f["partitionValues"] for f in delta_log.files} == {"id=1/a": {"id": "1"}, "id=2/b": {}}
+    # commits that are no longer in the log (before the checkpoint) are not part of the history
+    assert [c["version"] for c in delta_log.history()] == [11]
+
+
+def test_delta_log_reader_read_metadata(delta_log_path):
+    delta_log = DeltaLogReader.for_path(delta_log_path)
+    metadata, protocol = delta_log.read_metadata()
+
+    assert metadata["id"] == "abc"
+    assert DeltaLogReader.table_properties(metadata, protocol) == {
+        "delta.enableChangeDataFeed": "true",
+        "delta.minReaderVersion": "1",
+        "delta.minWriterVersion": "2",
+    }
+    # the data files are not loaded
+    assert delta_log._files == {} and delta_log._version == -1
+
+
+def test_delta_log_reader_no_table(tmp_path):
+    delta_log = DeltaLogReader(path=tmp_path.as_posix())
+    assert delta_log.exists is False
+    assert delta_log.history() == []
+
+
+def test_delta_log_reader_recreated_table(delta_log_path):
+    delta_log = DeltaLogReader.for_path(delta_log_path)
+    assert delta_log.version == 2
+
+    # drop the table and recreate it at the same location
+    log_dir = Path(delta_log_path) / "_delta_log"
+    shutil.rmtree(log_dir)
+    _write_commit(log_dir, 0, [_commit_info("CREATE TABLE", 1_700_000_400_000), _add("new")])
+
+    assert delta_log.version == 0
+    assert [f["path"] for f in delta_log.files] == ["new"]
+    assert [c["operation"] for c in delta_log.history()] == ["CREATE TABLE"]
+
+
+@pytest.mark.parametrize("path", ["s3a://bucket/table", "dbfs:/mnt/table", "/mnt/does/not/exist"])
+def test_delta_log_reader_unsupported_location(path):
+    assert DeltaLogReader.try_for_path(path) is None
+    assert DeltaTableStep(table=f"delta.`{path}`").delta_log is None
+
+
+def test_delta_table_step_path_based(spark, tmp_path):
+    path = (tmp_path / "path.based.table").as_posix()
+    spark.range(3).write.format("delta").save(path)
+
+    dt = DeltaTableStep(table=f"delta.`{path}`")
+    assert dt.path == path
+    assert dt.table_name == f"delta.`{path}`"
+    assert dt.exists is True
+    assert dt.delta_log.version == 0
+    assert dt.dataframe.count() == 3
+
+    dt.add_properties({"delta.enableChangeDataFeed": True})
+    assert dt.is_cdf_active is True
+    assert dt.get_persisted_properties()["delta.enableChangeDataFeed"] == "true"
+    assert [r["operation"] for r in dt.describe_history().collect()] == ["SET TBLPROPERTIES", "WRITE"]
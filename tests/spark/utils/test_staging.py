@@ -0,0 +1,54 @@
+import os
+from unittest import mock
+
+import pytest
+
+from koheesio.spark.utils import staging
+from koheesio.spark.utils.staging import create_staging_dir, to_local_path
+
+pytestmark = pytest.mark.spark
+
+
+def test_create_staging_dir(spark, tmp_path):
+    first = create_staging_dir(spark, tmp_path.as_posix(), prefix="test_")
+    second = create_staging_dir(spark, tmp_path.as_posix(), prefix="test_")
+
+    # every call gets its own directory
+    assert first != second
+    assert os.path.isdir(first.local_path)
+    assert first.spark_path == first.local_path
+    assert os.path.basename(first.local_path).startswith("test_")
+
+    first.cleanup()
+    assert not os.path.exists(first.local_path)
+    assert os.path.isdir(second.local_path)
+
+
+def test_create_staging_dir_default(spark):
+    # a temporary directory on the driver is fine in local mode
+    staging_dir = create_staging_dir(spark, None, prefix="test_")
+    assert os.path.isdir(staging_dir.local_path)
+    staging_dir.cleanup()
+
+    # but not on a cluster
+    with mock.patch.object(staging, "is_local_master", return_value=False):
+        with pytest.raises(ValueError, match="staging_path"):
+            create_staging_dir(spark, None, prefix="test_")
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("dbfs:/tmp/staging", "/dbfs/tmp/staging"),
+        ("file:///tmp/staging", "/tmp/staging"),
+        ("/tmp/staging", "/tmp/staging"),
+    ],
+)
+def test_to_local_path(path, expected):
+    assert to_local_path(path) == expected
+
+
+@pytest.mark.parametrize("path", ["s3://bucket/staging", "abfss://container@account/staging", "s3a:/bucket"])
+def test_to_local_path_not_accessible(path):
+    with pytest.raises(ValueError, match="not accessible"):
+        to_local_path(path)
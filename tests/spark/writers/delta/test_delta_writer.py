@@ -104,6 +104,55 @@ def test_delta_table_merge_all(spark):
         assert result == expected
 
 
+@pytest.mark.parametrize(
+    "max_values, expected",
+    [
+        (10, "((target.id = source.id) AND ((target.part IN (a, b)) OR (target.part IS NULL)))"),
+        (2, "((target.id = source.id) AND (((target.part >= a) AND (target.part <= b)) OR (target.part IS NULL)))"),
+    ],
+)
+def test_merge_partition_pruning_predicate(mocker, spark, max_values, expected):
+    mocker.patch.object(DeltaTableStep, "partition_columns", new_callable=mocker.PropertyMock(return_value=["part"]))
+    source_df = spark.createDataFrame([(1, "a"), (2, "b"), (3, None)], "id int, part string")
+    writer = DeltaTableWriter(
+        table="test_table",
+        output_mode=BatchOutputMode.MERGEALL,
+        output_mode_params={"merge_cond": "target.id=source.id"},
+        merge_partition_pruning=True,
+        merge_pruning_max_values=max_values,
+        df=source_df,
+    )
+    merge_cond = writer._prune_merge_cond(merge_cond="target.id = source.id", target_alias="target")
+    assert str(merge_cond) == f"Column<'{expected}'>"
+
+    writer.merge_partition_pruning = False
+    assert (
+        writer._prune_merge_cond(merge_cond="target.id = source.id", target_alias="target") == "target.id = source.id"
+    )
+
+
+def test_delta_table_merge_all_partition_pruning(spark):
+    table_name = "test_merge_all_partition_pruning"
+    target_df = spark.createDataFrame(
+        [(1, "a", "old"), (2, "b", "old"), (3, "c", "old")], "id int, part string, v string"
+    )
+    source_df = spark.createDataFrame([(2, "b", "new"), (4, "d", "new")], "id int, part string, v string")
+    DeltaTableWriter(
+        table=table_name, output_mode=BatchOutputMode.OVERWRITE, partition_by=["part"], df=target_df
+    ).execute()
+
+    DeltaTableWriter(
+        table=table_name,
+        output_mode=BatchOutputMode.MERGEALL,
+        output_mode_params={"merge_cond": "target.id=source.id AND target.part=source.part"},
+        merge_partition_pruning=True,
+        df=source_df,
+    ).execute()
+
+    result = {row["id"]: row["v"] for row in spark.read.table(table_name).collect()}
+    assert result == {1: "old", 2: "new", 3: "old", 4: "new"}
+
+
 def test_deltatablewriter_with_invalid_conditions(spark, dummy_df):
     from koheesio.spark.utils.connect import is_remote_session
     from koheesio.spark.writers.delta.utils import get_delta_table_for_name
@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+from koheesio.spark.delta import DeltaTableStep
+from koheesio.spark.delta_log import DeltaLogReader
+from koheesio.spark.writers.delta import DeltaTableMaintenance
+
+pytestmark = pytest.mark.spark
+
+
+def _write_commit(log_dir, version, operation, metrics=None, adds=()):
+    actions = [{"commitInfo": {"timestamp": 1_700_000_000_000 + version, "operation": operation}}]
+    if metrics:
+        actions[0]["commitInfo"]["operationMetrics"] = metrics
+    actions += [{"add": {"path": path, "partitionValues": {}, "size": size}} for path, size in adds]
+    (log_dir / f"{version:020d}.json").write_text("\n".join(json.dumps(a) for a in actions))
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    log_dir = tmp_path / "_delta_log"
+    log_dir.mkdir()
+    _write_commit(log_dir, 0, "WRITE", {"numFiles": "1"}, adds=[("a", 1024**3)])
+    _write_commit(log_dir, 1, "OPTIMIZE", {"numAddedFiles": "1"})
+    _write_commit(log_dir, 2, "WRITE", {"numFiles": "2"}, adds=[("b", 10), ("c", 10)])
+    _write_commit(log_dir, 3, "MERGE", {"numTargetFilesAdded": "3"}, adds=[("d", 1024**3)])
+    yield tmp_path.as_posix()
+    DeltaLogReader.clear_cache()
+
+
+@pytest.mark.parametrize(
+    "thresholds, triggered",
+    [
+        ({}, True),
+        ({"min_files_added": 5}, True),
+        ({"min_files_added": 6}, False),
+        ({"min_commits": 2}, True),
+        ({"min_commits": 3}, False),
+        ({"max_small_file_ratio": 0.5}, True),
+        ({"max_small_file_ratio": 0.75}, False),
+    ],
+)
+def test_delta_table_maintenance_thresholds(mocker, spark, table_path, thresholds, triggered):
+    mock_sql = mocker.patch.object(spark, "sql")
+    table = DeltaTableStep(table=f"delta.`{table_path}`")
+
+    maintenance = DeltaTableMaintenance(table=table, zorder_by=["id", "name"], vacuum=True, **thresholds)
+    output = maintenance.execute()
+
+    assert output.commits_since_optimize == 2
+    assert output.files_added_since_optimize == 5
+    assert output.small_file_ratio == 0.5
+    assert output.triggered is triggered
+    expected = [f"OPTIMIZE delta.`{table_path}` ZORDER BY (id, name)", f"VACUUM delta.`{table_path}`"]
+    assert output.statements == (expected if triggered else [])
+    assert [c.args[0] for c in mock_sql.call_args_list] == output.statements
+
+
+def test_delta_table_maintenance_statements(spark):
+    maintenance = DeltaTableMaintenance(
+        table="my_table", optimize=False, vacuum=True, vacuum_retention_hours=168, compute_statistics=True
+    )
+    assert maintenance.statements == [
+        "ANALYZE TABLE my_table COMPUTE STATISTICS FOR ALL COLUMNS",
+        "VACUUM my_table RETAIN 168 HOURS",
+    ]
+
+
+def test_delta_table_writer_runs_maintenance(mocker, spark, table_path):
+    from koheesio.spark.writers.delta import DeltaTableWriter
+
+    mocker.patch("koheesio.spark.writers.delta.DeltaTableWriter.writer", new_callable=mocker.MagicMock)
+    mock_sql = mocker.patch.object(spark, "sql")
+
+    writer = DeltaTableWriter(
+        table=f"delta.`{table_path}`",
+        df=spark.range(1),
+        maintenance=DeltaTableMaintenance(min_commits=1),
+    )
+    writer.execute()
+    writer.await_maintenance(timeout=30)
+
+    mock_sql.assert_called_once_with(f"OPTIMIZE delta.`{table_path}`")
+    # the policy itself is not bound to the table, a copy is used for every run
+    assert writer.maintenance.table is None
+
+
+def test_delta_table_writer_requires_maintenance_threshold(spark):
+    from koheesio.spark.writers.delta import DeltaTableWriter
+
+    with pytest.raises(ValueError, match="threshold"):
+        DeltaTableWriter(table="my_table", maintenance=DeltaTableMaintenance(vacuum=True))
+
+
+def test_delta_table_writer_awaits_background_maintenance(mocker, spark, table_path):
+    from koheesio.spark.writers.delta import DeltaTableWriter
+
+    mocker.patch("koheesio.spark.writers.delta.DeltaTableWriter.writer", new_callable=mocker.MagicMock)
+    mocker.patch.object(spark, "sql")
+    writer = DeltaTableWriter(
+        table=f"delta.`{table_path}`",
+        df=spark.range(1),
+        maintenance=DeltaTableMaintenance(min_commits=1, background=True),
+    )
+
+    writer.execute()
+    first = writer._maintenance_thread
+    assert not first.daemon
+    # the next write waits for the maintenance of the previous one
+    writer.execute()
+    assert not first.is_alive()
+    writer.await_maintenance(timeout=30)
+
+
+def test_delta_table_stream_writer_monitors_maintenance(mocker, spark, tmp_path):
+    from koheesio.spark.writers.delta import DeltaTableStreamWriter
+
+    execute = mocker.patch.object(DeltaTableMaintenance, "execute", side_effect=[RuntimeError("busy"), None])
+    query = mocker.Mock()
+    query.awaitTermination.side_effect = [False, False, False, False, True]
+    type(query).lastProgress = mocker.PropertyMock(
+        side_effect=[None, {"batchId": 0}, {"batchId": 0}, {"batchId": 1}, {"batchId": 1}]
+    )
+
+    writer = DeltaTableStreamWriter(
+        table="my_table",
+        checkpoint_location=tmp_path.as_posix(),
+        maintenance=DeltaTableMaintenance(min_commits=1, check_interval=5),
+    )
+    writer.streaming_query = query
+    writer._monitor_maintenance()
+
+    # checked once per new micro-batch, a failed maintenance does not stop the monitor
+    assert execute.call_count == 2
+    query.awaitTermination.assert_called_with(5)
+
+
+def test_delta_table_stream_writer_monitor_stops_on_failure(mocker, spark, tmp_path):
+    from koheesio.spark.writers.delta import DeltaTableStreamWriter
+
+    execute = mocker.patch.object(DeltaTableMaintenance, "execute")
+    query = mocker.Mock()
+    query.awaitTermination.side_effect = RuntimeError("query failed")
+
+    writer = DeltaTableStreamWriter(
+        table="my_table",
+        checkpoint_location=tmp_path.as_posix(),
+        maintenance=DeltaTableMaintenance(min_files_added=1),
+    )
+    writer.streaming_query = query
+    writer._monitor_maintenance()
+
+    execute.assert_not_called()
@@ -293,7 +293,8 @@ def test_scd2_custom_logic(spark):
         assert result == expected
 
 
-def test_scd2_logic(spark):
+@pytest.mark.parametrize("hash_diff", [None, "xxhash64", "sha2"])
+def test_scd2_logic(spark, hash_diff):
     from koheesio.spark.utils.connect import is_remote_session
 
     changes_data = [
@@ -426,6 +427,7 @@ def test_scd2_logic(spark):
         merge_key="merge_key",
         scd2_columns=["value_scd2"],
         scd1_columns=["value_scd1"],
+        hash_diff=hash_diff,
     )
 
     # Act & Assert
@@ -441,9 +443,46 @@ def test_scd2_logic(spark):
         else:
             writer.execute()
             res = (
-                spark.sql("SELECT merge_key,value_scd2, value_scd1, _scd2.* FROM scd2_test_data_set")
+                spark.sql(
+                    "SELECT merge_key,value_scd2, value_scd1, _scd2.effective_time, _scd2.end_time, _scd2.is_current "
+                    "FROM scd2_test_data_set"
+                )
                 .orderBy("merge_key", "effective_time")
                 .collect()
             )
 
             assert res == expected
+
+    if hash_diff and not is_remote_session():
+        hashes = spark.sql(
+            "SELECT _scd2.scd2_hash, _scd2.scd1_hash FROM scd2_test_data_set WHERE _scd2.is_current"
+        ).collect()
+        assert all(h.scd2_hash is not None and h.scd1_hash is not None for h in hashes)
+
+
+@pytest.mark.parametrize(
+    "algorithm, expected",
+    [
+        (
+            "xxhash64",
+            "NOT (xxhash64(src.a, src.a IS NULL, src.b, src.b IS NULL) <=> "
+            "coalesce(tgt._scd2.scd2_hash, xxhash64(tgt.a, tgt.a IS NULL, tgt.b, tgt.b IS NULL)))",
+        ),
+        (
+            "sha2",
+            "NOT (sha2(to_json(struct(src.a, src.b)), 256) <=> "
+            "coalesce(tgt._scd2.scd2_hash, sha2(to_json(struct(tgt.a, tgt.b)), 256)))",
+        ),
+    ],
+)
+def test_scd2_prepare_hash_clause(algorithm, expected):
+    clause = SCD2DeltaTableWriter._prepare_hash_clause(
+        attrs=["a", "b"], algorithm=algorithm, hash_col="_scd2.scd2_hash", src_alias="src", dest_alias="tgt"
+    )
+    assert clause == expected
+    assert (
+        SCD2DeltaTableWriter._prepare_hash_clause(
+            attrs=[], algorithm=algorithm, hash_col="_scd2.scd2_hash", src_alias="src", dest_alias="tgt"
+        )
+        is None
+    )
@@ -0,0 +1,124 @@
+import json
+from unittest import mock
+
+import pytest
+
+from pyspark.sql.streaming import StreamingQuery
+
+from koheesio.spark.kafka import KafkaSerializer, LocalSchemaRegistry
+from koheesio.spark.writers.kafka import KafkaWriter
+
+pytestmark = pytest.mark.spark
+
+
+@pytest.fixture
+def orders(spark):
+    return spark.createDataFrame(
+        [(1, "a", 1.5, "t1"), (2, "b", None, "t2")], "order_id int, customer string, amount double, trace_id string"
+    )
+
+
+def kafka_writer(df, **kwargs):
+    return KafkaWriter(df=df, broker="broker:9092", topic="orders", checkpoint_location="/tmp/checkpoint", **kwargs)
+
+
+def test_kafka_writer_serialize(orders):
+    writer = kafka_writer(
+        orders,
+        key_serializer=KafkaSerializer(format="string", columns=["order_id"]),
+        value_serializer=KafkaSerializer(format="json", columns=["order_id", "customer", "amount"]),
+        header_columns=["trace_id"],
+    )
+    df = writer.serialize(orders)
+
+    assert writer.options["includeHeaders"] == "true"
+    assert df.columns == ["key", "value", "headers"]
+    rows = df.orderBy("key").collect()
+    assert [(row.key, json.loads(row.value)) for row in rows] == [
+        ("1", {"order_id": 1, "customer": "a", "amount": 1.5}),
+        ("2", {"order_id": 2, "customer": "b"}),
+    ]
+    assert [(h.key, bytes(h.value)) for h in rows[0].headers] == [("trace_id", b"t1")]
+
+
+def test_kafka_writer_without_serializers(orders):
+    writer = kafka_writer(orders)
+    assert writer.serialize(orders) is orders
+
+
+def test_kafka_writer_confluent_wire_format(orders, tmp_path):
+    registry = LocalSchemaRegistry(path=(tmp_path / "registry.json").as_posix())
+    registry.register("orders-key", "other")
+    writer = kafka_writer(
+        orders,
+        value_serializer=KafkaSerializer(format="string", columns=["customer"], schema='"string"', registry=registry),
+    )
+    df = writer.serialize(orders)
+
+    assert registry.get_latest("orders-value") == (2, '"string"')
+    assert sorted(bytes(row.value) for row in df.collect()) == [b"\x00\x00\x00\x00\x02a", b"\x00\x00\x00\x00\x02b"]
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({}, {}),
+        ({"profile": "throughput"}, {"kafka.linger.ms": "100", "kafka.batch.size": "1048576", "kafka.acks": "all"}),
+        # only the low latency profile trades durability for latency
+        ({"profile": "low_latency"}, {"kafka.linger.ms": "0", "kafka.acks": "1"}),
+        # explicit options take precedence over the profile
+        ({"profile": "durable", "kafka.linger.ms": "5"}, {"kafka.linger.ms": "5", "kafka.acks": "all"}),
+    ],
+)
+def test_kafka_writer_profile(orders, kwargs, expected):
+    options = kafka_writer(orders, **kwargs).options
+    assert {k: v for k, v in options.items() if k in expected} == expected
+    if not expected:
+        assert "kafka.linger.ms" not in options
+
+
+def test_kafka_writer_key_serializer_requires_columns(orders):
+    with pytest.raises(ValueError, match="columns"):
+        kafka_writer(orders, key_serializer=KafkaSerializer(format="string"))
+
+
+def test_kafka_writer_batch_metrics(orders):
+    writer = kafka_writer(orders, value_serializer=KafkaSerializer(format="string", columns=["customer"]))
+    writer._observe(writer.serialize(orders)).collect()
+    assert writer._observation.get == {"records": 2, "bytes": 2}
+
+
+def test_kafka_writer_streaming_metrics(spark, tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "data.json").write_text('{"value": "abc"}\n{"value": "de"}\n')
+    stream = spark.readStream.schema("value string").json(source.as_posix())
+
+    writer = kafka_writer(stream)
+    query = (
+        writer._observe(stream)
+        .writeStream.format("noop")
+        .option("checkpointLocation", (tmp_path / "checkpoint").as_posix())
+        .trigger(availableNow=True)
+        .start()
+    )
+    query.awaitTermination()
+    writer.output.streaming_query = query
+
+    assert writer.refresh_batch_metrics() == [{"batch_id": 0, "records": 2, "bytes": 5}]
+    # batches that were collected before are not added again
+    assert writer.refresh_batch_metrics() == [{"batch_id": 0, "records": 2, "bytes": 5}]
+
+
+def test_kafka_writer_streaming_metrics_history_size(orders):
+    progress = [
+        {"batchId": batch_id, "observedMetrics": {"kafka_writer": {"records": batch_id, "bytes": 1}}}
+        for batch_id in range(5)
+    ]
+    writer = kafka_writer(orders, metrics_history_size=2)
+    writer._observation_name = "kafka_writer"
+    writer.output.streaming_query = mock.Mock(spec=StreamingQuery, recentProgress=progress[:3])
+    assert [batch["batch_id"] for batch in writer.refresh_batch_metrics()] == [1, 2]
+
+    writer.output.streaming_query.recentProgress = progress[1:]
+    assert [batch["batch_id"] for batch in writer.refresh_batch_metrics()] == [3, 4]
@@ -64,3 +64,43 @@ def test_execute():
     actual_value = trigger.value
     actual_execute = trigger.execute()
     assert actual_value == {"processingTime": "5 seconds"} == actual_execute.value
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_foreachbatch_fan_out(spark, mocker, parallel):
+    """Test that all writers run on the same persisted batch and that failures are recorded per writer"""
+    from koheesio.spark.writers.dummy import DummyWriter
+    from koheesio.spark.writers.stream import ForEachBatchFanOut
+
+    df = spark.range(3)
+    persisted = mocker.MagicMock()
+    mocker.patch.object(type(df), "persist", return_value=persisted)
+
+    failing_writer = DummyWriter(name="failing")
+    mocker.patch.object(DummyWriter, "write", autospec=True, side_effect=[None, ValueError("boom")])
+
+    fan_out = ForEachBatchFanOut(writers=[DummyWriter(name="ok"), failing_writer], parallel=parallel)
+    with pytest.raises(RuntimeError, match="1 writer\\(s\\) failed for batch 7"):
+        fan_out(df, 7)
+
+    persisted.unpersist.assert_called_once()
+    assert all(call.args[1] is persisted for call in DummyWriter.write.call_args_list)
+    assert sorted(m["writer"] for m in fan_out.metrics) == ["failing", "ok"]
+    assert [m["batch_id"] for m in fan_out.metrics] == [7, 7]
+    assert sum(m["error"] is not None for m in fan_out.metrics) == 1
+
+
+def test_foreachbatch_fan_out_delta_txn(spark, mocker):
+    """Test that Delta writers receive txnAppId and txnVersion, without altering the configured writer"""
+    from koheesio.spark.writers.delta import DeltaTableWriter
+    from koheesio.spark.writers.stream import ForEachBatchFanOut
+
+    params = []
+    mocker.patch.object(DeltaTableWriter, "execute", new=lambda w: params.append(w.params))
+
+    writer = DeltaTableWriter(table="my_table", output_mode="append")
+    fan_out = ForEachBatchFanOut(writers=[writer], txn_app_id="my_stream", raise_on_failure=False)
+    fan_out(spark.range(1), 3)
+
+    assert params == [{"txnAppId": "my_stream", "txnVersion": 3}]
+    assert writer.params == {}
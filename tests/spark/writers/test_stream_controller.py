@@ -0,0 +1,86 @@
+import pytest
+
+from koheesio.spark.readers.file_loader import JsonReader
+from koheesio.spark.readers.kafka import KafkaStreamReader
+from koheesio.spark.writers.stream import ForEachBatchStreamWriter
+from koheesio.spark.writers.stream_controller import AdaptiveStreamController
+
+pytestmark = pytest.mark.spark
+
+
+@pytest.fixture
+def stream_source(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    for i in range(6):
+        (source / f"data_{i}.json").write_text(f'{{"id": {i}}}\n')
+    return source.as_posix()
+
+
+@pytest.mark.parametrize(
+    "limit, durations, kwargs, expected",
+    [
+        # batches are twice as fast as the target, limit doubles
+        (100, [30, 30], {"smoothing": 1}, 200),
+        # smoothing takes the average of the current and the proposed limit
+        (100, [30, 30], {}, 150),
+        # batches are too slow, limit decreases
+        (100, [120], {"smoothing": 1}, 50),
+        # bounds are respected
+        (100, [1], {"max_limit": 500}, 500),
+        (100, [6000], {"min_limit": 10, "smoothing": 1}, 10),
+        # nothing was processed, limit is kept
+        (100, [], {}, 100),
+    ],
+)
+def test_next_limit(spark, limit, durations, kwargs, expected):
+    controller = AdaptiveStreamController(
+        reader=KafkaStreamReader(read_broker="broker:9092", topic="topic"),
+        writer=ForEachBatchStreamWriter(checkpoint_location="/tmp/checkpoint", batch_function=print),
+        target_batch_duration=60,
+        initial_limit=limit,
+        **kwargs,
+    )
+    assert controller.limit_option == "maxOffsetsPerTrigger"
+    assert controller.next_limit(limit, durations) == expected
+
+
+@pytest.mark.parametrize(
+    "backlog, expected",
+    [
+        # unknown backlog, the limit is smoothed
+        (None, 150),
+        # catching up, the limit grows without smoothing
+        (10_000, 200),
+        # caught up, the limit is not raised above the backlog
+        (80, 90),
+        (0, 50),
+    ],
+)
+def test_next_limit_backlog(spark, backlog, expected):
+    controller = AdaptiveStreamController(
+        reader=KafkaStreamReader(read_broker="broker:9092", topic="topic"),
+        writer=ForEachBatchStreamWriter(checkpoint_location="/tmp/checkpoint", batch_function=print),
+        target_batch_duration=60,
+        initial_limit=100,
+    )
+    assert controller.next_limit(100, [30, 30], backlog) == expected
+
+
+def test_adaptive_stream_controller(spark, tmp_path, stream_source):
+    reader = JsonReader(path=stream_source, streaming=True, schema="id long")
+    writer = ForEachBatchStreamWriter(
+        checkpoint_location=(tmp_path / "checkpoint").as_posix(),
+        batch_function=lambda df, batch_id: df.count(),
+    )
+
+    controller = AdaptiveStreamController(
+        reader=reader, writer=writer, initial_limit=1, max_limit=3, target_batch_duration=3600
+    )
+    output = controller.execute()
+
+    assert reader.extra_params["maxFilesPerTrigger"] == "3"
+    assert writer.trigger.value == {"availableNow": True}
+    # the first run processes one file per batch, the second run finds no new data
+    assert [(run["limit"], run["batches"], run["rows"]) for run in output.runs] == [(1, 6, 6), (3, 0, 0)]
+    assert output.limit == 3
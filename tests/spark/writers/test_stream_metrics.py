@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from koheesio import Step
+from koheesio.notifications import NotificationSeverity
+from koheesio.spark.writers.stream import ForEachBatchStreamWriter
+from koheesio.spark.writers.stream_metrics import (
+    StreamingMetricAlert,
+    StreamingMetricsCollector,
+    progress_to_metrics,
+)
+
+pytestmark = pytest.mark.spark
+
+PROGRESS = {
+    "id": "query-id",
+    "runId": "run-id",
+    "name": "my_query",
+    "timestamp": "2024-01-01T00:10:00.000Z",
+    "batchId": 3,
+    "numInputRows": 100,
+    "inputRowsPerSecond": 10.0,
+    "processedRowsPerSecond": 50.0,
+    "durationMs": {"addBatch": 1500, "triggerExecution": 2000},
+    "eventTime": {"watermark": "2024-01-01T00:00:00.000Z"},
+    "stateOperators": [
+        {"numRowsTotal": 10, "numRowsUpdated": 2, "memoryUsedBytes": 1024},
+        {"numRowsTotal": 5, "numRowsUpdated": 1, "memoryUsedBytes": 512},
+    ],
+}
+
+
+def test_progress_to_metrics():
+    metrics = progress_to_metrics(PROGRESS)
+    assert metrics["batch_id"] == 3
+    assert metrics["batch_duration_ms"] == 2000
+    assert metrics["duration_ms"] == {"addBatch": 1500, "triggerExecution": 2000}
+    assert metrics["state_rows_total"] == 15
+    assert metrics["state_rows_updated"] == 3
+    assert metrics["state_memory_used_bytes"] == 1536
+    assert metrics["watermark_lag_seconds"] == 600
+
+
+def test_collector_ring_buffer_and_jsonl(tmp_path):
+    jsonl_path = tmp_path / "metrics.jsonl"
+    collector = StreamingMetricsCollector(buffer_size=2, jsonl_path=jsonl_path.as_posix())
+
+    for batch_id in range(3):
+        collector.record({**PROGRESS, "batchId": batch_id})
+    # the same progress is only recorded once
+    assert collector.record({**PROGRESS, "batchId": 2}) is None
+
+    assert [m["batch_id"] for m in collector.progress()] == [1, 2]
+    assert collector.progress(query_id="other") == []
+    assert collector.last["batch_id"] == 2
+    assert [json.loads(line)["batch_id"] for line in jsonl_path.read_text().splitlines()] == [0, 1, 2]
+
+
+def test_collector_alerts(mocker):
+    callback = mocker.MagicMock()
+    notification = mocker.MagicMock(spec=Step)
+    collector = StreamingMetricsCollector(
+        alerts=[
+            StreamingMetricAlert(metric="batch_duration_ms", threshold=1000, callback=callback),
+            StreamingMetricAlert(
+                metric="processed_rows_per_second",
+                threshold=10,
+                above=False,
+                severity=NotificationSeverity.ERROR,
+                notification=notification,
+            ),
+        ]
+    )
+    collector.record(PROGRESS)
+
+    callback.assert_called_once()
+    assert "batch_duration_ms=2000 is above the threshold of 1000" in callback.call_args.args[0]
+    notification.model_copy.assert_not_called()
+
+
+def test_stream_writer_metrics(spark, tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "data.json").write_text('{"id": 1}\n{"id": 2}\n')
+    df = spark.readStream.schema("id long").json(source.as_posix())
+
+    writer = ForEachBatchStreamWriter(
+        df=df,
+        checkpoint_location=(tmp_path / "checkpoint").as_posix(),
+        batch_function=lambda batch_df, batch_id: batch_df.count(),
+    )
+    writer.execute()
+    writer.await_termination()
+
+    metrics = writer.output.metrics.progress()
+    assert metrics
+    assert sum(m["num_input_rows"] for m in metrics) == 2
+    assert metrics[0]["query_id"] == str(writer.streaming_query.id)